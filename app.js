@@ -10,11 +10,10 @@ import {
 } from "./utils.js";
 import {
   buildAdversarialIntelReport,
-  collectSleeperPlayerIdsFromSeasonData,
   fetchLeagueHistoryChain,
   fetchLeagueSeasonData
 } from "./intel_engine.js";
-import { currentSleeperSeason, fetchSleeperJSON } from "./site_state.js";
+import { currentSleeperSeason, fetchSleeperJSON, loadSleeperPlayerCatalog } from "./site_state.js";
 
 const FREE_DAILY_LIMIT = 3;
 const FREE_USAGE_STORAGE_KEY = "fdl_free_usage";
@@ -26,9 +25,6 @@ const REMOTE_SEARCH_MIN_CHARS = 2;
 const REMOTE_SEARCH_DEBOUNCE_MS = 300;
 const PLAYER_CATALOG_CACHE_KEY = "fdl_player_catalog_cache_v1";
 const PLAYER_CATALOG_CACHE_TTL_MS = 6 * 60 * 60 * 1000;
-const SLEEPER_SUBSET_CACHE_KEY = "fdl_sleeper_subset_cache_v1";
-const SLEEPER_SUBSET_CACHE_TTL_MS = 24 * 60 * 60 * 1000;
-const SLEEPER_SUBSET_CACHE_MAX = 5000;
 
 let suggestionRequestCounter = 0;
 let suggestionDebounceTimer = null;
@@ -43,7 +39,6 @@ const state = {
   sleeperSeason: currentSleeperSeason(),
   sleeperUserId: "",
   availableLeagues: [],
-  sleeperPlayersById: null,
   syncedLeagueId: "",
   syncedRoster: [],
   syncedLeagueSummary: "",
@@ -506,9 +501,8 @@ async function handleLeagueSync() {
       throw new Error("Could not find your roster in that league.");
     }
 
-    const rosterSleeperIds = dedupe([...(myRoster.players || []), ...(myRoster.reserve || []), ...(myRoster.taxi || [])]);
-    setStatus("Loading Sleeper player subset for roster mapping...", "info");
-    const sleeperPlayersById = await loadSleeperPlayerCatalog(rosterSleeperIds);
+    setStatus("Loading Sleeper player catalog for roster mapping...", "info");
+    const sleeperPlayersById = await loadSleeperPlayerCatalog();
     const mapped = mapSleeperRosterToInternalIds(myRoster, sleeperPlayersById);
 
     if (mapped.ids.length === 0) {
@@ -666,8 +660,7 @@ async function fetchLeagueSeasonDataForTerminal(leagues) {
 }
 
 async function buildTerminalIntelReport(seasonData, myUserId) {
-  const referencedPlayerIds = collectSleeperPlayerIdsFromSeasonData(seasonData);
-  const sleeperPlayersById = await loadSleeperPlayerCatalog(referencedPlayerIds);
+  const sleeperPlayersById = await loadSleeperPlayerCatalog();
   return buildAdversarialIntelReport(seasonData, myUserId, sleeperPlayersById, {
     profileTone: "terminal",
     includeTradeTimeline: false
@@ -920,47 +913,6 @@ function getActiveRoster() {
   return [...SAMPLE_LEAGUES[0].roster];
 }
 
-async function loadSleeperPlayerCatalog(requestedIds = []) {
-  const requested = dedupe((requestedIds || []).map((item) => String(item || "").trim()).filter(Boolean));
-  if (!requested.length) {
-    return state.sleeperPlayersById || {};
-  }
-
-  if (!state.sleeperPlayersById) {
-    hydrateSleeperSubsetFromCache();
-    if (!state.sleeperPlayersById) {
-      state.sleeperPlayersById = {};
-    }
-  }
-
-  const missing = requested.filter((playerId) => !state.sleeperPlayersById[playerId]);
-  if (!missing.length) {
-    return state.sleeperPlayersById;
-  }
-
-  const response = await fetch("/api/sleeper/players/by-ids", {
-    method: "POST",
-    headers: { "Content-Type": "application/json" },
-    body: JSON.stringify({ ids: missing })
-  });
-  if (!response.ok) {
-    throw new Error(`Sleeper player cache API returned ${response.status}.`);
-  }
-  const payload = await response.json();
-  const players = payload?.players;
-  if (!players || typeof players !== "object") {
-    throw new Error("Sleeper player subset payload was not usable.");
-  }
-
-  state.sleeperPlayersById = {
-    ...state.sleeperPlayersById,
-    ...players
-  };
-  trimSleeperSubsetCache();
-  persistSleeperSubsetCache();
-  return state.sleeperPlayersById;
-}
-
 function hydrateCatalogFromCache() {
   const payload = readCachedJson(PLAYER_CATALOG_CACHE_KEY);
   if (!payload || !Array.isArray(payload.players) || payload.players.length === 0) {
@@ -990,33 +942,6 @@ function persistCatalogCache() {
   });
 }
 
-function hydrateSleeperSubsetFromCache() {
-  const payload = readCachedJson(SLEEPER_SUBSET_CACHE_KEY);
-  if (!payload || !payload.players || typeof payload.players !== "object") {
-    return "miss";
-  }
-  state.sleeperPlayersById = payload.players;
-  return isCacheFresh(payload.timestamp, SLEEPER_SUBSET_CACHE_TTL_MS) ? "fresh" : "stale";
-}
-
-function persistSleeperSubsetCache() {
-  if (!state.sleeperPlayersById || typeof state.sleeperPlayersById !== "object") {
-    return;
-  }
-  writeCachedJson(SLEEPER_SUBSET_CACHE_KEY, {
-    timestamp: Date.now(),
-    players: state.sleeperPlayersById
-  });
-}
-
-function trimSleeperSubsetCache() {
-  const entries = Object.entries(state.sleeperPlayersById || {});
-  if (entries.length <= SLEEPER_SUBSET_CACHE_MAX) {
-    return;
-  }
-  state.sleeperPlayersById = Object.fromEntries(entries.slice(entries.length - SLEEPER_SUBSET_CACHE_MAX));
-}
-
 function readCachedJson(key) {
   try {
     return JSON.parse(localStorage.getItem(key) || "null");
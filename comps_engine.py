@@ -0,0 +1,85 @@
+"""Player comps: nearest neighbours over per-position season metric vectors.
+
+A player-season's vector holds, for each stat_key in the metric set, the
+per-game average of that stat over the season's regular-season weeks,
+z-scored within its (season, position) cohort. Z-scores put yards, shares
+and touchdowns on one scale and make a season comparable with other seasons
+at the same position.
+
+Distance is the root-mean-square z difference over the metrics both vectors
+have, so a candidate missing a metric is neither rewarded nor punished for
+it; candidates sharing fewer than MIN_SHARED_FRACTION of the metrics are
+skipped. Cohorts are a few hundred player-seasons, so a linear scan over
+the pool beats building a spatial index.
+"""
+
+import heapq
+import math
+
+MAX_COMPS_METRICS = 24
+MAX_COMPS_K = 50
+DEFAULT_COMPS_K = 10
+MIN_SHARED_FRACTION = 0.5
+COMPS_POOLS = ("season", "all")
+
+COMPS_DEFAULT_METRICS = {
+    "QB": ("fantasy_points_ppr", "passing_yards", "passing_tds", "interceptions", "rushing_yards", "rushing_tds"),
+    "RB": ("fantasy_points_ppr", "carries", "rushing_yards", "rushing_tds", "targets", "receptions", "receiving_yards"),
+    "WR": ("fantasy_points_ppr", "targets", "target_share", "receptions", "receiving_yards", "receiving_tds"),
+    "TE": ("fantasy_points_ppr", "targets", "target_share", "receptions", "receiving_yards", "receiving_tds"),
+}
+FALLBACK_COMPS_METRICS = ("fantasy_points_ppr",)
+
+
+class CompsError(ValueError):
+    pass
+
+
+def default_metrics(position):
+    return list(COMPS_DEFAULT_METRICS.get(str(position or "").upper(), FALLBACK_COMPS_METRICS))
+
+
+def zscore_cohorts(rows):
+    """Map (player_id, season, position, value) rows to {position: {(player_id, season): (value, z)}}.
+
+    Z-scores use the population standard deviation of the (season, position)
+    cohort; single-valued or constant cohorts get z 0.
+    """
+    cohorts = {}
+    for player_id, season, position, value in rows:
+        cohorts.setdefault((season, position), []).append((player_id, value))
+    out = {}
+    for (season, position), members in cohorts.items():
+        mean = sum(value for _, value in members) / len(members)
+        variance = sum((value - mean) ** 2 for _, value in members) / len(members)
+        scale = math.sqrt(variance) if variance > 1e-12 else None
+        column = out.setdefault(position, {})
+        for player_id, value in members:
+            column[(player_id, season)] = (value, (value - mean) / scale if scale else 0.0)
+    return out
+
+
+def nearest(target, candidates, k):
+    """Return the k nearest candidates as (distance, key, shared) tuples, closest first.
+
+    target is {stat_key: z}; candidates is {key: {stat_key: z}}.
+    """
+    required = max(1, math.ceil(len(target) * MIN_SHARED_FRACTION))
+
+    def scored():
+        for key, vector in candidates.items():
+            total = 0.0
+            shared = 0
+            for stat_key, z in target.items():
+                other = vector.get(stat_key)
+                if other is not None:
+                    total += (other - z) ** 2
+                    shared += 1
+            if shared >= required:
+                yield math.sqrt(total / shared), key, shared
+
+    return heapq.nsmallest(k, scored(), key=lambda entry: (entry[0], -entry[2], entry[1]))
+
+
+def similarity(distance):
+    return round(1.0 / (1.0 + distance), 4)
@@ -0,0 +1,259 @@
+"""Custom screener formulas over stat_keys.
+
+A formula is a small arithmetic expression such as
+``per_game(receiving_yards) / max(targets, 1)`` or
+``target_share__pct * 0.6 + yards_per_route__pct * 0.4``. It is parsed by a
+hand-written recursive-descent parser (never ``eval``) into a tuple tree:
+
+- numbers and stat_key identifiers;
+- ``+ - * /`` and unary minus, with the usual precedence and parentheses;
+- ``min(a, b, ...)``, ``max(a, b, ...)``, ``abs(x)``, ``ratio(a, b)`` and
+  ``per_game(x)`` (x divided by games played in the screener window; 1 for
+  latest values).
+
+A missing stat makes the whole formula missing, and so does division by
+zero. The tree compiles to a SQL expression (SQLite NULL semantics give the
+same result) and evaluates column-at-a-time over dense per-stat arrays with
+NaN for missing cells (see ``screener_index``).
+"""
+
+import math
+import operator
+import re
+from array import array
+from functools import lru_cache
+from typing import NamedTuple
+
+NAN = float("nan")
+MAX_FORMULA_LENGTH = 400
+MAX_FORMULA_NODES = 64
+MAX_FORMULA_STAT_KEYS = 12
+MAX_FORMULAS = 8
+
+TOKEN_PATTERN = re.compile(r"\s*(?:(\d+\.?\d*(?:e[+-]?\d+)?|\.\d+(?:e[+-]?\d+)?)|([a-z_][a-z0-9_]*)|(.))")
+BINARY_OPERATORS = {"+": "add", "-": "sub", "*": "mul", "/": "div"}
+BINARY_SQL = {"add": "+", "sub": "-", "mul": "*", "div": "/"}
+# name: (min args, max args or None)
+FUNCTIONS = {"min": (2, None), "max": (2, None), "abs": (1, 1), "ratio": (2, 2), "per_game": (1, 1)}
+
+
+class FormulaError(ValueError):
+    pass
+
+
+class Formula(NamedTuple):
+    name: str
+    expression: str
+    tree: tuple
+    stat_keys: tuple
+
+
+def _tokenize(text):
+    tokens = []
+    position = 0
+    text = text.strip().lower()
+    while position < len(text):
+        match = TOKEN_PATTERN.match(text, position)
+        number, name, symbol = match.groups()
+        if number is not None:
+            value = float(number)
+            if not math.isfinite(value):
+                # repr() would render it as "inf", which SQLite reads as a column name.
+                raise FormulaError(f"number {number!r} is out of range")
+            tokens.append(("num", value))
+        elif name is not None:
+            tokens.append(("name", name))
+        elif symbol is not None:
+            if symbol not in "+-*/(),":
+                raise FormulaError(f"unexpected character {symbol!r}")
+            tokens.append(("op", symbol))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def take(self, symbol=None):
+        token = self.peek()
+        if token[0] is None or (symbol is not None and token != ("op", symbol)):
+            raise FormulaError(f"expected {symbol!r}" if symbol else "unexpected end of formula")
+        self.position += 1
+        return token
+
+    def expression(self):
+        node = self.term()
+        while self.peek() in {("op", "+"), ("op", "-")}:
+            node = (BINARY_OPERATORS[self.take()[1]], node, self.term())
+        return node
+
+    def term(self):
+        node = self.unary()
+        while self.peek() in {("op", "*"), ("op", "/")}:
+            node = (BINARY_OPERATORS[self.take()[1]], node, self.unary())
+        return node
+
+    def unary(self):
+        if self.peek() == ("op", "-"):
+            self.take()
+            return ("neg", self.unary())
+        if self.peek() == ("op", "+"):
+            self.take()
+            return self.unary()
+        return self.primary()
+
+    def primary(self):
+        kind, value = self.take()
+        if kind == "num":
+            return ("num", value)
+        if kind == "name":
+            if self.peek() != ("op", "("):
+                return ("stat", value)
+            if value not in FUNCTIONS:
+                raise FormulaError(f"unknown function {value!r}")
+            self.take("(")
+            args = [self.expression()]
+            while self.peek() == ("op", ","):
+                self.take()
+                args.append(self.expression())
+            self.take(")")
+            low, high = FUNCTIONS[value]
+            if len(args) < low or (high is not None and len(args) > high):
+                raise FormulaError(f"{value}() takes {low if low == high else f'at least {low}'} argument(s)")
+            return ("call", value, tuple(args))
+        if (kind, value) == ("op", "("):
+            node = self.expression()
+            self.take(")")
+            return node
+        raise FormulaError(f"unexpected {value!r}")
+
+
+def _walk(tree):
+    yield tree
+    if tree[0] in {"num", "stat"}:
+        return
+    children = tree[2] if tree[0] == "call" else tree[1:]
+    for child in children:
+        yield from _walk(child)
+
+
+def unparse(tree):
+    kind = tree[0]
+    if kind == "num":
+        return repr(tree[1])
+    if kind == "stat":
+        return tree[1]
+    if kind == "neg":
+        return f"-{unparse(tree[1])}"
+    if kind == "call":
+        return f"{tree[1]}({', '.join(unparse(arg) for arg in tree[2])})"
+    return f"({unparse(tree[1])} {BINARY_SQL[kind]} {unparse(tree[2])})"
+
+
+@lru_cache(maxsize=256)
+def parse_tree(text):
+    """Parse formula text into (tree, stat_keys); raises FormulaError."""
+    text = str(text or "")
+    if not text.strip():
+        raise FormulaError("formula is empty")
+    if len(text) > MAX_FORMULA_LENGTH:
+        raise FormulaError(f"formula is longer than {MAX_FORMULA_LENGTH} characters")
+    parser = _Parser(_tokenize(text))
+    tree = parser.expression()
+    if parser.position != len(parser.tokens):
+        raise FormulaError(f"unexpected {parser.peek()[1]!r}")
+    nodes = list(_walk(tree))
+    if len(nodes) > MAX_FORMULA_NODES:
+        raise FormulaError(f"formula has more than {MAX_FORMULA_NODES} terms")
+    stat_keys = tuple(dict.fromkeys(node[1] for node in nodes if node[0] == "stat"))
+    if not stat_keys:
+        raise FormulaError("formula must reference at least one stat")
+    if len(stat_keys) > MAX_FORMULA_STAT_KEYS:
+        raise FormulaError(f"formula references more than {MAX_FORMULA_STAT_KEYS} stats")
+    return tree, stat_keys
+
+
+def parse_formula(name, text):
+    tree, stat_keys = parse_tree(text)
+    return Formula(name=name, expression=unparse(tree), tree=tree, stat_keys=stat_keys)
+
+
+def to_sql(tree, stat_sql, games_sql="1"):
+    """Render tree as a SQL expression; stat_sql maps stat_key to a scalar SQL expression."""
+    kind = tree[0]
+    if kind == "num":
+        return repr(float(tree[1]))
+    if kind == "stat":
+        return stat_sql[tree[1]]
+    if kind == "neg":
+        return f"(-{to_sql(tree[1], stat_sql, games_sql)})"
+    if kind == "call":
+        args = [to_sql(arg, stat_sql, games_sql) for arg in tree[2]]
+        name = tree[1]
+        if name in {"min", "max"}:
+            return f"{name.upper()}({', '.join(args)})"
+        if name == "abs":
+            return f"ABS({args[0]})"
+        if name == "ratio":
+            return f"({args[0]} / {args[1]})"
+        return f"({args[0]} / {games_sql})"
+    return f"({to_sql(tree[1], stat_sql, games_sql)} {BINARY_SQL[kind]} {to_sql(tree[2], stat_sql, games_sql)})"
+
+
+def _divide(numerator, denominator):
+    return numerator / denominator if denominator else NAN
+
+
+def _least(*values):
+    return NAN if any(math.isnan(value) for value in values) else min(values)
+
+
+def _greatest(*values):
+    return NAN if any(math.isnan(value) for value in values) else max(values)
+
+
+COLUMN_OPERATORS = {"add": operator.add, "sub": operator.sub, "mul": operator.mul, "div": _divide}
+
+
+def evaluate_columns(tree, columns, size, games=None):
+    """Evaluate tree over whole columns at once.
+
+    columns maps stat_key to a length-size sequence of floats (NaN = missing);
+    games is an optional per-row games-played sequence for per_game().
+    Returns an array('d') with NaN where the formula is missing.
+    """
+    kind = tree[0]
+    if kind == "num":
+        return array("d", [tree[1]]) * size
+    if kind == "stat":
+        column = columns.get(tree[1])
+        return array("d", column) if column is not None else array("d", [NAN]) * size
+    if kind == "neg":
+        return array("d", map(operator.neg, evaluate_columns(tree[1], columns, size, games)))
+    if kind == "call":
+        args = [evaluate_columns(arg, columns, size, games) for arg in tree[2]]
+        name = tree[1]
+        if name == "min":
+            return array("d", map(_least, *args))
+        if name == "max":
+            return array("d", map(_greatest, *args))
+        if name == "abs":
+            return array("d", map(abs, args[0]))
+        if name == "ratio":
+            return array("d", map(_divide, args[0], args[1]))
+        return array("d", map(_divide, args[0], games if games is not None else array("d", [1.0]) * size))
+    left = evaluate_columns(tree[1], columns, size, games)
+    right = evaluate_columns(tree[2], columns, size, games)
+    return array("d", map(COLUMN_OPERATORS[kind], left, right))
+
+
+def evaluate_row(tree, values, games=None):
+    """Evaluate tree for one player's {stat_key: value}; returns None when missing."""
+    columns = {key: [NAN if value is None else float(value)] for key, value in values.items()}
+    result = evaluate_columns(tree, columns, 1, [1.0 if games is None else float(games)])[0]
+    return None if math.isnan(result) or math.isinf(result) else result
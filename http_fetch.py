@@ -0,0 +1,371 @@
+"""Pooled, compressed and conditional HTTP GETs for upstream pulls.
+
+urllib opens a fresh TCP/TLS connection per request and asks for the
+identity encoding, so the daily Sleeper ``/players/nfl`` pull, the GitHub
+release listing and the nflverse assets always cost a handshake and their
+full size. HttpFetcher instead:
+
+- keeps idle keep-alive connections per (scheme, host, port);
+- asks for gzip and decodes it;
+- sends If-None-Match / If-Modified-Since from validators the caller stored
+  with an earlier response (FetchResult.validators) and returns a 304 as a
+  ``not_modified`` result with an empty body;
+- follows redirects (GitHub release assets sit behind one) and keeps the
+  conditional headers on the way;
+- retries connection errors, 429 and 5xx a bounded number of times with
+  full-jitter exponential backoff;
+- honours the HTTP_PROXY / HTTPS_PROXY / NO_PROXY environment variables the
+  way urllib does (CONNECT tunnels for https).
+
+fetch() reads the whole body; stream() hands it over as a file object for
+large downloads. Any other non-200 status raises urllib.error.HTTPError, so
+callers written against urlopen keep their except clauses. The counters
+split body bytes that crossed the wire from bytes saved by compression and
+by 304s; a 304 saves the size recorded in the validators it was sent with.
+
+The v2 SleeperClient shares HostPool through its own HttpFetcher.
+"""
+
+import base64
+import contextlib
+import gzip
+import http.client
+import io
+import random
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from typing import NamedTuple
+
+DEFAULT_ATTEMPTS = 3
+DEFAULT_BACKOFF_SECONDS = 0.5
+MAX_IDLE_PER_HOST = 4
+MAX_REDIRECTS = 5
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# A pooled connection the server closed while idle fails on first use; the
+# request is replayed once on a fresh connection without counting a retry.
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+COUNTERS = (
+    "requests",
+    "retries",
+    "not_modified",
+    "connections_opened",
+    "bytes_transferred",
+    "bytes_decoded",
+    "bytes_saved",
+)
+
+
+def _validators(headers, size):
+    out = {}
+    if headers.get("etag"):
+        out["etag"] = headers["etag"]
+    if headers.get("last-modified"):
+        out["last_modified"] = headers["last-modified"]
+    if out:
+        out["bytes"] = size
+    return out
+
+
+class FetchResult(NamedTuple):
+    url: str
+    status: int
+    body: bytes
+    headers: dict
+    wire_bytes: int
+
+    @property
+    def not_modified(self):
+        return self.status == 304
+
+    def validators(self):
+        """Return {"etag", "last_modified", "bytes"} to store for the next conditional fetch ({} if none)."""
+        return _validators(self.headers, len(self.body))
+
+
+class StreamedResult:
+    """What stream() yields: body is a buffered binary file, already gzip-decoded."""
+
+    def __init__(self, url, status, headers, body):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.decoded_bytes = 0
+
+    @property
+    def not_modified(self):
+        return self.status == 304
+
+    def validators(self):
+        """Like FetchResult.validators; "bytes" counts what was read, so call it once the body is consumed."""
+        return _validators(self.headers, self.decoded_bytes)
+
+
+class _CountingReader(io.RawIOBase):
+    def __init__(self, raw):
+        self.raw = raw
+        self.count = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = self.raw.readinto(buffer)
+        self.count += size or 0
+        return size
+
+
+def _proxy_for(scheme, host):
+    """Return the proxy URL urllib would use for scheme://host, or None."""
+    proxy = urllib.request.getproxies().get(scheme)
+    if not proxy or urllib.request.proxy_bypass(host):
+        return None
+    return proxy if "://" in proxy else f"http://{proxy}"
+
+
+class HostPool:
+    """Idle keep-alive connections to one origin, shared by the caller's threads.
+
+    Through an http proxy requests go to the proxy with an absolute target;
+    through an https proxy each connection is a CONNECT tunnel.
+    """
+
+    def __init__(self, scheme, host, port, max_idle, proxy=None):
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.max_idle = max_idle
+        self.proxy = urllib.parse.urlsplit(proxy) if proxy else None
+        self.proxy_headers = {}
+        if self.proxy is not None and self.proxy.username:
+            credentials = f"{urllib.parse.unquote(self.proxy.username)}:{urllib.parse.unquote(self.proxy.password or '')}"
+            self.proxy_headers["Proxy-Authorization"] = "Basic " + base64.b64encode(credentials.encode()).decode("ascii")
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def target(self, parsed):
+        path = parsed.path or "/"
+        if parsed.query:
+            path = f"{path}?{parsed.query}"
+        if self.proxy is not None and self.scheme == "http":
+            return f"http://{parsed.netloc}{path}"
+        return path
+
+    def request_headers(self, headers):
+        if self.proxy is not None and self.scheme == "http" and self.proxy_headers:
+            return {**headers, **self.proxy_headers}
+        return headers
+
+    def acquire(self, timeout):
+        """Return (connection, reused); reused connections get this request's timeout."""
+        with self._lock:
+            connection = self._idle.pop() if self._idle else None
+        if connection is not None:
+            connection.timeout = timeout
+            if connection.sock is not None:
+                connection.sock.settimeout(timeout)
+            return connection, True
+        factory = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        if self.proxy is None:
+            return factory(self.host, self.port, timeout=timeout), False
+        connection = factory(self.proxy.hostname, self.proxy.port, timeout=timeout)
+        if self.scheme == "https":
+            connection.set_tunnel(self.host, self.port, headers=self.proxy_headers or None)
+        return connection, False
+
+    def release(self, connection):
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(connection)
+                return
+        connection.close()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+
+class HttpFetcher:
+    def __init__(
+        self,
+        user_agent,
+        attempts=DEFAULT_ATTEMPTS,
+        backoff_seconds=DEFAULT_BACKOFF_SECONDS,
+        max_idle_per_host=MAX_IDLE_PER_HOST,
+        sleep=time.sleep,
+    ):
+        self.user_agent = user_agent
+        self.attempts = max(1, attempts)
+        self.backoff_seconds = backoff_seconds
+        self.max_idle_per_host = max_idle_per_host
+        self._sleep = sleep
+        self._pools = {}
+        self._lock = threading.Lock()
+        self.stats = dict.fromkeys(COUNTERS, 0)
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats)
+
+    def stats_since(self, before):
+        """Counter deltas since an earlier snapshot(), e.g. for one sync run."""
+        now = self.snapshot()
+        return {key: now[key] - before.get(key, 0) for key in COUNTERS}
+
+    def close(self):
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            pool.close()
+
+    def _count(self, **deltas):
+        with self._lock:
+            for key, value in deltas.items():
+                self.stats[key] += value
+
+    def _pool(self, parsed):
+        scheme = parsed.scheme or "https"
+        key = (scheme, parsed.hostname, parsed.port)
+        with self._lock:
+            pool = self._pools.get(key)
+        if pool is not None:
+            return pool
+        pool = HostPool(
+            scheme, parsed.hostname, parsed.port, self.max_idle_per_host, proxy=_proxy_for(scheme, parsed.hostname)
+        )
+        with self._lock:
+            return self._pools.setdefault(key, pool)
+
+    def _headers(self, accept, validators):
+        headers = {"User-Agent": self.user_agent, "Accept-Encoding": "gzip"}
+        if accept:
+            headers["Accept"] = accept
+        if validators and validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators and validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+        return headers
+
+    def fetch(self, url, *, timeout=45, accept=None, validators=None):
+        """GET url and return a FetchResult; raises urllib.error.HTTPError for non-200/304 answers."""
+        url, response, done = self._open(url, self._headers(accept, validators), timeout)
+        raw = self._read(response, done)
+        response_headers = {key.lower(): value for key, value in response.msg.items()}
+        if response.status == 304:
+            self._count(not_modified=1, bytes_saved=int((validators or {}).get("bytes") or 0))
+            return FetchResult(url, response.status, b"", response_headers, len(raw))
+        if response.status != 200:
+            raise urllib.error.HTTPError(url, response.status, response.reason, response.msg, None)
+        body = raw
+        if response_headers.get("content-encoding", "").lower() == "gzip":
+            body = gzip.decompress(raw)
+        self._count(bytes_decoded=len(body), bytes_saved=len(body) - len(raw))
+        return FetchResult(url, response.status, body, response_headers, len(raw))
+
+    @contextlib.contextmanager
+    def stream(self, url, *, timeout=45, accept=None, validators=None):
+        """Like fetch(), but yield a StreamedResult whose body is read from the socket as it is consumed.
+
+        The connection goes back to the pool only if the body was read to the end.
+        """
+        url, response, done = self._open(url, self._headers(accept, validators), timeout)
+        response_headers = {key.lower(): value for key, value in response.msg.items()}
+        if response.status == 304:
+            self._read(response, done)
+            self._count(not_modified=1, bytes_saved=int((validators or {}).get("bytes") or 0))
+            yield StreamedResult(url, response.status, response_headers, io.BufferedReader(io.BytesIO()))
+            return
+        if response.status != 200:
+            self._read(response, done)
+            raise urllib.error.HTTPError(url, response.status, response.reason, response.msg, None)
+        wire = _CountingReader(response)
+        decoded = wire
+        if response_headers.get("content-encoding", "").lower() == "gzip":
+            decoded = _CountingReader(gzip.GzipFile(fileobj=io.BufferedReader(wire)))
+        result = StreamedResult(url, response.status, response_headers, io.BufferedReader(decoded))
+        try:
+            yield result
+        finally:
+            result.decoded_bytes = decoded.count
+            self._count(
+                bytes_transferred=wire.count, bytes_decoded=decoded.count, bytes_saved=decoded.count - wire.count
+            )
+            done(response.isclosed())
+
+    def _read(self, response, done):
+        try:
+            raw = response.read()
+        except BaseException:
+            done(False)
+            raise
+        self._count(bytes_transferred=len(raw))
+        done(True)
+        return raw
+
+    def _open(self, url, headers, timeout):
+        """Send GET url, following redirects; returns (final url, unread response, done(reusable))."""
+        for _ in range(MAX_REDIRECTS + 1):
+            response, done = self._send_with_retry(url, headers, timeout)
+            location = response.msg.get("Location")
+            if response.status not in REDIRECT_STATUSES or not location:
+                return url, response, done
+            self._read(response, done)
+            url = urllib.parse.urljoin(url, location)
+        raise urllib.error.URLError(f"Too many redirects fetching {url}")
+
+    def _send_with_retry(self, url, headers, timeout):
+        attempt = 1
+        while True:
+            try:
+                response, done = self._send(url, headers, timeout)
+                if response.status not in RETRY_STATUSES or attempt >= self.attempts:
+                    return response, done
+                self._read(response, done)
+            except OSError:
+                if attempt >= self.attempts:
+                    raise
+            except http.client.HTTPException as error:
+                # Protocol errors are not OSErrors; surface them as URLError like urlopen would.
+                if attempt >= self.attempts:
+                    raise urllib.error.URLError(error) from error
+            self._count(retries=1)
+            self._sleep(random.uniform(0, self.backoff_seconds * 2 ** (attempt - 1)))
+            attempt += 1
+
+    def _send(self, url, headers, timeout):
+        """One GET on a pooled connection; returns (unread response, done(reusable)) to hand it back."""
+        parsed = urllib.parse.urlsplit(url)
+        pool = self._pool(parsed)
+        target = pool.target(parsed)
+        headers = pool.request_headers(headers)
+        self._count(requests=1)
+        while True:
+            connection, reused = pool.acquire(timeout)
+            if not reused:
+                self._count(connections_opened=1)
+            try:
+                connection.request("GET", target, headers=headers)
+                response = connection.getresponse()
+            except STALE_CONNECTION_ERRORS:
+                connection.close()
+                if reused:
+                    continue
+                raise
+            except BaseException:
+                connection.close()
+                raise
+            break
+
+        def done(reusable):
+            if reusable and not response.will_close:
+                pool.release(connection)
+            else:
+                connection.close()
+
+        return response, done
@@ -413,7 +413,7 @@ async function loadMetricOptions() {
   }
 
   try {
-    const response = await fetch("/api/filter-options?limit=12000");
+    const response = await fetch("/api/metrics/catalog?scope=all");
     if (!response.ok) throw new Error(`HTTP ${response.status}`);
     const payload = await response.json();
     const items = (payload.items || []).filter((item) => item && item.key);
@@ -460,6 +460,7 @@ function applyMetricOptions(items) {
       minValue: Number(item.min_value),
       maxValue: Number(item.max_value),
       playerCount: Number(item.player_count || 0),
+      histogram: Array.isArray(item.histogram) ? item.histogram.map(Number) : [],
       category: categorizeMetricKey(key)
     };
   });
@@ -893,6 +894,7 @@ function renderActiveFilters() {
               boundMax
             )}</p>
           </div>
+          ${renderFilterHistogram(filter.key, left, right)}
           <div class="active-filter-controls">
             <input data-field="value" type="range" min="${boundMin}" max="${boundMax}" step="${step}" value="${left}" />
             <input data-field="value_max" type="range" min="${boundMin}" max="${boundMax}" step="${step}" value="${right}" />
@@ -907,6 +909,25 @@ function renderActiveFilters() {
   scheduleCustomScrollbarRefresh();
 }
 
+function renderFilterHistogram(key, left, right) {
+  const option = state.metricIndex.get(String(key || "").trim());
+  const counts = option?.histogram || [];
+  const peak = Math.max(0, ...counts);
+  if (!counts.length || !peak || !Number.isFinite(option.minValue) || !Number.isFinite(option.maxValue)) return "";
+  const width = (option.maxValue - option.minValue) / counts.length;
+  const bars = counts
+    .map((count, index) => {
+      const low = option.minValue + index * width;
+      const selected = low + width >= left && low <= right;
+      const height = Math.max(4, Math.round((count / peak) * 100));
+      return `<span class="${selected ? "is-selected" : ""}" style="height:${height}%" title="${formatCompact(
+        low
+      )} to ${formatCompact(low + width)}: ${count}"></span>`;
+    })
+    .join("");
+  return `<div class="active-filter-histogram" aria-hidden="true">${bars}</div>`;
+}
+
 function onActiveFilterClick(event) {
   const button = event.target.closest("button[data-action='remove-filter']");
   if (!button) return;
@@ -1020,7 +1041,8 @@ async function runScreen(options = {}) {
       sort_key: sortIsBuiltin ? "fantasy_points_ppr" : state.sortKey,
       sort_direction: state.sortDirection,
       filters,
-      columns: metricColumns
+      columns: metricColumns,
+      include: ["sparklines"]
     };
 
     const payload = await postScreenerQuery(request, activeScreenRequestController.signal);
@@ -1228,7 +1250,7 @@ function renderCell(item, columnKey, sticky) {
   if (columnKey === "player_name") {
     return `<td class="${sticky ? "sticky-col" : ""} player-cell"><span class="player-name">${escapeHtml(
       rawValue || "Unknown"
-    )}</span></td>`;
+    )}</span>${renderSparkline(item.sparkline)}</td>`;
   }
 
   if (columnKey === "position") {
@@ -1251,6 +1273,32 @@ function renderCell(item, columnKey, sticky) {
   return `<td class="${Number.isFinite(numeric) ? "num metric-cell" : "metric-cell"}">${escapeHtml(formatted)}</td>`;
 }
 
+function renderSparkline(sparkline) {
+  const points = (sparkline?.values?.fantasy_points_ppr || []).map((value) =>
+    value === null ? null : toNumberOrNull(value)
+  );
+  const observed = points.filter((value) => value !== null);
+  if (observed.length < 2) {
+    return "";
+  }
+  const width = 56;
+  const height = 14;
+  const max = Math.max(...observed, 1);
+  const step = width / Math.max(points.length - 1, 1);
+  const coords = points
+    .map((value, index) =>
+      value === null ? "" : `${(index * step).toFixed(1)},${(height - (value / max) * height).toFixed(1)}`
+    )
+    .filter(Boolean)
+    .join(" ");
+  const slope = Number(sparkline.ppr_slope || 0);
+  const trend = slope > 0.25 ? "up" : slope < -0.25 ? "down" : "flat";
+  const title = `Last ${sparkline.games} games PPR · ${slope >= 0 ? "+" : ""}${slope.toFixed(2)}/game`;
+  return `<svg class="sparkline sparkline-${trend}" width="${width}" height="${height}" viewBox="0 0 ${width} ${height}" role="img"><title>${escapeHtml(
+    title
+  )}</title><polyline points="${coords}" /></svg>`;
+}
+
 function renderDetailRow(item, colspan) {
   const metrics = item.metrics || {};
   const production = [
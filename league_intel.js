@@ -5,15 +5,15 @@ import {
   fetchSleeperJSON,
   getSleeperSession,
   hydrateHeader,
+  loadSleeperPlayerCatalog,
   renderConnectButton,
   setLeagueIntelContext,
   setSleeperSession,
   updateSelectedLeague
 } from "./site_state.js";
-import { clamp, dedupe, escapeHtml, round, signed } from "./utils.js";
+import { clamp, escapeHtml, round, signed } from "./utils.js";
 import {
   buildAdversarialIntelReport,
-  collectSleeperPlayerIdsFromSeasonData,
   fetchLeagueHistoryChain,
   fetchLeagueSeasonData,
   mergeRosterContext
@@ -249,8 +249,7 @@ async function fetchLeagueSeasonDataForIntel(leagues) {
 }
 
 async function buildIntelReport(seasonData, myUserId) {
-  const referencedPlayerIds = collectSleeperPlayerIdsFromSeasonData(seasonData);
-  state.sleeperPlayersById = await loadSleeperPlayerCatalog(referencedPlayerIds);
+  state.sleeperPlayersById = await loadSleeperPlayerCatalog();
   const report = buildAdversarialIntelReport(seasonData, myUserId, state.sleeperPlayersById, {
     profileTone: "intel",
     includeTradeTimeline: true
@@ -259,43 +258,6 @@ async function buildIntelReport(seasonData, myUserId) {
   return report;
 }
 
-async function loadSleeperPlayerCatalog(requestedIds = []) {
-  const requested = dedupe((requestedIds || []).map((item) => String(item || "").trim()).filter(Boolean));
-  if (!requested.length) {
-    return state.sleeperPlayersById || {};
-  }
-
-  if (!state.sleeperPlayersById) {
-    state.sleeperPlayersById = {};
-  }
-
-  const missing = requested.filter((playerId) => !state.sleeperPlayersById[playerId]);
-  if (!missing.length) {
-    return state.sleeperPlayersById;
-  }
-
-  const response = await fetch("/api/sleeper/players/by-ids", {
-    method: "POST",
-    headers: { "Content-Type": "application/json" },
-    body: JSON.stringify({ ids: missing })
-  });
-  if (!response.ok) {
-    throw new Error(`Could not load Sleeper player subset (HTTP ${response.status}).`);
-  }
-
-  const payload = await response.json();
-  const players = payload?.players;
-  if (!players || typeof players !== "object") {
-    throw new Error("Sleeper player subset payload was not usable.");
-  }
-
-  state.sleeperPlayersById = {
-    ...state.sleeperPlayersById,
-    ...players
-  };
-  return state.sleeperPlayersById;
-}
-
 function renderManagerGrid() {
   if (!state.report || !state.report.managers.length) {
     dom.summary.textContent = "No managers available.";
@@ -0,0 +1,117 @@
+"""League roster ownership for the screener's "available in my league" filters.
+
+A Sleeper league's rosters are fetched once per ROSTER_TTL_SECONDS and
+reduced to a LeagueOwnership: which roster owns each player (``players``,
+``reserve`` and ``taxi`` all count). The screener asks it for a sorted list
+of player ids, which the compiler binds as one JSON array and semi-joins
+against ``players`` (``p.player_id [NOT] IN json_each(...)``), and which
+the in-memory index turns into an eligibility bitset. Nothing is filtered
+after the page has been cut, so totals and pagination stay exact.
+
+Owners are matched by Sleeper user id (``owner_id`` or a co-owner) or by
+``roster_id``. The cache holds at most MAX_CACHED_LEAGUES leagues, least
+recently used first out, and concurrent misses for one league share a
+single fetch.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+
+ROSTER_TTL_SECONDS = 10 * 60
+MAX_CACHED_LEAGUES = 256
+MAX_OWNER_FILTERS = 32
+LEAGUE_ID_PATTERN = re.compile(r"^[0-9A-Za-z_-]{1,64}$")
+ROSTER_PLAYER_FIELDS = ("players", "reserve", "taxi")
+
+
+class LeagueFilterError(ValueError):
+    """Raised for league filters that cannot be applied (bad input or unknown league)."""
+
+
+class LeagueOwnership:
+    def __init__(self, league_id, rosters):
+        self.league_id = league_id
+        self.owner_by_player = {}
+        self.players_by_owner = {}
+        for roster in rosters or []:
+            if not isinstance(roster, dict):
+                continue
+            player_ids = set()
+            for field in ROSTER_PLAYER_FIELDS:
+                player_ids.update(str(player_id) for player_id in roster.get(field) or [] if player_id)
+            owner_id = str(roster.get("owner_id") or "")
+            owner_keys = {str(roster.get("roster_id") or ""), owner_id}
+            owner_keys.update(str(co_owner) for co_owner in roster.get("co_owners") or [] if co_owner)
+            owner_keys.discard("")
+            for key in owner_keys:
+                self.players_by_owner.setdefault(key, set()).update(player_ids)
+            for player_id in player_ids:
+                self.owner_by_player[player_id] = owner_id or str(roster.get("roster_id") or "")
+
+    def player_ids(self, owners=None):
+        """Sorted ids of players rostered by any of owners (None: by anyone in the league)."""
+        if owners is None:
+            return sorted(self.owner_by_player)
+        owned = set()
+        for owner in owners:
+            owned |= self.players_by_owner.get(str(owner), set())
+        return sorted(owned)
+
+
+class LeagueOwnershipCache:
+    def __init__(self, ttl_seconds=ROSTER_TTL_SECONDS, max_leagues=MAX_CACHED_LEAGUES, clock=time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.max_leagues = max_leagues
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _fresh(self, league_id):
+        entry = self._entries.get(league_id)
+        if entry is None or self.clock() - entry[0] >= self.ttl_seconds:
+            return None
+        self._entries.move_to_end(league_id)
+        return entry[1]
+
+    def get(self, league_id, load_rosters):
+        """Return the LeagueOwnership for league_id, calling load_rosters(league_id) on a miss."""
+        with self._lock:
+            ownership = self._fresh(league_id)
+            if ownership is not None:
+                self.hits += 1
+                return ownership
+            league_lock = self._loading.setdefault(league_id, threading.Lock())
+        with league_lock:
+            with self._lock:
+                ownership = self._fresh(league_id)
+                if ownership is not None:
+                    self.hits += 1
+                    return ownership
+                self.misses += 1
+            try:
+                ownership = LeagueOwnership(league_id, load_rosters(league_id))
+            finally:
+                with self._lock:
+                    self._loading.pop(league_id, None)
+            with self._lock:
+                self._entries[league_id] = (self.clock(), ownership)
+                self._entries.move_to_end(league_id)
+                while len(self._entries) > self.max_leagues:
+                    self._entries.popitem(last=False)
+        return ownership
+
+    def invalidate(self, league_id=None):
+        with self._lock:
+            if league_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(league_id, None)
+
+    def snapshot(self):
+        with self._lock:
+            return {"leagues": len(self._entries), "hits": self.hits, "misses": self.misses}
@@ -2,18 +2,31 @@ import csv
 import datetime as dt
 import gzip
 import io
+import itertools
 import json
 import math
 import os
 import re
 import sqlite3
+import sys
 import threading
+import time
 import urllib.error
 import urllib.parse
-import urllib.request
+from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+import comps_engine
+import formula_engine
+import http_fetch
+import league_rosters
+import player_catalog
+import query_cache
+import scoring_engine
+import screener_compiler
+import screener_index
+
 BASE_DIR = Path(__file__).resolve().parent
 DATA_DIR = BASE_DIR / "data"
 DB_PATH = Path(os.getenv("FDL_DB_PATH", str(DATA_DIR / "terminal.db"))).expanduser()
@@ -22,6 +35,8 @@ SLEEPER_PLAYERS_CACHE_PATH = CACHE_DIR / "sleeper_players_nfl.json"
 SLEEPER_PLAYERS_CACHE_TTL_SECONDS = 24 * 60 * 60
 
 SLEEPER_PLAYERS_URL = "https://api.sleeper.app/v1/players/nfl"
+SLEEPER_LEAGUE_ROSTERS_URL = "https://api.sleeper.app/v1/league/{league_id}/rosters"
+SLEEPER_LEAGUE_ROSTERS_TIMEOUT_SECONDS = 15
 SLEEPER_STATS_ENDPOINTS = [
     "https://api.sleeper.app/stats/nfl/{season}/{week}?season_type=regular",
     "https://api.sleeper.com/stats/nfl/{season}/{week}?season_type=regular",
@@ -34,13 +49,121 @@ BULK_LOAD_SEASONS_BACK = 3  # How many seasons to bulk-load on bootstrap
 BOOTSTRAP_MIN_PLAYER_COUNT = 100  # Threshold below which we trigger bootstrap
 
 USER_AGENT = "FourthDownLabsTerminal/1.0 (+https://fourthdownlabs.local)"
+# Every upstream GET goes through one pooled fetcher (gzip, keep-alive,
+# retries, conditional requests); see http_fetch. Validators for conditional
+# pulls are kept in sync_state under HTTP_VALIDATORS_STATE_PREFIX.
+HTTP_FETCHER = http_fetch.HttpFetcher(USER_AGENT)
+HTTP_VALIDATORS_STATE_PREFIX = "http_validators:"
+NFLVERSE_RELEASES_STATE_KEY = "nflverse_releases"
 NFL_REGULAR_SEASON_WEEKS = 18
 MAX_SCREEN_FILTERS = 24
 DB_SCHEMA_LOCK = threading.Lock()
 SLEEPER_CACHE_LOCK = threading.Lock()
+# Parsed copy of the Sleeper players cache file. The snapshot is replaced
+# whole rather than updated in place, so lookups read it without a lock: they stat the file
+# and only re-parse it when its mtime or size moved (another process synced).
+# SLEEPER_CACHE_LOCK is held only by the one network refresh in flight; fresh
+# lookups past SLEEPER_PLAYERS_REFRESH_AHEAD_FRACTION of the TTL start it in
+# the background so readers never wait on Sleeper for an expiring cache.
+SLEEPER_PLAYERS_MEMORY = {"snapshot": None, "refreshing": False, "retry_after": 0.0}
+SLEEPER_PLAYERS_STATS = {"hits": 0, "disk_loads": 0, "refreshes": 0, "background_refreshes": 0, "refresh_failures": 0}
+SLEEPER_PLAYERS_PARSE_LOCK = threading.Lock()
+SLEEPER_PLAYERS_REFRESH_AHEAD_FRACTION = 0.9
+SLEEPER_PLAYERS_REFRESH_RETRY_SECONDS = 5 * 60
+# Parsed player catalog, rebuilt only when the Sleeper players cache moves to
+# a new generation (see player_catalog). While the cached document is stale and
+# Sleeper is unreachable, a refresh is attempted at most once per recheck.
+SLEEPER_PLAYER_CATALOG = {"catalog": None, "checked_at": 0.0}
+SLEEPER_PLAYER_CATALOG_LOCK = threading.Lock()
+SLEEPER_PLAYER_CATALOG_RECHECK_SECONDS = 5 * 60
+SLEEPER_BY_IDS_MAX = 8000
 FILTER_OPTIONS_CACHE_LOCK = threading.Lock()
 FILTER_OPTIONS_CACHE = {"stamp": None, "entries": {}}
 FILTER_OPTIONS_CACHE_MAX_ENTRIES = 32
+# Monotonic id bumped whenever synced data changes. Kept in memory so HTTP
+# layers can validate conditional requests without opening SQLite, and
+# persisted in sync_state so it keeps increasing across restarts.
+DATA_GENERATION_LOCK = threading.Lock()
+DATA_GENERATION = {"value": None, "checked_at": 0.0}
+DATA_GENERATION_STATE_KEY = "data_generation"
+# Another process (v1 terminal vs v2 API) may sync the shared DB, so the
+# in-memory value is re-read from sync_state at most this often.
+DATA_GENERATION_RECHECK_SECONDS = 5.0
+SCREENER_RESULT_CACHE = query_cache.ResultCache(
+    "screener",
+    max_bytes=int(os.getenv("FDL_SCREENER_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+)
+# Owned-player sets for the screener's owned_by / available_only filters,
+# shared by the v1 and v2 screeners (see league_rosters).
+LEAGUE_OWNERSHIP = league_rosters.LeagueOwnershipCache(
+    ttl_seconds=int(os.getenv("FDL_LEAGUE_ROSTERS_TTL_SECONDS", str(league_rosters.ROSTER_TTL_SECONDS))),
+)
+# Relevance tiers materialized on players at sync (refresh_player_relevance).
+# Tier 1 is the default Lab "fantasy" filter: active and either a rookie /
+# second-year player or someone with a scoring week. Higher tiers require a
+# best week of at least the listed PPR.
+RELEVANCE_TIERS = {"all": 0, "fantasy": 1, "rosterable": 2, "starter": 3}
+RELEVANCE_TIER_MIN_MAX_PPR = {2: 10.0, 3: 20.0}
+PLAYER_RELEVANCE_COLUMNS = {
+    "max_ppr": "REAL",
+    "last_ppr": "REAL",
+    "relevance_tier": "INTEGER NOT NULL DEFAULT 0",
+    "is_fantasy_relevant": "INTEGER NOT NULL DEFAULT 0",
+}
+SCREENER_INDEX = screener_index.ScreenerIndexHolder(
+    enabled=os.getenv("FDL_SCREENER_INDEX", "1").strip().lower() not in {"0", "false", "no", "off"},
+)
+# Per-stat_key value histograms used to plan screener filters; loaded from
+# the league-wide metric_catalog rows once per data generation.
+METRIC_HISTOGRAMS_LOCK = threading.Lock()
+METRIC_HISTOGRAMS = {"generation": None, "histograms": None}
+# Per stat_key distribution summaries (refresh_metric_catalog) served by
+# /api/metrics/catalog: league-wide, per position and per team.
+METRIC_CATALOG_SCOPES = ("all", "position", "team")
+METRIC_CATALOG_QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+METRIC_CATALOG_BUCKETS = 20
+METRIC_CATALOG_LOCK = threading.Lock()
+METRIC_CATALOG = {"generation": None, "items": None}
+# Custom league scoring (scoring_engine): weekly points per profile id are
+# cached in scoring_profile_points and recomputed once per data generation;
+# the least recently computed profiles beyond this many are evicted.
+SCORING_PROFILES_LOCK = threading.Lock()
+SCORING_PROFILE_CACHE_SIZE = 16
+# Batch player time series (fetch_player_series): weeks x players x stat_keys
+# arrays for up to this many players, read from idx_week_metrics_series.
+MAX_SERIES_PLAYERS = 500
+MAX_SERIES_STAT_KEYS = 32
+MAX_SERIES_CELLS = 1_000_000
+SERIES_DEFAULT_GAMES = 36
+SERIES_MAX_GAMES = 200
+SERIES_DEFAULT_STAT_KEYS = (
+    "fantasy_points_ppr",
+    "passing_yards",
+    "rushing_yards",
+    "receiving_yards",
+    "receptions",
+    "touchdowns",
+)
+# Per-player recent-trend sparklines (refresh_player_sparklines), attached to
+# screener rows with include=["sparklines"]: PPR from player_week_stats plus
+# these usage metrics over each player's last SPARKLINE_GAMES games.
+SPARKLINE_GAMES = 12
+SPARKLINE_MOMENTUM_GAMES = 4
+SPARKLINE_USAGE_KEYS = ("targets", "receptions", "carries")
+SPARKLINES_LOCK = threading.Lock()
+SPARKLINES = {"generation": None, "items": None}
+SCREENER_INCLUDES = ("sparklines",)
+# Player comps (comps_engine): per stat_key, every player-season's per-game
+# average z-scored per (season, position), loaded on first use and kept for
+# the most recently used stat_keys of the current data generation.
+COMPS_COLUMNS_LOCK = threading.Lock()
+COMPS_COLUMNS = {"generation": None, "columns": OrderedDict()}
+COMPS_COLUMN_CACHE_SIZE = 32
+# Season/position rank pseudo-metrics (refresh_metric_ranks): "<stat_key>__pct"
+# is the 0-100 percentile rank and "<stat_key>__z" the z-score of a player's
+# latest value among same-position players in that season.
+RANK_METRIC_SUFFIXES = {"pct": "Pos. Percentile", "z": "Pos. Z-Score"}
+RANK_METRIC_SOURCE = "ranks"
 
 SLEEPER_METRIC_ALIASES = {
     "pts_ppr": "fantasy_points_ppr",
@@ -124,6 +247,10 @@ def normalize_stat_key(value):
     key = str(value or "").strip().lower()
     if not key:
         return ""
+    base, separator, suffix = key.rpartition("__")
+    if separator and suffix in RANK_METRIC_SUFFIXES:
+        base = normalize_stat_key(base)
+        return f"{base}__{suffix}" if base else ""
     key = key.replace("%", "pct")
     key = re.sub(r"[^a-z0-9]+", "_", key)
     key = re.sub(r"_+", "_", key).strip("_")
@@ -140,6 +267,9 @@ def build_stat_label(stat_key):
         return ""
     if key in STAT_KEY_LABEL_OVERRIDES:
         return STAT_KEY_LABEL_OVERRIDES[key]
+    base, separator, suffix = key.rpartition("__")
+    if separator and suffix in RANK_METRIC_SUFFIXES:
+        return f"{build_stat_label(base)} ({RANK_METRIC_SUFFIXES[suffix]})"
     tokens = key.split("_")
     parts = []
     for token in tokens:
@@ -225,16 +355,46 @@ def metric_rows_from_dict(player_id, season, week, season_type, source, metrics,
 
 
 def fetch_json(url, timeout=45):
-    request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT, "Accept": "application/json"})
-    with urllib.request.urlopen(request, timeout=timeout) as response:
-        raw = response.read()
-    return json.loads(raw.decode("utf-8"))
+    result = HTTP_FETCHER.fetch(url, timeout=timeout, accept="application/json")
+    return json.loads(result.body.decode("utf-8"))
+
+
+def read_http_validators(connection, key):
+    """Return the validators stored for a conditional fetch under key, or None."""
+    state = read_sync_state(connection, HTTP_VALIDATORS_STATE_PREFIX + key)
+    try:
+        validators = json.loads(state["value"]) if state and state.get("value") else None
+    except json.JSONDecodeError:
+        return None
+    return validators if isinstance(validators, dict) else None
+
+
+def save_http_validators(connection, key, result):
+    """Store a 200 response's ETag / Last-Modified for the next conditional fetch of key."""
+    validators = result.validators()
+    if validators:
+        upsert_sync_state(connection, HTTP_VALIDATORS_STATE_PREFIX + key, json.dumps(validators))
+
+
+def fetch_league_rosters(league_id):
+    """Return a Sleeper league's rosters; raises LeagueFilterError for unknown leagues, RuntimeError if unreachable."""
+    url = SLEEPER_LEAGUE_ROSTERS_URL.format(league_id=urllib.parse.quote(league_id, safe=""))
+    try:
+        payload = fetch_json(url, timeout=SLEEPER_LEAGUE_ROSTERS_TIMEOUT_SECONDS)
+    except urllib.error.HTTPError as error:
+        if error.code == 404:
+            raise league_rosters.LeagueFilterError(f"Unknown Sleeper league: {league_id}") from None
+        raise RuntimeError(f"Sleeper rosters request failed for league {league_id}: HTTP {error.code}") from error
+    except (urllib.error.URLError, OSError, ValueError) as error:
+        raise RuntimeError(f"Sleeper rosters request failed for league {league_id}: {error}") from error
+    # Sleeper answers unknown league ids with a null body.
+    if not isinstance(payload, list):
+        raise league_rosters.LeagueFilterError(f"Unknown Sleeper league: {league_id}")
+    return payload
 
 
 def fetch_bytes(url, timeout=90):
-    request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
-    with urllib.request.urlopen(request, timeout=timeout) as response:
-        return response.read()
+    return HTTP_FETCHER.fetch(url, timeout=timeout).body
 
 
 def parse_iso_timestamp(value):
@@ -249,23 +409,49 @@ def parse_iso_timestamp(value):
         return None
 
 
-def load_sleeper_players_cache():
-    if not SLEEPER_PLAYERS_CACHE_PATH.exists():
-        return None
+def _sleeper_players_file_key():
     try:
-        payload = json.loads(SLEEPER_PLAYERS_CACHE_PATH.read_text(encoding="utf-8"))
-    except (OSError, json.JSONDecodeError):
+        stat_result = SLEEPER_PLAYERS_CACHE_PATH.stat()
+    except OSError:
         return None
+    return stat_result.st_mtime_ns, stat_result.st_size
 
-    players = payload.get("players")
-    fetched_at = parse_iso_timestamp(payload.get("fetched_at"))
-    if not isinstance(players, dict):
-        return None
-    return {
+
+def _publish_sleeper_players(players, fetched_at, file_key, refreshed=False):
+    snapshot = {
         "players": players,
         "fetched_at": fetched_at,
         "count": len(players),
+        "file_key": file_key,
+        "refreshed_at": time.monotonic() if refreshed else None,
     }
+    SLEEPER_PLAYERS_MEMORY["snapshot"] = snapshot
+    return snapshot
+
+
+def load_sleeper_players_cache():
+    """Return the parsed Sleeper players cache, re-reading the file only when its mtime or size changed."""
+    file_key = _sleeper_players_file_key()
+    if file_key is None:
+        return None
+    snapshot = SLEEPER_PLAYERS_MEMORY["snapshot"]
+    if snapshot is not None and snapshot["file_key"] == file_key:
+        SLEEPER_PLAYERS_STATS["hits"] += 1
+        return snapshot
+    with SLEEPER_PLAYERS_PARSE_LOCK:
+        snapshot = SLEEPER_PLAYERS_MEMORY["snapshot"]
+        if snapshot is not None and snapshot["file_key"] == file_key:
+            SLEEPER_PLAYERS_STATS["hits"] += 1
+            return snapshot
+        try:
+            payload = json.loads(SLEEPER_PLAYERS_CACHE_PATH.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return None
+        players = payload.get("players") if isinstance(payload, dict) else None
+        if not isinstance(players, dict):
+            return None
+        SLEEPER_PLAYERS_STATS["disk_loads"] += 1
+        return _publish_sleeper_players(players, parse_iso_timestamp(payload.get("fetched_at")), file_key)
 
 
 def save_sleeper_players_cache(players, fetched_at=None):
@@ -278,34 +464,102 @@ def save_sleeper_players_cache(players, fetched_at=None):
     temp_path = SLEEPER_PLAYERS_CACHE_PATH.with_suffix(".json.tmp")
     temp_path.write_text(json.dumps(document), encoding="utf-8")
     temp_path.replace(SLEEPER_PLAYERS_CACHE_PATH)
+    return _publish_sleeper_players(players, parse_iso_timestamp(timestamp), _sleeper_players_file_key(), refreshed=True)
+
+
+def _sleeper_cache_age_seconds(cached):
+    fetched_at = cached.get("fetched_at")
+    if not fetched_at:
+        return None
+    return (dt.datetime.utcnow() - fetched_at).total_seconds()
+
+
+def _sleeper_cache_info(cached, source, **extra):
+    fetched_at = cached.get("fetched_at")
+    return {
+        "source": source,
+        "cached": source != "network",
+        **extra,
+        "fetched_at": fetched_at.replace(microsecond=0).isoformat() + "Z" if fetched_at else None,
+        "count": cached["count"],
+    }
+
+
+def _sleeper_players_validators(result=None):
+    """Read (or, given a fetch result, store) the players download's validators; None if the DB is unavailable."""
+    try:
+        with get_connection() as own_connection:
+            initialize_database(own_connection)
+            if result is not None:
+                save_http_validators(own_connection, SLEEPER_PLAYERS_URL, result)
+                return None
+            return read_http_validators(own_connection, SLEEPER_PLAYERS_URL)
+    except sqlite3.Error:
+        return None
+
+
+def _download_sleeper_players():
+    cached = SLEEPER_PLAYERS_MEMORY["snapshot"]
+    # Validators are only worth sending while the body they vouch for is on hand.
+    validators = _sleeper_players_validators() if cached is not None else None
+    result = HTTP_FETCHER.fetch(SLEEPER_PLAYERS_URL, accept="application/json", validators=validators)
+    if result.not_modified:
+        players = cached["players"]
+    else:
+        players = json.loads(result.body.decode("utf-8"))
+        if not isinstance(players, dict):
+            raise RuntimeError("Unexpected Sleeper players payload.")
+        _sleeper_players_validators(result)
+    snapshot = save_sleeper_players_cache(players, fetched_at=utc_now_iso())
+    SLEEPER_PLAYERS_STATS["refreshes"] += 1
+    return snapshot
+
+
+def _background_sleeper_players_refresh():
+    try:
+        with SLEEPER_CACHE_LOCK:
+            _download_sleeper_players()
+        SLEEPER_PLAYERS_STATS["background_refreshes"] += 1
+    except (OSError, ValueError, RuntimeError, urllib.error.URLError):
+        SLEEPER_PLAYERS_STATS["refresh_failures"] += 1
+        SLEEPER_PLAYERS_MEMORY["retry_after"] = time.monotonic() + SLEEPER_PLAYERS_REFRESH_RETRY_SECONDS
+    finally:
+        SLEEPER_PLAYERS_MEMORY["refreshing"] = False
+
+
+def _start_background_sleeper_players_refresh():
+    with SLEEPER_PLAYERS_PARSE_LOCK:
+        if SLEEPER_PLAYERS_MEMORY["refreshing"] or time.monotonic() < SLEEPER_PLAYERS_MEMORY["retry_after"]:
+            return False
+        SLEEPER_PLAYERS_MEMORY["refreshing"] = True
+    threading.Thread(target=_background_sleeper_players_refresh, name="sleeper-players-refresh", daemon=True).start()
+    return True
 
 
 def fetch_sleeper_players_cached(force_refresh=False, max_age_seconds=SLEEPER_PLAYERS_CACHE_TTL_SECONDS):
+    cached = load_sleeper_players_cache()
+    if cached and not force_refresh:
+        age = _sleeper_cache_age_seconds(cached)
+        if age is not None and age <= max_age_seconds:
+            if age >= max_age_seconds * SLEEPER_PLAYERS_REFRESH_AHEAD_FRACTION:
+                _start_background_sleeper_players_refresh()
+            return cached["players"], _sleeper_cache_info(cached, "cache")
+
+    requested_at = time.monotonic()
     with SLEEPER_CACHE_LOCK:
+        # Single flight: callers that queued behind a refresh reuse its result.
         cached = load_sleeper_players_cache()
-        now = dt.datetime.utcnow()
-        if cached and not force_refresh:
-            fetched_at = cached.get("fetched_at")
-            if fetched_at and (now - fetched_at).total_seconds() <= max_age_seconds:
-                return cached["players"], {
-                    "source": "cache",
-                    "cached": True,
-                    "fetched_at": fetched_at.replace(microsecond=0).isoformat() + "Z",
-                    "count": cached["count"],
-                }
+        if cached:
+            age = _sleeper_cache_age_seconds(cached)
+            refreshed_at = cached.get("refreshed_at")
+            if force_refresh and refreshed_at is not None and refreshed_at >= requested_at:
+                return cached["players"], _sleeper_cache_info(cached, "network")
+            if not force_refresh and age is not None and age <= max_age_seconds:
+                return cached["players"], _sleeper_cache_info(cached, "cache")
 
         try:
-            players = fetch_json(SLEEPER_PLAYERS_URL)
-            if not isinstance(players, dict):
-                raise RuntimeError("Unexpected Sleeper players payload.")
-            timestamp = utc_now_iso()
-            save_sleeper_players_cache(players, fetched_at=timestamp)
-            return players, {
-                "source": "network",
-                "cached": False,
-                "fetched_at": timestamp,
-                "count": len(players),
-            }
+            snapshot = _download_sleeper_players()
+            return snapshot["players"], _sleeper_cache_info(snapshot, "network")
         except (
             OSError,
             ValueError,
@@ -314,19 +568,89 @@ def fetch_sleeper_players_cached(force_refresh=False, max_age_seconds=SLEEPER_PL
             TimeoutError,
             urllib.error.URLError,
         ) as error:
+            SLEEPER_PLAYERS_STATS["refresh_failures"] += 1
             if cached:
-                fetched_at = cached.get("fetched_at")
-                return cached["players"], {
-                    "source": "cache_stale",
-                    "cached": True,
-                    "stale": True,
-                    "fetch_error": str(error),
-                    "fetched_at": fetched_at.replace(microsecond=0).isoformat() + "Z" if fetched_at else None,
-                    "count": cached["count"],
-                }
+                return cached["players"], _sleeper_cache_info(
+                    cached, "cache_stale", stale=True, fetch_error=str(error)
+                )
             raise
 
 
+def deep_sizeof(value):
+    """Approximate bytes held by a JSON-like value, counting shared objects once."""
+    seen = set()
+    total = 0
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+    return total
+
+
+def sleeper_players_cache_snapshot():
+    """Hit/refresh counters and memory footprint of the parsed Sleeper players cache."""
+    snapshot = SLEEPER_PLAYERS_MEMORY["snapshot"]
+    info = {**SLEEPER_PLAYERS_STATS, "loaded": snapshot is not None, "refreshing": SLEEPER_PLAYERS_MEMORY["refreshing"]}
+    if snapshot is None:
+        return info
+    if "memory_bytes" not in snapshot:
+        # Walking ~10k player dicts takes a moment, so it is measured once per snapshot.
+        snapshot["memory_bytes"] = deep_sizeof(snapshot["players"])
+    info.update(
+        {
+            "count": snapshot["count"],
+            "fetched_at": _sleeper_cache_info(snapshot, "cache")["fetched_at"],
+            "file_bytes": snapshot["file_key"][1] if snapshot["file_key"] else None,
+            "memory_bytes": snapshot["memory_bytes"],
+        }
+    )
+    return info
+
+
+def sleeper_catalog_generation(fetched_at):
+    """Epoch seconds of a Sleeper players cache fetched_at timestamp; 0 when unknown."""
+    parsed = parse_iso_timestamp(fetched_at)
+    if parsed is None:
+        return 0
+    return int(parsed.replace(tzinfo=dt.timezone.utc).timestamp())
+
+
+def _sleeper_catalog_is_fresh(catalog, now):
+    if catalog is None:
+        return False
+    if now - catalog.generation <= SLEEPER_PLAYERS_CACHE_TTL_SECONDS:
+        return True
+    return now - SLEEPER_PLAYER_CATALOG["checked_at"] < SLEEPER_PLAYER_CATALOG_RECHECK_SECONDS
+
+
+def get_sleeper_player_catalog(force_refresh=False):
+    """Return the in-memory PlayerCatalog, loading the Sleeper players cache only when it is due."""
+    catalog = SLEEPER_PLAYER_CATALOG["catalog"]
+    if not force_refresh and _sleeper_catalog_is_fresh(catalog, time.time()):
+        return catalog
+    with SLEEPER_PLAYER_CATALOG_LOCK:
+        catalog = SLEEPER_PLAYER_CATALOG["catalog"]
+        if not force_refresh and _sleeper_catalog_is_fresh(catalog, time.time()):
+            return catalog
+        players, cache_info = fetch_sleeper_players_cached(force_refresh=force_refresh)
+        generation = sleeper_catalog_generation(cache_info.get("fetched_at"))
+        if catalog is None or catalog.generation != generation:
+            catalog = player_catalog.PlayerCatalog.build(players, generation, cache_info, previous=catalog)
+        else:
+            catalog.cache_info = cache_info
+        SLEEPER_PLAYER_CATALOG["catalog"] = catalog
+        SLEEPER_PLAYER_CATALOG["checked_at"] = time.time()
+    return catalog
+
+
 def sleeper_player_subset_by_ids(player_ids, force_refresh=False):
     ids = []
     seen = set()
@@ -336,34 +660,23 @@ def sleeper_player_subset_by_ids(player_ids, force_refresh=False):
             continue
         seen.add(token)
         ids.append(token)
-    ids = ids[:8000]
-
-    players_by_id, cache_info = fetch_sleeper_players_cached(force_refresh=force_refresh)
-    result = {}
-    for player_id in ids:
-        player = players_by_id.get(player_id)
-        if not isinstance(player, dict):
-            continue
-        result[player_id] = {
-            "player_id": player_id,
-            "full_name": player.get("full_name"),
-            "first_name": player.get("first_name"),
-            "last_name": player.get("last_name"),
-            "position": player.get("position"),
-            "age": player.get("age"),
-            "years_exp": player.get("years_exp"),
-            "team": player.get("team"),
-            "status": player.get("status"),
-        }
+    ids = ids[:SLEEPER_BY_IDS_MAX]
 
+    catalog = get_sleeper_player_catalog(force_refresh=force_refresh)
+    result = catalog.subset(ids)
     return {
         "count": len(result),
         "requested_ids": len(ids),
         "players": result,
-        "cache": cache_info,
+        "cache": {**catalog.cache_info, "generation": catalog.generation},
     }
 
 
+def sleeper_player_catalog_document(since_generation=None, force_refresh=False):
+    """Return (document, strong etag) for /api/sleeper/players/catalog."""
+    return get_sleeper_player_catalog(force_refresh=force_refresh).document(since_generation)
+
+
 def get_connection():
     DATA_DIR.mkdir(parents=True, exist_ok=True)
     connection = sqlite3.connect(DB_PATH, timeout=60)
@@ -394,7 +707,11 @@ def initialize_database(connection):
           yahoo_id TEXT,
           fantasy_positions TEXT,
           metadata_json TEXT,
-          updated_at TEXT NOT NULL
+          updated_at TEXT NOT NULL,
+          max_ppr REAL,
+          last_ppr REAL,
+          relevance_tier INTEGER NOT NULL DEFAULT 0,
+          is_fantasy_relevant INTEGER NOT NULL DEFAULT 0
         );
 
         CREATE INDEX IF NOT EXISTS idx_players_search_full_name ON players(search_full_name);
@@ -441,6 +758,9 @@ def initialize_database(connection):
 
         CREATE INDEX IF NOT EXISTS idx_week_metrics_key_value ON player_week_metrics(stat_key, stat_value);
         CREATE INDEX IF NOT EXISTS idx_week_metrics_player_week ON player_week_metrics(player_id, season, week);
+        -- Covering index for fetch_player_series: one seek per (player, stat_key, week).
+        CREATE INDEX IF NOT EXISTS idx_week_metrics_series
+          ON player_week_metrics(player_id, stat_key, season, week, season_type, source, stat_value);
 
         CREATE TABLE IF NOT EXISTS player_latest_metrics (
           player_id TEXT NOT NULL,
@@ -457,6 +777,71 @@ def initialize_database(connection):
         CREATE INDEX IF NOT EXISTS idx_latest_metrics_player ON player_latest_metrics(player_id);
         CREATE INDEX IF NOT EXISTS idx_latest_metrics_player_key_value ON player_latest_metrics(player_id, stat_key, stat_value);
 
+        CREATE TABLE IF NOT EXISTS player_metric_ranks (
+          season INTEGER NOT NULL,
+          position TEXT NOT NULL,
+          stat_key TEXT NOT NULL,
+          player_id TEXT NOT NULL,
+          week INTEGER,
+          stat_value REAL NOT NULL,
+          percentile REAL NOT NULL,
+          z_score REAL,
+          cohort_size INTEGER NOT NULL,
+          updated_at TEXT NOT NULL,
+          PRIMARY KEY (season, position, stat_key, player_id)
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_metric_ranks_player ON player_metric_ranks(player_id, stat_key, season);
+
+        CREATE TABLE IF NOT EXISTS metric_catalog (
+          scope TEXT NOT NULL,
+          scope_value TEXT NOT NULL,
+          stat_key TEXT NOT NULL,
+          player_count INTEGER NOT NULL,
+          min_value REAL NOT NULL,
+          max_value REAL NOT NULL,
+          quantiles_json TEXT NOT NULL,
+          histogram_json TEXT NOT NULL,
+          bounds_json TEXT,
+          updated_at TEXT NOT NULL,
+          PRIMARY KEY (scope, scope_value, stat_key)
+        );
+
+        CREATE TABLE IF NOT EXISTS player_sparklines (
+          player_id TEXT PRIMARY KEY,
+          games INTEGER NOT NULL,
+          series_json TEXT NOT NULL,
+          ppr_slope REAL,
+          ppr_momentum REAL,
+          updated_at TEXT NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS scoring_profiles (
+          profile_id TEXT PRIMARY KEY,
+          settings_json TEXT NOT NULL,
+          generation INTEGER,
+          player_weeks INTEGER NOT NULL DEFAULT 0,
+          computed_at TEXT NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS scoring_profile_points (
+          profile_id TEXT NOT NULL,
+          player_id TEXT NOT NULL,
+          season INTEGER NOT NULL,
+          week INTEGER NOT NULL,
+          fantasy_points REAL NOT NULL,
+          PRIMARY KEY (profile_id, player_id, season, week)
+        );
+
+        CREATE TABLE IF NOT EXISTS scoring_profile_latest (
+          profile_id TEXT NOT NULL,
+          player_id TEXT NOT NULL,
+          season INTEGER NOT NULL,
+          week INTEGER NOT NULL,
+          fantasy_points REAL NOT NULL,
+          PRIMARY KEY (profile_id, player_id)
+        );
+
         CREATE TABLE IF NOT EXISTS sync_state (
           key TEXT PRIMARY KEY,
           value TEXT,
@@ -476,6 +861,13 @@ def initialize_database(connection):
         SELECT * FROM ranked WHERE rn = 1;
         """
         )
+        existing_columns = {row[1] for row in connection.execute("PRAGMA table_info(players)")}
+        for column, definition in PLAYER_RELEVANCE_COLUMNS.items():
+            if column not in existing_columns:
+                connection.execute(f"ALTER TABLE players ADD COLUMN {column} {definition}")
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_players_relevance_position ON players(is_fantasy_relevant, position)"
+        )
         connection.commit()
 
 
@@ -505,6 +897,42 @@ def read_sync_state(connection, key):
     }
 
 
+def read_data_generation(connection):
+    state = read_sync_state(connection, DATA_GENERATION_STATE_KEY)
+    if not state:
+        return 0
+    return parse_int(state.get("value"), 0)
+
+
+def current_data_generation(connection=None):
+    now = time.monotonic()
+    with DATA_GENERATION_LOCK:
+        value = DATA_GENERATION["value"]
+        fresh = now - DATA_GENERATION["checked_at"] < DATA_GENERATION_RECHECK_SECONDS
+    if value is not None and fresh:
+        return value
+    if connection is None:
+        with get_connection() as own_connection:
+            initialize_database(own_connection)
+            stored = read_data_generation(own_connection)
+    else:
+        stored = read_data_generation(connection)
+    with DATA_GENERATION_LOCK:
+        if DATA_GENERATION["value"] is None or DATA_GENERATION["value"] < stored:
+            DATA_GENERATION["value"] = stored
+        DATA_GENERATION["checked_at"] = now
+        return DATA_GENERATION["value"]
+
+
+def bump_data_generation(connection):
+    with DATA_GENERATION_LOCK:
+        value = max(read_data_generation(connection), DATA_GENERATION["value"] or 0) + 1
+        upsert_sync_state(connection, DATA_GENERATION_STATE_KEY, str(value))
+        DATA_GENERATION["value"] = value
+        DATA_GENERATION["checked_at"] = time.monotonic()
+    return value
+
+
 def upsert_player_week_metrics(connection, rows):
     if not rows:
         return 0
@@ -555,6 +983,36 @@ def upsert_player_week_stats(connection, rows):
     return len(rows)
 
 
+# The v2 API reads latest stats from this materialized copy of player_latest_stats
+# (created by its bootstrap). It is rebuilt with every data generation so both
+# APIs, and the screener index, see the same latest rows.
+REFRESH_LATEST_STATS_CURRENT_SQL = """
+INSERT INTO player_latest_stats_current (
+  player_id, season, week, season_type, team, opponent_team,
+  fantasy_points_ppr, fantasy_points_half_ppr, fantasy_points_std,
+  passing_yards, rushing_yards, receiving_yards, receptions, touchdowns, turnovers,
+  source, updated_at
+)
+SELECT
+  player_id, season, week, season_type, team, opponent_team,
+  fantasy_points_ppr, fantasy_points_half_ppr, fantasy_points_std,
+  passing_yards, rushing_yards, receiving_yards, receptions, touchdowns, turnovers,
+  source, :now
+FROM player_latest_stats
+"""
+
+
+def refresh_latest_stats_current(connection, updated_at=None):
+    """Rebuild player_latest_stats_current when the v2 schema has created it."""
+    exists = connection.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'player_latest_stats_current'"
+    ).fetchone()
+    if not exists:
+        return
+    connection.execute("DELETE FROM player_latest_stats_current")
+    connection.execute(REFRESH_LATEST_STATS_CURRENT_SQL, {"now": updated_at or utc_now_iso()})
+
+
 def refresh_latest_metrics(connection):
     now = utc_now_iso()
     connection.execute("DROP TABLE IF EXISTS latest_metric_snapshot")
@@ -580,6 +1038,8 @@ def refresh_latest_metrics(connection):
         WHERE rn = 1
         """
     )
+    # The stale-row DELETE below probes the snapshot per latest row.
+    connection.execute("CREATE INDEX temp.idx_latest_metric_snapshot ON latest_metric_snapshot(player_id, stat_key)")
     connection.execute(
         """
         INSERT INTO player_latest_metrics (
@@ -600,14 +1060,15 @@ def refresh_latest_metrics(connection):
     connection.execute(
         """
         DELETE FROM player_latest_metrics
-        WHERE source != 'players'
+        WHERE source NOT IN ('players', ?)
           AND NOT EXISTS (
             SELECT 1
             FROM latest_metric_snapshot snapshot
             WHERE snapshot.player_id = player_latest_metrics.player_id
               AND snapshot.stat_key = player_latest_metrics.stat_key
           )
-        """
+        """,
+        (RANK_METRIC_SOURCE,),
     )
     connection.execute(
         """
@@ -645,7 +1106,665 @@ def refresh_latest_metrics(connection):
     )
     upsert_profile_metrics_from_players(connection, updated_at=now)
     connection.execute("DROP TABLE IF EXISTS latest_metric_snapshot")
+    refresh_metric_ranks(connection, updated_at=now)
+    refresh_metric_catalog(connection, updated_at=now)
+    refresh_player_sparklines(connection, updated_at=now)
+    refresh_player_relevance(connection)
+    refresh_latest_stats_current(connection, updated_at=now)
     connection.commit()
+    bump_data_generation(connection)
+
+
+def refresh_player_relevance(connection):
+    """Materialize max/last PPR and the relevance tier on players (see RELEVANCE_TIERS)."""
+    connection.execute("UPDATE players SET max_ppr = NULL, last_ppr = NULL")
+    connection.execute(
+        """
+        UPDATE players
+        SET max_ppr = agg.max_ppr
+        FROM (
+          SELECT player_id, MAX(fantasy_points_ppr) AS max_ppr
+          FROM player_week_stats
+          GROUP BY player_id
+        ) AS agg
+        WHERE agg.player_id = players.player_id
+        """
+    )
+    connection.execute(
+        """
+        UPDATE players
+        SET last_ppr = latest.fantasy_points_ppr
+        FROM player_latest_stats AS latest
+        WHERE latest.player_id = players.player_id
+        """
+    )
+    connection.execute(
+        """
+        UPDATE players
+        SET relevance_tier = CASE
+          WHEN status IS NULL OR status != 'Active' THEN 0
+          WHEN COALESCE(max_ppr, 0) >= ? THEN 3
+          WHEN COALESCE(max_ppr, 0) >= ? THEN 2
+          WHEN (years_exp IS NOT NULL AND years_exp <= 1) OR COALESCE(max_ppr, 0) > 0 THEN 1
+          ELSE 0
+        END
+        """,
+        (RELEVANCE_TIER_MIN_MAX_PPR[3], RELEVANCE_TIER_MIN_MAX_PPR[2]),
+    )
+    connection.execute("UPDATE players SET is_fantasy_relevant = relevance_tier >= 1")
+
+
+def relevance_tier(value, default="fantasy"):
+    """Map a relevance name to its minimum tier; unknown names disable the filter."""
+    return RELEVANCE_TIERS.get(str(value or default).strip().lower(), 0)
+
+
+def refresh_metric_ranks(connection, updated_at=None):
+    """Rank every player's season value of each stat_key within (season, position).
+
+    A player's season value is their latest week of the season, picked like
+    player_latest_metrics picks the overall latest. Percentiles are
+    100 * PERCENT_RANK (ties share the lower rank); z-scores use the
+    population standard deviation and are NULL for single-valued cohorts.
+    The ranks of each player's latest season are then projected into
+    player_latest_metrics as the "__pct" / "__z" pseudo-metrics.
+    """
+    updated_at = updated_at or utc_now_iso()
+    connection.execute("DELETE FROM player_metric_ranks")
+    connection.execute(
+        """
+        INSERT INTO player_metric_ranks (
+          season, position, stat_key, player_id, week, stat_value, percentile, z_score, cohort_size, updated_at
+        )
+        WITH season_latest AS (
+          SELECT
+            pwm.player_id,
+            pwm.season,
+            pwm.week,
+            pwm.stat_key,
+            pwm.stat_value,
+            ROW_NUMBER() OVER (
+              PARTITION BY pwm.player_id, pwm.season, pwm.stat_key
+              ORDER BY pwm.week DESC, CASE WHEN pwm.source='sleeper' THEN 0 ELSE 1 END
+            ) AS rn
+          FROM player_week_metrics pwm
+        ),
+        cohort AS (
+          SELECT
+            s.season,
+            p.position,
+            s.stat_key,
+            s.player_id,
+            s.week,
+            s.stat_value,
+            PERCENT_RANK() OVER ranked AS pct_rank,
+            AVG(s.stat_value) OVER peers AS mean_value,
+            AVG(s.stat_value * s.stat_value) OVER peers AS mean_square,
+            COUNT(*) OVER peers AS cohort_size
+          FROM season_latest s
+          JOIN players p ON p.player_id = s.player_id
+          WHERE s.rn = 1 AND p.position IS NOT NULL AND p.position != ''
+          WINDOW peers AS (PARTITION BY s.season, p.position, s.stat_key),
+                 ranked AS (PARTITION BY s.season, p.position, s.stat_key ORDER BY s.stat_value)
+        )
+        SELECT
+          season, position, stat_key, player_id, week, stat_value,
+          100.0 * pct_rank,
+          CASE
+            WHEN mean_square - mean_value * mean_value > 1e-12
+            THEN (stat_value - mean_value) / SQRT(mean_square - mean_value * mean_value)
+          END,
+          cohort_size,
+          ?
+        FROM cohort
+        """,
+        (updated_at,),
+    )
+    # Pseudo-metric rows are upserted in place and only rewritten when they
+    # change, so a sync that leaves past seasons alone leaves their rows alone.
+    connection.execute("DROP TABLE IF EXISTS rank_metric_snapshot")
+    connection.execute(
+        """
+        CREATE TEMP TABLE rank_metric_snapshot AS
+        SELECT r.player_id, r.stat_key || '__pct' AS stat_key, r.percentile AS stat_value, r.season, r.week
+        FROM player_latest_metrics plm
+        JOIN player_metric_ranks r
+          ON r.player_id = plm.player_id AND r.stat_key = plm.stat_key AND r.season = plm.season
+        WHERE plm.source NOT IN ('players', ?)
+        UNION ALL
+        SELECT r.player_id, r.stat_key || '__z', r.z_score, r.season, r.week
+        FROM player_latest_metrics plm
+        JOIN player_metric_ranks r
+          ON r.player_id = plm.player_id AND r.stat_key = plm.stat_key AND r.season = plm.season
+        WHERE plm.source NOT IN ('players', ?) AND r.z_score IS NOT NULL
+        """,
+        (RANK_METRIC_SOURCE, RANK_METRIC_SOURCE),
+    )
+    connection.execute("CREATE INDEX temp.idx_rank_metric_snapshot ON rank_metric_snapshot(player_id, stat_key)")
+    connection.execute(
+        """
+        INSERT INTO player_latest_metrics (
+          player_id, stat_key, stat_value, season, week, source, updated_at
+        )
+        SELECT player_id, stat_key, stat_value, season, week, ?, ?
+        FROM rank_metric_snapshot
+        WHERE 1=1
+        ON CONFLICT(player_id, stat_key) DO UPDATE SET
+          stat_value=excluded.stat_value,
+          season=excluded.season,
+          week=excluded.week,
+          updated_at=excluded.updated_at
+        WHERE player_latest_metrics.source = excluded.source
+          AND (
+            player_latest_metrics.stat_value != excluded.stat_value
+            OR player_latest_metrics.season IS NOT excluded.season
+            OR player_latest_metrics.week IS NOT excluded.week
+          )
+        """,
+        (RANK_METRIC_SOURCE, updated_at),
+    )
+    connection.execute(
+        """
+        DELETE FROM player_latest_metrics
+        WHERE source = ?
+          AND NOT EXISTS (
+            SELECT 1
+            FROM rank_metric_snapshot snapshot
+            WHERE snapshot.player_id = player_latest_metrics.player_id
+              AND snapshot.stat_key = player_latest_metrics.stat_key
+          )
+        """,
+        (RANK_METRIC_SOURCE,),
+    )
+    connection.execute("DROP TABLE IF EXISTS rank_metric_snapshot")
+    return connection.execute("SELECT COUNT(*) FROM player_metric_ranks").fetchone()[0]
+
+
+def metric_distribution(sorted_values, buckets=METRIC_CATALOG_BUCKETS):
+    """Return (quantiles, bucket counts) for ascending values.
+
+    Quantiles are nearest-rank over METRIC_CATALOG_QUANTILES; the histogram
+    splits [min, max] into equal-width buckets (a constant series lands in
+    the first bucket).
+    """
+    count = len(sorted_values)
+    quantiles = [sorted_values[min(count - 1, int(q * count))] for q in METRIC_CATALOG_QUANTILES]
+    low, high = sorted_values[0], sorted_values[-1]
+    counts = [0] * buckets
+    if high > low:
+        scale = buckets / (high - low)
+        for value in sorted_values:
+            counts[min(buckets - 1, int((value - low) * scale))] += 1
+    else:
+        counts[0] = count
+    return quantiles, counts
+
+
+def refresh_metric_catalog(connection, updated_at=None):
+    """Rebuild metric_catalog: count/min/max/quantiles/histogram per stat_key and scope.
+
+    The league-wide rows also carry the equi-depth bounds the screener planner
+    reads (read_metric_histograms), so one sorted scan feeds both. Rank
+    pseudo-metrics are skipped: their distribution is fixed by construction.
+    """
+    updated_at = updated_at or utc_now_iso()
+    rows = connection.execute(
+        """
+        SELECT plm.stat_key, plm.stat_value, p.position, p.team
+        FROM player_latest_metrics plm
+        LEFT JOIN players p ON p.player_id = plm.player_id
+        WHERE plm.source != ?
+        ORDER BY plm.stat_key, plm.stat_value
+        """,
+        (RANK_METRIC_SOURCE,),
+    )
+    catalog_rows = []
+    for stat_key, group in itertools.groupby(rows, key=lambda row: row[0]):
+        scopes = {("all", ""): []}
+        for _, stat_value, position, team in group:
+            scopes[("all", "")].append(stat_value)
+            if position:
+                scopes.setdefault(("position", position), []).append(stat_value)
+            if team:
+                scopes.setdefault(("team", team), []).append(stat_value)
+        for (scope, scope_value), values in scopes.items():
+            quantiles, counts = metric_distribution(values)
+            bounds = screener_compiler.equi_depth_bounds(values) if scope == "all" else None
+            catalog_rows.append(
+                (
+                    scope,
+                    scope_value,
+                    stat_key,
+                    len(values),
+                    values[0],
+                    values[-1],
+                    json.dumps(quantiles),
+                    json.dumps(counts),
+                    None if bounds is None else json.dumps(bounds),
+                    updated_at,
+                )
+            )
+    connection.execute("DELETE FROM metric_catalog")
+    connection.executemany(
+        """
+        INSERT INTO metric_catalog (
+          scope, scope_value, stat_key, player_count, min_value, max_value,
+          quantiles_json, histogram_json, bounds_json, updated_at
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        catalog_rows,
+    )
+    return len(catalog_rows)
+
+
+# Each player's last :games weeks (Sleeper row preferred for PPR) crossed with
+# the usage stat_keys; one row per (week, stat_key), ordered for groupby.
+SPARKLINE_ROWS_SQL = """
+WITH weeks AS (
+  SELECT
+    player_id, season, week, fantasy_points_ppr,
+    ROW_NUMBER() OVER (
+      PARTITION BY player_id, season, week
+      ORDER BY CASE WHEN source='sleeper' THEN 0 ELSE 1 END
+    ) AS pick
+  FROM player_week_stats
+  WHERE season_type = 'regular'
+),
+games AS (
+  SELECT
+    player_id, season, week, fantasy_points_ppr,
+    ROW_NUMBER() OVER (PARTITION BY player_id ORDER BY season DESC, week DESC) AS rn
+  FROM weeks
+  WHERE pick = 1
+),
+keys AS (
+  SELECT value AS stat_key FROM json_each(:stat_keys)
+)
+SELECT g.player_id, g.season, g.week, g.fantasy_points_ppr, k.stat_key, m.stat_value, m.source
+FROM games g
+CROSS JOIN keys k
+LEFT JOIN player_week_metrics m
+  ON m.player_id = g.player_id
+ AND m.stat_key = k.stat_key
+ AND m.season = g.season
+ AND m.week = g.week
+ AND m.season_type = 'regular'
+WHERE g.rn <= :games
+ORDER BY g.player_id, g.season, g.week
+"""
+
+
+def sparkline_trend(points):
+    """Return (slope, momentum) of a PPR series, oldest first; None where too short.
+
+    Slope is the least-squares PPR change per game over the games with
+    points. Momentum is the mean of the last SPARKLINE_MOMENTUM_GAMES games
+    minus the mean of the whole series.
+    """
+    observed = [(index, value) for index, value in enumerate(points) if value is not None]
+    count = len(observed)
+    if count < 2:
+        return None, None
+    mean_x = sum(index for index, _ in observed) / count
+    mean_y = sum(value for _, value in observed) / count
+    spread = sum((index - mean_x) ** 2 for index, _ in observed)
+    slope = sum((index - mean_x) * (value - mean_y) for index, value in observed) / spread
+    momentum = None
+    if count > SPARKLINE_MOMENTUM_GAMES:
+        recent = [value for _, value in observed[-SPARKLINE_MOMENTUM_GAMES:]]
+        momentum = round(sum(recent) / len(recent) - mean_y, 4)
+    return round(slope, 4), momentum
+
+
+def refresh_player_sparklines(connection, updated_at=None):
+    """Rebuild player_sparklines: each player's recent PPR/usage series with trend scalars."""
+    updated_at = updated_at or utc_now_iso()
+    cursor = connection.cursor()
+    cursor.row_factory = None
+    sparkline_rows = []
+    try:
+        cursor.execute(
+            SPARKLINE_ROWS_SQL,
+            {"stat_keys": json.dumps(SPARKLINE_USAGE_KEYS), "games": SPARKLINE_GAMES},
+        )
+        for player_id, player_rows in itertools.groupby(cursor, key=lambda row: row[0]):
+            seasons, weeks = [], []
+            values = {key: [] for key in ("fantasy_points_ppr", *SPARKLINE_USAGE_KEYS)}
+            for (season, week), week_rows in itertools.groupby(player_rows, key=lambda row: (row[1], row[2])):
+                cells = {}
+                for _, _, _, points, stat_key, stat_value, source in week_rows:
+                    if stat_value is not None and (source == "sleeper" or stat_key not in cells):
+                        cells[stat_key] = stat_value
+                seasons.append(season)
+                weeks.append(week)
+                values["fantasy_points_ppr"].append(points)
+                for stat_key in SPARKLINE_USAGE_KEYS:
+                    values[stat_key].append(cells.get(stat_key))
+            slope, momentum = sparkline_trend(values["fantasy_points_ppr"])
+            series = {"axis": {"season": seasons, "week": weeks}, "values": values}
+            sparkline_rows.append(
+                (player_id, len(weeks), json.dumps(series, separators=(",", ":")), slope, momentum, updated_at)
+            )
+    finally:
+        cursor.close()
+    connection.execute("DELETE FROM player_sparklines")
+    connection.executemany(
+        """
+        INSERT INTO player_sparklines (player_id, games, series_json, ppr_slope, ppr_momentum, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        sparkline_rows,
+    )
+    return len(sparkline_rows)
+
+
+def load_sparklines(connection=None):
+    """Return {player_id: sparkline document}, read from player_sparklines once per data generation."""
+    generation = current_data_generation(connection)
+    with SPARKLINES_LOCK:
+        if SPARKLINES["generation"] == generation and SPARKLINES["items"] is not None:
+            return SPARKLINES["items"]
+    if connection is None:
+        with get_connection() as own_connection:
+            initialize_database(own_connection)
+            items = read_sparklines(own_connection)
+    else:
+        items = read_sparklines(connection)
+    with SPARKLINES_LOCK:
+        SPARKLINES["generation"] = generation
+        SPARKLINES["items"] = items
+    return items
+
+
+def read_sparklines(connection):
+    items = {}
+    for row in connection.execute(
+        "SELECT player_id, games, series_json, ppr_slope, ppr_momentum FROM player_sparklines"
+    ):
+        items[row["player_id"]] = {
+            "games": row["games"],
+            "ppr_slope": row["ppr_slope"],
+            "ppr_momentum": row["ppr_momentum"],
+            **json.loads(row["series_json"]),
+        }
+    return items
+
+
+def attach_sparklines(items, connection=None):
+    """Set each screener row's "sparkline" (None for players without games)."""
+    sparklines = load_sparklines(connection)
+    for item in items:
+        item["sparkline"] = sparklines.get(item["player_id"])
+
+
+def normalize_screener_include(raw):
+    """Return the known screener include options, sorted; unknown names are ignored."""
+    if isinstance(raw, str):
+        raw = raw.split(",")
+    if not isinstance(raw, (list, tuple)):
+        return []
+    names = {str(name or "").strip().lower() for name in raw}
+    return [name for name in SCREENER_INCLUDES if name in names]
+
+
+def normalize_league_filters(payload):
+    """Return the screener's league filter fields; raises league_rosters.LeagueFilterError.
+
+    owned_by takes Sleeper user ids or roster ids (a list or a comma
+    separated string); available_only keeps players nobody in the league
+    rosters. Both need a league_id and they cannot be combined.
+    """
+    league_id = str(payload.get("league_id") or "").strip()
+    raw_owners = payload.get("owned_by")
+    if isinstance(raw_owners, str):
+        raw_owners = raw_owners.split(",")
+    elif isinstance(raw_owners, int) and not isinstance(raw_owners, bool):
+        raw_owners = [raw_owners]
+    elif not isinstance(raw_owners, (list, tuple, set)):
+        raw_owners = []
+    owned_by = sorted({str(owner).strip() for owner in raw_owners if str(owner or "").strip()})
+    available_only = parse_bool(payload.get("available_only"))
+    if league_id and not league_rosters.LEAGUE_ID_PATTERN.match(league_id):
+        raise league_rosters.LeagueFilterError(f"Invalid league_id: {league_id[:80]}")
+    if (owned_by or available_only) and not league_id:
+        raise league_rosters.LeagueFilterError("owned_by and available_only require a league_id")
+    if owned_by and available_only:
+        raise league_rosters.LeagueFilterError("owned_by and available_only cannot be combined")
+    if len(owned_by) > league_rosters.MAX_OWNER_FILTERS:
+        raise league_rosters.LeagueFilterError(f"At most {league_rosters.MAX_OWNER_FILTERS} owned_by entries")
+    return {"league_id": league_id, "owned_by": owned_by, "available_only": available_only}
+
+
+def resolve_league_filters(spec):
+    """Attach league_player_ids (the roster semi-join set) to a spec with a league filter.
+
+    Runs before the result cache key is built, so cached pages follow the
+    rosters as they change.
+    """
+    if not spec.get("owned_by") and not spec.get("available_only"):
+        return spec
+    ownership = LEAGUE_OWNERSHIP.get(spec["league_id"], fetch_league_rosters)
+    return {**spec, "league_player_ids": ownership.player_ids(spec["owned_by"] or None)}
+
+
+def metric_catalog_item(row):
+    return {
+        "key": row["stat_key"],
+        "label": build_stat_label(row["stat_key"]),
+        "scope": row["scope"],
+        "scope_value": row["scope_value"],
+        "min_value": row["min_value"],
+        "max_value": row["max_value"],
+        "player_count": row["player_count"],
+        "quantiles": json.loads(row["quantiles_json"]),
+        "histogram": json.loads(row["histogram_json"]),
+    }
+
+
+METRIC_CATALOG_SQL = """
+  SELECT scope, scope_value, stat_key, player_count, min_value, max_value, quantiles_json, histogram_json
+  FROM metric_catalog
+  ORDER BY
+    CASE stat_key
+      WHEN 'fantasy_points_ppr' THEN 0
+      WHEN 'age' THEN 1
+      WHEN 'years_exp' THEN 2
+      ELSE 100
+    END,
+    stat_key ASC,
+    CASE scope WHEN 'all' THEN 0 WHEN 'position' THEN 1 ELSE 2 END,
+    scope_value ASC
+"""
+
+
+def metric_catalog_document(items, generation, scope=None, scope_value=None):
+    """Shape catalog items (optionally narrowed to a scope/value) as the /api/metrics/catalog payload."""
+    if scope:
+        items = [item for item in items if item["scope"] == scope]
+    if scope_value:
+        items = [item for item in items if item["scope_value"] == scope_value]
+    return {
+        "generation": generation,
+        "quantiles": list(METRIC_CATALOG_QUANTILES),
+        "buckets": METRIC_CATALOG_BUCKETS,
+        "count": len(items),
+        "items": items,
+    }
+
+
+def fetch_metric_catalog(connection, query):
+    """Return the metric catalog document, reading metric_catalog once per data generation."""
+    scope = str(query.get("scope") or "").strip().lower()
+    if scope and scope not in METRIC_CATALOG_SCOPES:
+        raise ValueError(f"scope must be one of {', '.join(METRIC_CATALOG_SCOPES)}")
+    scope_value = str(query.get("scope_value") or "").strip().upper()
+    generation = current_data_generation(connection)
+
+    def read_items():
+        initialize_database(connection)
+        return [metric_catalog_item(row) for row in connection.execute(METRIC_CATALOG_SQL)]
+
+    return metric_catalog_document(cached_metric_catalog_items(generation, read_items), generation, scope, scope_value)
+
+
+def cached_metric_catalog_items(generation, read_items):
+    """Return catalog items for generation, calling read_items() only on a generation change."""
+    with METRIC_CATALOG_LOCK:
+        if METRIC_CATALOG["generation"] == generation and METRIC_CATALOG["items"] is not None:
+            return METRIC_CATALOG["items"]
+    items = read_items()
+    with METRIC_CATALOG_LOCK:
+        METRIC_CATALOG["generation"] = generation
+        METRIC_CATALOG["items"] = items
+    return items
+
+
+def scoring_profile_document(row, cached):
+    return {
+        "profile_id": row["profile_id"],
+        "settings": json.loads(row["settings_json"]),
+        "generation": row["generation"],
+        "player_weeks": row["player_weeks"],
+        "computed_at": row["computed_at"],
+        "cached": cached,
+    }
+
+
+def score_profile(connection, profile, settings):
+    """Recompute a profile's weekly and latest points; returns the player-week count."""
+    connection.execute("DELETE FROM scoring_profile_points WHERE profile_id = ?", (profile,))
+    connection.execute("DELETE FROM scoring_profile_latest WHERE profile_id = ?", (profile,))
+    cursor = connection.execute(
+        scoring_engine.SCORE_WEEKS_SQL,
+        {"profile_id": profile, "weights": json.dumps(scoring_engine.weight_vector(settings))},
+    )
+    connection.execute(scoring_engine.SCORE_LATEST_SQL, {"profile_id": profile})
+    return cursor.rowcount
+
+
+def ensure_scoring_profile(connection, profile, settings=None):
+    """Return the profile document, scoring the profile if its points predate the data generation.
+
+    settings may be None for a profile registered earlier; an unknown id then
+    raises scoring_engine.ScoringError.
+    """
+    if connection is None:
+        with get_connection() as own_connection:
+            initialize_database(own_connection)
+            return ensure_scoring_profile(own_connection, profile, settings)
+    generation = current_data_generation(connection)
+    with SCORING_PROFILES_LOCK:
+        row = connection.execute("SELECT * FROM scoring_profiles WHERE profile_id = ?", (profile,)).fetchone()
+        if row is not None and row["generation"] == generation:
+            return scoring_profile_document(row, cached=True)
+        if row is None and settings is None:
+            raise scoring_engine.ScoringError(f"unknown scoring profile {profile!r}")
+        if settings is None:
+            settings = json.loads(row["settings_json"])
+        player_weeks = score_profile(connection, profile, settings)
+        connection.execute(
+            """
+            INSERT INTO scoring_profiles (profile_id, settings_json, generation, player_weeks, computed_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(profile_id) DO UPDATE SET
+              generation=excluded.generation,
+              player_weeks=excluded.player_weeks,
+              computed_at=excluded.computed_at
+            """,
+            (profile, json.dumps(settings), generation, player_weeks, utc_now_iso()),
+        )
+        # Only points are evicted: the settings row stays so the profile_id keeps
+        # working and is rescored from it on its next use.
+        evicted = [
+            item["profile_id"]
+            for item in connection.execute(
+                """
+                SELECT profile_id FROM scoring_profiles
+                WHERE generation IS NOT NULL AND profile_id != ?
+                ORDER BY computed_at DESC, rowid DESC
+                LIMIT -1 OFFSET ?
+                """,
+                (profile, max(SCORING_PROFILE_CACHE_SIZE - 1, 0)),
+            ).fetchall()
+        ]
+        for evicted_id in evicted:
+            for table in ("scoring_profile_points", "scoring_profile_latest"):
+                connection.execute(f"DELETE FROM {table} WHERE profile_id = ?", (evicted_id,))
+            connection.execute(
+                "UPDATE scoring_profiles SET generation = NULL, player_weeks = 0 WHERE profile_id = ?", (evicted_id,)
+            )
+        connection.commit()
+        row = connection.execute("SELECT * FROM scoring_profiles WHERE profile_id = ?", (profile,)).fetchone()
+        return scoring_profile_document(row, cached=False)
+
+
+def register_scoring_profile(connection, payload):
+    """Handle a scoring profile registration body: {"scoring_settings": {...}} or {"preset": name}."""
+    payload = payload or {}
+    raw = payload.get("preset") or payload.get("scoring_settings") or payload.get("scoring_profile")
+    profile, settings = scoring_engine.resolve_profile(raw)
+    if profile is None:
+        raise scoring_engine.ScoringError("scoring_settings or preset is required")
+    return ensure_scoring_profile(connection, profile, settings)
+
+
+def scoring_index_column(index, profile, connection=None):
+    """Return the index column of a profile's latest points, loaded once per index."""
+
+    def load_rows():
+        if connection is None:
+            with get_connection() as own_connection:
+                return read_scoring_points(own_connection, profile)
+        return read_scoring_points(connection, profile)
+
+    return index.external_column(("scoring", profile), load_rows)
+
+
+def read_scoring_points(connection, profile):
+    return connection.execute(
+        "SELECT player_id, fantasy_points FROM scoring_profile_latest WHERE profile_id = ?", (profile,)
+    ).fetchall()
+
+
+def get_screener_index(connection=None):
+    """Return the in-memory screener index for the current data generation, or None if disabled."""
+    if not SCREENER_INDEX.enabled:
+        return None
+    generation = current_data_generation(connection)
+    if connection is None:
+        with get_connection() as own_connection:
+            initialize_database(own_connection)
+            return SCREENER_INDEX.get(own_connection, generation)
+    return SCREENER_INDEX.get(connection, generation)
+
+
+def load_metric_histograms(connection=None):
+    """Return {"player_count", "by_key"} for filter planning, cached per data generation."""
+    generation = current_data_generation(connection)
+    with METRIC_HISTOGRAMS_LOCK:
+        if METRIC_HISTOGRAMS["generation"] == generation and METRIC_HISTOGRAMS["histograms"] is not None:
+            return METRIC_HISTOGRAMS["histograms"]
+    if connection is None:
+        with get_connection() as own_connection:
+            initialize_database(own_connection)
+            histograms = read_metric_histograms(own_connection)
+    else:
+        histograms = read_metric_histograms(connection)
+    with METRIC_HISTOGRAMS_LOCK:
+        METRIC_HISTOGRAMS["generation"] = generation
+        METRIC_HISTOGRAMS["histograms"] = histograms
+    return histograms
+
+
+def read_metric_histograms(connection):
+    by_key = {}
+    for row in connection.execute(
+        "SELECT stat_key, player_count, bounds_json FROM metric_catalog WHERE scope = 'all' AND bounds_json IS NOT NULL"
+    ):
+        by_key[row["stat_key"]] = {"player_count": row["player_count"], "bounds": json.loads(row["bounds_json"])}
+    player_count = connection.execute("SELECT COUNT(*) AS total FROM players").fetchone()["total"]
+    return {"player_count": player_count, "by_key": by_key}
 
 
 def upsert_profile_metrics_from_players(connection, updated_at=None):
@@ -706,6 +1825,7 @@ def run_full_sync(connection, season=None, include_nflverse=True):
     """
     initialize_database(connection)
     season = int(season or current_nfl_season())
+    http_before = HTTP_FETCHER.snapshot()
 
     summary = {
         "season": season,
@@ -739,6 +1859,7 @@ def run_full_sync(connection, season=None, include_nflverse=True):
         "SELECT COUNT(DISTINCT stat_key) AS value FROM player_latest_metrics"
     ).fetchone()["value"]
     summary["metric_keys_available"] = metric_key_count
+    summary["http"] = HTTP_FETCHER.stats_since(http_before)
 
     upsert_sync_state(connection, "last_sync_report", json.dumps(summary))
     return summary
@@ -941,6 +2062,47 @@ def nflverse_asset_cache_key(season=None):
     return f"{NFLVERSE_ASSET_CACHE_KEY_PREFIX}:{season_part}"
 
 
+def fetch_nflverse_releases(connection):
+    """Return the nflverse release listing, revalidated against the compact copy kept in sync_state.
+
+    Only tag_name, name and each asset's name and download URL are kept, and
+    an unchanged listing costs GitHub a 304 (which is not rate limited).
+    """
+    state = read_sync_state(connection, NFLVERSE_RELEASES_STATE_KEY)
+    try:
+        stored = json.loads(state["value"]) if state and state.get("value") else None
+    except json.JSONDecodeError:
+        stored = None
+    if not isinstance(stored, dict) or not isinstance(stored.get("releases"), list):
+        stored = None
+    result = HTTP_FETCHER.fetch(
+        NFLVERSE_RELEASES_URL,
+        accept="application/json",
+        validators=stored.get("validators") if stored else None,
+    )
+    if result.not_modified and stored:
+        return stored["releases"]
+    releases = [
+        {
+            "tag_name": release.get("tag_name"),
+            "name": release.get("name"),
+            "assets": [
+                {"name": asset.get("name"), "browser_download_url": asset.get("browser_download_url")}
+                for asset in release.get("assets") or []
+                if isinstance(asset, dict)
+            ],
+        }
+        for release in json.loads(result.body.decode("utf-8"))
+        if isinstance(release, dict)
+    ]
+    validators = result.validators()
+    if validators:
+        upsert_sync_state(
+            connection, NFLVERSE_RELEASES_STATE_KEY, json.dumps({"validators": validators, "releases": releases})
+        )
+    return releases
+
+
 def find_nflverse_player_stats_asset(connection, season=None):
     initialize_database(connection)
     cache_key = nflverse_asset_cache_key(season=season)
@@ -956,7 +2118,7 @@ def find_nflverse_player_stats_asset(connection, season=None):
             except json.JSONDecodeError:
                 pass
 
-    releases = fetch_json(NFLVERSE_RELEASES_URL)
+    releases = fetch_nflverse_releases(connection)
     season = int(season) if season else None
     candidates = []
 
@@ -1033,7 +2195,7 @@ def sync_nflverse_player_stats(connection, season):
     metric_batch_size = 12000
     selected_season = int(season)
     fallback_season_used = False
-    request = urllib.request.Request(asset_url, headers={"User-Agent": USER_AGENT})
+    validators_key = f"{asset_url}#{selected_season}"
 
     def flush_batches():
         nonlocal stats_rows_upserted, metrics_rows_upserted, stats_batch, metric_batch
@@ -1155,16 +2317,28 @@ def sync_nflverse_player_stats(connection, season):
             if len(stats_batch) >= stats_batch_size or len(metric_batch) >= metric_batch_size:
                 flush_batches()
 
-    with urllib.request.urlopen(request, timeout=180) as response:
-        if asset_url.endswith(".gz"):
-            with gzip.GzipFile(fileobj=response) as raw_stream:
-                with io.TextIOWrapper(raw_stream, encoding="utf-8", errors="ignore", newline="") as text_stream:
-                    process_reader(csv.DictReader(text_stream))
-        else:
-            with io.TextIOWrapper(response, encoding="utf-8", errors="ignore", newline="") as text_stream:
-                process_reader(csv.DictReader(text_stream))
+    validators = read_http_validators(connection, validators_key)
+    with HTTP_FETCHER.stream(asset_url, timeout=180, validators=validators) as result:
+        if result.not_modified:
+            # The asset is byte-for-byte what the last successful ingest of this season read.
+            return {
+                "stats_rows_upserted": 0,
+                "metrics_rows_upserted": 0,
+                "asset": asset_url,
+                "asset_name": asset.get("name"),
+                "asset_season_hint": asset_year,
+                "fallback_season_used": False,
+                "not_modified": True,
+            }
+        raw_stream = result.body
+        if raw_stream.peek(2)[:2] == b"\x1f\x8b":
+            raw_stream = gzip.GzipFile(fileobj=raw_stream)
+        with io.TextIOWrapper(raw_stream, encoding="utf-8", errors="ignore", newline="") as text_stream:
+            process_reader(csv.DictReader(text_stream))
 
     flush_batches()
+    save_http_validators(connection, validators_key, result)
+    connection.commit()
 
     return {
         "stats_rows_upserted": stats_rows_upserted,
@@ -1173,6 +2347,7 @@ def sync_nflverse_player_stats(connection, season):
         "asset_name": asset.get("name"),
         "asset_season_hint": asset_year,
         "fallback_season_used": fallback_season_used,
+        "not_modified": False,
     }
 
 
@@ -1209,7 +2384,7 @@ def find_all_nflverse_player_stats_assets(connection, seasons):
 
     # Fetch releases once for all uncached seasons
     try:
-        releases = fetch_json(NFLVERSE_RELEASES_URL)
+        releases = fetch_nflverse_releases(connection)
     except (OSError, ValueError, RuntimeError, json.JSONDecodeError, TimeoutError, urllib.error.URLError):
         return result
 
@@ -1263,6 +2438,7 @@ def bulk_sync_nflverse(connection, seasons=None):
     current = current_nfl_season()
     if seasons is None:
         seasons = list(range(current - BULK_LOAD_SEASONS_BACK + 1, current + 1))
+    http_before = HTTP_FETCHER.snapshot()
 
     # Sync player bios first (needed for ID matching)
     players_result = sync_sleeper_players(connection)
@@ -1291,6 +2467,7 @@ def bulk_sync_nflverse(connection, seasons=None):
             summary["errors"].append(f"Season {season}: {error}")
 
     refresh_latest_metrics(connection)
+    summary["http"] = HTTP_FETCHER.stats_since(http_before)
     upsert_sync_state(connection, "last_bulk_sync", json.dumps({
         "seasons": summary["seasons_loaded"],
         "synced_at": utc_now_iso(),
@@ -1438,6 +2615,12 @@ def fetch_health_summary(connection):
         "metric_keys_available": metric_key_count,
         "last_sync_at": last_sync["updated_at"] if last_sync else None,
         "last_sync_report": json.loads(last_sync["value"]) if last_sync and last_sync["value"] else None,
+        "data_generation": current_data_generation(connection),
+        "screener_cache": SCREENER_RESULT_CACHE.snapshot(),
+        "screener_index": SCREENER_INDEX.snapshot(),
+        "league_ownership": LEAGUE_OWNERSHIP.snapshot(),
+        "sleeper_players_cache": sleeper_players_cache_snapshot(),
+        "http": HTTP_FETCHER.snapshot(),
     }
 
 
@@ -1448,6 +2631,14 @@ def parse_int(value, default):
         return default
 
 
+def parse_bool(value, default=False):
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in {"1", "true", "yes", "on"}
+
+
 def parse_float(value):
     try:
         if value is None or value == "":
@@ -1465,13 +2656,22 @@ def fetch_players(connection, query):
     limit = max(1, min(parse_int(query.get("limit"), 200), 5000))
     offset = max(0, parse_int(query.get("offset"), 0))
     sort = (query.get("sort") or "points_desc").strip().lower()
+    profile, settings = scoring_engine.resolve_profile(query.get("scoring_profile"))
+    points_sql = "l.fantasy_points_ppr"
+    if profile:
+        ensure_scoring_profile(connection, profile, settings)
+        points_sql = "sp.fantasy_points"
 
     sort_sql = {
-        "points_desc": "COALESCE(l.fantasy_points_ppr, -9999) DESC, p.full_name ASC",
-        "points_asc": "COALESCE(l.fantasy_points_ppr, 9999) ASC, p.full_name ASC",
+        "points_desc": f"COALESCE({points_sql}, -9999) DESC, p.full_name ASC",
+        "points_asc": f"COALESCE({points_sql}, 9999) ASC, p.full_name ASC",
         "name": "p.full_name ASC",
         "team": "p.team ASC, p.full_name ASC",
-    }.get(sort, "COALESCE(l.fantasy_points_ppr, -9999) DESC, p.full_name ASC")
+    }.get(sort, f"COALESCE({points_sql}, -9999) DESC, p.full_name ASC")
+    scoring_columns = ",\n        sp.fantasy_points AS latest_fantasy_points_custom" if profile else ""
+    scoring_join = (
+        "\n      LEFT JOIN scoring_profile_latest sp ON sp.profile_id = ? AND sp.player_id = p.player_id" if profile else ""
+    )
 
     sql = f"""
       SELECT
@@ -1482,12 +2682,12 @@ def fetch_players(connection, query):
         l.rushing_yards AS latest_rushing_yards,
         l.receiving_yards AS latest_receiving_yards,
         l.receptions AS latest_receptions,
-        l.touchdowns AS latest_touchdowns
+        l.touchdowns AS latest_touchdowns{scoring_columns}
       FROM players p
-      LEFT JOIN player_latest_stats l ON l.player_id = p.player_id
+      LEFT JOIN player_latest_stats l ON l.player_id = p.player_id{scoring_join}
       WHERE 1=1
     """
-    params = []
+    params = [profile] if profile else []
     if search:
         sql += " AND (LOWER(p.full_name) LIKE ? OR LOWER(p.first_name) LIKE ? OR LOWER(p.last_name) LIKE ?)"
         wildcard = f"%{search}%"
@@ -1561,24 +2761,33 @@ def normalize_screen_filters(raw_filters):
     return normalized
 
 
-def build_filter_sql(alias, metric_filter):
-    operator = metric_filter.get("op")
-    value = metric_filter.get("value")
-    value_max = metric_filter.get("value_max")
+def normalize_formulas(raw_formulas):
+    """Normalize payload formulas to [{"name", "expression"}]; raises formula_engine.FormulaError.
 
-    if operator == "lt":
-        return f"{alias}.stat_value < ?", [value]
-    if operator == "lte":
-        return f"{alias}.stat_value <= ?", [value]
-    if operator == "gt":
-        return f"{alias}.stat_value > ?", [value]
-    if operator == "eq":
-        return f"{alias}.stat_value = ?", [value]
-    if operator == "neq":
-        return f"{alias}.stat_value != ?", [value]
-    if operator == "between":
-        return f"{alias}.stat_value BETWEEN ? AND ?", [value, value_max]
-    return f"{alias}.stat_value >= ?", [value]
+    Accepts [{"name": ..., "expression": ...}] or {name: expression}. Names
+    follow stat_key rules and can be used in filters, sort_key and columns.
+    """
+    if isinstance(raw_formulas, dict):
+        raw_formulas = [{"name": name, "expression": expression} for name, expression in raw_formulas.items()]
+    if not isinstance(raw_formulas, list):
+        return []
+    normalized = []
+    for raw_formula in raw_formulas:
+        if not isinstance(raw_formula, dict):
+            continue
+        name = normalize_stat_key(raw_formula.get("name") or raw_formula.get("key"))
+        if not name:
+            raise formula_engine.FormulaError("formula name is required")
+        if any(entry["name"] == name for entry in normalized):
+            raise formula_engine.FormulaError(f"duplicate formula name {name!r}")
+        try:
+            formula = formula_engine.parse_formula(name, raw_formula.get("expression") or raw_formula.get("formula"))
+        except formula_engine.FormulaError as error:
+            raise formula_engine.FormulaError(f"{name}: {error}") from None
+        normalized.append({"name": name, "expression": formula.expression})
+    if len(normalized) > formula_engine.MAX_FORMULAS:
+        raise formula_engine.FormulaError(f"at most {formula_engine.MAX_FORMULAS} formulas per query")
+    return normalized
 
 
 def dedupe_metric_keys(keys):
@@ -1621,7 +2830,27 @@ def fetch_filter_options(connection, query):
             FILTER_OPTIONS_CACHE["stamp"] = cache_stamp
             FILTER_OPTIONS_CACHE["entries"] = {}
 
-    sql = """
+    # League-wide, per-position and per-team options come straight from the
+    # catalog built at sync; only position+team slices aggregate
+    # player_latest_metrics. Rank pseudo-metrics ("__pct" / "__z") are left
+    # out of the catalog and the default list and only listed for a search.
+    use_catalog = not (position and team) and connection.execute(
+        "SELECT 1 FROM metric_catalog LIMIT 1"
+    ).fetchone() is not None
+
+    search_parts = []
+    search_params = []
+    if search:
+        token = normalize_stat_key(search)
+        wildcard = f"%{token.replace('_', '%') if token else search}%"
+        if token == "yac":
+            search_parts.append("(plm.stat_key LIKE ? OR plm.stat_key LIKE ?)")
+            search_params.extend(["%yac%", "%yards_after_catch%"])
+        else:
+            search_parts.append("plm.stat_key LIKE ?")
+            search_params.append(wildcard)
+
+    aggregate_sql = """
       SELECT
         plm.stat_key,
         COUNT(*) AS player_count,
@@ -1629,31 +2858,38 @@ def fetch_filter_options(connection, query):
         MAX(plm.stat_value) AS max_value
       FROM player_latest_metrics plm
     """
-    params = []
-    where_parts = ["1=1"]
-
+    aggregate_parts = list(search_parts)
+    aggregate_params = list(search_params)
     if position or team:
-        sql += " JOIN players p ON p.player_id = plm.player_id"
-
-    if search:
-        token = normalize_stat_key(search)
-        wildcard = f"%{token.replace('_', '%') if token else search}%"
-        if token == "yac":
-            where_parts.append("(plm.stat_key LIKE ? OR plm.stat_key LIKE ?)")
-            params.extend(["%yac%", "%yards_after_catch%"])
-        else:
-            where_parts.append("plm.stat_key LIKE ?")
-            params.append(wildcard)
+        aggregate_sql += " JOIN players p ON p.player_id = plm.player_id"
     if position:
-        where_parts.append("p.position = ?")
-        params.append(position)
+        aggregate_parts.append("p.position = ?")
+        aggregate_params.append(position)
     if team:
-        where_parts.append("p.team = ?")
-        params.append(team)
+        aggregate_parts.append("p.team = ?")
+        aggregate_params.append(team)
 
-    sql += f" WHERE {' AND '.join(where_parts)}"
-    sql += """
-      GROUP BY plm.stat_key
+    if use_catalog:
+        where_parts = ["plm.scope = ? AND plm.scope_value = ?", *search_parts]
+        params = ["position" if position else "team" if team else "all", position or team, *search_params]
+        sql = f"""
+          SELECT plm.stat_key, plm.player_count, plm.min_value, plm.max_value
+          FROM metric_catalog plm
+          WHERE {' AND '.join(where_parts)}
+        """
+        if search:
+            aggregate_parts.append("plm.source = ?")
+            sql += f" UNION ALL {aggregate_sql} WHERE {' AND '.join(aggregate_parts)} GROUP BY plm.stat_key"
+            params.extend([*aggregate_params, RANK_METRIC_SOURCE])
+    else:
+        if not search:
+            aggregate_parts.append("plm.source != ?")
+            aggregate_params.append(RANK_METRIC_SOURCE)
+        sql = f"{aggregate_sql} WHERE {' AND '.join(aggregate_parts or ['1=1'])} GROUP BY plm.stat_key"
+        params = aggregate_params
+
+    sql = f"""
+      SELECT * FROM ({sql}) plm
       ORDER BY
         CASE plm.stat_key
           WHEN 'fantasy_points_ppr' THEN 0
@@ -1921,19 +3157,9 @@ def rebuild_window_temp_tables(connection, window):
     connection.execute("CREATE INDEX IF NOT EXISTS idx_temp_window_stats_player ON temp_window_stats(player_id)")
 
 
-def fetch_screener_query(connection, payload):
-    initialize_database(connection)
+def normalize_screener_payload(payload):
+    """Reduce a raw /api/screener/query payload to the fields that shape the result."""
     payload = payload or {}
-    window = parse_window_config(payload)
-    metrics_table = "player_latest_metrics"
-    stats_table = "player_latest_stats"
-    use_window = window["mode"] != "latest" or window.get("seasons") is not None
-    if use_window:
-        rebuild_window_temp_tables(connection, window)
-        metrics_table = "temp_window_metrics"
-        stats_table = "temp_window_stats"
-    games_played_col = "l.games_played AS games_played" if use_window else "NULL AS games_played"
-
     search = str(payload.get("search") or "").strip().lower()
     position = str(payload.get("position") or "").strip().upper()
     raw_positions = payload.get("positions")
@@ -1944,184 +3170,176 @@ def fetch_screener_query(connection, payload):
         positions = [str(item).strip().upper() for item in raw_positions if item and str(item).strip()]
     if not positions and position:
         positions = [position]
-    positions = [item for item in positions if item]
-
-    team = str(payload.get("team") or "").strip().upper()
-    age_min = parse_float(payload.get("age_min"))
-    age_max = parse_float(payload.get("age_max"))
-    relevance = str(payload.get("relevance") or "fantasy").strip().lower()
-    limit = max(1, min(parse_int(payload.get("limit"), 200), 1000))
-    offset = max(0, parse_int(payload.get("offset"), 0))
-    filters = normalize_screen_filters(payload.get("filters"))
-    requested_metric_keys = build_requested_metric_keys(payload.get("columns"), filters)
+    positions = sorted({item for item in positions if item})
 
-    sort_key = normalize_stat_key(payload.get("sort_key") or "fantasy_points_ppr")
+    filters = normalize_screen_filters(payload.get("filters"))
     sort_direction = str(payload.get("sort_direction") or "desc").strip().lower()
-    sort_is_asc = sort_direction == "asc"
-    sort_null_fill = "9999999" if sort_is_asc else "-9999999"
-    sort_order = "ASC" if sort_is_asc else "DESC"
-
-    where_params = []
-    where_parts = ["1=1"]
-
-    # Relevance filtering — hide low-caliber / zero-stat players by default.
-    # When a search term is present we always show all players so users can
-    # find anyone.  The "all" setting disables the filter entirely.
-    if relevance == "fantasy" and not search:
-        where_parts.append(
-            """(
-              p.status = 'Active'
-              AND (
-                p.years_exp IS NOT NULL AND p.years_exp <= 1
-                OR EXISTS (
-                  SELECT 1 FROM player_week_stats pws
-                  WHERE pws.player_id = p.player_id
-                    AND pws.fantasy_points_ppr > 0
-                )
-              )
-            )"""
-        )
-    filter_join_parts = []
-    filter_join_params = []
+    scoring_profile, scoring_settings = scoring_engine.resolve_profile(payload.get("scoring_profile"))
+    columns = build_requested_metric_keys(payload.get("columns"), filters)
+    default_sort_key = "fantasy_points_ppr"
+    if scoring_profile:
+        columns = dedupe_metric_keys([scoring_engine.SCORING_STAT_KEY, *columns])[:80]
+        default_sort_key = scoring_engine.SCORING_STAT_KEY
+    return {
+        "window": parse_window_config(payload),
+        "search": search,
+        "positions": positions,
+        "team": str(payload.get("team") or "").strip().upper(),
+        "age_min": parse_float(payload.get("age_min")),
+        "age_max": parse_float(payload.get("age_max")),
+        "relevance": str(payload.get("relevance") or "fantasy").strip().lower(),
+        "relevance_tier": relevance_tier(payload.get("relevance")),
+        "limit": max(1, min(parse_int(payload.get("limit"), 200), 1000)),
+        "offset": max(0, parse_int(payload.get("offset"), 0)),
+        "filters": filters,
+        "formulas": normalize_formulas(payload.get("formulas")),
+        "scoring_profile": scoring_profile,
+        "scoring_settings": scoring_settings,
+        "columns": columns,
+        "sort_key": normalize_stat_key(payload.get("sort_key") or default_sort_key),
+        "sort_direction": "asc" if sort_direction == "asc" else "desc",
+        "include": normalize_screener_include(payload.get("include")),
+        **normalize_league_filters(payload),
+        "debug": parse_bool(payload.get("debug")),
+    }
 
-    for index, metric_filter in enumerate(filters):
-        alias = f"mf{index}"
-        filter_sql, filter_params = build_filter_sql(alias, metric_filter)
-        filter_join_parts.append(
-            f"""
-            JOIN {metrics_table} {alias}
-              ON {alias}.player_id = p.player_id
-             AND {alias}.stat_key = ?
-             AND {filter_sql}
-            """
-        )
-        filter_join_params.extend([metric_filter["key"], *filter_params])
 
-    if search:
-        where_parts.append("(LOWER(p.full_name) LIKE ? OR LOWER(p.first_name) LIKE ? OR LOWER(p.last_name) LIKE ?)")
-        wildcard = f"%{search}%"
-        where_params.extend([wildcard, wildcard, wildcard])
-    if positions:
-        placeholders = ", ".join(["?"] * len(positions))
-        where_parts.append(f"p.position IN ({placeholders})")
-        where_params.extend(positions)
-    if team:
-        where_parts.append("p.team = ?")
-        where_params.append(team)
-    if age_min is not None:
-        where_parts.append("p.age >= ?")
-        where_params.append(age_min)
-    if age_max is not None:
-        where_parts.append("p.age <= ?")
-        where_params.append(age_max)
-
-    from_clause = f"FROM players p {' '.join(filter_join_parts)}"
-    select_params = [*filter_join_params, sort_key or "fantasy_points_ppr", *where_params, limit, offset]
-
-    if requested_metric_keys:
-        metric_placeholders = ",".join(["?"] * len(requested_metric_keys))
-        sql = f"""
-          WITH ranked AS (
-            SELECT
-              p.player_id, p.full_name, p.position, p.team, p.status, p.age, p.years_exp,
-              l.season AS latest_season, l.week AS latest_week, l.source AS latest_source,
-              l.fantasy_points_ppr AS latest_fantasy_points_ppr,
-              l.passing_yards AS latest_passing_yards,
-              l.rushing_yards AS latest_rushing_yards,
-              l.receiving_yards AS latest_receiving_yards,
-              l.receptions AS latest_receptions,
-              l.touchdowns AS latest_touchdowns,
-              {games_played_col},
-              COALESCE(msort.stat_value, COALESCE(l.fantasy_points_ppr, {sort_null_fill})) AS sort_value
-            {from_clause}
-            LEFT JOIN {stats_table} l ON l.player_id = p.player_id
-            LEFT JOIN {metrics_table} msort
-              ON msort.player_id = p.player_id
-             AND msort.stat_key = ?
-            WHERE {' AND '.join(where_parts)}
-            ORDER BY sort_value {sort_order}, p.full_name ASC
-            LIMIT ? OFFSET ?
-          )
-          SELECT
-            r.player_id, r.full_name, r.position, r.team, r.status, r.age, r.years_exp,
-            r.latest_season, r.latest_week, r.latest_source,
-            r.latest_fantasy_points_ppr, r.latest_passing_yards, r.latest_rushing_yards,
-            r.latest_receiving_yards, r.latest_receptions, r.latest_touchdowns,
-            r.games_played,
-            r.sort_value,
-            mv.stat_key,
-            mv.stat_value
-          FROM ranked r
-          LEFT JOIN {metrics_table} mv
-            ON mv.player_id = r.player_id
-           AND mv.stat_key IN ({metric_placeholders})
-          ORDER BY r.sort_value {sort_order}, r.full_name ASC
-        """
-        rows = connection.execute(sql, [*select_params, *requested_metric_keys]).fetchall()
-        items_by_player_id = {}
-        order = []
-        for row in rows:
-            player_id = row["player_id"]
-            if player_id not in items_by_player_id:
-                item = {
-                    "player_id": row["player_id"],
-                    "full_name": row["full_name"],
-                    "position": row["position"],
-                    "team": row["team"],
-                    "status": row["status"],
-                    "age": row["age"],
-                    "years_exp": row["years_exp"],
-                    "latest_season": row["latest_season"],
-                    "latest_week": row["latest_week"],
-                    "latest_source": row["latest_source"],
-                    "latest_fantasy_points_ppr": row["latest_fantasy_points_ppr"],
-                    "latest_passing_yards": row["latest_passing_yards"],
-                    "latest_rushing_yards": row["latest_rushing_yards"],
-                    "latest_receiving_yards": row["latest_receiving_yards"],
-                    "latest_receptions": row["latest_receptions"],
-                    "latest_touchdowns": row["latest_touchdowns"],
-                    "games_played": row["games_played"],
-                    "metrics": {},
-                }
-                items_by_player_id[player_id] = item
-                order.append(player_id)
-            stat_key = row["stat_key"]
-            if stat_key:
-                items_by_player_id[player_id]["metrics"][stat_key] = row["stat_value"]
-        items = [items_by_player_id[player_id] for player_id in order]
+def fetch_screener_query(connection, payload):
+    initialize_database(connection)
+    spec = resolve_league_filters(normalize_screener_payload(payload))
+    generation = current_data_generation(connection)
+    return SCREENER_RESULT_CACHE.get_or_compute(
+        query_cache.canonical_key("v1", spec),
+        lambda: execute_screener_query(connection, spec),
+        generation=generation,
+    )
+
+
+def execute_screener_query(connection, spec):
+    window = spec["window"]
+    metrics_table = "player_latest_metrics"
+    stats_table = "player_latest_stats"
+    use_window = window["mode"] != "latest" or window.get("seasons") is not None
+    profile = spec.get("scoring_profile")
+    if profile:
+        ensure_scoring_profile(connection, profile, spec.get("scoring_settings"))
+    if use_window:
+        rebuild_window_temp_tables(connection, window)
+        metrics_table = "temp_window_metrics"
+        stats_table = "temp_window_stats"
+        if profile:
+            agg_func = "SUM" if window.get("agg_mode") == "totals" else "AVG"
+            connection.execute(scoring_engine.window_points_sql(agg_func), {"profile_id": profile})
+
+    formulas = list(screener_compiler.spec_formulas(spec).values())
+    index = None
+    # Index formula columns only see synced metrics, so formulas over the
+    # custom points take the SQL path.
+    if not use_window and not spec["search"] and not (
+        profile and any(scoring_engine.SCORING_STAT_KEY in formula.stat_keys for formula in formulas)
+    ):
+        index = get_screener_index(connection)
+    extra = None
+    if index is not None and profile:
+        extra = {scoring_engine.SCORING_STAT_KEY: scoring_index_column(index, profile, connection)}
+    elif profile and not use_window:
+        scored_params = {"profile_id": profile, "stat_keys": json.dumps(screener_compiler.spec_stat_keys(spec))}
+        for statement in scoring_engine.SCORED_METRICS_SQL:
+            connection.execute(statement, scored_params)
+        metrics_table = scoring_engine.SCORED_METRICS_TABLE
+
+    filters = spec["filters"]
+    requested_metric_keys = spec["columns"]
+
+    # Relevance filtering (tier >= 1, "fantasy") hides low-caliber / zero-stat
+    # players by default; the compiler drops it whenever a search term is
+    # present so users can find anyone.
+    shape, params, plan = screener_compiler.compile_screener(
+        spec,
+        profile="v1",
+        metrics_table=metrics_table,
+        stats_table=stats_table,
+        games_played=use_window,
+        histograms=load_metric_histograms(connection) if filters else None,
+    )
+    if index is not None:
+        rows = index.profile_rows(index.top_k(spec, spec["sort_key"] or "fantasy_points_ppr", extra))
     else:
-        sql = f"""
-          SELECT
-            p.player_id, p.full_name, p.position, p.team, p.status, p.age, p.years_exp,
-            l.season AS latest_season, l.week AS latest_week, l.source AS latest_source,
-            l.fantasy_points_ppr AS latest_fantasy_points_ppr,
-            l.passing_yards AS latest_passing_yards,
-            l.rushing_yards AS latest_rushing_yards,
-            l.receiving_yards AS latest_receiving_yards,
-            l.receptions AS latest_receptions,
-            l.touchdowns AS latest_touchdowns,
-            {games_played_col}
-          {from_clause}
-          LEFT JOIN {stats_table} l ON l.player_id = p.player_id
-          LEFT JOIN {metrics_table} msort
-            ON msort.player_id = p.player_id
-           AND msort.stat_key = ?
-          WHERE {' AND '.join(where_parts)}
-          ORDER BY COALESCE(msort.stat_value, COALESCE(l.fantasy_points_ppr, {sort_null_fill})) {sort_order}, p.full_name ASC
-          LIMIT ? OFFSET ?
-        """
-        rows = connection.execute(sql, select_params).fetchall()
-        items = [dict(row) for row in rows]
+        rows = connection.execute(screener_compiler.page_sql(shape), params).fetchall()
+    plan["index"] = index is not None
+    items = []
+    items_by_player_id = {}
+    for row in rows:
+        item = dict(row)
+        item["metrics"] = {}
+        items.append(item)
+        items_by_player_id[item["player_id"]] = item
+
+    if items and requested_metric_keys:
+        if index is not None:
+            metric_values = index.metric_values(items_by_player_id, requested_metric_keys, extra)
+        else:
+            metric_values = fetch_metric_values(connection, metrics_table, items_by_player_id, requested_metric_keys)
         for item in items:
-            item["metrics"] = {}
+            item["metrics"] = metric_values[item["player_id"]]
+    if items and formulas:
+        if index is not None:
+            formula_values = index.formula_values(items_by_player_id, formulas)
+        else:
+            formula_values = evaluate_formula_rows(connection, metrics_table, items, formulas)
+        for item in items:
+            item["metrics"].update(formula_values[item["player_id"]])
+    if "sparklines" in spec.get("include", ()):
+        attach_sparklines(items, connection)
 
-    return {
+    response = {
         "count": len(items),
         "window": window,
         "filters": filters,
         "columns": requested_metric_keys,
         "items": items,
     }
+    if profile:
+        response["scoring_profile"] = profile
+    if spec.get("debug"):
+        response["debug"] = {"plan": plan}
+    return response
+
+
+def evaluate_formula_rows(connection, metrics_table, items, formulas):
+    """Return {player_id: {formula name: value}} for a page of screener rows (SQL path)."""
+    stat_keys = list(dict.fromkeys(stat_key for formula in formulas for stat_key in formula.stat_keys))
+    inputs = fetch_metric_values(connection, metrics_table, [item["player_id"] for item in items], stat_keys)
+    out = {}
+    for item in items:
+        cells = {}
+        for formula in formulas:
+            value = formula_engine.evaluate_row(formula.tree, inputs[item["player_id"]], item.get("games_played"))
+            if value is not None:
+                cells[formula.name] = value
+        out[item["player_id"]] = cells
+    return out
+
+
+def fetch_metric_values(connection, metrics_table, player_ids, stat_keys):
+    """Return {player_id: {stat_key: value}} from one (player_id, stat_key, value) fetch.
+
+    Rows come back as plain tuples and are scattered straight into the
+    per-player dicts, so no sqlite3.Row is allocated per metric cell.
+    """
+    values = {player_id: {} for player_id in player_ids}
+    cursor = connection.cursor()
+    cursor.row_factory = None
+    try:
+        cursor.execute(
+            screener_compiler.metrics_sql(metrics_table),
+            screener_compiler.metrics_params(values, stat_keys),
+        )
+        for player_id, stat_key, stat_value in cursor:
+            values[player_id][stat_key] = stat_value
+    finally:
+        cursor.close()
+    return values
 
 
 def fetch_screener(connection, query):
@@ -2170,3 +3388,278 @@ def fetch_player_history(connection, player_id, season=None, limit=36):
     params.append(max(1, min(int(limit), 200)))
     rows = connection.execute(sql, params).fetchall()
     return [dict(row) for row in rows]
+
+
+# Selected games per player (the series week axis) crossed with the requested
+# stat_keys; CROSS JOIN keeps SQLite on that loop order so each metric cell is
+# one idx_week_metrics_series seek. Games without a stat come back with NULLs.
+PLAYER_SERIES_SQL = """
+WITH games AS (
+  SELECT player_id, season, week
+  FROM (
+    SELECT
+      player_id, season, week,
+      ROW_NUMBER() OVER (PARTITION BY player_id ORDER BY season DESC, week DESC) AS rn
+    FROM (
+      SELECT DISTINCT player_id, season, week
+      FROM player_week_stats
+      WHERE player_id IN (SELECT value FROM json_each(:player_ids))
+        AND season_type = 'regular'
+        AND (:seasons IS NULL OR season IN (SELECT value FROM json_each(:seasons)))
+        AND week BETWEEN :week_start AND :week_end
+    )
+  )
+  WHERE rn <= :last_n_games
+),
+keys AS (
+  SELECT value AS stat_key FROM json_each(:stat_keys)
+)
+SELECT g.player_id, g.season, g.week, k.stat_key, m.stat_value, m.source
+FROM games g
+CROSS JOIN keys k
+LEFT JOIN player_week_metrics m
+  ON m.player_id = g.player_id
+ AND m.stat_key = k.stat_key
+ AND m.season = g.season
+ AND m.week = g.week
+ AND m.season_type = 'regular'
+"""
+
+
+def _split_list(raw):
+    if isinstance(raw, str):
+        return raw.split(",")
+    if isinstance(raw, (list, tuple)):
+        return raw
+    return []
+
+
+def normalize_series_payload(payload):
+    """Validate a /api/players/series request; raises ValueError."""
+    player_ids = [str(value).strip() for value in _split_list(payload.get("player_ids"))]
+    player_ids = list(dict.fromkeys(player_id for player_id in player_ids if player_id))
+    if not player_ids:
+        raise ValueError("player_ids is required")
+    if len(player_ids) > MAX_SERIES_PLAYERS:
+        raise ValueError(f"at most {MAX_SERIES_PLAYERS} player_ids per request")
+    stat_keys = list(dict.fromkeys(key for key in map(normalize_stat_key, _split_list(payload.get("stat_keys"))) if key))
+    stat_keys = stat_keys or list(SERIES_DEFAULT_STAT_KEYS)
+    if len(stat_keys) > MAX_SERIES_STAT_KEYS:
+        raise ValueError(f"at most {MAX_SERIES_STAT_KEYS} stat_keys per request")
+
+    window = parse_window_config(payload)
+    seasons = window["seasons"] if isinstance(window["seasons"], list) else None
+    if seasons is None and window["season"] is not None:
+        seasons = [window["season"]]
+    week_start = window["week_start"] if window["week_start"] is not None else 1
+    week_end = window["week_end"] if window["week_end"] is not None else NFL_REGULAR_SEASON_WEEKS
+    week_start, week_end = min(week_start, week_end), max(week_start, week_end)
+    last_n_games = window["last_n_games"]
+    if last_n_games is None:
+        bounded = seasons is not None or window["seasons"] == "career"
+        last_n_games = SERIES_MAX_GAMES if bounded else SERIES_DEFAULT_GAMES
+    if len(player_ids) * len(stat_keys) * last_n_games > MAX_SERIES_CELLS:
+        raise ValueError(f"series request exceeds {MAX_SERIES_CELLS} cells; narrow players, stat_keys or the window")
+    return {
+        "player_ids": player_ids,
+        "stat_keys": stat_keys,
+        "seasons": seasons,
+        "week_start": week_start,
+        "week_end": week_end,
+        "last_n_games": last_n_games,
+    }
+
+
+def player_series_params(spec):
+    return {
+        "player_ids": json.dumps(spec["player_ids"]),
+        "stat_keys": json.dumps(spec["stat_keys"]),
+        "seasons": json.dumps(spec["seasons"]) if spec["seasons"] else None,
+        "week_start": spec["week_start"],
+        "week_end": spec["week_end"],
+        "last_n_games": spec["last_n_games"],
+    }
+
+
+def player_series_document(spec, generation, rows):
+    """Pivot PLAYER_SERIES_SQL rows into column-oriented arrays.
+
+    The week axis is the union of every requested player's selected games,
+    oldest first, as parallel ``axis.season`` / ``axis.week`` arrays.
+    ``values[stat_key][i][j]`` is player i's value at axis position j, null
+    where the player has no game or no value that week. A Sleeper value wins
+    over an nflverse one for the same week, like ``player_latest_stats``.
+    """
+    rows = list(rows)
+    axis = sorted({(season, week) for _, season, week, _, _, _ in rows})
+    axis_index = {key: index for index, key in enumerate(axis)}
+    player_index = {player_id: index for index, player_id in enumerate(spec["player_ids"])}
+    values = {stat_key: [[None] * len(axis) for _ in player_index] for stat_key in spec["stat_keys"]}
+    for player_id, season, week, stat_key, stat_value, source in rows:
+        if stat_value is None:
+            continue
+        column = values[stat_key][player_index[player_id]]
+        position = axis_index[(season, week)]
+        if source == "sleeper" or column[position] is None:
+            column[position] = stat_value
+    return {
+        "generation": generation,
+        "player_ids": spec["player_ids"],
+        "stat_keys": spec["stat_keys"],
+        "window": {key: spec[key] for key in ("seasons", "week_start", "week_end", "last_n_games")},
+        "axis": {"season": [season for season, _ in axis], "week": [week for _, week in axis]},
+        "values": values,
+    }
+
+
+def fetch_player_series(connection, payload):
+    """Return weekly stat_key series for many players in one column-oriented document."""
+    initialize_database(connection)
+    spec = normalize_series_payload(payload)
+    generation = current_data_generation(connection)
+
+    def compute():
+        cursor = connection.cursor()
+        cursor.row_factory = None
+        try:
+            return player_series_document(spec, generation, cursor.execute(PLAYER_SERIES_SQL, player_series_params(spec)))
+        finally:
+            cursor.close()
+
+    return SCREENER_RESULT_CACHE.get_or_compute(query_cache.canonical_key("series", spec), compute, generation=generation)
+
+
+COMPS_COLUMN_SQL = """
+SELECT s.player_id, s.season, p.position, AVG(s.stat_value)
+FROM (
+  SELECT
+    player_id, season, stat_value,
+    ROW_NUMBER() OVER (
+      PARTITION BY player_id, season, week
+      ORDER BY CASE WHEN source='sleeper' THEN 0 ELSE 1 END
+    ) AS rn
+  FROM player_week_metrics
+  WHERE stat_key = :stat_key AND season_type = 'regular'
+) s
+JOIN players p ON p.player_id = s.player_id
+WHERE s.rn = 1 AND p.position IS NOT NULL AND p.position != ''
+GROUP BY s.player_id, s.season
+"""
+
+
+def comps_column(connection, stat_key, generation):
+    """Return {position: {(player_id, season): (per-game value, z)}} for stat_key."""
+    with COMPS_COLUMNS_LOCK:
+        if COMPS_COLUMNS["generation"] != generation:
+            COMPS_COLUMNS["generation"] = generation
+            COMPS_COLUMNS["columns"] = OrderedDict()
+        columns = COMPS_COLUMNS["columns"]
+        if stat_key in columns:
+            columns.move_to_end(stat_key)
+            return columns[stat_key]
+    column = comps_engine.zscore_cohorts(connection.execute(COMPS_COLUMN_SQL, {"stat_key": stat_key}))
+    with COMPS_COLUMNS_LOCK:
+        if COMPS_COLUMNS["generation"] == generation:
+            columns[stat_key] = column
+            while len(columns) > COMPS_COLUMN_CACHE_SIZE:
+                columns.popitem(last=False)
+    return column
+
+
+def normalize_comps_query(query):
+    """Validate /api/players/<id>/comps options; raises comps_engine.CompsError."""
+    pool = str(query.get("pool") or "season").strip().lower()
+    if pool not in comps_engine.COMPS_POOLS:
+        raise comps_engine.CompsError(f"pool must be one of {', '.join(comps_engine.COMPS_POOLS)}")
+    metrics = list(dict.fromkeys(key for key in map(normalize_stat_key, _split_list(query.get("metrics"))) if key))
+    if len(metrics) > comps_engine.MAX_COMPS_METRICS:
+        raise comps_engine.CompsError(f"at most {comps_engine.MAX_COMPS_METRICS} metrics")
+    return {
+        "season": parse_int(query.get("season"), None),
+        "pool": pool,
+        "metrics": metrics,
+        "k": max(1, min(parse_int(query.get("k"), comps_engine.DEFAULT_COMPS_K), comps_engine.MAX_COMPS_K)),
+    }
+
+
+def fetch_player_comps(connection, player_id, query):
+    """Return the player-seasons most similar to a player's season, or None for an unknown player.
+
+    Results are cached per (player, season, pool, metric set) and data generation.
+    """
+    if connection is None:
+        with get_connection() as own_connection:
+            return fetch_player_comps(own_connection, player_id, query)
+    initialize_database(connection)
+    spec = normalize_comps_query(query)
+    generation = current_data_generation(connection)
+    return SCREENER_RESULT_CACHE.get_or_compute(
+        query_cache.canonical_key("comps", {"player_id": player_id, **spec}),
+        lambda: compute_player_comps(connection, player_id, spec, generation),
+        generation=generation,
+    )
+
+
+def compute_player_comps(connection, player_id, spec, generation):
+    player = connection.execute(
+        "SELECT player_id, full_name, position FROM players WHERE player_id = ?", (player_id,)
+    ).fetchone()
+    if player is None:
+        return None
+    position = player["position"] or ""
+    metrics = spec["metrics"] or comps_engine.default_metrics(position)
+    columns = {stat_key: comps_column(connection, stat_key, generation).get(position, {}) for stat_key in metrics}
+    season = spec["season"]
+    if season is None:
+        season = max(
+            (entry_season for column in columns.values() for entry_id, entry_season in column if entry_id == player_id),
+            default=None,
+        )
+    key = (player_id, season)
+    target = {stat_key: column[key][1] for stat_key, column in columns.items() if key in column}
+    candidates = {}
+    if target:
+        for stat_key, column in columns.items():
+            for (other_id, other_season), (_, z) in column.items():
+                if other_id == player_id or (spec["pool"] == "season" and other_season != season):
+                    continue
+                candidates.setdefault((other_id, other_season), {})[stat_key] = z
+    neighbours = comps_engine.nearest(target, candidates, spec["k"])
+    profiles = {
+        row["player_id"]: row
+        for row in connection.execute(
+            "SELECT player_id, full_name, team FROM players WHERE player_id IN (SELECT value FROM json_each(?))",
+            (json.dumps([other_id for _, (other_id, _), _ in neighbours]),),
+        )
+    }
+    items = []
+    for distance, (other_id, other_season), shared in neighbours:
+        profile = profiles.get(other_id)
+        items.append(
+            {
+                "player_id": other_id,
+                "full_name": profile["full_name"] if profile else None,
+                "team": profile["team"] if profile else None,
+                "season": other_season,
+                "distance": round(distance, 4),
+                "similarity": comps_engine.similarity(distance),
+                "shared_metrics": shared,
+                "metrics": {
+                    stat_key: column[(other_id, other_season)][0]
+                    for stat_key, column in columns.items()
+                    if (other_id, other_season) in column
+                },
+            }
+        )
+    return {
+        "generation": generation,
+        "player_id": player_id,
+        "full_name": player["full_name"],
+        "position": position,
+        "season": season,
+        "pool": spec["pool"],
+        "metrics": metrics,
+        "target": {stat_key: column[key][0] for stat_key, column in columns.items() if key in column},
+        "count": len(items),
+        "items": items,
+    }
@@ -0,0 +1,135 @@
+"""Compact in-memory Sleeper player catalog.
+
+Sleeper's /players/nfl document carries ~10k players with dozens of fields
+each. The terminal only needs a handful of them, so the catalog keeps one
+slotted CatalogPlayer per player, built once per cache generation, and
+serves both id lookups (``/api/sleeper/players/by-ids``) and the columnar
+catalog document (``/api/sleeper/players/catalog``).
+
+A generation is the epoch second the Sleeper document was fetched at, so it
+survives restarts and only moves forward. Each rebuild diffs against the
+previous catalog: unchanged players keep the generation they last changed
+in, and dropped players are remembered with the generation they left. A
+delta since generation G then lists the players changed after G plus the ids
+removed after G. Change history only reaches back to the first catalog this
+process built (``base_generation``); older clients get the full document.
+
+Documents are memoized per ``since`` value with a strong ETag derived from
+their content.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+CATALOG_FORMAT_VERSION = 1
+CATALOG_FIELDS = (
+    "player_id",
+    "full_name",
+    "first_name",
+    "last_name",
+    "position",
+    "age",
+    "years_exp",
+    "team",
+    "status",
+)
+DOCUMENT_CACHE_SIZE = 16
+
+
+class CatalogPlayer:
+    __slots__ = (*CATALOG_FIELDS, "changed_generation")
+
+    def __init__(self, player_id, raw, changed_generation):
+        self.player_id = player_id
+        for field in CATALOG_FIELDS[1:]:
+            setattr(self, field, raw.get(field))
+        self.changed_generation = changed_generation
+
+    def values(self):
+        return tuple(getattr(self, field) for field in CATALOG_FIELDS)
+
+    def as_dict(self):
+        return dict(zip(CATALOG_FIELDS, self.values()))
+
+
+class PlayerCatalog:
+    def __init__(self, generation, cache_info, players, removed, base_generation):
+        self.generation = generation
+        self.cache_info = cache_info
+        self.players = players
+        self.removed = removed
+        self.base_generation = base_generation
+        self._documents = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, raw_players, generation, cache_info, previous=None):
+        """Build a catalog from Sleeper's {player_id: player} document, diffed against previous."""
+        if previous is not None and previous.generation >= generation:
+            previous = None
+        players = {}
+        for player_id, raw in raw_players.items():
+            if not isinstance(raw, dict):
+                continue
+            player_id = str(player_id)
+            player = CatalogPlayer(player_id, raw, generation)
+            before = previous.players.get(player_id) if previous else None
+            if before is not None and before.values() == player.values():
+                player.changed_generation = before.changed_generation
+            players[player_id] = player
+        removed = {}
+        base_generation = generation
+        if previous is not None:
+            base_generation = previous.base_generation
+            removed = {player_id: left for player_id, left in previous.removed.items() if player_id not in players}
+            removed.update({player_id: generation for player_id in previous.players if player_id not in players})
+        return cls(generation, cache_info, players, removed, base_generation)
+
+    def subset(self, player_ids):
+        """Return {player_id: fields} for the ids present in the catalog."""
+        out = {}
+        for player_id in player_ids:
+            player = self.players.get(player_id)
+            if player is not None:
+                out[player_id] = player.as_dict()
+        return out
+
+    def document(self, since_generation=None):
+        """Return (document, strong etag) for the full catalog or a delta since a generation."""
+        full = since_generation is None or not self.base_generation <= since_generation <= self.generation
+        key = None if full else since_generation
+        with self._lock:
+            entry = self._documents.get(key)
+            if entry is not None:
+                self._documents.move_to_end(key)
+                return entry
+        if full:
+            changed = sorted(self.players)
+            removed = []
+        else:
+            changed = sorted(
+                player_id for player_id, player in self.players.items() if player.changed_generation > since_generation
+            )
+            removed = sorted(player_id for player_id, left in self.removed.items() if left > since_generation)
+        rows = [self.players[player_id].values() for player_id in changed]
+        document = {
+            "version": CATALOG_FORMAT_VERSION,
+            "generation": self.generation,
+            "since_generation": None if full else since_generation,
+            "full": full,
+            "count": len(self.players),
+            "changed": len(rows),
+            "fields": list(CATALOG_FIELDS),
+            "columns": {field: [row[index] for row in rows] for index, field in enumerate(CATALOG_FIELDS)},
+            "removed": removed,
+            "fetched_at": self.cache_info.get("fetched_at"),
+        }
+        digest = hashlib.sha1(json.dumps(document, sort_keys=True).encode("utf-8")).hexdigest()[:20]
+        entry = (document, f'"pc{self.generation}-{digest}"')
+        with self._lock:
+            self._documents[key] = entry
+            while len(self._documents) > DOCUMENT_CACHE_SIZE:
+                self._documents.popitem(last=False)
+        return entry
@@ -0,0 +1,129 @@
+"""In-process result caches shared by the v1 terminal server and the v2 API.
+
+A ResultCache maps a canonical request key to a computed payload. It evicts
+least-recently-used entries once a byte budget is exceeded, and coalesces
+concurrent misses for the same key so only one caller does the work
+(single-flight). Entries are scoped to a data generation: when the caller
+passes a newer generation the cache drops everything computed for older data.
+Generations only move forward; a caller still on an older generation computes
+(coalesced with its own generation's flight) without reading or filling the
+cache.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+
+def canonical_key(namespace, spec):
+    raw = json.dumps(spec, sort_keys=True, separators=(",", ":"), default=str)
+    return f"{namespace}:{hashlib.sha1(raw.encode('utf-8')).hexdigest()}"
+
+
+def json_size(value):
+    return len(json.dumps(value, ensure_ascii=True, separators=(",", ":"), default=str))
+
+
+class _Flight:
+    __slots__ = ("event", "value", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class ResultCache:
+    def __init__(self, name, max_bytes, size_of=json_size):
+        self.name = name
+        self.max_bytes = max(0, int(max_bytes))
+        self._size_of = size_of
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._generation = None
+        self._total_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._evictions = 0
+
+    def get_or_compute(self, key, compute, generation=None):
+        """Return the cached value for key, computing it at most once concurrently.
+
+        Cached values are shared between callers and must be treated as read-only.
+        """
+        flight_key = (generation, key)
+        with self._lock:
+            if generation is not None and (self._generation is None or generation > self._generation):
+                self._clear_locked()
+                self._generation = generation
+            current = generation is None or generation == self._generation
+            if current and key in self._entries:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return self._entries[key][0]
+            flight = self._inflight.get(flight_key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._inflight[flight_key] = flight
+                self._misses += 1
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            value = compute()
+        except BaseException as error:
+            flight.error = error
+            with self._lock:
+                self._inflight.pop(flight_key, None)
+            flight.event.set()
+            raise
+
+        size = self._size_of(value) if self.max_bytes else 0
+        with self._lock:
+            self._inflight.pop(flight_key, None)
+            if self.max_bytes and size <= self.max_bytes and (generation is None or generation == self._generation):
+                self._entries[key] = (value, size)
+                self._total_bytes += size
+                while self._total_bytes > self.max_bytes and self._entries:
+                    _, (_, evicted_size) = self._entries.popitem(last=False)
+                    self._total_bytes -= evicted_size
+                    self._evictions += 1
+        flight.value = value
+        flight.event.set()
+        return value
+
+    def clear(self):
+        """Drop every entry and forget the generation, so any generation is accepted next."""
+        with self._lock:
+            self._clear_locked()
+            self._generation = None
+
+    def snapshot(self):
+        with self._lock:
+            lookups = self._hits + self._misses + self._coalesced
+            return {
+                "name": self.name,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "generation": self._generation,
+                "hits": self._hits,
+                "misses": self._misses,
+                "coalesced": self._coalesced,
+                "evictions": self._evictions,
+                "hit_rate": round((self._hits + self._coalesced) / lookups, 4) if lookups else None,
+            }
+
+    def _clear_locked(self):
+        self._entries.clear()
+        self._total_bytes = 0
@@ -0,0 +1,241 @@
+"""Custom league scoring: fantasy points recomputed from weekly stats.
+
+A scoring profile is a Sleeper-style ``scoring_settings`` dict
+(``{"rec": 1, "pass_td": 6, "bonus_rec_te": 0.5, ...}``). Settings are
+normalized into a canonical form whose hash is the profile id, so the same
+league settings always map to the same cached points.
+
+Points are a dot product of the settings with each player-week's stat
+vector. The settings compile to a weight vector over
+(source, stat_key, position) that is bound as one JSON parameter and joined
+against ``player_week_metrics`` in a single INSERT ... SELECT, so a profile
+is scored for every player-week in one statement:
+
+- Sleeper rows carry Sleeper's own stat keys, so a setting weights the stat
+  of the same name;
+- nflverse rows use nflverse column names, mapped through NFLVERSE_STAT_KEYS;
+- ``bonus_rec_<pos>`` settings (TE premium and friends) weight receptions of
+  players at that position only.
+
+Each player-week is scored from one source, preferring Sleeper like
+``player_latest_stats``; weeks without any weighted stat score 0.
+"""
+
+import hashlib
+import json
+import math
+import re
+
+SCORING_STAT_KEY = "fantasy_points_custom"
+MAX_SCORING_SETTINGS = 256
+SETTING_KEY_PATTERN = re.compile(r"^[a-z0-9_]{1,64}$")
+PROFILE_ID_PATTERN = re.compile(r"^[0-9a-f]{16}$")
+
+_OFFENSE = {
+    "pass_yd": 0.04,
+    "pass_td": 4,
+    "pass_int": -1,
+    "pass_2pt": 2,
+    "rush_yd": 0.1,
+    "rush_td": 6,
+    "rush_2pt": 2,
+    "rec_yd": 0.1,
+    "rec_td": 6,
+    "rec_2pt": 2,
+    "fum_lost": -2,
+}
+# Offensive scoring only; pass a league's full scoring_settings for K/DEF.
+SCORING_PRESETS = {
+    "ppr": {**_OFFENSE, "rec": 1},
+    "half_ppr": {**_OFFENSE, "rec": 0.5},
+    "std": dict(_OFFENSE),
+}
+
+# Sleeper scoring key -> nflverse weekly stat columns it counts.
+NFLVERSE_STAT_KEYS = {
+    "pass_yd": ("passing_yards",),
+    "pass_td": ("passing_tds",),
+    "pass_int": ("interceptions",),
+    "pass_2pt": ("passing_2pt_conversions",),
+    "pass_fd": ("passing_first_downs",),
+    "rush_yd": ("rushing_yards",),
+    "rush_td": ("rushing_tds",),
+    "rush_2pt": ("rushing_2pt_conversions",),
+    "rush_fd": ("rushing_first_downs",),
+    "rec": ("receptions",),
+    "rec_yd": ("receiving_yards",),
+    "rec_td": ("receiving_tds",),
+    "rec_2pt": ("receiving_2pt_conversions",),
+    "rec_fd": ("receiving_first_downs",),
+    "fum_lost": ("rushing_fumbles_lost", "receiving_fumbles_lost", "sack_fumbles_lost"),
+}
+
+# Position-conditional settings: key -> (stat it weights, position).
+POSITION_BONUSES = {
+    "bonus_rec_te": ("rec", "TE"),
+    "bonus_rec_rb": ("rec", "RB"),
+    "bonus_rec_wr": ("rec", "WR"),
+}
+
+
+class ScoringError(ValueError):
+    pass
+
+
+def normalize_scoring_settings(raw):
+    """Return canonical {key: weight} (sorted, non-zero); raises ScoringError."""
+    if not isinstance(raw, dict) or not raw:
+        raise ScoringError("scoring_settings must be a non-empty object")
+    settings = {}
+    for raw_key, raw_value in raw.items():
+        key = str(raw_key or "").strip().lower()
+        if not SETTING_KEY_PATTERN.match(key):
+            raise ScoringError(f"invalid scoring key {raw_key!r}")
+        if isinstance(raw_value, bool):
+            raise ScoringError(f"{key} must be a number")
+        try:
+            value = float(raw_value)
+        except (TypeError, ValueError):
+            raise ScoringError(f"{key} must be a number") from None
+        if not math.isfinite(value):
+            raise ScoringError(f"{key} must be finite")
+        if value:
+            settings[key] = value
+    if not settings:
+        raise ScoringError("scoring_settings has no non-zero values")
+    if len(settings) > MAX_SCORING_SETTINGS:
+        raise ScoringError(f"scoring_settings has more than {MAX_SCORING_SETTINGS} keys")
+    return dict(sorted(settings.items()))
+
+
+def profile_id(settings):
+    canonical = json.dumps(settings, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def resolve_profile(raw):
+    """Map a scoring_profile payload value to (profile_id, settings or None).
+
+    Accepts a preset name, a profile id returned by an earlier registration
+    (settings None: they are read from the profile cache), a scoring_settings
+    dict, or a Sleeper league object carrying ``scoring_settings``.
+    Returns (None, None) when no profile is requested.
+    """
+    if raw is None or raw == "" or raw == {}:
+        return None, None
+    if isinstance(raw, dict):
+        settings = normalize_scoring_settings(raw.get("scoring_settings", raw))
+        return profile_id(settings), settings
+    token = str(raw).strip().lower()
+    if token in SCORING_PRESETS:
+        settings = normalize_scoring_settings(SCORING_PRESETS[token])
+        return profile_id(settings), settings
+    if PROFILE_ID_PATTERN.match(token):
+        return token, None
+    raise ScoringError(f"unknown scoring profile {raw!r}; use one of {', '.join(SCORING_PRESETS)} or a profile id")
+
+
+def weight_vector(settings):
+    """Return [[source, stat_key, position, weight], ...] for the scoring SQL."""
+    weights = {}
+
+    def add(source, stat_key, position, weight):
+        key = (source, stat_key, position)
+        weights[key] = weights.get(key, 0.0) + weight
+
+    for key, weight in settings.items():
+        stat_key, position = POSITION_BONUSES.get(key, (key, ""))
+        add("sleeper", stat_key, position, weight)
+        for nflverse_key in NFLVERSE_STAT_KEYS.get(stat_key, ()):
+            add("nflverse", nflverse_key, position, weight)
+    return [[*key, weight] for key, weight in sorted(weights.items()) if weight]
+
+
+SCORE_WEEKS_SQL = """
+INSERT INTO scoring_profile_points (profile_id, player_id, season, week, fantasy_points)
+WITH weights AS (
+  SELECT
+    json_extract(value, '$[0]') AS source,
+    json_extract(value, '$[1]') AS stat_key,
+    json_extract(value, '$[2]') AS position,
+    json_extract(value, '$[3]') AS weight
+  FROM json_each(:weights)
+),
+scored AS (
+  SELECT pwm.player_id, pwm.season, pwm.week, pwm.source, SUM(pwm.stat_value * w.weight) AS points
+  FROM weights w
+  JOIN player_week_metrics pwm
+    ON pwm.stat_key = w.stat_key
+   AND pwm.source = w.source
+   AND pwm.season_type = 'regular'
+  LEFT JOIN players p ON p.player_id = pwm.player_id
+  WHERE w.position = '' OR p.position = w.position
+  GROUP BY pwm.player_id, pwm.season, pwm.week, pwm.source
+),
+games AS (
+  SELECT
+    player_id, season, week, source,
+    ROW_NUMBER() OVER (
+      PARTITION BY player_id, season, week
+      ORDER BY CASE WHEN source='sleeper' THEN 0 ELSE 1 END
+    ) AS rn
+  FROM player_week_stats
+  WHERE season_type = 'regular'
+)
+SELECT :profile_id, g.player_id, g.season, g.week, ROUND(COALESCE(s.points, 0), 4)
+FROM games g
+LEFT JOIN scored s
+  ON s.player_id = g.player_id
+ AND s.season = g.season
+ AND s.week = g.week
+ AND s.source = g.source
+WHERE g.rn = 1
+"""
+
+SCORE_LATEST_SQL = """
+INSERT INTO scoring_profile_latest (profile_id, player_id, season, week, fantasy_points)
+SELECT profile_id, player_id, season, week, fantasy_points
+FROM (
+  SELECT
+    profile_id, player_id, season, week, fantasy_points,
+    ROW_NUMBER() OVER (PARTITION BY player_id ORDER BY season DESC, week DESC) AS rn
+  FROM scoring_profile_points
+  WHERE profile_id = :profile_id
+)
+WHERE rn = 1
+"""
+
+
+SCORED_METRICS_TABLE = "temp_scored_metrics"
+# Builds the latest-window metrics table for a scored screener query: the
+# query's stat_keys copied from player_latest_metrics plus the profile's latest
+# points, so the screener compiler reads the custom points like any stat_key.
+SCORED_METRICS_SQL = (
+    "DROP TABLE IF EXISTS temp_scored_metrics",
+    f"""
+    CREATE TEMP TABLE temp_scored_metrics AS
+    SELECT player_id, stat_key, stat_value
+    FROM player_latest_metrics
+    WHERE stat_key IN (SELECT value FROM json_each(:stat_keys))
+    UNION ALL
+    SELECT player_id, '{SCORING_STAT_KEY}', fantasy_points
+    FROM scoring_profile_latest
+    WHERE profile_id = :profile_id
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_temp_scored_metrics_key_player ON temp_scored_metrics(stat_key, player_id, stat_value)",
+)
+
+
+def window_points_sql(agg_func):
+    """INSERT the profile's points aggregated over temp_selected_games into temp_window_metrics."""
+    return f"""
+    INSERT INTO temp_window_metrics (player_id, stat_key, stat_value)
+    SELECT s.player_id, '{SCORING_STAT_KEY}', {agg_func}(s.fantasy_points)
+    FROM scoring_profile_points s
+    JOIN temp_selected_games g
+      ON g.player_id = s.player_id
+     AND g.season = s.season
+     AND g.week = s.week
+    WHERE s.profile_id = :profile_id
+    GROUP BY s.player_id
+    """
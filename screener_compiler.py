@@ -0,0 +1,466 @@
+"""Screener query compiler shared by the v1 terminal API and the v2 API.
+
+A normalized screener spec is split into a *shape* (everything that changes
+the SQL text: which tables, which predicates are present, the sort mode) and a
+*parameter dict* (the values). SQL is rendered once per shape and cached, and
+the rendered text uses stable named placeholders, so repeated queries with the
+same shape hit sqlite3's statement cache and SQLAlchemy's compiled cache.
+
+To keep the number of shapes small:
+
+- every comparison operator except ``neq`` is compiled to a closed range
+  (``gt 5`` becomes ``BETWEEN nextafter(5) AND +inf``);
+- variable-length lists (positions, player ids, stat keys) are bound as one
+  JSON array and expanded with ``json_each``.
+
+League filters (``owned_by`` / ``available_only``, see ``league_rosters``)
+arrive as ``league_player_ids`` and compile to a semi-join of
+``players.player_id`` against that array: ``IN`` for players on the given
+rosters, ``NOT IN`` for players nobody rosters.
+
+When per-stat_key histograms are available (built at sync, see
+``live_data.refresh_metric_catalog``) the metric filters are planned: they
+are ordered by estimated matching rows, and a sufficiently selective range
+filter drives the query through the (stat_key, stat_value) index instead of
+being probed once per player.
+
+Custom formulas (``formula_engine``) compile into the same SQL: each
+referenced stat is a correlated lookup in the metrics table, formula filters
+become WHERE predicates on the rendered expression, and a formula sort key
+orders by it (missing values last, no fantasy-points fallback).
+"""
+
+import json
+import math
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from typing import NamedTuple
+
+import formula_engine
+
+NULL_FILL_ASC = "9999999"
+NULL_FILL_DESC = "-9999999"
+HISTOGRAM_BUCKETS = 32
+# A range filter drives the query when it is expected to keep at most this
+# share of all players; above it a scan of players is cheaper.
+DRIVER_MAX_FRACTION = 0.2
+
+# Columns selected into each screener row, per API generation.
+SELECT_PROFILES = {
+    "v1": """
+      p.player_id, p.full_name, p.position, p.team, p.status, p.age, p.years_exp,
+      l.season AS latest_season, l.week AS latest_week, l.source AS latest_source,
+      l.fantasy_points_ppr AS latest_fantasy_points_ppr,
+      l.passing_yards AS latest_passing_yards,
+      l.rushing_yards AS latest_rushing_yards,
+      l.receiving_yards AS latest_receiving_yards,
+      l.receptions AS latest_receptions,
+      l.touchdowns AS latest_touchdowns""",
+    "v2": """
+      p.player_id, p.full_name, p.position, p.team, p.status, p.age, p.years_exp,
+      l.season AS latest_season, l.week AS latest_week, l.source AS latest_source,
+      l.fantasy_points_ppr AS latest_fantasy_points_ppr""",
+}
+
+# Sort keys answered from player/stat columns instead of a metrics lookup.
+BASE_SORT_EXPRESSIONS = {
+    "player_name": "p.full_name",
+    "position": "p.position",
+    "team": "p.team",
+    "age": "COALESCE(p.age, {null_fill})",
+    "fantasy_points_ppr": "COALESCE(l.fantasy_points_ppr, {null_fill})",
+}
+
+# players.relevance_tier is materialized at sync; is_fantasy_relevant mirrors
+# tier >= 1 and leads the (is_fantasy_relevant, position) index.
+RELEVANCE_SQL = "p.is_fantasy_relevant = 1 AND p.relevance_tier >= :relevance_tier"
+
+
+class ScreenerShape(NamedTuple):
+    profile: str
+    metrics_table: str
+    stats_table: str
+    games_played: bool
+    relevance: bool
+    search: bool
+    positions: bool
+    team: bool
+    age_min: bool
+    age_max: bool
+    filters: tuple
+    driver: bool
+    sort: str
+    descending: bool
+    # Rendered formula SQL (see formula_sql); formula filters are
+    # (formula index, "range" | "neq"); sort_formula indexes formulas.
+    formulas: tuple = ()
+    formula_filters: tuple = ()
+    sort_formula: int = -1
+    # "", "owned" or "available": semi-join against :league_player_ids.
+    league: str = ""
+
+
+def filter_range(metric_filter):
+    """Map a normalized filter to ("range", low, high) or ("neq", value, None)."""
+    op = metric_filter.get("op")
+    value = float(metric_filter["value"])
+    if op == "neq":
+        return "neq", value, None
+    if op == "between":
+        return "range", value, float(metric_filter["value_max"])
+    if op == "eq":
+        return "range", value, value
+    if op == "lte":
+        return "range", -math.inf, value
+    if op == "lt":
+        return "range", -math.inf, math.nextafter(value, -math.inf)
+    if op == "gt":
+        return "range", math.nextafter(value, math.inf), math.inf
+    return "range", value, math.inf
+
+
+def equi_depth_bounds(sorted_values, buckets=HISTOGRAM_BUCKETS):
+    """Return buckets + 1 boundaries splitting sorted_values into equal-count buckets."""
+    count = len(sorted_values)
+    if not count:
+        return []
+    return [sorted_values[round(index * (count - 1) / buckets)] for index in range(buckets + 1)]
+
+
+def _fraction_below(bounds, value, inclusive):
+    if value < bounds[0] or (not inclusive and value == bounds[0]):
+        return 0.0
+    if value > bounds[-1] or (inclusive and value == bounds[-1]):
+        return 1.0
+    position = (bisect_right if inclusive else bisect_left)(bounds, value) - 1
+    low, high = bounds[position], bounds[position + 1]
+    within = (value - low) / (high - low) if high > low else 1.0
+    return (position + within) / (len(bounds) - 1)
+
+
+def estimate_filter_rows(histogram, kind, low, high):
+    """Estimate how many players a compiled filter keeps, from an equi-depth histogram.
+
+    Returns None when the key has no histogram (e.g. rank pseudo-metrics,
+    which metric_catalog leaves out): the estimate is unknown, not zero.
+    """
+    if not histogram:
+        return None
+    count = histogram["player_count"]
+    bounds = histogram["bounds"]
+    if kind == "neq" or not bounds:
+        return count
+    if high < bounds[0] or low > bounds[-1]:
+        return 0
+    fraction = _fraction_below(bounds, high, True) - _fraction_below(bounds, low, False)
+    return max(1, round(count * max(0.0, fraction)))
+
+
+def plan_filters(filters, histograms=None):
+    """Order compiled filters by estimated selectivity and pick a driving filter.
+
+    ``filters`` is a list of (metric_filter, kind, low, high). Returns the
+    reordered list, whether its first entry drives the query, and a plan dict
+    for debug output. Without histograms the payload order is kept; filters
+    without an estimate go after the estimated ones and never drive.
+    """
+    by_key = (histograms or {}).get("by_key") or {}
+    player_count = (histograms or {}).get("player_count") or 0
+    if not by_key:
+        ordered = [(entry, None) for entry in filters]
+    else:
+        estimates = [
+            estimate_filter_rows(by_key.get(entry[0]["key"]), entry[1], entry[2], entry[3]) for entry in filters
+        ]
+        ordered = sorted(
+            zip(filters, estimates),
+            key=lambda pair: (pair[0][1] == "neq", pair[1] is None, pair[1] or 0),
+        )
+    driver = bool(
+        ordered
+        and ordered[0][1] is not None
+        and ordered[0][0][1] == "range"
+        and ordered[0][1] <= player_count * DRIVER_MAX_FRACTION
+    )
+    plan = {
+        "histograms": bool(by_key),
+        "player_count": player_count,
+        "driver": ordered[0][0][0]["key"] if driver else None,
+        "filters": [
+            {"key": entry[0]["key"], "op": entry[0]["op"], "estimated_rows": estimate}
+            for entry, estimate in ordered
+        ],
+    }
+    return [entry for entry, _ in ordered], driver, plan
+
+
+def formula_sql(formula, index, metrics_table, stats_table, games_played):
+    """Render formula index as SQL whose stats bind as :x{index}_{n} parameters."""
+    stat_sql = {
+        stat_key: (
+            f"(SELECT xv.stat_value FROM {metrics_table} xv"
+            f" WHERE xv.player_id = p.player_id AND xv.stat_key = :x{index}_{position})"
+        )
+        for position, stat_key in enumerate(formula.stat_keys)
+    }
+    games_sql = "1"
+    if games_played:
+        games_sql = f"COALESCE((SELECT xg.games_played FROM {stats_table} xg WHERE xg.player_id = p.player_id), 1)"
+    return formula_engine.to_sql(formula.tree, stat_sql, games_sql)
+
+
+def spec_formulas(spec):
+    """Return {name: Formula} for the spec's normalized formulas."""
+    return {
+        entry["name"]: formula_engine.parse_formula(entry["name"], entry["expression"])
+        for entry in spec.get("formulas") or []
+    }
+
+
+def spec_stat_keys(spec):
+    """Return every stat_key a spec reads: columns, filters, sort key and formula inputs."""
+    keys = list(spec.get("columns") or [])
+    keys.extend(entry["key"] for entry in spec.get("filters") or [])
+    keys.append(spec.get("sort_key") or "fantasy_points_ppr")
+    for formula in spec_formulas(spec).values():
+        keys.extend(formula.stat_keys)
+    return list(dict.fromkeys(keys))
+
+
+def league_filter_mode(spec):
+    """Return "owned", "available" or "" for a spec after live_data.resolve_league_filters."""
+    if spec.get("league_player_ids") is None:
+        return ""
+    return "available" if spec.get("available_only") else "owned"
+
+
+def compile_screener(
+    spec,
+    *,
+    profile,
+    metrics_table,
+    stats_table,
+    games_played=False,
+    base_sorts=False,
+    histograms=None,
+):
+    """Return (shape, params, plan) for a normalized screener spec.
+
+    ``base_sorts`` lets sort keys in BASE_SORT_EXPRESSIONS read player/stat
+    columns directly (v2 behaviour); otherwise every sort goes through the
+    metrics table with a fantasy-points fallback (v1 behaviour).
+    ``histograms`` enables selectivity planning of the metric filters.
+    """
+    params = {"limit": spec["limit"], "offset": spec["offset"]}
+    formulas = spec_formulas(spec)
+    formula_names = list(formulas)
+    compiled = [
+        (metric_filter, *filter_range(metric_filter))
+        for metric_filter in spec.get("filters") or []
+        if metric_filter["key"] not in formulas
+    ]
+    compiled, driver, plan = plan_filters(compiled, histograms)
+    filter_kinds = []
+    for index, (metric_filter, kind, low, high) in enumerate(compiled):
+        filter_kinds.append(kind)
+        params[f"f{index}_key"] = metric_filter["key"]
+        if kind == "neq":
+            params[f"f{index}_value"] = low
+        else:
+            params[f"f{index}_low"] = low
+            params[f"f{index}_high"] = high
+
+    search = spec.get("search") or ""
+    if search:
+        params["search"] = f"%{search}%"
+    positions = spec.get("positions") or []
+    if positions:
+        params["positions"] = json.dumps(list(positions))
+    if spec.get("team"):
+        params["team"] = spec["team"]
+    if spec.get("age_min") is not None:
+        params["age_min"] = spec["age_min"]
+    if spec.get("age_max") is not None:
+        params["age_max"] = spec["age_max"]
+
+    league = league_filter_mode(spec)
+    if league:
+        params["league_player_ids"] = json.dumps(list(spec["league_player_ids"]))
+
+    relevance = bool(spec.get("relevance_tier")) and not search
+    if relevance:
+        params["relevance_tier"] = spec["relevance_tier"]
+
+    formula_filters = []
+    for metric_filter in spec.get("filters") or []:
+        if metric_filter["key"] not in formulas:
+            continue
+        index = len(formula_filters)
+        kind, low, high = filter_range(metric_filter)
+        formula_filters.append((formula_names.index(metric_filter["key"]), kind))
+        if kind == "neq":
+            params[f"g{index}_value"] = low
+        else:
+            params[f"g{index}_low"] = low
+            params[f"g{index}_high"] = high
+    for index, formula in enumerate(formulas.values()):
+        for position, stat_key in enumerate(formula.stat_keys):
+            params[f"x{index}_{position}"] = stat_key
+    if formulas:
+        plan["formulas"] = [
+            {"name": formula.name, "expression": formula.expression, "stat_keys": list(formula.stat_keys)}
+            for formula in formulas.values()
+        ]
+
+    sort_key = spec.get("sort_key") or "fantasy_points_ppr"
+    sort_formula = -1
+    if sort_key in formulas:
+        sort_mode = "formula"
+        sort_formula = formula_names.index(sort_key)
+    elif base_sorts and sort_key in BASE_SORT_EXPRESSIONS:
+        sort_mode = sort_key
+    else:
+        sort_mode = "metric"
+        params["sort_key"] = sort_key
+
+    shape = ScreenerShape(
+        profile=profile,
+        metrics_table=metrics_table,
+        stats_table=stats_table,
+        games_played=bool(games_played),
+        relevance=relevance,
+        search=bool(search),
+        positions=bool(positions),
+        team=bool(spec.get("team")),
+        age_min=spec.get("age_min") is not None,
+        age_max=spec.get("age_max") is not None,
+        filters=tuple(filter_kinds),
+        driver=driver,
+        sort=sort_mode,
+        descending=spec.get("sort_direction") != "asc",
+        formulas=tuple(
+            formula_sql(formula, index, metrics_table, stats_table, games_played)
+            for index, formula in enumerate(formulas.values())
+        ),
+        formula_filters=tuple(formula_filters),
+        sort_formula=sort_formula,
+        league=league,
+    )
+    return shape, params, plan
+
+
+def _from_sql(shape):
+    if shape.driver:
+        # CROSS JOIN pins the driving filter as the outer loop in SQLite.
+        return f"FROM {shape.metrics_table} f0 CROSS JOIN players p ON p.player_id = f0.player_id"
+    return "FROM players p"
+
+
+def _where_sql(shape):
+    parts = ["1=1"]
+    if shape.relevance:
+        parts.append(RELEVANCE_SQL)
+    for index, kind in enumerate(shape.filters):
+        alias = f"f{index}"
+        if kind == "neq":
+            clause = f"{alias}.stat_value != :{alias}_value"
+        else:
+            clause = f"{alias}.stat_value BETWEEN :{alias}_low AND :{alias}_high"
+        if index == 0 and shape.driver:
+            parts.append(f"{alias}.stat_key = :{alias}_key AND {clause}")
+            continue
+        parts.append(
+            f"""EXISTS (
+      SELECT 1 FROM {shape.metrics_table} {alias}
+      WHERE {alias}.player_id = p.player_id
+        AND {alias}.stat_key = :{alias}_key
+        AND {clause}
+    )"""
+        )
+    for index, (formula_index, kind) in enumerate(shape.formula_filters):
+        expression = shape.formulas[formula_index]
+        if kind == "neq":
+            parts.append(f"{expression} != :g{index}_value")
+        else:
+            parts.append(f"{expression} BETWEEN :g{index}_low AND :g{index}_high")
+    if shape.search:
+        parts.append("(LOWER(p.full_name) LIKE :search OR LOWER(p.first_name) LIKE :search OR LOWER(p.last_name) LIKE :search)")
+    if shape.positions:
+        parts.append("p.position IN (SELECT value FROM json_each(:positions))")
+    if shape.team:
+        parts.append("p.team = :team")
+    if shape.age_min:
+        parts.append("p.age >= :age_min")
+    if shape.age_max:
+        parts.append("p.age <= :age_max")
+    if shape.league == "owned":
+        parts.append("p.player_id IN (SELECT value FROM json_each(:league_player_ids))")
+    elif shape.league == "available":
+        parts.append("p.player_id NOT IN (SELECT value FROM json_each(:league_player_ids))")
+    return " AND ".join(parts)
+
+
+@lru_cache(maxsize=512)
+def page_sql(shape):
+    null_fill = NULL_FILL_DESC if shape.descending else NULL_FILL_ASC
+    direction = "DESC" if shape.descending else "ASC"
+    joins = [f"LEFT JOIN {shape.stats_table} l ON l.player_id = p.player_id"]
+    if shape.sort == "metric":
+        joins.append(
+            f"LEFT JOIN {shape.metrics_table} msort ON msort.player_id = p.player_id AND msort.stat_key = :sort_key"
+        )
+        sort_expr = f"COALESCE(msort.stat_value, COALESCE(l.fantasy_points_ppr, {null_fill}))"
+    elif shape.sort == "formula":
+        sort_expr = f"COALESCE({shape.formulas[shape.sort_formula]}, {null_fill})"
+    else:
+        sort_expr = BASE_SORT_EXPRESSIONS[shape.sort].format(null_fill=null_fill)
+    columns = SELECT_PROFILES[shape.profile]
+    if shape.profile == "v1":
+        columns += ",\n      l.games_played AS games_played" if shape.games_played else ",\n      NULL AS games_played"
+    return f"""
+    SELECT {columns}
+    {_from_sql(shape)}
+    {' '.join(joins)}
+    WHERE {_where_sql(shape)}
+    ORDER BY {sort_expr} {direction}, p.full_name ASC, p.player_id ASC
+    LIMIT :limit OFFSET :offset
+    """
+
+
+@lru_cache(maxsize=16)
+def rows_by_id_sql(profile, stats_table):
+    """Page rows for an already-ordered list of player ids (see screener_index)."""
+    return f"""
+    SELECT {SELECT_PROFILES[profile]}
+    FROM players p
+    LEFT JOIN {stats_table} l ON l.player_id = p.player_id
+    WHERE p.player_id IN (SELECT value FROM json_each(:player_ids))
+    """
+
+
+@lru_cache(maxsize=512)
+def count_sql(shape):
+    return f"SELECT COUNT(*) AS total {_from_sql(shape)} WHERE {_where_sql(shape)}"
+
+
+@lru_cache(maxsize=8)
+def metrics_sql(metrics_table):
+    return f"""
+    SELECT player_id, stat_key, stat_value
+    FROM {metrics_table}
+    WHERE player_id IN (SELECT value FROM json_each(:player_ids))
+      AND stat_key IN (SELECT value FROM json_each(:stat_keys))
+    """
+
+
+def count_params(params):
+    return {key: value for key, value in params.items() if key not in {"limit", "offset", "sort_key"}}
+
+
+def metrics_params(player_ids, stat_keys):
+    return {"player_ids": json.dumps(list(player_ids)), "stat_keys": json.dumps(list(stat_keys))}
+
+
+def compiler_snapshot():
+    info = page_sql.cache_info()
+    return {"shapes": info.currsize, "hits": info.hits, "misses": info.misses}
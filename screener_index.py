@@ -0,0 +1,379 @@
+"""In-memory top-K index for screener sorts over latest metrics.
+
+Built once per data generation from the synced tables:
+
+- players are numbered in (full_name, player_id) order, so a player's index
+  doubles as the screener's tie-break rank;
+- position, team, status and relevance-tier sets are Python int bitsets
+  (a league filter's rostered players become one more, per request);
+- every stat_key gets a dense value array plus its player order by value,
+  once per sort direction.
+
+A top-K request intersects the bitsets into an eligibility mask, then walks
+the requested stat's sorted order (merged with the fantasy-points fallback
+the SQL path uses for players without the stat) until offset + limit
+eligible players are found. Metric filters are checked against the dense
+arrays during the walk.
+
+Custom formulas are evaluated column-at-a-time over the same arrays and kept
+as extra sortable columns, at most FORMULA_CACHE_SIZE per index (so per data
+generation). Columns computed outside the index (a scoring profile's points)
+are loaded the same way through external_column and passed to top_k as
+``extra`` metrics.
+"""
+
+import heapq
+import math
+import threading
+from array import array
+from collections import OrderedDict
+
+import formula_engine
+import screener_compiler
+
+NAN = float("nan")
+FORMULA_CACHE_SIZE = 32
+# Player row columns kept in the index; the v1 screener row shape.
+PROFILE_COLUMNS = (
+    "player_id",
+    "full_name",
+    "position",
+    "team",
+    "status",
+    "age",
+    "years_exp",
+    "latest_season",
+    "latest_week",
+    "latest_source",
+    "latest_fantasy_points_ppr",
+    "latest_passing_yards",
+    "latest_rushing_yards",
+    "latest_receiving_yards",
+    "latest_receptions",
+    "latest_touchdowns",
+)
+
+
+def _mask(indices):
+    mask = 0
+    for index in indices:
+        mask |= 1 << index
+    return mask
+
+
+def _order(values, indices, descending):
+    if descending:
+        return array("i", sorted(indices, key=lambda index: (-values[index], index)))
+    return array("i", sorted(indices, key=lambda index: (values[index], index)))
+
+
+class ScreenerIndex:
+    def __init__(self, generation, player_rows, metric_rows):
+        """player_rows: tuples in PROFILE_COLUMNS order followed by relevance_tier.
+
+        metric_rows: (stat_key, player_id, stat_value) ordered by stat_key.
+        """
+        self.generation = generation
+        player_rows = sorted(player_rows, key=lambda row: (row[1] is not None, row[1] or "", row[0]))
+        self.rows = player_rows
+        self.player_ids = [row[0] for row in player_rows]
+        self.size = len(player_rows)
+        position_by_id = {player_id: index for index, player_id in enumerate(self.player_ids)}
+        self._position_by_id = position_by_id
+
+        positions, teams, statuses, tiers = {}, {}, {}, {}
+        for index, row in enumerate(player_rows):
+            positions.setdefault(row[2], []).append(index)
+            teams.setdefault(row[3], []).append(index)
+            statuses.setdefault(row[4], []).append(index)
+            tiers.setdefault(row[len(PROFILE_COLUMNS)] or 0, []).append(index)
+        self.positions = {key: _mask(value) for key, value in positions.items()}
+        self.teams = {key: _mask(value) for key, value in teams.items()}
+        self.statuses = {key: _mask(value) for key, value in statuses.items()}
+        # tier_masks[t] holds every player whose relevance_tier is at least t.
+        self.tier_masks = {}
+        cumulative = 0
+        for tier in sorted(tiers, reverse=True):
+            cumulative |= _mask(tiers[tier])
+            self.tier_masks[tier] = cumulative
+        self.all_players = (1 << self.size) - 1
+
+        self.ages = array("d", (NAN if row[5] is None else float(row[5]) for row in player_rows))
+        self.fallback = array("d", (NAN if row[10] is None else float(row[10]) for row in player_rows))
+        holders = [index for index in range(self.size) if not math.isnan(self.fallback[index])]
+        self.fallback_order = {
+            True: _order(self.fallback, holders, True),
+            False: _order(self.fallback, holders, False),
+        }
+
+        self.metrics = {}
+        current_key, values, indices = None, None, []
+        for stat_key, player_id, stat_value in metric_rows:
+            index = position_by_id.get(player_id)
+            if index is None:
+                continue
+            if stat_key != current_key:
+                self._add_metric(current_key, values, indices)
+                current_key, values, indices = stat_key, array("d", [NAN]) * self.size, []
+            values[index] = float(stat_value)
+            indices.append(index)
+        self._add_metric(current_key, values, indices)
+        self._formulas = OrderedDict()
+        self._external = OrderedDict()
+        self._formula_lock = threading.Lock()
+        self.formula_hits = 0
+        self.formula_builds = 0
+
+    def _add_metric(self, stat_key, values, indices):
+        if stat_key is None:
+            return
+        self.metrics[stat_key] = (values, {True: _order(values, indices, True), False: _order(values, indices, False)})
+
+    def formula_column(self, formula):
+        """Return (values, orders) for a formula, evaluated once per index and cached by expression."""
+        with self._formula_lock:
+            entry = self._formulas.get(formula.expression)
+            if entry is not None:
+                self._formulas.move_to_end(formula.expression)
+                self.formula_hits += 1
+                return entry
+        columns = {stat_key: self.metrics[stat_key][0] for stat_key in formula.stat_keys if stat_key in self.metrics}
+        values = formula_engine.evaluate_columns(formula.tree, columns, self.size)
+        indices = [index for index in range(self.size) if not math.isnan(values[index])]
+        entry = (values, {True: _order(values, indices, True), False: _order(values, indices, False)})
+        with self._formula_lock:
+            self._formulas[formula.expression] = entry
+            self.formula_builds += 1
+            while len(self._formulas) > FORMULA_CACHE_SIZE:
+                self._formulas.popitem(last=False)
+        return entry
+
+    def external_column(self, key, load_rows):
+        """Return (values, orders) for a column built once per index from load_rows() -> (player_id, value) rows."""
+        with self._formula_lock:
+            entry = self._external.get(key)
+            if entry is not None:
+                self._external.move_to_end(key)
+                return entry
+        values = array("d", [NAN]) * self.size
+        indices = []
+        for player_id, value in load_rows():
+            index = self._position_by_id.get(player_id)
+            if index is None or value is None:
+                continue
+            values[index] = float(value)
+            indices.append(index)
+        entry = (values, {True: _order(values, indices, True), False: _order(values, indices, False)})
+        with self._formula_lock:
+            self._external[key] = entry
+            while len(self._external) > FORMULA_CACHE_SIZE:
+                self._external.popitem(last=False)
+        return entry
+
+    def eligible_mask(self, spec):
+        mask = self.all_players
+        if spec.get("positions"):
+            mask &= _union(self.positions.get(position, 0) for position in spec["positions"])
+        if spec.get("team"):
+            mask &= self.teams.get(spec["team"], 0)
+        tier = spec.get("relevance_tier") or 0
+        if tier and not spec.get("search"):
+            qualifying = [key for key in self.tier_masks if key >= tier]
+            mask &= self.tier_masks[min(qualifying)] if qualifying else 0
+        league = screener_compiler.league_filter_mode(spec)
+        if league:
+            rostered = _mask(
+                self._position_by_id[player_id]
+                for player_id in spec["league_player_ids"]
+                if player_id in self._position_by_id
+            )
+            mask &= rostered if league == "owned" else ~rostered
+        return mask
+
+    def top_k(self, spec, sort_key, extra=None):
+        """Return the page of player ids for spec, sorted by sort_key (None: latest PPR only).
+
+        extra maps stat_keys to (values, orders) columns that act as metrics.
+        """
+        metrics = {**self.metrics, **extra} if extra else self.metrics
+        descending = spec.get("sort_direction") != "asc"
+        wanted = spec["offset"] + spec["limit"]
+        eligible = self.eligible_mask(spec).to_bytes((self.size + 7) // 8 or 1, "little")
+        formulas = screener_compiler.spec_formulas(spec)
+        checks = []
+        for metric_filter in spec.get("filters") or []:
+            kind, low, high = screener_compiler.filter_range(metric_filter)
+            if metric_filter["key"] in formulas:
+                entry = self.formula_column(formulas[metric_filter["key"]])
+            else:
+                entry = metrics.get(metric_filter["key"])
+            if entry is None:
+                return []
+            checks.append((entry[0], kind, low, high))
+        age_min = spec.get("age_min")
+        age_max = spec.get("age_max")
+        ages = self.ages
+
+        matches = []
+        if sort_key in formulas:
+            walk = self._walk(sort_key, descending, self.formula_column(formulas[sort_key]), use_fallback=False)
+        else:
+            walk = self._walk(sort_key, descending, metrics.get(sort_key))
+        for _, _, index in walk:
+            if not eligible[index >> 3] >> (index & 7) & 1:
+                continue
+            if age_min is not None or age_max is not None:
+                age = ages[index]
+                if math.isnan(age) or (age_min is not None and age < age_min) or (age_max is not None and age > age_max):
+                    continue
+            if not all(_passes(values[index], kind, low, high) for values, kind, low, high in checks):
+                continue
+            matches.append(index)
+            if len(matches) >= wanted:
+                break
+        return [self.player_ids[index] for index in matches[spec["offset"]:]]
+
+    def profile_rows(self, player_ids):
+        """Return v1 screener rows (PROFILE_COLUMNS plus games_played) for player ids."""
+        out = []
+        for player_id in player_ids:
+            item = dict(zip(PROFILE_COLUMNS, self.rows[self._position_by_id[player_id]]))
+            item["games_played"] = None
+            out.append(item)
+        return out
+
+    def metric_values(self, player_ids, stat_keys, extra=None):
+        """Return {player_id: {stat_key: value}} read from the dense per-stat arrays."""
+        metrics = {**self.metrics, **extra} if extra else self.metrics
+        columns = [(stat_key, metrics[stat_key][0]) for stat_key in stat_keys if stat_key in metrics]
+        out = {}
+        for player_id in player_ids:
+            index = self._position_by_id[player_id]
+            cells = {}
+            for stat_key, values in columns:
+                value = values[index]
+                if value == value:  # NaN marks a missing cell
+                    cells[stat_key] = value
+            out[player_id] = cells
+        return out
+
+    def formula_values(self, player_ids, formulas):
+        """Return {player_id: {formula name: value}} from the cached formula columns."""
+        columns = [(formula.name, self.formula_column(formula)[0]) for formula in formulas]
+        out = {}
+        for player_id in player_ids:
+            index = self._position_by_id[player_id]
+            cells = {}
+            for name, values in columns:
+                value = values[index]
+                if value == value:  # NaN marks a missing cell
+                    cells[name] = value
+            out[player_id] = cells
+        return out
+
+    def _walk(self, sort_key, descending, entry=None, use_fallback=True):
+        """Yield (sort value, tie-break, index) in screener order for every player.
+
+        entry is the sorted (values, orders) column; formulas pass
+        use_fallback=False since they have no fantasy-points fallback, so
+        their missing values sort with the fill.
+        """
+        sign = -1.0 if descending else 1.0
+        fill = float(screener_compiler.NULL_FILL_DESC if descending else screener_compiler.NULL_FILL_ASC)
+        values, order = entry or (None, {True: (), False: ()})
+        order = order[descending]
+        fallback = self.fallback
+
+        def has_metric(index):
+            return values is not None and not math.isnan(values[index])
+
+        metric_stream = ((sign * values[index], index, index) for index in order)
+        fallback_stream = (
+            (sign * fallback[index], index, index)
+            for index in (self.fallback_order[descending] if use_fallback else ())
+            if not has_metric(index)
+        )
+        fill_stream = (
+            (sign * fill, index, index)
+            for index in range(self.size)
+            if (not use_fallback or math.isnan(fallback[index])) and not has_metric(index)
+        )
+        return heapq.merge(metric_stream, fallback_stream, fill_stream)
+
+    def snapshot(self):
+        return {
+            "generation": self.generation,
+            "players": self.size,
+            "stat_keys": len(self.metrics),
+            "formulas": len(self._formulas),
+            "formula_hits": self.formula_hits,
+            "formula_builds": self.formula_builds,
+        }
+
+
+def _union(masks):
+    out = 0
+    for mask in masks:
+        out |= mask
+    return out
+
+
+def _passes(value, kind, low, high):
+    if math.isnan(value):
+        return False
+    if kind == "neq":
+        return value != low
+    return low <= value <= high
+
+
+def build_screener_index(connection, generation):
+    player_rows = connection.execute(
+        """
+        SELECT
+          p.player_id, p.full_name, p.position, p.team, p.status, p.age, p.years_exp,
+          l.season, l.week, l.source, l.fantasy_points_ppr, l.passing_yards,
+          l.rushing_yards, l.receiving_yards, l.receptions, l.touchdowns,
+          p.relevance_tier
+        FROM players p
+        LEFT JOIN player_latest_stats l ON l.player_id = p.player_id
+        """
+    ).fetchall()
+    metric_rows = connection.execute(
+        "SELECT stat_key, player_id, stat_value FROM player_latest_metrics ORDER BY stat_key"
+    )
+    return ScreenerIndex(generation, [tuple(row) for row in player_rows], (tuple(row) for row in metric_rows))
+
+
+class ScreenerIndexHolder:
+    """Keeps the index for the current data generation, building it at most once at a time."""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._index = None
+        self._builds = 0
+
+    def get(self, connection, generation):
+        if not self.enabled:
+            return None
+        with self._lock:
+            index = self._index
+        if index is not None and index.generation == generation:
+            return index
+        with self._build_lock:
+            with self._lock:
+                index = self._index
+            if index is not None and index.generation == generation:
+                return index
+            index = build_screener_index(connection, generation)
+            with self._lock:
+                self._index = index
+                self._builds += 1
+            return index
+
+    def snapshot(self):
+        with self._lock:
+            index = self._index
+            builds = self._builds
+        return {"enabled": self.enabled, "builds": builds, **(index.snapshot() if index else {})}
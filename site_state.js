@@ -3,6 +3,11 @@ const SLEEPER_AVATAR_BASE = "https://sleepercdn.com/avatars/thumbs";
 const SESSION_STORAGE_KEY = "fdl_sleeper_session_v1";
 const LAB_CONTEXT_STORAGE_KEY = "fdl_shared_lab_context_v1";
 const INTEL_CONTEXT_STORAGE_KEY = "fdl_shared_intel_context_v1";
+const SLEEPER_CATALOG_STORAGE_KEY = "fdl_sleeper_player_catalog_v1";
+const SLEEPER_CATALOG_REFRESH_MS = 24 * 60 * 60 * 1000;
+
+let sleeperCatalog = null;
+let sleeperCatalogRequest = null;
 
 export function currentSleeperSeason(now = new Date()) {
   const year = now.getFullYear();
@@ -55,6 +60,89 @@ export async function fetchSleeperJSON(path) {
   return response.json();
 }
 
+// Sleeper players by id, from the server's columnar catalog. The catalog is
+// kept in localStorage and refreshed at most once a day with a delta since
+// the stored generation; a failed refresh keeps the stored copy.
+export async function loadSleeperPlayerCatalog() {
+  if (!sleeperCatalog) {
+    sleeperCatalog = readStoredSleeperCatalog();
+  }
+  if (sleeperCatalog && Date.now() - sleeperCatalog.checkedAt <= SLEEPER_CATALOG_REFRESH_MS) {
+    return sleeperCatalog.playersById;
+  }
+  if (!sleeperCatalogRequest) {
+    sleeperCatalogRequest = refreshSleeperCatalog().finally(() => {
+      sleeperCatalogRequest = null;
+    });
+  }
+  return sleeperCatalogRequest;
+}
+
+async function refreshSleeperCatalog() {
+  const since = sleeperCatalog ? `?since_generation=${encodeURIComponent(sleeperCatalog.generation)}` : "";
+  try {
+    const response = await fetch(`/api/sleeper/players/catalog${since}`);
+    if (!response.ok) throw new Error(`Sleeper player catalog API returned ${response.status}.`);
+    const payload = await response.json();
+    if (!payload || !payload.columns || !Array.isArray(payload.fields)) {
+      throw new Error("Sleeper player catalog payload was not usable.");
+    }
+    sleeperCatalog = applySleeperCatalog(payload.full ? null : sleeperCatalog, payload);
+    storeSleeperCatalog(sleeperCatalog);
+  } catch (error) {
+    if (!sleeperCatalog) throw error;
+    sleeperCatalog.checkedAt = Date.now();
+  }
+  return sleeperCatalog.playersById;
+}
+
+function applySleeperCatalog(previous, payload) {
+  const playersById = previous ? { ...previous.playersById } : {};
+  const ids = payload.columns.player_id || [];
+  ids.forEach((playerId, row) => {
+    const player = {};
+    for (const field of payload.fields) {
+      player[field] = payload.columns[field] ? payload.columns[field][row] : null;
+    }
+    playersById[playerId] = player;
+  });
+  for (const playerId of payload.removed || []) {
+    delete playersById[playerId];
+  }
+  return {
+    generation: payload.generation,
+    fields: payload.fields,
+    checkedAt: Date.now(),
+    playersById
+  };
+}
+
+function storeSleeperCatalog(catalog) {
+  const ids = Object.keys(catalog.playersById);
+  const columns = {};
+  for (const field of catalog.fields) {
+    columns[field] = ids.map((playerId) => catalog.playersById[playerId][field] ?? null);
+  }
+  try {
+    window.localStorage.setItem(
+      SLEEPER_CATALOG_STORAGE_KEY,
+      JSON.stringify({ generation: catalog.generation, checkedAt: catalog.checkedAt, fields: catalog.fields, columns })
+    );
+  } catch (_error) {
+    // Ignore quota failures; the catalog stays in memory for this page.
+  }
+}
+
+function readStoredSleeperCatalog() {
+  try {
+    const stored = JSON.parse(window.localStorage.getItem(SLEEPER_CATALOG_STORAGE_KEY) || "null");
+    if (!stored || !stored.columns || !Array.isArray(stored.fields)) return null;
+    return { ...applySleeperCatalog(null, stored), checkedAt: Number(stored.checkedAt) || 0 };
+  } catch (_error) {
+    return null;
+  }
+}
+
 function setSharedContext(storageKey, context) {
   if (!context || typeof context !== "object") return;
   const normalized = {
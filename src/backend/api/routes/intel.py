@@ -1,9 +1,9 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Query, Request
+from fastapi import APIRouter, HTTPException, Query, Request
 
 from src.backend.api.schemas.common import ok
-from src.backend.services.intel_service import build_league_intel_report
+from src.backend.services.intel_service import LeagueNotFoundError, build_league_intel_report
 
 router = APIRouter(tags=["intel"])
 
@@ -13,7 +13,16 @@ def get_intel_report(
     request: Request,
     league_id: str = "",
     lookback: int = Query(default=2, ge=1, le=4),
+    user_id: str = "",
+    tone: str = Query(default="intel", pattern="^(intel|terminal)$"),
 ):
     _ = request.state.request_id
-    payload = build_league_intel_report(league_id=league_id, lookback=lookback)
+    if not league_id.strip():
+        raise HTTPException(status_code=400, detail="league_id is required")
+    try:
+        payload = build_league_intel_report(league_id=league_id, lookback=lookback, user_id=user_id, tone=tone)
+    except LeagueNotFoundError as error:
+        raise HTTPException(status_code=404, detail=str(error)) from None
+    except RuntimeError as error:
+        raise HTTPException(status_code=502, detail=str(error)) from None
     return ok(payload)
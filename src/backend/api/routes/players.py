@@ -1,9 +1,18 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Query, Request
+import comps_engine
+import live_data
+import scoring_engine
+from fastapi import APIRouter, HTTPException, Query, Request
 
 from src.backend.api.schemas.common import ok
-from src.backend.db.repositories.players_repository import fetch_filter_options, fetch_players
+from src.backend.api.schemas.players import PlayerSeriesRequest
+from src.backend.db.repositories.players_repository import (
+    fetch_filter_options,
+    fetch_metric_catalog,
+    fetch_player_series,
+    fetch_players,
+)
 from src.backend.db.session import db_connection
 
 router = APIRouter(tags=["players"])
@@ -18,18 +27,23 @@ def get_players(
     limit: int = Query(default=100, ge=1, le=500),
     offset: int = Query(default=0, ge=0),
     sort: str = "points_desc",
+    scoring_profile: str = "",
 ):
     _ = request.state.request_id
     with db_connection() as connection:
-        payload = fetch_players(
-            connection,
-            search=search,
-            position=position,
-            team=team,
-            limit=limit,
-            offset=offset,
-            sort=sort,
-        )
+        try:
+            payload = fetch_players(
+                connection,
+                search=search,
+                position=position,
+                team=team,
+                limit=limit,
+                offset=offset,
+                sort=sort,
+                scoring_profile=scoring_profile,
+            )
+        except scoring_engine.ScoringError as error:
+            raise HTTPException(status_code=400, detail=f"Invalid scoring profile: {error}") from None
     return ok(payload)
 
 
@@ -51,3 +65,47 @@ def get_screener_options(
             limit=limit,
         )
     return ok({"count": len(items), "items": items})
+
+
+@router.get("/metrics/catalog")
+def get_metrics_catalog(
+    request: Request,
+    scope: str = Query(default="", pattern="^(all|position|team)?$"),
+    scope_value: str = "",
+):
+    _ = request.state.request_id
+    with db_connection() as connection:
+        payload = fetch_metric_catalog(connection, scope=scope, scope_value=scope_value)
+    return ok(payload)
+
+
+@router.post("/players/series")
+def post_player_series(request: Request, body: PlayerSeriesRequest):
+    _ = request.state.request_id
+    with db_connection() as connection:
+        try:
+            payload = fetch_player_series(connection, body.model_dump())
+        except ValueError as error:
+            raise HTTPException(status_code=400, detail=str(error)) from None
+    return ok(payload)
+
+
+@router.get("/players/{player_id}/comps")
+def get_player_comps(
+    request: Request,
+    player_id: str,
+    season: int | None = None,
+    pool: str = Query(default="season", pattern="^(season|all)$"),
+    metrics: str = "",
+    k: int = Query(default=comps_engine.DEFAULT_COMPS_K, ge=1, le=comps_engine.MAX_COMPS_K),
+):
+    _ = request.state.request_id
+    try:
+        payload = live_data.fetch_player_comps(
+            None, player_id, {"season": season, "pool": pool, "metrics": metrics, "k": k}
+        )
+    except comps_engine.CompsError as error:
+        raise HTTPException(status_code=400, detail=str(error)) from None
+    if payload is None:
+        raise HTTPException(status_code=404, detail="Player not found")
+    return ok(payload)
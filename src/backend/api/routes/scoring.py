@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+import live_data
+import scoring_engine
+from fastapi import APIRouter, HTTPException, Request
+
+from src.backend.api.schemas.common import ok
+from src.backend.api.schemas.scoring import ScoringProfileCreateRequest
+
+router = APIRouter(tags=["scoring"])
+
+
+@router.post("/scoring/profiles")
+def create_scoring_profile(request: Request, body: ScoringProfileCreateRequest):
+    _ = request.state.request_id
+    try:
+        payload = live_data.register_scoring_profile(None, body.model_dump())
+    except scoring_engine.ScoringError as error:
+        raise HTTPException(status_code=400, detail=f"Invalid scoring profile: {error}") from None
+    return ok(payload)
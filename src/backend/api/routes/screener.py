@@ -1,6 +1,10 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, HTTPException, Request
+
+import formula_engine
+import league_rosters
+import scoring_engine
 
 from src.backend.api.schemas.common import ok
 from src.backend.api.schemas.screener import ScreenerQueryRequest
@@ -14,5 +18,14 @@ router = APIRouter(tags=["screener"])
 def post_screener_query(request: Request, body: ScreenerQueryRequest):
     _ = request.state.request_id
     with db_connection() as connection:
-        payload = query_screener(connection, body.model_dump())
+        try:
+            payload = query_screener(connection, body.model_dump())
+        except formula_engine.FormulaError as error:
+            raise HTTPException(status_code=400, detail=f"Invalid formula: {error}") from None
+        except scoring_engine.ScoringError as error:
+            raise HTTPException(status_code=400, detail=f"Invalid scoring profile: {error}") from None
+        except league_rosters.LeagueFilterError as error:
+            raise HTTPException(status_code=400, detail=f"Invalid league filter: {error}") from None
+        except RuntimeError as error:
+            raise HTTPException(status_code=502, detail=str(error)) from None
     return ok(payload)
@@ -3,16 +3,51 @@ from __future__ import annotations
 from pydantic import BaseModel, Field
 
 
+class IntelTradeEvent(BaseModel):
+    timestamp: int
+    date_label: str
+    summary: str
+    delta: int
+
+
 class IntelManagerCard(BaseModel):
-    manager_id: str
+    user_id: str
     display_name: str
+    is_you: bool = False
+    seasons_covered: int = 0
+    total_transactions: int = 0
+    waiver_count: int = 0
+    trade_count: int = 0
+    avg_faab_bid: float = 0
+    max_faab_bid: float = 0
+    faab_bid_pct: float = 0
+    draft_pick_moves: int = 0
+    add_count: int = 0
+    drop_count: int = 0
+    top_position_adds: str = "N/A"
+    profile_label: str
+    aggression_raw: float = 0
     aggression_score: float
-    trade_friendliness: float
-    weakness: str | None = None
+    trade_friendliness_score: float
+    risk_tolerance_score: float
+    targeting_cue: str = ""
+    insight: str = ""
+    counterparty_count: int = 0
+    top_counterparty_user_id: str | None = None
+    top_counterparty_trades: int = 0
+    trade_timeline: list[IntelTradeEvent] = Field(default_factory=list)
+    window_tag: str = "Competitive"
+    weak_positions: list[str] = Field(default_factory=list)
+    position_strengths: dict = Field(default_factory=dict)
+    avg_roster_age: float = 26.0
+    starter_value: float = 0
+    faab_remaining: float = 0
+    trade_pattern: dict = Field(default_factory=dict)
 
 
 class IntelReportResponse(BaseModel):
     league_id: str
     lookback: int
+    user_id: str | None = None
     summary: dict = Field(default_factory=dict)
     managers: list[IntelManagerCard] = Field(default_factory=list)
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class PlayerSummary(BaseModel):
@@ -17,6 +17,7 @@ class PlayerSummary(BaseModel):
     latest_week: int | None = None
     latest_source: str | None = None
     latest_fantasy_points_ppr: float | None = None
+    latest_fantasy_points_custom: float | None = None
 
 
 class PlayerPage(BaseModel):
@@ -29,3 +30,28 @@ class PlayerPage(BaseModel):
 class PlayerListResponse(BaseModel):
     items: list[PlayerSummary]
     page: PlayerPage
+
+
+class PlayerSeriesRequest(BaseModel):
+    player_ids: list[str]
+    # Empty: the six player history columns (fantasy_points_ppr, yards, ...).
+    stat_keys: list[str] = Field(default_factory=list)
+    seasons: list[int] | None = None
+    week_start: int | None = None
+    week_end: int | None = None
+    last_n_games: int | None = None
+
+
+class PlayerSeriesAxis(BaseModel):
+    season: list[int]
+    week: list[int]
+
+
+class PlayerSeriesResponse(BaseModel):
+    generation: int | None = None
+    player_ids: list[str]
+    stat_keys: list[str]
+    window: dict
+    axis: PlayerSeriesAxis
+    # values[stat_key][player][axis position]
+    values: dict[str, list[list[float | None]]]
@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from pydantic import BaseModel
+
+
+class ScoringProfileCreateRequest(BaseModel):
+    scoring_settings: dict[str, float] | None = None
+    preset: str | None = None
+
+
+class ScoringProfileResponse(BaseModel):
+    profile_id: str
+    settings: dict[str, float]
+    generation: int | None = None
+    player_weeks: int
+    computed_at: str
+    cached: bool
@@ -12,8 +12,14 @@ class MetricFilter(BaseModel):
     value_max: float | None = None
 
 
+class FormulaSpec(BaseModel):
+    name: str
+    expression: str
+
+
 class SortSpec(BaseModel):
-    key: str = "fantasy_points_ppr"
+    # Empty: fantasy_points_ppr, or fantasy_points_custom with a scoring_profile.
+    key: str = ""
     direction: Literal["asc", "desc"] = "desc"
 
 
@@ -28,10 +34,22 @@ class ScreenerQueryRequest(BaseModel):
     team: str = ""
     age_min: float | None = None
     age_max: float | None = None
+    relevance: Literal["all", "fantasy", "rosterable", "starter"] = "all"
     filters: list[MetricFilter] = Field(default_factory=list)
+    formulas: list[FormulaSpec] = Field(default_factory=list)
+    # Preset name, registered profile id, or a Sleeper scoring_settings object.
+    scoring_profile: str | dict[str, float] | None = None
     columns: list[str] = Field(default_factory=list)
+    # "sparklines": attach each row's recent PPR/usage series and trend.
+    include: list[Literal["sparklines"]] = Field(default_factory=list)
+    # Sleeper league filters: players on these owners' rosters (user or roster
+    # ids), or players nobody in the league rosters.
+    league_id: str = ""
+    owned_by: list[str] = Field(default_factory=list)
+    available_only: bool = False
     sort: SortSpec = Field(default_factory=SortSpec)
     page: PageSpec = Field(default_factory=PageSpec)
+    debug: bool = False
 
 
 class ScreenerPlayer(BaseModel):
@@ -47,6 +65,7 @@ class ScreenerPlayer(BaseModel):
     latest_week: int | None = None
     latest_source: str | None = None
     metrics: dict[str, float] = Field(default_factory=dict)
+    sparkline: dict | None = None
 
 
 class ScreenerPage(BaseModel):
@@ -62,3 +81,4 @@ class ScreenerQueryResponse(BaseModel):
     sort: SortSpec
     applied_filters: list[MetricFilter]
     columns: list[str]
+    debug: dict | None = None
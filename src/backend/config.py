@@ -25,6 +25,7 @@ class Settings:
     frontend_dist_dir: Path
     sleeper_max_concurrency: int
     sleeper_retry_attempts: int
+    sleeper_hedge_after_ms: int
     static_asset_cache_seconds: int
     api_cache_players_seconds: int
     api_cache_screener_options_seconds: int
@@ -52,6 +53,7 @@ def get_settings() -> Settings:
         frontend_dist_dir=Path(os.getenv("FDL_FRONTEND_DIST", str(PROJECT_ROOT / "src" / "frontend" / "dist"))),
         sleeper_max_concurrency=int(os.getenv("FDL_SLEEPER_MAX_CONCURRENCY", "4")),
         sleeper_retry_attempts=int(os.getenv("FDL_SLEEPER_RETRY_ATTEMPTS", "3")),
+        sleeper_hedge_after_ms=int(os.getenv("FDL_SLEEPER_HEDGE_AFTER_MS", "750")),
         static_asset_cache_seconds=int(os.getenv("FDL_STATIC_ASSET_CACHE_SECONDS", str(7 * 24 * 60 * 60))),
         api_cache_players_seconds=int(os.getenv("FDL_API_CACHE_PLAYERS_SECONDS", "60")),
         api_cache_screener_options_seconds=int(os.getenv("FDL_API_CACHE_SCREENER_OPTIONS_SECONDS", "300")),
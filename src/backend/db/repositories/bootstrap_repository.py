@@ -58,6 +58,54 @@ def ensure_v2_tables(connection: Connection) -> None:
         )
     )
 
+    # Raw Sleeper league payloads keyed by API path, shared by every user of a league.
+    connection.execute(
+        text(
+            """
+            CREATE TABLE IF NOT EXISTS sleeper_cache (
+              path TEXT PRIMARY KEY,
+              league_id TEXT NOT NULL,
+              resource TEXT NOT NULL,
+              payload_json TEXT NOT NULL,
+              fetched_at REAL NOT NULL,
+              expires_at REAL NOT NULL
+            )
+            """
+        )
+    )
+
+    # Running manager-profile aggregates per Sleeper league (one season), and per
+    # week the newest folded transaction, so refreshes fold only newer ones.
+    connection.execute(
+        text(
+            """
+            CREATE TABLE IF NOT EXISTS league_manager_profiles (
+              league_id TEXT PRIMARY KEY,
+              season TEXT,
+              aggregates_json TEXT NOT NULL,
+              transactions_folded INTEGER NOT NULL DEFAULT 0,
+              updated_at TEXT NOT NULL
+            )
+            """
+        )
+    )
+
+    connection.execute(
+        text(
+            """
+            CREATE TABLE IF NOT EXISTS league_transaction_marks (
+              league_id TEXT NOT NULL,
+              week INTEGER NOT NULL,
+              high_water_ms INTEGER NOT NULL DEFAULT 0,
+              high_water_ids_json TEXT NOT NULL DEFAULT '[]',
+              sealed INTEGER NOT NULL DEFAULT 0,
+              PRIMARY KEY (league_id, week)
+            )
+            """
+        )
+    )
+
+    connection.execute(text("CREATE INDEX IF NOT EXISTS idx_sleeper_cache_league ON sleeper_cache(league_id, resource)"))
     connection.execute(text("CREATE INDEX IF NOT EXISTS idx_plsc_points ON player_latest_stats_current(fantasy_points_ppr)"))
     connection.execute(text("CREATE INDEX IF NOT EXISTS idx_plsc_player ON player_latest_stats_current(player_id)"))
     connection.execute(text("CREATE INDEX IF NOT EXISTS idx_plm_player_key ON player_latest_metrics(player_id, stat_key)"))
@@ -66,52 +114,8 @@ def ensure_v2_tables(connection: Connection) -> None:
 
 
 def refresh_latest_stats_current(connection: Connection) -> None:
-    now = live_data.utc_now_iso()
     connection.execute(text("DELETE FROM player_latest_stats_current"))
-    connection.execute(
-        text(
-            """
-            INSERT INTO player_latest_stats_current (
-              player_id, season, week, season_type, team, opponent_team,
-              fantasy_points_ppr, fantasy_points_half_ppr, fantasy_points_std,
-              passing_yards, rushing_yards, receiving_yards, receptions, touchdowns, turnovers,
-              source, updated_at
-            )
-            WITH ranked AS (
-              SELECT
-                pws.player_id,
-                pws.season,
-                pws.week,
-                pws.season_type,
-                pws.team,
-                pws.opponent_team,
-                pws.fantasy_points_ppr,
-                pws.fantasy_points_half_ppr,
-                pws.fantasy_points_std,
-                pws.passing_yards,
-                pws.rushing_yards,
-                pws.receiving_yards,
-                pws.receptions,
-                pws.touchdowns,
-                pws.turnovers,
-                pws.source,
-                ROW_NUMBER() OVER (
-                  PARTITION BY pws.player_id
-                  ORDER BY pws.season DESC, pws.week DESC, CASE WHEN pws.source='sleeper' THEN 0 ELSE 1 END
-                ) AS rn
-              FROM player_week_stats pws
-            )
-            SELECT
-              player_id, season, week, season_type, team, opponent_team,
-              fantasy_points_ppr, fantasy_points_half_ppr, fantasy_points_std,
-              passing_yards, rushing_yards, receiving_yards, receptions, touchdowns, turnovers,
-              source, :now
-            FROM ranked
-            WHERE rn = 1
-            """
-        ),
-        {"now": now},
-    )
+    connection.execute(text(live_data.REFRESH_LATEST_STATS_CURRENT_SQL), {"now": live_data.utc_now_iso()})
 
 
 def fetch_health_summary() -> dict:
@@ -127,6 +131,9 @@ def fetch_health_summary() -> dict:
         "metric_keys_available": payload.get("metric_keys_available", 0),
         "last_sync_at": payload.get("last_sync_at"),
         "last_sync_report": payload.get("last_sync_report"),
+        "data_generation": payload.get("data_generation"),
+        "screener_cache": payload.get("screener_cache"),
+        "screener_index": payload.get("screener_index"),
     }
 
 
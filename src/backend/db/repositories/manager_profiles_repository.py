@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import json
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+
+def read_league_profile(connection: Connection, *, league_id: str) -> dict | None:
+    row = connection.execute(
+        text(
+            """
+            SELECT league_id, season, aggregates_json, transactions_folded, updated_at
+            FROM league_manager_profiles
+            WHERE league_id = :league_id
+            """
+        ),
+        {"league_id": league_id},
+    ).mappings().first()
+    return dict(row) if row else None
+
+
+def save_league_profile(
+    connection: Connection,
+    *,
+    league_id: str,
+    season: str,
+    aggregates_json: str,
+    transactions_folded: int,
+    updated_at: str,
+) -> None:
+    connection.execute(
+        text(
+            """
+            INSERT INTO league_manager_profiles (league_id, season, aggregates_json, transactions_folded, updated_at)
+            VALUES (:league_id, :season, :aggregates_json, :transactions_folded, :updated_at)
+            ON CONFLICT(league_id) DO UPDATE SET
+              season = excluded.season,
+              aggregates_json = excluded.aggregates_json,
+              transactions_folded = excluded.transactions_folded,
+              updated_at = excluded.updated_at
+            """
+        ),
+        {
+            "league_id": league_id,
+            "season": season,
+            "aggregates_json": aggregates_json,
+            "transactions_folded": transactions_folded,
+            "updated_at": updated_at,
+        },
+    )
+
+
+def read_transaction_marks(connection: Connection, *, league_ids: list[str]) -> dict[str, dict[int, dict]]:
+    rows = connection.execute(
+        text(
+            """
+            SELECT league_id, week, high_water_ms, high_water_ids_json, sealed
+            FROM league_transaction_marks
+            WHERE league_id IN (SELECT value FROM json_each(:league_ids))
+            """
+        ),
+        {"league_ids": json.dumps(league_ids)},
+    ).mappings()
+    marks: dict[str, dict[int, dict]] = {}
+    for row in rows:
+        marks.setdefault(row["league_id"], {})[int(row["week"])] = {
+            "high_water_ms": int(row["high_water_ms"]),
+            "high_water_ids": json.loads(row["high_water_ids_json"]),
+            "sealed": bool(row["sealed"]),
+        }
+    return marks
+
+
+def save_transaction_marks(connection: Connection, *, league_id: str, marks: dict[int, dict]) -> None:
+    if not marks:
+        return
+    connection.execute(
+        text(
+            """
+            INSERT INTO league_transaction_marks (league_id, week, high_water_ms, high_water_ids_json, sealed)
+            VALUES (:league_id, :week, :high_water_ms, :high_water_ids_json, :sealed)
+            ON CONFLICT(league_id, week) DO UPDATE SET
+              high_water_ms = excluded.high_water_ms,
+              high_water_ids_json = excluded.high_water_ids_json,
+              sealed = excluded.sealed
+            """
+        ),
+        [
+            {
+                "league_id": league_id,
+                "week": week,
+                "high_water_ms": mark["high_water_ms"],
+                "high_water_ids_json": json.dumps(sorted(mark["high_water_ids"])),
+                "sealed": 1 if mark["sealed"] else 0,
+            }
+            for week, mark in sorted(marks.items())
+        ],
+    )
@@ -1,9 +1,13 @@
 from __future__ import annotations
 
+import json
+
 from sqlalchemy import text
 from sqlalchemy.engine import Connection
 
 import live_data
+import query_cache
+import scoring_engine
 
 SORT_SQL = {
     "points_desc": "COALESCE(ls.fantasy_points_ppr, -9999999) DESC, p.full_name ASC",
@@ -28,19 +32,29 @@ def fetch_players(
     limit: int,
     offset: int,
     sort: str,
+    scoring_profile: str = "",
 ) -> dict:
     search = (search or "").strip().lower()
     position = (position or "").strip().upper()
     team = (team or "").strip().upper()
     sort_sql = SORT_SQL.get((sort or "").strip().lower(), SORT_SQL["points_desc"])
+    profile, settings = scoring_engine.resolve_profile(scoring_profile)
 
     base_sql = """
       FROM players p
       LEFT JOIN player_latest_stats_current ls ON ls.player_id = p.player_id
-      WHERE 1=1
     """
+    select_sql = ""
     where_sql = ""
     params: dict[str, object] = {"limit": limit, "offset": offset}
+    if profile:
+        live_data.ensure_scoring_profile(None, profile, settings)
+        # Points sorts rank by the profile's latest-week points instead of PPR.
+        sort_sql = sort_sql.replace("ls.fantasy_points_ppr", "sp.fantasy_points")
+        base_sql += " LEFT JOIN scoring_profile_latest sp ON sp.profile_id = :profile_id AND sp.player_id = p.player_id"
+        select_sql = ",\n        sp.fantasy_points AS latest_fantasy_points_custom"
+        params["profile_id"] = profile
+    base_sql += " WHERE 1=1"
     if search:
         where_sql += " AND (LOWER(p.full_name) LIKE :wild OR LOWER(p.first_name) LIKE :wild OR LOWER(p.last_name) LIKE :wild)"
         params["wild"] = f"%{search}%"
@@ -58,7 +72,7 @@ def fetch_players(
       SELECT
         p.player_id, p.full_name, p.first_name, p.last_name, p.position, p.team, p.status, p.age, p.years_exp,
         ls.season AS latest_season, ls.week AS latest_week, ls.source AS latest_source,
-        ls.fantasy_points_ppr AS latest_fantasy_points_ppr
+        ls.fantasy_points_ppr AS latest_fantasy_points_ppr{select_sql}
       {base_sql}
       {where_sql}
       ORDER BY {sort_sql}
@@ -89,39 +103,61 @@ def fetch_filter_options(
     position = (position or "").strip().upper()
     team = (team or "").strip().upper()
 
-    sql = """
-      SELECT
-        plm.stat_key,
-        COUNT(*) AS player_count,
-        MIN(plm.stat_value) AS min_value,
-        MAX(plm.stat_value) AS max_value
-      FROM player_latest_metrics plm
-      JOIN players p ON p.player_id = plm.player_id
-      WHERE 1=1
-    """
-
-    params: dict[str, object] = {"limit": limit}
+    # Single-scope slices read the catalog built at sync (see
+    # live_data.refresh_metric_catalog); position+team slices aggregate. Rank
+    # pseudo-metrics are not in the catalog and are only listed for a search.
+    params: dict[str, object] = {"limit": limit, "rank_source": live_data.RANK_METRIC_SOURCE}
+    use_catalog = not (position and team) and connection.execute(
+        text("SELECT 1 FROM metric_catalog LIMIT 1")
+    ).first() is not None
 
+    search_sql = ""
     if search:
         token = live_data.normalize_stat_key(search)
         wildcard = f"%{token.replace('_', '%') if token else search}%"
         if token == "yac":
-            sql += " AND (plm.stat_key LIKE :wild1 OR plm.stat_key LIKE :wild2)"
+            search_sql = " AND (plm.stat_key LIKE :wild1 OR plm.stat_key LIKE :wild2)"
             params["wild1"] = "%yac%"
             params["wild2"] = "%yards_after_catch%"
         else:
-            sql += " AND plm.stat_key LIKE :wild"
+            search_sql = " AND plm.stat_key LIKE :wild"
             params["wild"] = wildcard
 
+    aggregate_sql = """
+      SELECT
+        plm.stat_key,
+        COUNT(*) AS player_count,
+        MIN(plm.stat_value) AS min_value,
+        MAX(plm.stat_value) AS max_value
+      FROM player_latest_metrics plm
+      JOIN players p ON p.player_id = plm.player_id
+      WHERE 1=1
+    """
     if position:
-        sql += " AND p.position = :position"
+        aggregate_sql += " AND p.position = :position"
         params["position"] = position
     if team:
-        sql += " AND p.team = :team"
+        aggregate_sql += " AND p.team = :team"
         params["team"] = team
+    aggregate_sql += search_sql
+
+    if use_catalog:
+        sql = """
+          SELECT plm.stat_key, plm.player_count, plm.min_value, plm.max_value
+          FROM metric_catalog plm
+          WHERE plm.scope = :scope AND plm.scope_value = :scope_value
+        """ + search_sql
+        params["scope"] = "position" if position else "team" if team else "all"
+        params["scope_value"] = position or team
+        if search:
+            sql += f" UNION ALL {aggregate_sql} AND plm.source = :rank_source GROUP BY plm.stat_key"
+    elif search:
+        sql = f"{aggregate_sql} GROUP BY plm.stat_key"
+    else:
+        sql = f"{aggregate_sql} AND plm.source != :rank_source GROUP BY plm.stat_key"
 
-    sql += """
-      GROUP BY plm.stat_key
+    sql = f"""
+      SELECT * FROM ({sql}) plm
       ORDER BY
         CASE plm.stat_key
           WHEN 'fantasy_points_ppr' THEN 0
@@ -144,3 +180,45 @@ def fetch_filter_options(
         }
         for row in rows
     ]
+
+
+def fetch_metric_catalog(connection: Connection, *, scope: str, scope_value: str) -> dict:
+    generation = live_data.current_data_generation()
+    items = live_data.cached_metric_catalog_items(
+        generation,
+        lambda: [
+            live_data.metric_catalog_item(row)
+            for row in connection.execute(text(live_data.METRIC_CATALOG_SQL)).mappings()
+        ],
+    )
+    return live_data.metric_catalog_document(items, generation, scope, (scope_value or "").strip().upper())
+
+
+def fetch_player_series(connection: Connection, payload: dict) -> dict:
+    spec = live_data.normalize_series_payload(payload)
+    generation = live_data.current_data_generation()
+    return live_data.SCREENER_RESULT_CACHE.get_or_compute(
+        query_cache.canonical_key("series", spec),
+        lambda: live_data.player_series_document(
+            spec,
+            generation,
+            connection.execute(text(live_data.PLAYER_SERIES_SQL), live_data.player_series_params(spec)),
+        ),
+        generation=generation,
+    )
+
+
+def fetch_players_by_ids(connection: Connection, player_ids: list[str]) -> dict[str, dict]:
+    if not player_ids:
+        return {}
+    rows = connection.execute(
+        text(
+            """
+            SELECT player_id, position, age, years_exp
+            FROM players
+            WHERE player_id IN (SELECT value FROM json_each(:player_ids))
+            """
+        ),
+        {"player_ids": json.dumps(player_ids)},
+    ).mappings()
+    return {row["player_id"]: dict(row) for row in rows}
@@ -1,21 +1,21 @@
 from __future__ import annotations
 
+import json
 import re
 from collections.abc import Iterable
+from functools import lru_cache
 
 from sqlalchemy import text
 from sqlalchemy.engine import Connection
+from sqlalchemy.sql.elements import TextClause
 
+import formula_engine
 import live_data
+import query_cache
+import scoring_engine
+import screener_compiler
 
 STAT_KEY_PATTERN = re.compile(r"^[a-z0-9_]{1,80}$")
-BASE_SORT_KEYS = {
-    "player_name": "p.full_name",
-    "position": "p.position",
-    "team": "p.team",
-    "age": "COALESCE(p.age, {null_fill})",
-    "fantasy_points_ppr": "COALESCE(ls.fantasy_points_ppr, {null_fill})",
-}
 
 
 def _normalize_stat_key(value: str) -> str:
@@ -62,29 +62,6 @@ def _normalize_filters(filters: list[dict] | None) -> list[dict]:
     return out
 
 
-def _metric_filter_sql(alias: str, metric_filter: dict) -> tuple[str, dict[str, float]]:
-    op = metric_filter["op"]
-    value = metric_filter["value"]
-    value_max = metric_filter.get("value_max")
-
-    if op == "lt":
-        return f"{alias}.stat_value < :{alias}_value", {f"{alias}_value": value}
-    if op == "lte":
-        return f"{alias}.stat_value <= :{alias}_value", {f"{alias}_value": value}
-    if op == "gt":
-        return f"{alias}.stat_value > :{alias}_value", {f"{alias}_value": value}
-    if op == "eq":
-        return f"{alias}.stat_value = :{alias}_value", {f"{alias}_value": value}
-    if op == "neq":
-        return f"{alias}.stat_value != :{alias}_value", {f"{alias}_value": value}
-    if op == "between":
-        return (
-            f"{alias}.stat_value BETWEEN :{alias}_value_min AND :{alias}_value_max",
-            {f"{alias}_value_min": value, f"{alias}_value_max": value_max},
-        )
-    return f"{alias}.stat_value >= :{alias}_value", {f"{alias}_value": value}
-
-
 def _dedupe_metric_keys(keys: Iterable[str]) -> list[str]:
     seen: set[str] = set()
     out: list[str] = []
@@ -97,9 +74,9 @@ def _dedupe_metric_keys(keys: Iterable[str]) -> list[str]:
     return out[:80]
 
 
-def query_screener(connection: Connection, payload: dict) -> dict:
+def normalize_query(payload: dict) -> dict:
     search = str(payload.get("search") or "").strip().lower()
-    positions = _normalize_positions(payload.get("positions") or payload.get("position"))
+    positions = sorted(_normalize_positions(payload.get("positions") or payload.get("position")))
     team = str(payload.get("team") or "").strip().upper()
 
     age_min = live_data.parse_float(payload.get("age_min"))
@@ -109,122 +86,149 @@ def query_screener(connection: Connection, payload: dict) -> dict:
     limit = max(1, min(live_data.parse_int(raw_page.get("limit") or payload.get("limit"), 100), 200))
     offset = max(0, live_data.parse_int(raw_page.get("offset") or payload.get("offset"), 0))
 
+    scoring_profile, scoring_settings = scoring_engine.resolve_profile(payload.get("scoring_profile"))
+    default_sort_key = scoring_engine.SCORING_STAT_KEY if scoring_profile else "fantasy_points_ppr"
     raw_sort = payload.get("sort") if isinstance(payload.get("sort"), dict) else {}
-    sort_key = _normalize_stat_key(raw_sort.get("key") or payload.get("sort_key") or "fantasy_points_ppr")
+    sort_key = _normalize_stat_key(raw_sort.get("key") or payload.get("sort_key") or default_sort_key)
     sort_direction = str(raw_sort.get("direction") or payload.get("sort_direction") or "desc").strip().lower()
-    sort_is_asc = sort_direction == "asc"
-    sort_direction = "asc" if sort_is_asc else "desc"
+    sort_direction = "asc" if sort_direction == "asc" else "desc"
 
     filters = _normalize_filters(payload.get("filters") if isinstance(payload.get("filters"), list) else [])
+    relevance = str(payload.get("relevance") or "all").strip().lower()
 
     raw_columns = payload.get("columns") if isinstance(payload.get("columns"), list) else []
+    base_keys = ["fantasy_points_ppr", "age", "years_exp"]
+    if scoring_profile:
+        base_keys.insert(0, scoring_engine.SCORING_STAT_KEY)
     requested_metric_keys = _dedupe_metric_keys(
-        ["fantasy_points_ppr", "age", "years_exp", *[entry["key"] for entry in filters], *raw_columns, sort_key]
+        [*base_keys, *[entry["key"] for entry in filters], *raw_columns, sort_key]
+    )
+    return {
+        "search": search,
+        "positions": positions,
+        "team": team,
+        "age_min": age_min,
+        "age_max": age_max,
+        "relevance_tier": live_data.relevance_tier(relevance, default="all"),
+        "limit": limit,
+        "offset": offset,
+        "sort_key": sort_key,
+        "sort_direction": sort_direction,
+        "filters": filters,
+        "formulas": live_data.normalize_formulas(payload.get("formulas")),
+        "scoring_profile": scoring_profile,
+        "scoring_settings": scoring_settings,
+        "columns": requested_metric_keys,
+        "include": live_data.normalize_screener_include(payload.get("include")),
+        **live_data.normalize_league_filters(payload),
+        "debug": bool(payload.get("debug")),
+    }
+
+
+def query_screener(connection: Connection, payload: dict) -> dict:
+    spec = live_data.resolve_league_filters(normalize_query(payload))
+    return live_data.SCREENER_RESULT_CACHE.get_or_compute(
+        query_cache.canonical_key("v2", spec),
+        lambda: execute_query(connection, spec),
+        generation=live_data.current_data_generation(),
     )
 
-    null_fill = "9999999" if sort_is_asc else "-9999999"
-    where_parts = ["1=1"]
-    join_parts = ["LEFT JOIN player_latest_stats_current ls ON ls.player_id = p.player_id"]
-    params: dict[str, object] = {"limit": limit, "offset": offset}
-
-    for index, metric_filter in enumerate(filters):
-        alias = f"mf{index}"
-        clause, clause_params = _metric_filter_sql(alias, metric_filter)
-        where_parts.append(
-            f"""
-            EXISTS (
-              SELECT 1
-              FROM player_latest_metrics {alias}
-              WHERE {alias}.player_id = p.player_id
-                AND {alias}.stat_key = :{alias}_key
-                AND {clause}
-            )
-            """
-        )
-        params[f"{alias}_key"] = metric_filter["key"]
-        params.update(clause_params)
-
-    if sort_key in BASE_SORT_KEYS:
-        sort_expr = BASE_SORT_KEYS[sort_key].format(null_fill=null_fill)
-    else:
-        sort_expr = f"COALESCE(msort.stat_value, COALESCE(ls.fantasy_points_ppr, {null_fill}))"
-        join_parts.append("LEFT JOIN player_latest_metrics msort ON msort.player_id = p.player_id AND msort.stat_key = :sort_key")
-        params["sort_key"] = sort_key
-
-    if search:
-        where_parts.append("(LOWER(p.full_name) LIKE :wild OR LOWER(p.first_name) LIKE :wild OR LOWER(p.last_name) LIKE :wild)")
-        params["wild"] = f"%{search}%"
-    if positions:
-        placeholders = []
-        for i, pos in enumerate(positions):
-            key = f"position_{i}"
-            placeholders.append(f":{key}")
-            params[key] = pos
-        where_parts.append(f"p.position IN ({','.join(placeholders)})")
-    if team:
-        where_parts.append("p.team = :team")
-        params["team"] = team
-    if age_min is not None:
-        where_parts.append("p.age >= :age_min")
-        params["age_min"] = age_min
-    if age_max is not None:
-        where_parts.append("p.age <= :age_max")
-        params["age_max"] = age_max
-
-    from_sql = f"FROM players p {' '.join(join_parts)}"
-    where_sql = f"WHERE {' AND '.join(where_parts)}"
+
+@lru_cache(maxsize=512)
+def _statement(sql: str) -> TextClause:
+    # Reusing one TextClause per SQL string lets SQLAlchemy's compiled cache hit.
+    return text(sql)
+
+
+def _formula_values(
+    connection: Connection, metrics_table: str, items: list[dict], formulas: list
+) -> dict[str, dict[str, float]]:
+    stat_keys = list(dict.fromkeys(stat_key for formula in formulas for stat_key in formula.stat_keys))
+    inputs: dict[str, dict[str, float]] = {item["player_id"]: {} for item in items}
+    for row in connection.execute(
+        _statement(screener_compiler.metrics_sql(metrics_table)),
+        screener_compiler.metrics_params(inputs, stat_keys),
+    ).mappings():
+        inputs[str(row["player_id"])][str(row["stat_key"])] = float(row["stat_value"])
+    out: dict[str, dict[str, float]] = {}
+    for item in items:
+        cells = {}
+        for formula in formulas:
+            value = formula_engine.evaluate_row(formula.tree, inputs[item["player_id"]])
+            if value is not None:
+                cells[formula.name] = value
+        out[item["player_id"]] = cells
+    return out
+
+
+def execute_query(connection: Connection, spec: dict) -> dict:
+    limit = spec["limit"]
+    offset = spec["offset"]
+    sort_key = spec["sort_key"]
+    sort_direction = spec["sort_direction"]
+    filters = spec["filters"]
+    requested_metric_keys = spec["columns"]
+    profile = spec.get("scoring_profile")
+    metrics_table = "player_latest_metrics"
+    if profile:
+        live_data.ensure_scoring_profile(None, profile, spec.get("scoring_settings"))
+        params = {"profile_id": profile, "stat_keys": json.dumps(screener_compiler.spec_stat_keys(spec))}
+        for statement in scoring_engine.SCORED_METRICS_SQL:
+            connection.execute(_statement(statement), params)
+        metrics_table = scoring_engine.SCORED_METRICS_TABLE
+    formulas = list(screener_compiler.spec_formulas(spec).values())
+
+    shape, params, plan = screener_compiler.compile_screener(
+        spec,
+        profile="v2",
+        metrics_table=metrics_table,
+        stats_table="player_latest_stats_current",
+        base_sorts=True,
+        histograms=live_data.load_metric_histograms() if filters else None,
+    )
 
     total_row = connection.execute(
-        text(f"SELECT COUNT(*) AS total {from_sql} {where_sql}"),
-        params,
+        _statement(screener_compiler.count_sql(shape)),
+        screener_compiler.count_params(params),
     ).mappings().first()
     total = int(total_row["total"] if total_row else 0)
 
-    rows = connection.execute(
-        text(
-            f"""
-            SELECT
-              p.player_id, p.full_name, p.position, p.team, p.status, p.age, p.years_exp,
-              ls.season AS latest_season,
-              ls.week AS latest_week,
-              ls.source AS latest_source,
-              ls.fantasy_points_ppr AS latest_fantasy_points_ppr
-            {from_sql}
-            {where_sql}
-            ORDER BY {sort_expr} {sort_direction.upper()}, p.full_name ASC
-            LIMIT :limit OFFSET :offset
-            """
-        ),
-        params,
-    ).mappings().all()
+    index = None
+    if (
+        not spec["search"]
+        and shape.sort in {"metric", "formula", "fantasy_points_ppr"}
+        and not (profile and any(scoring_engine.SCORING_STAT_KEY in formula.stat_keys for formula in formulas))
+    ):
+        index = live_data.get_screener_index()
+    extra = None
+    if index is not None and profile:
+        extra = {scoring_engine.SCORING_STAT_KEY: live_data.scoring_index_column(index, profile)}
+    if index is not None:
+        player_ids = index.top_k(spec, sort_key if shape.sort in {"metric", "formula"} else None, extra)
+        rows = []
+        if player_ids:
+            rows_by_id = {
+                row["player_id"]: row
+                for row in connection.execute(
+                    _statement(screener_compiler.rows_by_id_sql("v2", "player_latest_stats_current")),
+                    {"player_ids": json.dumps(player_ids)},
+                ).mappings()
+            }
+            rows = [rows_by_id[player_id] for player_id in player_ids if player_id in rows_by_id]
+    else:
+        rows = connection.execute(_statement(screener_compiler.page_sql(shape)), params).mappings().all()
+    plan["index"] = index is not None
 
     items = [dict(row) for row in rows]
     player_ids = [item["player_id"] for item in items]
 
     metric_values: dict[str, dict[str, float]] = {player_id: {} for player_id in player_ids}
-    if player_ids and requested_metric_keys:
-        pid_placeholders = []
-        key_placeholders = []
-        metric_params: dict[str, object] = {}
-        for index, player_id in enumerate(player_ids):
-            name = f"pid_{index}"
-            pid_placeholders.append(f":{name}")
-            metric_params[name] = player_id
-        for index, metric_key in enumerate(requested_metric_keys):
-            name = f"mkey_{index}"
-            key_placeholders.append(f":{name}")
-            metric_params[name] = metric_key
-
+    if player_ids and requested_metric_keys and index is not None:
+        metric_values = index.metric_values(player_ids, requested_metric_keys, extra)
+    elif player_ids and requested_metric_keys:
         metric_rows = connection.execute(
-            text(
-                f"""
-                SELECT player_id, stat_key, stat_value
-                FROM player_latest_metrics
-                WHERE player_id IN ({','.join(pid_placeholders)})
-                  AND stat_key IN ({','.join(key_placeholders)})
-                """
-            ),
-            metric_params,
+            _statement(screener_compiler.metrics_sql(metrics_table)),
+            screener_compiler.metrics_params(player_ids, requested_metric_keys),
         ).mappings().all()
 
         for row in metric_rows:
@@ -232,8 +236,17 @@ def query_screener(connection: Connection, payload: dict) -> dict:
 
     for item in items:
         item["metrics"] = metric_values.get(item["player_id"], {})
+    if player_ids and formulas:
+        if index is not None:
+            formula_values = index.formula_values(player_ids, formulas)
+        else:
+            formula_values = _formula_values(connection, metrics_table, items, formulas)
+        for item in items:
+            item["metrics"].update(formula_values[item["player_id"]])
+    if "sparklines" in spec.get("include", ()):
+        live_data.attach_sparklines(items)
 
-    return {
+    result = {
         "items": items,
         "page": {
             "limit": limit,
@@ -248,3 +261,8 @@ def query_screener(connection: Connection, payload: dict) -> dict:
         "applied_filters": filters,
         "columns": requested_metric_keys,
     }
+    if profile:
+        result["scoring_profile"] = profile
+    if spec["debug"]:
+        result["debug"] = {"plan": plan}
+    return result
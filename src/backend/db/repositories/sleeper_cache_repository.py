@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import json
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+
+def read_sleeper_cache(connection: Connection, *, paths: list[str], now: float) -> dict[str, object]:
+    if not paths:
+        return {}
+    rows = connection.execute(
+        text(
+            """
+            SELECT path, payload_json
+            FROM sleeper_cache
+            WHERE path IN (SELECT value FROM json_each(:paths))
+              AND expires_at > :now
+            """
+        ),
+        {"paths": json.dumps(paths), "now": now},
+    ).mappings()
+    return {row["path"]: json.loads(row["payload_json"]) for row in rows}
+
+
+def write_sleeper_cache(connection: Connection, *, entries: list[dict], fetched_at: float) -> None:
+    if not entries:
+        return
+    connection.execute(
+        text(
+            """
+            INSERT INTO sleeper_cache (path, league_id, resource, payload_json, fetched_at, expires_at)
+            VALUES (:path, :league_id, :resource, :payload_json, :fetched_at, :expires_at)
+            ON CONFLICT(path) DO UPDATE SET
+              payload_json = excluded.payload_json,
+              fetched_at = excluded.fetched_at,
+              expires_at = excluded.expires_at
+            """
+        ),
+        [
+            {
+                "path": entry["path"],
+                "league_id": entry["league_id"],
+                "resource": entry["resource"],
+                "payload_json": json.dumps(entry["payload"], separators=(",", ":")),
+                "fetched_at": fetched_at,
+                "expires_at": fetched_at + entry["ttl_seconds"],
+            }
+            for entry in entries
+        ],
+    )
+
+
+def purge_expired_sleeper_cache(connection: Connection, *, now: float) -> int:
+    result = connection.execute(text("DELETE FROM sleeper_cache WHERE expires_at <= :now"), {"now": now})
+    return int(result.rowcount or 0)
@@ -11,7 +11,14 @@ from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
-from src.backend.api.routes import health_router, intel_router, players_router, screener_router, sync_router
+from src.backend.api.routes import (
+    health_router,
+    intel_router,
+    players_router,
+    scoring_router,
+    screener_router,
+    sync_router,
+)
 from src.backend.api.schemas.common import fail
 from src.backend.config import get_settings
 from src.backend.db.repositories.bootstrap_repository import (
@@ -83,6 +90,7 @@ def create_app() -> FastAPI:
     app.include_router(health_router, prefix="/api/v2")
     app.include_router(players_router, prefix="/api/v2")
     app.include_router(screener_router, prefix="/api/v2")
+    app.include_router(scoring_router, prefix="/api/v2")
     app.include_router(sync_router, prefix="/api/v2")
     app.include_router(intel_router, prefix="/api/v2")
 
@@ -0,0 +1,569 @@
+"""Manager profiling for League Intel, ported from ``intel_engine.js``.
+
+``build_adversarial_intel_report`` folds a league history (one entry per
+season: the league object, its users, rosters and every week's
+transactions) into per-manager tendencies: trade and waiver counts, FAAB
+bid sizes, draft pick moves, position bias and counterparties. Aggression
+is a weighted sum of those, normalized to the most aggressive manager in
+the league. ``merge_roster_context`` then adds the latest season's roster
+shape (depth per position, age, starter value, FAAB left) and the FAAB bid
+predictor from ``league_intel.js``.
+
+Folding is split from finalizing: ``fold_season`` updates running
+aggregates and can be fed a season's transactions in batches,
+``merge_aggregates`` combines seasons, and ``finalize_report`` derives the
+scores. The server keeps aggregates per league and folds only new
+transactions into them.
+
+Output keys are the snake_case forms of the JS report's camelCase keys and
+the numbers match it, including JS ``Math.round`` half-up rounding.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+
+AGGRESSION_WEIGHTS = {
+    "trade_count": 2.4,
+    "waiver_count": 1.1,
+    "draft_pick_moves": 1.6,
+    "avg_bid_pct": 35,
+    "churn_moves": 0.08,
+}
+PROFILE_TONES = ("intel", "terminal")
+TRADE_TIMELINE_LIMIT = 8
+EXPECTED_DEPTH = {"QB": 3, "RB": 6, "WR": 7, "TE": 3}
+BASE_VALUE_BY_POSITION = {"QB": 5200, "RB": 3600, "WR": 3800, "TE": 2600}
+COMPLETED_STATUSES = {"complete", "completed", "accepted"}
+# How merge_aggregates combines two seasons of one manager's aggregates.
+SUMMED_FIELDS = (
+    "total_transactions",
+    "waiver_count",
+    "trade_count",
+    "faab_bid_sum",
+    "faab_bid_count",
+    "draft_pick_moves",
+    "add_count",
+    "drop_count",
+)
+MAX_FIELDS = ("faab_max_bid", "faab_budget_observed")
+COUNTER_FIELDS = ("position_adds", "position_drops", "counterparties")
+
+
+def _round(value, digits=2):
+    try:
+        numeric = float(value)
+    except (TypeError, ValueError):
+        return 0
+    if not math.isfinite(numeric):
+        return 0
+    factor = 10**digits
+    rounded = math.floor(numeric * factor + 0.5) / factor
+    return int(rounded) if digits == 0 else rounded
+
+
+def _clamp(value, low, high):
+    return min(max(value, low), high)
+
+
+def _number(value, default=0.0):
+    try:
+        numeric = float(value)
+    except (TypeError, ValueError):
+        return default
+    return numeric if math.isfinite(numeric) else default
+
+
+def is_completed_transaction(transaction):
+    status = str(transaction.get("status") or "").lower()
+    return not status or status in COMPLETED_STATUSES
+
+
+def normalize_position(position):
+    token = str(position or "").upper()
+    return token if token in EXPECTED_DEPTH else ""
+
+
+def collect_player_ids(season_data):
+    """Every player id on a roster or in a transaction, first-seen order."""
+    ids = {}
+    for season in season_data or []:
+        for roster in season.get("rosters") or []:
+            for key in ("players", "reserve", "taxi"):
+                for player_id in roster.get(key) or []:
+                    ids.setdefault(str(player_id or "").strip(), None)
+        for transaction in season.get("transactions") or []:
+            for key in ("adds", "drops"):
+                for player_id in transaction.get(key) or {}:
+                    ids.setdefault(str(player_id or "").strip(), None)
+    ids.pop("", None)
+    return list(ids)
+
+
+def infer_player_age(player):
+    player = player or {}
+    age = _number(player.get("age"), None)
+    if age is not None:
+        return age
+    years = _number(player.get("years_exp"), None)
+    if years is not None:
+        return 21 + years
+    return None
+
+
+def estimate_player_value(player):
+    position = normalize_position((player or {}).get("position")) or "WR"
+    base = BASE_VALUE_BY_POSITION[position]
+    age = infer_player_age(player)
+    if age is None:
+        return base
+    if age <= 23:
+        return base * 1.22
+    if age <= 26:
+        return base * 1.08
+    if age <= 29:
+        return base * 0.92
+    return base * 0.74
+
+
+def _top_position_value(players, starters):
+    values = sorted((estimate_player_value(player) for player in players), reverse=True)
+    return sum(values[:starters])
+
+
+def _top_key(record):
+    if not record:
+        return ""
+    return max(record.items(), key=lambda entry: entry[1])[0]
+
+
+def _new_manager(user_id, display_name):
+    return {
+        "user_id": user_id,
+        "display_name": display_name,
+        "seasons": set(),
+        "total_transactions": 0,
+        "waiver_count": 0,
+        "trade_count": 0,
+        "faab_bid_sum": 0.0,
+        "faab_bid_count": 0,
+        "faab_max_bid": 0,
+        "faab_budget_observed": 100,
+        "draft_pick_moves": 0,
+        "add_count": 0,
+        "drop_count": 0,
+        "position_adds": {},
+        "position_drops": {},
+        "counterparties": {},
+        "trade_timeline": [],
+    }
+
+
+def _ensure_manager(managers, user_id, display_name=""):
+    key = str(user_id or "")
+    if not key:
+        return _new_manager("", "Unknown")
+    manager = managers.get(key)
+    if manager is None:
+        # Unnamed managers get their "Manager xxxx" label at finalize, so a
+        # name from any folded season wins over the placeholder.
+        manager = managers[key] = _new_manager(key, display_name)
+    if display_name:
+        manager["display_name"] = display_name
+    return manager
+
+
+def _participant_user_ids(transaction, owner_by_roster_id):
+    ids = []
+    candidates = [*(transaction.get("roster_ids") or []), *(transaction.get("consenter_ids") or []), transaction.get("creator")]
+    for candidate in candidates:
+        if candidate is None:
+            continue
+        token = str(owner_by_roster_id.get(str(candidate)) or candidate or "").strip()
+        if token and token not in ids:
+            ids.append(token)
+    return ids
+
+
+def manager_label(trade_count, avg_bid_pct, total_moves, tone="intel"):
+    terminal = tone == "terminal"
+    if trade_count >= 8 and avg_bid_pct >= 0.18:
+        return "Hyper-aggressive" if terminal else "Trade Addict"
+    if trade_count >= 5 or total_moves >= 35:
+        return "Active market maker" if terminal else "Active Market Maker"
+    if avg_bid_pct >= 0.22:
+        return "Waiver sniper" if terminal else "FAAB Sniper"
+    if trade_count <= 1 and total_moves <= 10:
+        return "Risk-averse" if terminal else "The Hoarder"
+    return "Balanced" if terminal else "Silent Contender"
+
+
+def _targeting_cue(profile_label, top_position, trade_count):
+    if profile_label in ("Hyper-aggressive", "Trade Addict"):
+        return "Lead with a complete package and anchor negotiations early."
+    if profile_label in ("Waiver sniper", "FAAB Sniper"):
+        return f"Pitch {top_position} depth before waivers run to increase response rate."
+    if profile_label in ("Risk-averse", "The Hoarder"):
+        return "Offer stable floor assets; avoid volatile upside framing."
+    if trade_count >= 5:
+        return "Run a two-step offer sequence: fair opener, then targeted sweetener."
+    return "Use roster-fit framing and weekly points gain to open talks."
+
+
+def _push_trade_timeline(transaction, season, participants, roster_ids_by_owner, display_by_user_id, managers, players_by_id):
+    adds = transaction.get("adds") or {}
+    drops = transaction.get("drops") or {}
+    for user_id in participants:
+        manager = _ensure_manager(managers, user_id, display_by_user_id.get(user_id, ""))
+        roster_ids = set(roster_ids_by_owner.get(user_id, ()))
+        received = [player_id for player_id, roster_id in adds.items() if str(roster_id) in roster_ids]
+        sent = [player_id for player_id, roster_id in drops.items() if str(roster_id) in roster_ids]
+        received_value = sum(estimate_player_value(players_by_id.get(player_id)) for player_id in received)
+        sent_value = sum(estimate_player_value(players_by_id.get(player_id)) for player_id in sent)
+        counterparts = [display_by_user_id.get(other) or f"user-{other}" for other in participants if other != user_id]
+        manager["trade_timeline"].append(
+            {
+                "timestamp": int(_number(transaction.get("status_updated") or transaction.get("created"))),
+                "date_label": f"{season} W{int(_number(transaction.get('_week')))}" if season else "Trade",
+                "summary": f"Sent {len(sent)} · Received {len(received)} vs {', '.join(counterparts) or 'league'}",
+                "delta": _round(received_value - sent_value, 0),
+            }
+        )
+
+
+def _finalize_manager(manager, my_user_id, tone):
+    display_name = manager["display_name"] or f"Manager {manager['user_id'][:4]}"
+    avg_bid = manager["faab_bid_sum"] / manager["faab_bid_count"] if manager["faab_bid_count"] else 0
+    max_budget = manager["faab_budget_observed"] or 100
+    avg_bid_pct = avg_bid / max_budget
+    total_moves = manager["add_count"] + manager["drop_count"]
+    counterparties = sorted(manager["counterparties"].items(), key=lambda entry: entry[1], reverse=True)
+    counterparty_count = len(counterparties)
+    trade_count = manager["trade_count"]
+
+    aggression_raw = (
+        trade_count * AGGRESSION_WEIGHTS["trade_count"]
+        + manager["waiver_count"] * AGGRESSION_WEIGHTS["waiver_count"]
+        + manager["draft_pick_moves"] * AGGRESSION_WEIGHTS["draft_pick_moves"]
+        + avg_bid_pct * AGGRESSION_WEIGHTS["avg_bid_pct"]
+        + total_moves * AGGRESSION_WEIGHTS["churn_moves"]
+    )
+    top_position = _top_key(manager["position_adds"]) or "N/A"
+    profile_label = manager_label(trade_count, avg_bid_pct, total_moves, tone)
+    insight = (
+        f"{display_name} profiles as {profile_label}. They bias toward {top_position} adds, "
+        f"average {_round(avg_bid_pct * 100, 0)}% of budget per FAAB win, "
+        f"and have traded with {counterparty_count} unique managers."
+    )
+
+    return {
+        "user_id": manager["user_id"],
+        "display_name": display_name,
+        "is_you": str(manager["user_id"]) == str(my_user_id or ""),
+        "seasons_covered": len(manager["seasons"]),
+        "total_transactions": manager["total_transactions"],
+        "waiver_count": manager["waiver_count"],
+        "trade_count": trade_count,
+        "avg_faab_bid": _round(avg_bid, 1),
+        "max_faab_bid": manager["faab_max_bid"],
+        "faab_bid_pct": _round(avg_bid_pct * 100, 1),
+        "draft_pick_moves": manager["draft_pick_moves"],
+        "add_count": manager["add_count"],
+        "drop_count": manager["drop_count"],
+        "top_position_adds": top_position,
+        "profile_label": profile_label,
+        "aggression_raw": aggression_raw,
+        "aggression_score": 0.0,
+        "trade_friendliness_score": _round(_clamp((trade_count * 1.7 + counterparty_count * 2.4) / 3, 1, 10), 1),
+        "risk_tolerance_score": _round(_clamp(avg_bid_pct * 50 + trade_count * 0.8 + total_moves * 0.04, 1, 10), 1),
+        "targeting_cue": _targeting_cue(profile_label, top_position, trade_count),
+        "insight": insight,
+        "counterparty_count": counterparty_count,
+        "top_counterparty_user_id": counterparties[0][0] if counterparties else None,
+        "top_counterparty_trades": counterparties[0][1] if counterparties else 0,
+        "trade_timeline": _latest_events(manager["trade_timeline"]),
+    }
+
+
+def new_aggregates():
+    """Running per-manager aggregates plus league totals, folded by fold_season."""
+    return {"managers": {}, "totals": {"transactions": 0, "waivers": 0, "trades": 0, "faab_bid": 0.0}}
+
+
+def fold_season(aggregates, season, players_by_id, *, include_trade_timeline=True):
+    """Fold one season's transactions into aggregates in place; returns how many were counted.
+
+    season is {"league", "users", "rosters", "transactions"} of raw Sleeper
+    payloads; transactions carry their week as "_week". players_by_id maps
+    Sleeper player ids to {"position", "age", "years_exp"}. Folding a season's
+    transactions in batches gives the same aggregates as folding them at once.
+    """
+    managers = aggregates["managers"]
+    totals = aggregates["totals"]
+    players_by_id = players_by_id or {}
+    league = season.get("league") or {}
+    waiver_budget = _number((league.get("settings") or {}).get("waiver_budget")) or 100
+    season_label = str(league.get("season") or "")
+    owner_by_roster_id = {}
+    roster_ids_by_owner = {}
+    display_by_user_id = {}
+    folded = 0
+
+    for user in season.get("users") or []:
+        user_id = str(user.get("user_id") or "")
+        if user_id:
+            display_by_user_id[user_id] = user.get("display_name") or user.get("username") or f"user-{user_id}"
+
+    for roster in season.get("rosters") or []:
+        roster_id = str(roster.get("roster_id") or "")
+        owner_id = str(roster.get("owner_id") or "")
+        if not roster_id or not owner_id:
+            continue
+        owner_by_roster_id[roster_id] = owner_id
+        roster_ids_by_owner.setdefault(owner_id, []).append(roster_id)
+        _ensure_manager(managers, owner_id, display_by_user_id.get(owner_id, ""))
+
+    for transaction in season.get("transactions") or []:
+        if not is_completed_transaction(transaction):
+            continue
+        folded += 1
+        totals["transactions"] += 1
+        kind = str(transaction.get("type") or "unknown").lower()
+        if kind == "waiver":
+            totals["waivers"] += 1
+        if kind == "trade":
+            totals["trades"] += 1
+
+        participants = _participant_user_ids(transaction, owner_by_roster_id)
+        if not participants:
+            continue
+        involved = [_ensure_manager(managers, user_id, display_by_user_id.get(user_id, "")) for user_id in participants]
+        for manager in involved:
+            manager["seasons"].add(season_label)
+            manager["total_transactions"] += 1
+
+        if kind in ("waiver", "free_agent"):
+            bid = _number((transaction.get("settings") or {}).get("waiver_bid"))
+            if bid > 0:
+                totals["faab_bid"] += bid
+            for manager in involved:
+                manager["waiver_count"] += 1
+                if bid > 0:
+                    manager["faab_bid_sum"] += bid
+                    manager["faab_bid_count"] += 1
+                    manager["faab_max_bid"] = max(manager["faab_max_bid"], bid)
+                    manager["faab_budget_observed"] = max(manager["faab_budget_observed"], waiver_budget)
+
+        if kind == "trade":
+            for user_id, manager in zip(participants, involved):
+                manager["trade_count"] += 1
+                for counterpart in participants:
+                    if counterpart != user_id:
+                        manager["counterparties"][counterpart] = manager["counterparties"].get(counterpart, 0) + 1
+            for pick in transaction.get("draft_picks") or []:
+                owner_id = str((pick or {}).get("owner_id") or "")
+                if owner_id:
+                    _ensure_manager(managers, owner_id, display_by_user_id.get(owner_id, ""))["draft_pick_moves"] += 1
+            if include_trade_timeline:
+                _push_trade_timeline(
+                    transaction,
+                    int(_number(league.get("season"))),
+                    participants,
+                    roster_ids_by_owner,
+                    display_by_user_id,
+                    managers,
+                    players_by_id,
+                )
+                for manager in involved:
+                    manager["trade_timeline"] = _latest_events(manager["trade_timeline"])
+
+        for key, count_key, position_key in (("adds", "add_count", "position_adds"), ("drops", "drop_count", "position_drops")):
+            for player_id, roster_id in (transaction.get(key) or {}).items():
+                owner_id = owner_by_roster_id.get(str(roster_id))
+                if not owner_id:
+                    continue
+                manager = _ensure_manager(managers, owner_id, display_by_user_id.get(owner_id, ""))
+                manager[count_key] += 1
+                position = normalize_position((players_by_id.get(player_id) or {}).get("position"))
+                if position:
+                    manager[position_key][position] = manager[position_key].get(position, 0) + 1
+    return folded
+
+
+def _latest_events(events):
+    return sorted(events, key=lambda event: event["timestamp"], reverse=True)[:TRADE_TIMELINE_LIMIT]
+
+
+def merge_aggregates(parts):
+    """Combine per-season aggregates, newest season first, as if folded in one pass."""
+    merged = new_aggregates()
+    for part in parts:
+        for key, value in part["totals"].items():
+            merged["totals"][key] += value
+        for user_id, manager in part["managers"].items():
+            target = merged["managers"].get(user_id)
+            if target is None:
+                target = merged["managers"][user_id] = _new_manager(user_id, "")
+            if manager["display_name"]:
+                target["display_name"] = manager["display_name"]
+            target["seasons"] |= set(manager["seasons"])
+            for key in SUMMED_FIELDS:
+                target[key] += manager[key]
+            for key in MAX_FIELDS:
+                target[key] = max(target[key], manager[key])
+            for key in COUNTER_FIELDS:
+                for name, count in manager[key].items():
+                    target[key][name] = target[key].get(name, 0) + count
+            target["trade_timeline"] = _latest_events(target["trade_timeline"] + manager["trade_timeline"])
+    return merged
+
+
+def aggregates_to_json(aggregates):
+    managers = {user_id: {**manager, "seasons": sorted(manager["seasons"])} for user_id, manager in aggregates["managers"].items()}
+    return json.dumps({"managers": managers, "totals": aggregates["totals"]}, separators=(",", ":"))
+
+
+def aggregates_from_json(raw):
+    payload = json.loads(raw)
+    for manager in payload["managers"].values():
+        manager["seasons"] = set(manager["seasons"])
+    return payload
+
+
+def finalize_report(aggregates, seasons_analyzed, my_user_id, *, tone="intel"):
+    """Turn aggregates into {"summary": {...}, "managers": [...]}, managers sorted by aggression, highest first."""
+    totals = aggregates["totals"]
+    profiles = [_finalize_manager(manager, my_user_id, tone) for manager in aggregates["managers"].values()]
+    max_raw = max([profile["aggression_raw"] for profile in profiles] + [1])
+    for profile in profiles:
+        profile["aggression_score"] = _round(profile["aggression_raw"] / max_raw * 100, 1)
+    profiles.sort(key=lambda profile: profile["aggression_score"], reverse=True)
+
+    return {
+        "summary": {
+            "seasons_analyzed": seasons_analyzed,
+            "leagues_traversed": seasons_analyzed,
+            "total_transactions": totals["transactions"],
+            "total_waivers": totals["waivers"],
+            "total_trades": totals["trades"],
+            "total_faab_bid": _round(totals["faab_bid"], 0),
+            "managers_analyzed": len(profiles),
+        },
+        "managers": profiles,
+    }
+
+
+def build_adversarial_intel_report(season_data, my_user_id, players_by_id, *, tone="intel", include_trade_timeline=True):
+    """Fold every season (newest first) in one pass and finalize; the reference for the incremental store."""
+    aggregates = new_aggregates()
+    for season in season_data or []:
+        fold_season(aggregates, season, players_by_id, include_trade_timeline=include_trade_timeline)
+    return finalize_report(aggregates, len(season_data or []), my_user_id, tone=tone)
+
+
+def _derive_window_tag(avg_age, starter_value):
+    if starter_value >= 36000 and 24.5 <= avg_age <= 28.0:
+        return "Contender"
+    if avg_age < 24.8:
+        return "Rebuilder"
+    if starter_value < 28000 and avg_age > 27.5:
+        return "Tanking"
+    return "Competitive"
+
+
+def _default_roster_context():
+    return {
+        "position_strengths": {position: {"count": 0, "ratio": 0, "label": "Average"} for position in EXPECTED_DEPTH},
+        "weak_positions": ["RB", "TE"],
+        "avg_roster_age": 26.0,
+        "starter_value": 30000,
+        "faab_remaining": 50,
+        "window_tag": "Competitive",
+    }
+
+
+def build_roster_context(season, players_by_id):
+    """Map owner user_id -> roster shape for one season of {"league", "rosters"}."""
+    if not season:
+        return {}
+    players_by_id = players_by_id or {}
+    league_budget = _number(((season.get("league") or {}).get("settings") or {}).get("waiver_budget")) or 100
+    result = {}
+    for roster in season.get("rosters") or []:
+        owner_id = str(roster.get("owner_id") or "")
+        if not owner_id:
+            continue
+        player_ids = dict.fromkeys([*(roster.get("players") or []), *(roster.get("reserve") or []), *(roster.get("taxi") or [])])
+        grouped = {position: [] for position in EXPECTED_DEPTH}
+        ages = []
+        for player_id in player_ids:
+            player = players_by_id.get(player_id)
+            position = normalize_position((player or {}).get("position"))
+            if position:
+                grouped[position].append(player)
+            age = infer_player_age(player)
+            if age is not None:
+                ages.append(age)
+
+        strengths = {}
+        ratios = []
+        for position, expected in EXPECTED_DEPTH.items():
+            count = len(grouped[position])
+            ratio = count / expected
+            label = "Elite" if ratio >= 1.2 else "Strong" if ratio >= 0.95 else "Average" if ratio >= 0.75 else "WEAK"
+            strengths[position] = {"count": count, "ratio": _round(ratio, 2), "label": label}
+            ratios.append((ratio, position))
+        weakest = [position for _, position in sorted(ratios, key=lambda entry: entry[0])[:2]]
+
+        starter_value = _round(
+            _top_position_value(grouped["QB"], 1)
+            + _top_position_value(grouped["RB"], 2)
+            + _top_position_value(grouped["WR"], 2)
+            + _top_position_value(grouped["TE"], 1),
+            0,
+        )
+        avg_age = _round(sum(ages) / len(ages), 1) if ages else 26.0
+        used_budget = _number((roster.get("settings") or {}).get("waiver_budget_used"))
+        result[owner_id] = {
+            "position_strengths": strengths,
+            "weak_positions": weakest,
+            "avg_roster_age": avg_age,
+            "starter_value": starter_value,
+            "faab_remaining": _clamp(league_budget - used_budget, 0, league_budget),
+            "window_tag": _derive_window_tag(avg_age, starter_value),
+        }
+    return result
+
+
+def _trade_pattern(profile):
+    top_position = profile.get("top_position_adds") or "WR"
+    return {
+        "buys": "RB depth, immediate starters" if top_position == "RB" else "young WRs, draft picks",
+        "sells": "aging RBs, fringe veterans" if top_position == "WR" else "bench depth, aging pieces",
+        "avoids": "high-variance packages" if profile.get("trade_friendliness_score", 0) <= 3 else "1-for-1 QB swaps",
+    }
+
+
+def faab_predictor(profile):
+    base = profile.get("avg_faab_bid") or 8
+    spread = max(2, _round(base * (0.2 + profile["aggression_score"] / 180), 0))
+    low = max(1, _round(base - spread * 0.5, 0))
+    high = max(low + 1, _round(base + spread, 0))
+    waivers = profile.get("waiver_count", 0)
+    confidence = "High" if waivers >= 18 else "Medium" if waivers >= 8 else "Low"
+    reasoning = (
+        f"Needs at {', '.join(profile.get('weak_positions') or [])}, style \"{profile['profile_label']}\", "
+        f"and aggression {_round(profile['aggression_score'] / 10, 1)}/10 suggest a {confidence.lower()} confidence bid range."
+    )
+    return {"low": low, "high": high, "confidence": confidence, "reasoning": reasoning}
+
+
+def merge_roster_context(report, latest_season, players_by_id):
+    """Add the latest season's roster shape, a trade pattern and a FAAB bid range to each manager, in place."""
+    context_by_user = build_roster_context(latest_season, players_by_id)
+    for profile in report.get("managers") or []:
+        profile.update(context_by_user.get(profile["user_id"]) or _default_roster_context())
+        profile["trade_pattern"] = _trade_pattern(profile)
+        profile["faab_predictor"] = faab_predictor(profile)
+    return report
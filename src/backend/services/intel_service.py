@@ -1,19 +1,298 @@
 from __future__ import annotations
 
-from src.backend.db.repositories.bootstrap_repository import fetch_health_summary
+import asyncio
+import threading
+import time
+import zlib
 
+import live_data
 
-def build_league_intel_report(*, league_id: str, lookback: int) -> dict:
-    # Placeholder intelligence report for v2 parity bootstrap. Sleeper-auth manager
-    # profiling will be layered in subsequent iterations of the rewrite.
-    health = fetch_health_summary()
+from src.backend.db.repositories.manager_profiles_repository import (
+    read_league_profile,
+    read_transaction_marks,
+    save_league_profile,
+    save_transaction_marks,
+)
+from src.backend.db.repositories.players_repository import fetch_players_by_ids
+from src.backend.db.repositories.sleeper_cache_repository import (
+    purge_expired_sleeper_cache,
+    read_sleeper_cache,
+    write_sleeper_cache,
+)
+from src.backend.db.session import db_connection, db_transaction
+from src.backend.services import intel_profiles
+from src.backend.services.sleeper_client import SLEEPER_REGULAR_SEASON_WEEKS, SleeperClient, get_sleeper_client
+
+MAX_LOOKBACK = 4
+# Sleeper league payloads are shared by every user of a league, so one user's
+# report warms the cache for the rest. Rosters and transactions move during the
+# season; a completed season never changes again.
+SLEEPER_CACHE_TTL_SECONDS = {
+    "league": 6 * 60 * 60,
+    "users": 30 * 60,
+    "rosters": 10 * 60,
+    "transactions": 10 * 60,
+}
+COMPLETED_SEASON_TTL_SECONDS = 7 * 24 * 60 * 60
+
+# Fixed pools of striped locks, so arbitrary caller-supplied league ids cannot
+# grow memory. Reports hold a report lock while taking profile locks, so the
+# two use separate pools and nest in one order only.
+LEAGUE_LOCK_STRIPES = 64
+_REPORT_LOCKS = tuple(threading.Lock() for _ in range(LEAGUE_LOCK_STRIPES))
+_PROFILE_LOCKS = tuple(threading.Lock() for _ in range(LEAGUE_LOCK_STRIPES))
+
+
+class LeagueNotFoundError(LookupError):
+    pass
+
+
+def _league_lock(league_id: str, locks: tuple[threading.Lock, ...] = _REPORT_LOCKS) -> threading.Lock:
+    # Concurrent reports for one league wait for the first load and then read
+    # its payloads from the cache instead of fetching the same weeks again.
+    return locks[zlib.crc32(league_id.encode("utf-8")) % len(locks)]
+
+
+def _resource_ttl(resource: str, league: dict | None) -> int:
+    if league and str(league.get("status") or "").lower() == "complete":
+        return COMPLETED_SEASON_TTL_SECONDS
+    return SLEEPER_CACHE_TTL_SECONDS[resource]
+
+
+class LeagueDataLoader:
+    """Reads Sleeper league payloads through the sleeper_cache table.
+
+    Misses are fetched with SleeperClient.get_many, which bounds the requests
+    in flight across every report, and written back in one transaction.
+    """
+
+    def __init__(self, client: SleeperClient, *, now: float | None = None):
+        self.client = client
+        self.now = time.time() if now is None else now
+        self.stats = {"cache_hits": 0, "fetched": 0, "failed": 0, "weeks_fetched": 0}
+
+    async def fetch_many(self, requests: list[dict]) -> dict[str, object]:
+        paths = [request["path"] for request in requests]
+        with db_connection() as connection:
+            payloads = read_sleeper_cache(connection, paths=paths, now=self.now)
+        self.stats["cache_hits"] += len(payloads)
+
+        missing = [request for request in requests if request["path"] not in payloads]
+        results = await self.client.get_many([request["path"] for request in missing], return_exceptions=True)
+        entries = []
+        for request, result in zip(missing, results):
+            if isinstance(result, Exception):
+                self.stats["failed"] += 1
+                # A missing transaction week only thins the report; the
+                # league, its users and its rosters are required.
+                if request["resource"] == "transactions":
+                    continue
+                raise result
+            if result is None:
+                continue
+            payloads[request["path"]] = result
+            entries.append({**request, "payload": result})
+        self.stats["fetched"] += len(entries)
+
+        if entries:
+            with db_transaction() as connection:
+                purge_expired_sleeper_cache(connection, now=self.now)
+                write_sleeper_cache(connection, entries=entries, fetched_at=self.now)
+        return payloads
+
+    async def fetch_league_chain(self, league_id: str, lookback: int) -> list[dict]:
+        leagues: list[dict] = []
+        seen: set[str] = set()
+        current = league_id
+        while current and current != "0" and current not in seen and len(leagues) < lookback:
+            seen.add(current)
+            path = f"/league/{current}"
+            request = {"path": path, "league_id": current, "resource": "league", "ttl_seconds": SLEEPER_CACHE_TTL_SECONDS["league"]}
+            league = (await self.fetch_many([request])).get(path)
+            if not isinstance(league, dict) or not league.get("league_id"):
+                break
+            leagues.append(league)
+            current = str(league.get("previous_league_id") or "")
+        return leagues
+
+    async def fetch_season_data(self, leagues: list[dict], open_weeks: dict[str, list[int]]) -> list[dict]:
+        requests = []
+        for league in leagues:
+            league_id = str(league["league_id"])
+            for resource in ("users", "rosters"):
+                requests.append(
+                    {
+                        "path": f"/league/{league_id}/{resource}",
+                        "league_id": league_id,
+                        "resource": resource,
+                        "ttl_seconds": _resource_ttl(resource, league),
+                    }
+                )
+            for week in open_weeks.get(league_id, ()):
+                requests.append(
+                    {
+                        "path": f"/league/{league_id}/transactions/{week}",
+                        "league_id": league_id,
+                        "resource": "transactions",
+                        "ttl_seconds": _resource_ttl("transactions", league),
+                    }
+                )
+        payloads = await self.fetch_many(requests)
+
+        season_data = []
+        for league in leagues:
+            league_id = str(league["league_id"])
+            weeks = {}
+            for week in open_weeks.get(league_id, ()):
+                week_payload = payloads.get(f"/league/{league_id}/transactions/{week}")
+                if isinstance(week_payload, list):
+                    weeks[week] = [transaction for transaction in week_payload if isinstance(transaction, dict)]
+            self.stats["weeks_fetched"] += len(weeks)
+            users = payloads.get(f"/league/{league_id}/users")
+            rosters = payloads.get(f"/league/{league_id}/rosters")
+            season_data.append(
+                {
+                    "league": league,
+                    "users": users if isinstance(users, list) else [],
+                    "rosters": rosters if isinstance(rosters, list) else [],
+                    "weeks": weeks,
+                }
+            )
+        return season_data
+
+
+def _sealed_through(league: dict) -> int:
+    # Weeks up to this one can no longer gain transactions: all of a completed
+    # season, else those two legs behind the current one (one leg of slack
+    # covers a transactions page read from the cache just before the leg moved).
+    if str(league.get("status") or "").lower() == "complete":
+        return SLEEPER_REGULAR_SEASON_WEEKS
+    try:
+        leg = int((league.get("settings") or {}).get("leg") or 0)
+    except (TypeError, ValueError):
+        leg = 0
+    return max(0, leg - 2)
+
+
+def _transaction_ms(transaction: dict) -> int:
+    try:
+        return int(transaction.get("status_updated") or transaction.get("created") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _new_since_mark(week: int, payload: list[dict], mark: dict) -> tuple[list[dict], dict]:
+    """Completed transactions after the week's high-water mark, and the advanced mark.
+
+    The mark is the newest folded status_updated plus the ids folded at exactly
+    that time, so transactions sharing a timestamp are neither lost nor folded twice.
+    """
+    folded_at_mark = set(mark["high_water_ids"])
+    high_water = mark["high_water_ms"]
+    high_water_ids = set(folded_at_mark)
+    fresh = []
+    for transaction in payload:
+        if not intel_profiles.is_completed_transaction(transaction):
+            continue
+        stamp = _transaction_ms(transaction)
+        transaction_id = str(transaction.get("transaction_id") or "")
+        if stamp < mark["high_water_ms"] or (stamp == mark["high_water_ms"] and transaction_id in folded_at_mark):
+            continue
+        fresh.append({**transaction, "_week": week})
+        if stamp > high_water:
+            high_water, high_water_ids = stamp, set()
+        if stamp == high_water:
+            high_water_ids.add(transaction_id)
+    return fresh, {"high_water_ms": high_water, "high_water_ids": high_water_ids, "sealed": mark["sealed"]}
+
+
+def refresh_league_profile(season: dict) -> tuple[dict, int]:
+    """Fold a season's not-yet-seen transactions into its stored aggregates; returns (aggregates, folded)."""
+    league = season["league"]
+    league_id = str(league["league_id"])
+    sealed_through = _sealed_through(league)
+    with _league_lock(league_id, _PROFILE_LOCKS), db_transaction() as connection:
+        stored = read_league_profile(connection, league_id=league_id)
+        aggregates = intel_profiles.aggregates_from_json(stored["aggregates_json"]) if stored else intel_profiles.new_aggregates()
+        marks = read_transaction_marks(connection, league_ids=[league_id]).get(league_id, {})
+        fresh = []
+        for week, payload in sorted(season["weeks"].items()):
+            mark = marks.get(week) or {"high_water_ms": 0, "high_water_ids": [], "sealed": False}
+            if mark["sealed"]:
+                continue
+            week_fresh, marks[week] = _new_since_mark(week, payload, mark)
+            marks[week]["sealed"] = week <= sealed_through
+            fresh.extend(week_fresh)
+
+        players_by_id = fetch_players_by_ids(connection, intel_profiles.collect_player_ids([{"transactions": fresh}]))
+        folded = intel_profiles.fold_season(aggregates, {**season, "transactions": fresh}, players_by_id)
+        save_league_profile(
+            connection,
+            league_id=league_id,
+            season=str(league.get("season") or ""),
+            aggregates_json=intel_profiles.aggregates_to_json(aggregates),
+            transactions_folded=(stored["transactions_folded"] if stored else 0) + folded,
+            updated_at=live_data.utc_now_iso(),
+        )
+        save_transaction_marks(connection, league_id=league_id, marks=marks)
+    return aggregates, folded
+
+
+async def load_league_history(client: SleeperClient, league_id: str, lookback: int) -> tuple[list[dict], dict]:
+    loader = LeagueDataLoader(client)
+    leagues = await loader.fetch_league_chain(league_id, lookback)
+    if not leagues:
+        raise LeagueNotFoundError(f"Sleeper league {league_id} not found")
+    league_ids = [str(league["league_id"]) for league in leagues]
+    with db_connection() as connection:
+        marks = read_transaction_marks(connection, league_ids=league_ids)
+    open_weeks = {
+        league_id: [
+            week
+            for week in range(1, SLEEPER_REGULAR_SEASON_WEEKS + 1)
+            if not marks.get(league_id, {}).get(week, {}).get("sealed")
+        ]
+        for league_id in league_ids
+    }
+    return await loader.fetch_season_data(leagues, open_weeks), loader.stats
+
+
+def build_league_intel_report(
+    *,
+    league_id: str,
+    lookback: int,
+    user_id: str = "",
+    tone: str = "intel",
+    client: SleeperClient | None = None,
+) -> dict:
+    league_id = str(league_id or "").strip()
+    lookback = max(1, min(int(lookback or 1), MAX_LOOKBACK))
+    with _league_lock(league_id):
+        season_data, cache_stats = asyncio.run(load_league_history(client or get_sleeper_client(), league_id, lookback))
+        parts = []
+        folded = 0
+        for season in season_data:
+            aggregates, season_folded = refresh_league_profile(season)
+            parts.append(aggregates)
+            folded += season_folded
+
+    with db_connection() as connection:
+        players_by_id = fetch_players_by_ids(connection, intel_profiles.collect_player_ids(season_data[:1]))
+
+    report = intel_profiles.finalize_report(intel_profiles.merge_aggregates(parts), len(season_data), user_id, tone=tone)
+    intel_profiles.merge_roster_context(report, season_data[0], players_by_id)
+    latest = season_data[0]["league"]
     return {
         "league_id": league_id,
-        "lookback": max(1, min(int(lookback or 1), 4)),
+        "lookback": lookback,
+        "user_id": user_id or None,
         "summary": {
-            "players_indexed": health.get("players", 0),
-            "stats_rows": health.get("stats_rows", 0),
-            "note": "v2 intel endpoint is active; manager profiling expansion is next in queue.",
+            **report["summary"],
+            "league_name": latest.get("name"),
+            "seasons": [str(season["league"].get("season") or "") for season in season_data],
+            "players_resolved": len(players_by_id),
+            "transactions_folded": folded,
+            "sleeper_cache": cache_stats,
         },
-        "managers": [],
+        "managers": report["managers"],
     }
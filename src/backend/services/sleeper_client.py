@@ -1,14 +1,29 @@
 from __future__ import annotations
 
 import asyncio
+import http.client
 import json
+import threading
 import time
 import urllib.error
-import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache, partial
+
+import http_fetch
 
 from src.backend.config import get_settings
 
+SLEEPER_REGULAR_SEASON_WEEKS = 18
+# Returned by a hedge that found no spare request slot and so never ran.
+_NO_SLOT = object()
+
+
+class SleeperHTTPError(RuntimeError):
+    def __init__(self, status: int, url: str):
+        super().__init__(f"Sleeper returned HTTP {status} for {url}")
+        self.status = status
+
 
 @dataclass
 class SleeperClient:
@@ -19,30 +34,105 @@ class SleeperClient:
         settings = get_settings()
         self._max_concurrency = max(1, settings.sleeper_max_concurrency)
         self._retry_attempts = max(1, settings.sleeper_retry_attempts)
-        self._semaphore: asyncio.Semaphore | None = None
+        self._hedge_after_seconds = max(0, settings.sleeper_hedge_after_ms) / 1000
+        # Reports run their own asyncio.run in threadpool workers, so in-flight
+        # requests are bounded by a thread semaphore taken inside the executor
+        # rather than by a per-loop asyncio.Semaphore.
+        self._slots = threading.BoundedSemaphore(self._max_concurrency)
+        # Hedged requests can hold a second connection and thread per slot. The
+        # executor is the client's own so asyncio.run never waits on a hedge loser.
+        # Pooling, gzip and 429/5xx retries come from the shared http_fetch layer.
+        self._fetcher = http_fetch.HttpFetcher(
+            "FDL-v2/1.0",
+            attempts=self._retry_attempts,
+            backoff_seconds=0.35,
+            max_idle_per_host=self._max_concurrency * 2,
+            sleep=time.sleep,
+        )
+        self._executor = ThreadPoolExecutor(max_workers=self._max_concurrency * 2, thread_name_prefix="sleeper")
+        self._hedge_stats = {"hedges": 0, "hedge_wins": 0}
+
+    @property
+    def stats(self) -> dict[str, int]:
+        fetched = self._fetcher.snapshot()
+        return {"requests": fetched["requests"], "retries": fetched["retries"], **self._hedge_stats}
+
+    @property
+    def connections_opened(self) -> int:
+        return self._fetcher.snapshot()["connections_opened"]
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+        self._fetcher.close()
+
+    def _request_in_slot(self, path: str, hedge: bool = False):
+        # Hedges only use spare slots, so they never queue behind real work.
+        if not self._slots.acquire(blocking=not hedge):
+            return _NO_SLOT
+        try:
+            if hedge:
+                self._hedge_stats["hedges"] += 1
+            return self._request_with_retry(path)
+        finally:
+            self._slots.release()
 
     async def get_json(self, path: str) -> dict | list:
-        if self._semaphore is None:
-            self._semaphore = asyncio.Semaphore(self._max_concurrency)
-        async with self._semaphore:
-            return await asyncio.to_thread(self._request_with_retry, path)
+        loop = asyncio.get_running_loop()
+        primary = loop.run_in_executor(self._executor, self._request_in_slot, path)
+        if not self._hedge_after_seconds:
+            return await primary
+        done, _ = await asyncio.wait({primary}, timeout=self._hedge_after_seconds)
+        if done:
+            return await primary
+        hedge = loop.run_in_executor(self._executor, partial(self._request_in_slot, path, hedge=True))
+        pending = {primary, hedge}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            winner = next(
+                (task for task in done if task.exception() is None and task.result() is not _NO_SLOT), None
+            )
+            if winner is not None:
+                if winner is hedge:
+                    self._hedge_stats["hedge_wins"] += 1
+                # Cancelling only drops the loser's result: its thread
+                # finishes the request and returns the connection to the pool.
+                for task in pending:
+                    task.cancel()
+                return winner.result()
+        return primary.result()
+
+    async def get_many(self, paths: list[str], *, return_exceptions: bool = False) -> list:
+        """Fetch paths concurrently, at most sleeper_max_concurrency at a time, in input order."""
+        return await asyncio.gather(*(self.get_json(path) for path in paths), return_exceptions=return_exceptions)
+
+    async def get_league_transactions(self, league_id: str, weeks: int = SLEEPER_REGULAR_SEASON_WEEKS) -> list[dict]:
+        """Return every week's transactions, each tagged with its "_week"; weeks that fail are skipped."""
+        results = await self.get_many(
+            [f"/league/{league_id}/transactions/{week}" for week in range(1, weeks + 1)],
+            return_exceptions=True,
+        )
+        transactions = []
+        for week, payload in enumerate(results, start=1):
+            if isinstance(payload, list):
+                transactions.extend({**transaction, "_week": week} for transaction in payload if isinstance(transaction, dict))
+        return transactions
 
     def _request_with_retry(self, path: str):
         url = f"{self.base_url.rstrip('/')}/{path.lstrip('/')}"
-        backoff = 0.35
-        last_error: Exception | None = None
-
-        for attempt in range(1, self._retry_attempts + 1):
-            request = urllib.request.Request(url, headers={"User-Agent": "FDL-v2/1.0", "Accept": "application/json"})
-            try:
-                with urllib.request.urlopen(request, timeout=self.timeout_seconds) as response:
-                    raw = response.read()
-                return json.loads(raw.decode("utf-8"))
-            except (urllib.error.URLError, TimeoutError, json.JSONDecodeError, ValueError) as error:
-                last_error = error
-                if attempt >= self._retry_attempts:
-                    break
-                time.sleep(backoff)
-                backoff *= 2
-
+        try:
+            result = self._fetcher.fetch(url, timeout=self.timeout_seconds, accept="application/json")
+            return json.loads(result.body.decode("utf-8"))
+        except urllib.error.HTTPError as error:
+            if error.code < 500 and error.code != 429:
+                raise SleeperHTTPError(error.code, url) from None
+            last_error: Exception = SleeperHTTPError(error.code, url)
+        except (OSError, http.client.HTTPException, ValueError) as error:
+            last_error = error
         raise RuntimeError(f"Sleeper request failed for {url}: {last_error}")
+
+
+@lru_cache(maxsize=1)
+def get_sleeper_client() -> SleeperClient:
+    """Process-wide client, so keep-alive connections outlive a single report."""
+    return SleeperClient()
+
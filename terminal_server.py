@@ -1,16 +1,32 @@
 import argparse
+import email.utils
+import gzip
+import hashlib
+import io
 import json
+import mimetypes
 import os
+import queue
+import socket
 import threading
 import traceback
 from functools import partial
-from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from http.server import HTTPServer, SimpleHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 from urllib.parse import parse_qs, unquote, urlparse
 from urllib.request import Request, urlopen
 import urllib.error
 
+import comps_engine
+import formula_engine
+import league_rosters
 import live_data
+import scoring_engine
+
+try:
+    import brotli  # Optional: only negotiated when the package is installed.
+except ImportError:  # pragma: no cover - depends on the deployment image
+    brotli = None
 
 BASE_DIR = Path(__file__).resolve().parent
 LEGACY_REDIRECTS = {
@@ -61,6 +77,49 @@ STATIC_CACHE_MAX_AGE_BY_EXT = {
 }
 DEFAULT_STATIC_MAX_AGE = 300
 HTML_MAX_AGE = 60
+SERVER_MODES = ("threading", "pool")
+# Routes that can hold a worker for seconds (window temp-table rebuilds, full
+# syncs, outbound LLM calls). They get their own pool so a burst of them cannot
+# starve static assets and health checks.
+EXPENSIVE_API_PATHS = {
+    "/api/screener/query",
+    "/api/screener",
+    "/api/scoring/profiles",
+    "/api/admin/sync",
+    "/api/agents/recommend",
+}
+DEFAULT_FAST_WORKERS = 16
+DEFAULT_FAST_QUEUE = 64
+DEFAULT_HEAVY_WORKERS = 4
+DEFAULT_HEAVY_QUEUE = 16
+# How long a 503 rejection waits to drain what the client already sent.
+OVERLOAD_DRAIN_TIMEOUT_SECONDS = 0.2
+DEFAULT_KEEPALIVE_TIMEOUT_SECONDS = 15
+# Idle keep-alive connections pin a pool worker, so pool mode recycles them faster.
+POOL_KEEPALIVE_TIMEOUT_SECONDS = 2
+# A fast worker waits this long for a new connection's request line before routing it.
+DISPATCH_PEEK_TIMEOUT_SECONDS = POOL_KEEPALIVE_TIMEOUT_SECONDS
+DEFAULT_KEEPALIVE_MAX_REQUESTS = 100
+JSON_COMPRESS_MIN_BYTES = 1024
+JSON_GZIP_LEVEL = 5
+STATIC_GZIP_LEVEL = 9
+COMPRESSIBLE_STATIC_EXTS = {".html", ".js", ".mjs", ".css", ".json", ".svg", ".txt", ".md", ".map"}
+ETAG_ENCODING_SUFFIX = {"br": "br", "gzip": "gz"}
+# Directories (relative to BASE_DIR) whose site assets are loaded at startup;
+# "" means top-level files only, anything else is walked recursively.
+STATIC_PRELOAD_DIRS = ("", "pixel-agents")
+STATIC_CACHE_MAX_FILE_BYTES = 4 * 1024 * 1024
+STATIC_CACHE_MAX_TOTAL_BYTES = 64 * 1024 * 1024
+DEFAULT_STATIC_WATCH_INTERVAL_SECONDS = 2
+# GET endpoints whose payload only changes when synced data changes. Their
+# ETag is derived from the data generation, so revalidation never hits SQLite.
+CACHEABLE_API_PATHS = {"/api/teams", "/api/filter-options", "/api/metrics/catalog", "/api/players", "/api/screener"}
+CACHEABLE_API_PREFIXES = ("/api/players/",)
+API_CACHE_CONTROL = "public, max-age=30, stale-while-revalidate=120"
+# The Sleeper player catalog moves once a day; its strong ETag names the exact
+# document, so clients revalidate hourly and mostly get 304s.
+SLEEPER_CATALOG_CACHE_CONTROL = "public, max-age=3600, stale-while-revalidate=86400"
+OVERLOADED_BODY = json.dumps({"error": "server_busy", "retry_after_seconds": 1}).encode("utf-8")
 
 
 def first(query, key, default=None):
@@ -89,17 +148,11 @@ def should_async_admin_sync(query):
     return env_is_truthy("FDL_ADMIN_SYNC_ASYNC", default=False)
 
 
-def parse_bool(value, default=False):
-    if value is None:
-        return default
-    return str(value).strip().lower() in {"1", "true", "yes", "on"}
-
-
 def should_include_nflverse(query):
     explicit = first(query, "include_nflverse")
     if explicit is None:
         explicit = first(query, "full")
-    return parse_bool(explicit, default=env_is_truthy("FDL_SYNC_INCLUDE_NFLVERSE", default=False))
+    return live_data.parse_bool(explicit, default=env_is_truthy("FDL_SYNC_INCLUDE_NFLVERSE", default=False))
 
 
 def start_background_sync(season, include_nflverse=False):
@@ -132,18 +185,533 @@ def start_background_sync(season, include_nflverse=False):
     return True
 
 
+def available_encodings():
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate_encoding(accept_encoding):
+    """Pick the best supported content-coding from an Accept-Encoding header."""
+    if not accept_encoding:
+        return None
+    weights = {}
+    for token in str(accept_encoding).split(","):
+        name, _, params = token.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        weight = 1.0
+        params = params.strip().lower()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name] = weight
+    best = None
+    best_weight = 0.0
+    for encoding in available_encodings():
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def compress_payload(data, encoding, level=JSON_GZIP_LEVEL):
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(data, quality=min(11, max(1, level)))
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def encoded_etag(etag, encoding):
+    if not encoding or not etag:
+        return etag
+    return f'{etag[:-1]}-{ETAG_ENCODING_SUFFIX[encoding]}"'
+
+
+def static_max_age(ext):
+    if ext == ".html":
+        return HTML_MAX_AGE
+    return STATIC_CACHE_MAX_AGE_BY_EXT.get(ext, DEFAULT_STATIC_MAX_AGE)
+
+
+class StaticAssetCache:
+    """In-process cache of site assets: bytes, compressed variants and headers.
+
+    Entries are keyed by URL path so a hit needs no filesystem access at all.
+    Files change rarely, so staleness is handled out of band by a polling
+    watcher thread and the /api/admin/static/reload endpoint.
+    """
+
+    def __init__(
+        self,
+        base_dir,
+        max_file_bytes=STATIC_CACHE_MAX_FILE_BYTES,
+        max_total_bytes=STATIC_CACHE_MAX_TOTAL_BYTES,
+    ):
+        self.base_dir = Path(base_dir).resolve()
+        self.max_file_bytes = max_file_bytes
+        self.max_total_bytes = max_total_bytes
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._total_bytes = 0
+        self._hits = 0
+        self._loads = 0
+        self._reloads = 0
+        self._watcher = None
+        self._watcher_stop = threading.Event()
+
+    def lookup(self, url_path):
+        entry = self._entries.get(url_path)
+        if entry is not None:
+            self._hits += 1
+        return entry
+
+    def get(self, url_path):
+        entry = self.lookup(url_path)
+        if entry is None:
+            entry = self.load(url_path)
+        return entry
+
+    def load(self, url_path):
+        clean = unquote(str(url_path or "").lstrip("/"))
+        if not clean:
+            return None
+        candidate = (self.base_dir / clean).resolve()
+        try:
+            candidate.relative_to(self.base_dir)
+        except ValueError:
+            return None
+        return self._load_file(candidate)
+
+    def warm(self):
+        for relative_dir in STATIC_PRELOAD_DIRS:
+            root = self.base_dir / relative_dir
+            if not root.is_dir():
+                continue
+            paths = root.iterdir() if not relative_dir else root.rglob("*")
+            for path in sorted(paths):
+                if path.is_file():
+                    self._load_file(path.resolve())
+        return len(self._entries)
+
+    def refresh_changed(self):
+        """Reload entries whose file changed on disk and drop deleted ones."""
+        changed = 0
+        for url_path, entry in list(self._entries.items()):
+            try:
+                stat_result = entry["path"].stat()
+            except OSError:
+                self._evict(url_path)
+                changed += 1
+                continue
+            if (stat_result.st_mtime_ns, stat_result.st_size) != entry["stamp"]:
+                self._evict(url_path)
+                self._load_file(entry["path"])
+                changed += 1
+        if changed:
+            with self._lock:
+                self._reloads += changed
+        return changed
+
+    def reload(self):
+        with self._lock:
+            self._entries = {}
+            self._total_bytes = 0
+            self._reloads += 1
+        return self.warm()
+
+    def start_watcher(self, interval_seconds=DEFAULT_STATIC_WATCH_INTERVAL_SECONDS):
+        if interval_seconds <= 0 or self._watcher is not None:
+            return
+
+        def _watch():
+            while not self._watcher_stop.wait(interval_seconds):
+                try:
+                    self.refresh_changed()
+                except Exception:  # noqa: BLE001
+                    traceback.print_exc()
+
+        self._watcher = threading.Thread(target=_watch, name="fdl-static-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self):
+        self._watcher_stop.set()
+        self._watcher = None
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "hits": self._hits,
+                "loads": self._loads,
+                "reloads": self._reloads,
+            }
+
+    def _evict(self, url_path):
+        with self._lock:
+            entry = self._entries.pop(url_path, None)
+            if entry:
+                self._total_bytes -= entry["size_bytes"]
+
+    def _load_file(self, path):
+        ext = path.suffix.lower()
+        if ext != ".html" and ext not in STATIC_CACHE_MAX_AGE_BY_EXT:
+            return None
+        try:
+            stat_result = path.stat()
+        except OSError:
+            return None
+        if not path.is_file() or stat_result.st_size > self.max_file_bytes:
+            return None
+        try:
+            raw = path.read_bytes()
+        except OSError:
+            return None
+
+        bodies = {None: raw}
+        if ext in COMPRESSIBLE_STATIC_EXTS:
+            for encoding in available_encodings():
+                compressed = compress_payload(raw, encoding, level=STATIC_GZIP_LEVEL)
+                if len(compressed) < len(raw):
+                    bodies[encoding] = compressed
+        size_bytes = sum(len(body) for body in bodies.values())
+        url_path = "/" + path.relative_to(self.base_dir).as_posix()
+        entry = {
+            "path": path,
+            "url_path": url_path,
+            "stamp": (stat_result.st_mtime_ns, stat_result.st_size),
+            "content_type": mimetypes.guess_type(path.name)[0] or "application/octet-stream",
+            "cache_control": f"public, max-age={static_max_age(ext)}, stale-while-revalidate=300",
+            "last_modified": email.utils.formatdate(stat_result.st_mtime, usegmt=True),
+            "etag": f'"{hashlib.sha1(raw).hexdigest()[:20]}"',
+            "vary": len(bodies) > 1,
+            "bodies": bodies,
+            "size_bytes": size_bytes,
+        }
+        with self._lock:
+            previous = self._entries.get(url_path)
+            projected = self._total_bytes - (previous["size_bytes"] if previous else 0) + size_bytes
+            if projected > self.max_total_bytes:
+                return None
+            # Copy-on-write so lookup() can read the dict without taking the lock.
+            entries = dict(self._entries)
+            entries[url_path] = entry
+            self._entries = entries
+            self._total_bytes = projected
+            self._loads += 1
+        return entry
+
+
+STATIC_ASSETS = StaticAssetCache(BASE_DIR)
+
+
+def etag_matches(if_none_match, etag):
+    if not if_none_match or not etag:
+        return False
+    candidates = [token.strip() for token in str(if_none_match).split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def is_cacheable_api_path(path):
+    return path in CACHEABLE_API_PATHS or path.startswith(CACHEABLE_API_PREFIXES)
+
+
+def api_etag(generation, path, query):
+    normalized = "&".join(f"{key}={','.join(values)}" for key, values in sorted(query.items()))
+    digest = hashlib.sha1(f"{generation}|{path}|{normalized}".encode("utf-8")).hexdigest()[:16]
+    return f'W/"g{generation}-{digest}"'
+
+
+def peek_request_path(connection, timeout=DISPATCH_PEEK_TIMEOUT_SECONDS):
+    """Return the path from the request line without consuming it from the socket."""
+    previous_timeout = connection.gettimeout()
+    try:
+        connection.settimeout(timeout)
+        head = connection.recv(2048, socket.MSG_PEEK)
+    except OSError:
+        return ""
+    finally:
+        try:
+            connection.settimeout(previous_timeout)
+        except OSError:
+            pass
+    return request_path_from_head(head)
+
+
+def request_path_from_head(head):
+    request_line = head.split(b"\r\n", 1)[0].decode("latin-1", errors="ignore")
+    parts = request_line.split()
+    if len(parts) < 2:
+        return ""
+    return urlparse(parts[1]).path
+
+
+def classify_request_path(path):
+    return "heavy" if path in EXPENSIVE_API_PATHS else "fast"
+
+
+class WorkerPool:
+    """Fixed set of worker threads draining a bounded connection queue."""
+
+    def __init__(self, name, workers, queue_size, handle):
+        self.name = name
+        self.workers = max(1, int(workers))
+        self.queue_size = max(1, int(queue_size))
+        self._queue = queue.Queue(maxsize=self.queue_size)
+        self._handle = handle
+        self._threads = []
+        self._lock = threading.Lock()
+        self._busy = 0
+        self._accepted = 0
+        self._rejected = 0
+
+    def start(self):
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"fdl-{self.name}-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, item):
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            with self._lock:
+                self._rejected += 1
+            return False
+        with self._lock:
+            self._accepted += 1
+        return True
+
+    def stop(self):
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads = []
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_size": self.queue_size,
+                "queued": self._queue.qsize(),
+                "busy": self._busy,
+                "accepted": self._accepted,
+                "rejected": self._rejected,
+            }
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            with self._lock:
+                self._busy += 1
+            try:
+                self._handle(item)
+            finally:
+                with self._lock:
+                    self._busy -= 1
+
+
+class PooledHTTPServer(HTTPServer):
+    """HTTP server with fixed-size fast/heavy worker pools and bounded queues.
+
+    The accept thread only queues new connections on the fast pool. A fast
+    worker peeks at the request line and moves heavy requests to the heavy
+    pool, so a slow client never stalls accept(). Handlers that keep a
+    connection alive can move it again per request with hand_off(). When the
+    target queue is full the client gets an immediate 503 rather than another
+    thread contending for the GIL and SQLite locks.
+    """
+
+    def __init__(
+        self,
+        server_address,
+        handler_class,
+        fast_workers=DEFAULT_FAST_WORKERS,
+        fast_queue=DEFAULT_FAST_QUEUE,
+        heavy_workers=DEFAULT_HEAVY_WORKERS,
+        heavy_queue=DEFAULT_HEAVY_QUEUE,
+    ):
+        self.pools = {
+            "fast": WorkerPool("fast", fast_workers, fast_queue, self._dispatch),
+            "heavy": WorkerPool("heavy", heavy_workers, heavy_queue, partial(self._process_pooled, pool_name="heavy")),
+        }
+        self._worker_state = threading.local()
+        super().__init__(server_address, handler_class)
+        for pool in self.pools.values():
+            pool.start()
+
+    def process_request(self, request, client_address):
+        if self.pools["fast"].submit((request, client_address, None)):
+            return
+        self.reject_overloaded(request)
+        self.shutdown_request(request)
+
+    def hand_off(self, item, pool_name):
+        """Queue (request, client_address, rfile) on another pool; rejects with a 503 when it is full.
+
+        rfile carries whatever the previous handler already buffered from the
+        socket (None for an untouched connection). Returns False on rejection;
+        the caller still owns, and must close, the socket.
+        """
+        if self.pools[pool_name].submit(item):
+            self._worker_state.handed_off = True
+            return True
+        self.reject_overloaded(item[0])
+        return False
+
+    def worker_pool(self):
+        """Name of the pool the calling worker thread belongs to (None outside the pools)."""
+        return getattr(self._worker_state, "pool", None)
+
+    def take_carried_rfile(self):
+        rfile = getattr(self._worker_state, "rfile", None)
+        self._worker_state.rfile = None
+        return rfile
+
+    def reject_overloaded(self, request):
+        response = (
+            b"HTTP/1.1 503 Service Unavailable\r\n"
+            b"Content-Type: application/json; charset=utf-8\r\n"
+            b"Retry-After: 1\r\n"
+            b"Cache-Control: no-store\r\n"
+            b"Access-Control-Allow-Origin: *\r\n"
+            b"Connection: close\r\n"
+            + f"Content-Length: {len(OVERLOADED_BODY)}\r\n\r\n".encode("ascii")
+            + OVERLOADED_BODY
+        )
+        try:
+            request.settimeout(OVERLOAD_DRAIN_TIMEOUT_SECONDS)
+            # Drain what the client already sent so close() does not turn into an RST.
+            request.recv(65536)
+            request.sendall(response)
+        except OSError:
+            pass
+
+    def _dispatch(self, item):
+        request, client_address, rfile = item
+        if rfile is None and classify_request_path(peek_request_path(request)) == "heavy":
+            if not self.hand_off(item, "heavy"):
+                self.shutdown_request(request)
+            return
+        self._process_pooled(item, pool_name="fast")
+
+    def _process_pooled(self, item, pool_name):
+        request, client_address, rfile = item
+        state = self._worker_state
+        state.pool, state.rfile, state.handed_off = pool_name, rfile, False
+        try:
+            self.finish_request(request, client_address)
+        except Exception:  # noqa: BLE001
+            self.handle_error(request, client_address)
+        finally:
+            state.rfile = None
+            if not state.handed_off:
+                self.shutdown_request(request)
+
+    def pool_snapshot(self):
+        return {name: pool.snapshot() for name, pool in self.pools.items()}
+
+    def server_close(self):
+        super().server_close()
+        for pool in self.pools.values():
+            pool.stop()
+
+
+def configure_keepalive(args):
+    timeout = args.keepalive_timeout
+    if timeout is None:
+        timeout = POOL_KEEPALIVE_TIMEOUT_SECONDS if args.server_mode == "pool" else DEFAULT_KEEPALIVE_TIMEOUT_SECONDS
+    TerminalRequestHandler.timeout = max(1, int(timeout))
+    TerminalRequestHandler.max_requests_per_connection = max(1, int(args.keepalive_max_requests))
+
+
+def build_server(args, handler):
+    if args.server_mode == "pool":
+        return PooledHTTPServer(
+            (args.host, args.port),
+            handler,
+            fast_workers=args.fast_workers,
+            fast_queue=args.fast_queue,
+            heavy_workers=args.heavy_workers,
+            heavy_queue=args.heavy_queue,
+        )
+    return ThreadingHTTPServer((args.host, args.port), handler)
+
+
 class TerminalRequestHandler(SimpleHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # StreamRequestHandler applies this as the socket timeout, which doubles as
+    # the keep-alive idle timeout between requests on one connection.
+    timeout = DEFAULT_KEEPALIVE_TIMEOUT_SECONDS
+    max_requests_per_connection = DEFAULT_KEEPALIVE_MAX_REQUESTS
+
     def __init__(self, *args, **kwargs):
         self._pending_cache_control = None
         self._pending_etag = None
+        self._pending_vary = False
+        self._static_asset = None
+        self._requests_on_connection = 0
+        self._connection_header_sent = False
+        self._handoff_rfile = None
         super().__init__(*args, directory=str(BASE_DIR), **kwargs)
 
+    def setup(self):
+        super().setup()
+        if isinstance(self.server, PooledHTTPServer):
+            carried = self.server.take_carried_rfile()
+            if carried is not None:
+                self.rfile.close()
+                self.rfile = carried
+
+    def handle_one_request(self):
+        if self._requests_on_connection and self._route_next_request_elsewhere():
+            return
+        super().handle_one_request()
+
+    def _route_next_request_elsewhere(self):
+        """Move a keep-alive connection off the fast pool when its next request is heavy.
+
+        Peeking the buffered reader waits for the next request the same way
+        readline would, without consuming it; the heavy worker continues from
+        the same reader.
+        """
+        if not isinstance(self.server, PooledHTTPServer) or self.server.worker_pool() != "fast":
+            return False
+        try:
+            head = self.rfile.peek(2048)
+        except OSError:
+            self.close_connection = True
+            return True
+        if not head:
+            self.close_connection = True
+            return True
+        if classify_request_path(request_path_from_head(head)) != "heavy":
+            return False
+        self.close_connection = True
+        self._handoff_rfile = self.rfile
+        return True
+
+    def finish(self):
+        carried = self._handoff_rfile
+        if carried is None:
+            super().finish()
+            return
+        self.rfile = io.BytesIO()
+        super().finish()
+        self.server.hand_off((self.request, self.client_address, carried), "heavy")
+
     def _reset_response_cache_headers(self):
         self._pending_cache_control = None
         self._pending_etag = None
+        self._pending_vary = False
 
     def _prepare_static_cache_headers(self, parsed):
         self._reset_response_cache_headers()
+        self._static_asset = None
         if parsed.path.startswith("/api/"):
             return False
 
@@ -153,6 +721,31 @@ class TerminalRequestHandler(SimpleHTTPRequestHandler):
         if target_path in LEGACY_REDIRECTS:
             return False
 
+        entry = STATIC_ASSETS.get(target_path)
+        if entry is None:
+            return self._prepare_uncached_static_headers(target_path)
+
+        encoding = None
+        if entry["vary"]:
+            self._pending_vary = True
+            encoding = negotiate_encoding(self.headers.get("Accept-Encoding"))
+            if encoding not in entry["bodies"]:
+                encoding = None
+        self._pending_cache_control = entry["cache_control"]
+        self._pending_etag = encoded_etag(entry["etag"], encoding)
+
+        if etag_matches(self.headers.get("If-None-Match"), self._pending_etag):
+            self.send_response(304)
+            self.send_header("Content-Length", str(len(entry["bodies"][encoding])))
+            self.end_headers()
+            return True
+
+        self._static_asset = (entry, encoding)
+        return False
+
+    def _prepare_uncached_static_headers(self, target_path):
+        # Files outside the asset cache (too large, unknown type) keep the
+        # stat-based validators and are streamed by SimpleHTTPRequestHandler.
         clean = unquote(target_path.lstrip("/"))
         if not clean:
             return False
@@ -166,22 +759,32 @@ class TerminalRequestHandler(SimpleHTTPRequestHandler):
             return False
 
         stat_result = candidate.stat()
-        ext = candidate.suffix.lower()
-        if ext == ".html":
-            max_age = HTML_MAX_AGE
-        else:
-            max_age = STATIC_CACHE_MAX_AGE_BY_EXT.get(ext, DEFAULT_STATIC_MAX_AGE)
+        max_age = static_max_age(candidate.suffix.lower())
         self._pending_cache_control = f"public, max-age={max_age}, stale-while-revalidate=300"
         self._pending_etag = f'W/"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
 
-        incoming_etag = self.headers.get("If-None-Match")
-        if incoming_etag and incoming_etag == self._pending_etag:
+        if etag_matches(self.headers.get("If-None-Match"), self._pending_etag):
             self.send_response(304)
+            self.send_header("Content-Length", str(stat_result.st_size))
             self.end_headers()
             return True
 
         return False
 
+    def send_static_asset(self, include_body=True):
+        entry, encoding = self._static_asset
+        self._static_asset = None
+        body = entry["bodies"][encoding]
+        self.send_response(200)
+        self.send_header("Content-Type", entry["content_type"])
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Last-Modified", entry["last_modified"])
+        self.end_headers()
+        if include_body:
+            self.wfile.write(body)
+
     def do_GET(self):  # noqa: N802
         parsed = urlparse(self.path)
         if self._prepare_static_cache_headers(parsed):
@@ -193,6 +796,9 @@ class TerminalRequestHandler(SimpleHTTPRequestHandler):
         if redirect_target:
             self.redirect_to(redirect_target, parsed.query)
             return
+        if self._static_asset:
+            self.send_static_asset()
+            return
         if parsed.path == "/":
             self.path = "/home.html"
         super().do_GET()
@@ -208,6 +814,9 @@ class TerminalRequestHandler(SimpleHTTPRequestHandler):
         if redirect_target:
             self.redirect_to(redirect_target, parsed.query)
             return
+        if self._static_asset:
+            self.send_static_asset(include_body=False)
+            return
         if parsed.path == "/":
             self.path = "/home.html"
         super().do_HEAD()
@@ -225,9 +834,27 @@ class TerminalRequestHandler(SimpleHTTPRequestHandler):
             query = parse_qs(parsed.query)
             body = self.read_json_body() if method == "POST" else {}
 
+            if method == "GET" and is_cacheable_api_path(parsed.path):
+                generation = live_data.current_data_generation()
+                self._pending_etag = api_etag(generation, parsed.path, query)
+                self._pending_cache_control = API_CACHE_CONTROL
+                if etag_matches(self.headers.get("If-None-Match"), self._pending_etag):
+                    self._pending_vary = True
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+
+            if parsed.path == "/api/admin/static/reload" and method == "POST":
+                entries = STATIC_ASSETS.reload()
+                self.send_json(200, {"ok": True, "entries": entries, "cache": STATIC_ASSETS.snapshot()})
+                return
+
             with live_data.get_connection() as connection:
                 if parsed.path == "/api/health" and method == "GET":
                     payload = live_data.fetch_health_summary(connection)
+                    if isinstance(self.server, PooledHTTPServer):
+                        payload["server_pools"] = self.server.pool_snapshot()
+                    payload["static_cache"] = STATIC_ASSETS.snapshot()
                     self.send_json(200, payload)
                     return
 
@@ -254,26 +881,52 @@ class TerminalRequestHandler(SimpleHTTPRequestHandler):
                     self.send_json(200, {"count": len(items), "items": items})
                     return
 
+                if parsed.path == "/api/metrics/catalog" and method == "GET":
+                    scope = first(query, "scope", "")
+                    if scope and scope.strip().lower() not in live_data.METRIC_CATALOG_SCOPES:
+                        self.send_json(400, {"error": f"scope must be one of {', '.join(live_data.METRIC_CATALOG_SCOPES)}"})
+                        return
+                    payload = live_data.fetch_metric_catalog(
+                        connection,
+                        {"scope": scope, "scope_value": first(query, "scope_value", "")},
+                    )
+                    self.send_json(200, payload)
+                    return
+
                 if parsed.path == "/api/teams" and method == "GET":
                     teams = live_data.fetch_teams(connection)
                     self.send_json(200, {"count": len(teams), "items": teams})
                     return
 
                 if parsed.path == "/api/players" and method == "GET":
-                    items = live_data.fetch_players(
-                        connection,
-                        {
-                            "search": first(query, "search", ""),
-                            "position": first(query, "position", ""),
-                            "team": first(query, "team", ""),
-                            "limit": first(query, "limit", "200"),
-                            "offset": first(query, "offset", "0"),
-                            "sort": first(query, "sort", "points_desc"),
-                        },
-                    )
+                    try:
+                        items = live_data.fetch_players(
+                            connection,
+                            {
+                                "search": first(query, "search", ""),
+                                "position": first(query, "position", ""),
+                                "team": first(query, "team", ""),
+                                "limit": first(query, "limit", "200"),
+                                "offset": first(query, "offset", "0"),
+                                "sort": first(query, "sort", "points_desc"),
+                                "scoring_profile": first(query, "scoring_profile", ""),
+                            },
+                        )
+                    except scoring_engine.ScoringError as error:
+                        self.send_json(400, {"error": f"Invalid scoring profile: {error}"})
+                        return
                     self.send_json(200, {"count": len(items), "items": items})
                     return
 
+                if parsed.path == "/api/scoring/profiles" and method == "POST":
+                    try:
+                        payload = live_data.register_scoring_profile(connection, body)
+                    except scoring_engine.ScoringError as error:
+                        self.send_json(400, {"error": f"Invalid scoring profile: {error}"})
+                        return
+                    self.send_json(200, payload)
+                    return
+
                 if parsed.path == "/api/sleeper/players/by-ids" and method in {"GET", "POST"}:
                     raw_ids = []
                     if method == "GET":
@@ -288,7 +941,7 @@ class TerminalRequestHandler(SimpleHTTPRequestHandler):
                     else:
                         ids = []
 
-                    force_refresh = parse_bool(
+                    force_refresh = live_data.parse_bool(
                         body.get("force_refresh") if method == "POST" else first(query, "force_refresh"),
                         default=False,
                     )
@@ -296,8 +949,43 @@ class TerminalRequestHandler(SimpleHTTPRequestHandler):
                     self.send_json(200, payload)
                     return
 
+                if parsed.path == "/api/sleeper/players/catalog" and method == "GET":
+                    raw_since = str(first(query, "since_generation", "") or "").strip()
+                    since_generation = None
+                    if raw_since:
+                        try:
+                            since_generation = int(raw_since)
+                        except ValueError:
+                            self.send_json(400, {"error": "since_generation must be an integer"})
+                            return
+                    document, etag = live_data.sleeper_player_catalog_document(since_generation)
+                    self._pending_etag = etag
+                    self._pending_cache_control = SLEEPER_CATALOG_CACHE_CONTROL
+                    if_none_match = self.headers.get("If-None-Match")
+                    encoding = negotiate_encoding(self.headers.get("Accept-Encoding"))
+                    if etag_matches(if_none_match, etag) or etag_matches(if_none_match, encoded_etag(etag, encoding)):
+                        self._pending_vary = True
+                        self.send_response(304)
+                        self.end_headers()
+                        return
+                    self.send_json(200, document)
+                    return
+
                 if parsed.path == "/api/screener/query" and method == "POST":
-                    result = live_data.fetch_screener_query(connection, body)
+                    try:
+                        result = live_data.fetch_screener_query(connection, body)
+                    except formula_engine.FormulaError as error:
+                        self.send_json(400, {"error": f"Invalid formula: {error}"})
+                        return
+                    except scoring_engine.ScoringError as error:
+                        self.send_json(400, {"error": f"Invalid scoring profile: {error}"})
+                        return
+                    except league_rosters.LeagueFilterError as error:
+                        self.send_json(400, {"error": f"Invalid league filter: {error}"})
+                        return
+                    except RuntimeError as error:
+                        self.send_json(502, {"error": "provider_network_error", "details": str(error)})
+                        return
                     self.send_json(200, result)
                     return
 
@@ -390,6 +1078,45 @@ class TerminalRequestHandler(SimpleHTTPRequestHandler):
                     self.send_json(200, {"count": len(items), "items": items})
                     return
 
+                if parsed.path == "/api/players/series" and method in {"GET", "POST"}:
+                    if method == "GET":
+                        body = {
+                            key: first(query, key)
+                            for key in (
+                                "player_ids",
+                                "stat_keys",
+                                "season",
+                                "seasons",
+                                "week_start",
+                                "week_end",
+                                "last_n_games",
+                            )
+                        }
+                    try:
+                        payload = live_data.fetch_player_series(connection, body)
+                    except ValueError as error:
+                        self.send_json(400, {"error": str(error)})
+                        return
+                    self.send_json(200, payload)
+                    return
+
+                if parsed.path.startswith("/api/players/") and parsed.path.endswith("/comps") and method == "GET":
+                    player_id = parsed.path[len("/api/players/") : -len("/comps")]
+                    try:
+                        payload = live_data.fetch_player_comps(
+                            connection,
+                            player_id,
+                            {key: first(query, key) for key in ("season", "pool", "metrics", "k")},
+                        )
+                    except comps_engine.CompsError as error:
+                        self.send_json(400, {"error": str(error)})
+                        return
+                    if payload is None:
+                        self.send_json(404, {"error": f"Unknown player: {player_id}"})
+                        return
+                    self.send_json(200, payload)
+                    return
+
                 if parsed.path.startswith("/api/players/") and method == "GET":
                     player_id = parsed.path.split("/api/players/")[1]
                     if not player_id:
@@ -408,7 +1135,9 @@ class TerminalRequestHandler(SimpleHTTPRequestHandler):
                     season = first(query, "season", live_data.current_nfl_season())
                     include_nflverse = should_include_nflverse(query)
                     if method == "POST":
-                        include_nflverse = parse_bool(body.get("include_nflverse"), default=include_nflverse)
+                        include_nflverse = live_data.parse_bool(
+                            body.get("include_nflverse"), default=include_nflverse
+                        )
                     if should_async_admin_sync(query):
                         started = start_background_sync(season=season, include_nflverse=include_nflverse)
                         payload = {
@@ -445,16 +1174,42 @@ class TerminalRequestHandler(SimpleHTTPRequestHandler):
                 },
             )
 
+    def send_header(self, keyword, value):
+        if keyword.lower() == "connection":
+            self._connection_header_sent = True
+        super().send_header(keyword, value)
+
+    def _should_close_after_response(self):
+        if self.close_connection:
+            return True
+        if self._requests_on_connection >= self.max_requests_per_connection:
+            return True
+        # A heavy worker serves one request per connection so idle keep-alive
+        # clients never hold one of the few heavy slots.
+        if isinstance(self.server, PooledHTTPServer):
+            return classify_request_path(urlparse(self.path).path) == "heavy"
+        return False
+
     def end_headers(self):
+        self._requests_on_connection += 1
+        if not self._connection_header_sent:
+            if self._should_close_after_response():
+                self.send_header("Connection", "close")
+            else:
+                remaining = self.max_requests_per_connection - self._requests_on_connection
+                self.send_header("Keep-Alive", f"timeout={int(self.timeout)}, max={remaining}")
+        self._connection_header_sent = False
         self.send_header("Access-Control-Allow-Origin", "*")
         self.send_header("Access-Control-Allow-Methods", "GET, POST, OPTIONS")
         self.send_header("Access-Control-Allow-Headers", "Content-Type")
-        if self.path.startswith("/api/"):
-            self.send_header("Cache-Control", "no-store")
-        elif self._pending_cache_control:
+        if self._pending_cache_control:
             self.send_header("Cache-Control", self._pending_cache_control)
+        elif self.path.startswith("/api/"):
+            self.send_header("Cache-Control", "no-store")
         if self._pending_etag:
             self.send_header("ETag", self._pending_etag)
+        if self._pending_vary:
+            self.send_header("Vary", "Accept-Encoding")
         super().end_headers()
         self._reset_response_cache_headers()
 
@@ -468,23 +1223,45 @@ class TerminalRequestHandler(SimpleHTTPRequestHandler):
             location = f"{location}?{query}"
         self.send_response(302)
         self.send_header("Location", location)
+        self.send_header("Content-Length", "0")
         self.end_headers()
 
     def send_json(self, status_code, payload):
+        if status_code != 200:
+            # Validators and shared caching only apply to successful payloads.
+            self._pending_etag = None
+            self._pending_cache_control = None
         body = json.dumps(payload, ensure_ascii=True).encode("utf-8")
+        encoding = None
+        if len(body) >= JSON_COMPRESS_MIN_BYTES:
+            encoding = negotiate_encoding(self.headers.get("Accept-Encoding"))
+            if encoding:
+                body = compress_payload(body, encoding)
+                if self._pending_etag and not self._pending_etag.startswith("W/"):
+                    # A strong ETag names exact bytes, so each encoding gets its own.
+                    self._pending_etag = encoded_etag(self._pending_etag, encoding)
+        self._pending_vary = True
         self.send_response(status_code)
         self.send_header("Content-Type", "application/json; charset=utf-8")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
         self.send_header("Content-Length", str(len(body)))
         self.end_headers()
         self.wfile.write(body)
 
     def read_json_body(self):
+        if self.headers.get("Transfer-Encoding"):
+            # Chunked bodies are not parsed; drop the connection rather than
+            # misreading the leftover bytes as the next request.
+            self.close_connection = True
+            return {}
         content_length = self.headers.get("Content-Length")
         if not content_length:
             return {}
         try:
             size = int(content_length)
         except ValueError:
+            self.close_connection = True
             return {}
         if size <= 0:
             return {}
@@ -512,6 +1289,55 @@ def parse_args():
         default=live_data.current_nfl_season(),
         help="NFL season for initial sync",
     )
+    parser.add_argument(
+        "--server-mode",
+        choices=SERVER_MODES,
+        default=env_choice("FDL_SERVER_MODE", SERVER_MODES, default="threading"),
+        help="threading: one thread per connection; pool: bounded fast/heavy worker pools",
+    )
+    parser.add_argument(
+        "--fast-workers",
+        type=int,
+        default=env_int("FDL_FAST_WORKERS", DEFAULT_FAST_WORKERS),
+        help="Worker threads for static, health and other cheap requests (pool mode)",
+    )
+    parser.add_argument(
+        "--fast-queue",
+        type=int,
+        default=env_int("FDL_FAST_QUEUE", DEFAULT_FAST_QUEUE),
+        help="Pending connections allowed for the fast pool before returning 503",
+    )
+    parser.add_argument(
+        "--heavy-workers",
+        type=int,
+        default=env_int("FDL_HEAVY_WORKERS", DEFAULT_HEAVY_WORKERS),
+        help="Worker threads for screener queries and admin sync (pool mode)",
+    )
+    parser.add_argument(
+        "--heavy-queue",
+        type=int,
+        default=env_int("FDL_HEAVY_QUEUE", DEFAULT_HEAVY_QUEUE),
+        help="Pending connections allowed for the heavy pool before returning 503",
+    )
+    parser.add_argument(
+        "--keepalive-timeout",
+        type=int,
+        default=env_int("FDL_KEEPALIVE_TIMEOUT", None),
+        help="Idle seconds before a keep-alive connection is closed "
+        f"(default {DEFAULT_KEEPALIVE_TIMEOUT_SECONDS}, or {POOL_KEEPALIVE_TIMEOUT_SECONDS} in pool mode)",
+    )
+    parser.add_argument(
+        "--keepalive-max-requests",
+        type=int,
+        default=env_int("FDL_KEEPALIVE_MAX_REQUESTS", DEFAULT_KEEPALIVE_MAX_REQUESTS),
+        help="Requests served on one connection before it is closed",
+    )
+    parser.add_argument(
+        "--static-watch-interval",
+        type=int,
+        default=env_int("FDL_STATIC_WATCH_INTERVAL", DEFAULT_STATIC_WATCH_INTERVAL_SECONDS),
+        help="Seconds between mtime checks of cached static assets (0 disables the watcher)",
+    )
     return parser.parse_args()
 
 
@@ -522,6 +1348,18 @@ def env_is_truthy(name, default=False):
     return str(raw).strip().lower() in {"1", "true", "yes", "on"}
 
 
+def env_int(name, default):
+    raw = os.getenv(name)
+    if raw is None or not str(raw).strip().isdigit():
+        return default
+    return int(raw)
+
+
+def env_choice(name, choices, default):
+    raw = str(os.getenv(name) or "").strip().lower()
+    return raw if raw in choices else default
+
+
 def run_sync_task(season=None, include_nflverse=False):
     with live_data.get_connection() as connection:
         summary = live_data.run_full_sync(connection, season=season, include_nflverse=include_nflverse)
@@ -564,9 +1402,13 @@ def main():
             )
             print(f"Initial sync complete: players={summary['players_upserted']} stats={summary['stats_rows_upserted']}")
 
+    configure_keepalive(args)
+    warmed = STATIC_ASSETS.warm()
+    STATIC_ASSETS.start_watcher(args.static_watch_interval)
+    print(f"Cached {warmed} static assets in memory ({', '.join(available_encodings())} variants)")
     handler = partial(TerminalRequestHandler)
-    server = ThreadingHTTPServer((args.host, args.port), handler)
-    print(f"Serving Fourth Down Labs terminal on http://{args.host}:{args.port}")
+    server = build_server(args, handler)
+    print(f"Serving Fourth Down Labs terminal on http://{args.host}:{args.port} (mode={args.server_mode})")
 
     if sync_on_start_env:
         if sync_blocking_env:
@@ -0,0 +1,275 @@
+"""Screener benchmarks on a synthetic league-sized database.
+
+Run with ``make bench`` (or ``PYTHONPATH=. python3 tests/benchmarks/bench_screener.py``).
+Timings bypass the screener result cache so every run executes the query.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import live_data
+import screener_index
+
+POSITIONS = ["QB", "RB", "WR", "TE", "K", "DEF", "OL", "DL", "LB", "DB"]
+TEAMS = ["ARI", "ATL", "BAL", "BUF", "CAR", "CHI", "CIN", "CLE", "DAL", "DEN", "DET", "GB", "HOU", "IND", "JAX", "KC"]
+
+LAB_VIEWS = {
+    "default": {},
+    "wr_target_share": {"positions": ["WR"], "sort_key": "target_share"},
+    "rb_filtered": {
+        "positions": ["RB"],
+        "sort_key": "rushing_yards",
+        "filters": [{"key": "stat_03", "op": "gte", "value": 40}, {"key": "stat_07", "op": "lt", "value": 80}],
+    },
+    "all_players_asc": {"relevance": "all", "sort_key": "stat_11", "sort_direction": "asc"},
+    "page_5": {"sort_key": "receiving_yards", "offset": 800, "limit": 200},
+    "wr_top_decile": {
+        "positions": ["WR"],
+        "sort_key": "target_share__pct",
+        "filters": [{"key": "target_share__pct", "op": "gte", "value": 90}],
+    },
+    "wr_formula": {
+        "positions": ["WR"],
+        "formulas": [{"name": "blend", "expression": "target_share__pct * 0.6 + stat_03__pct * 0.4"}],
+        "sort_key": "blend",
+        "filters": [{"key": "blend", "op": "gte", "value": 50}],
+    },
+    "custom_scoring": {"scoring_profile": "BENCH"},
+    "sparklines": {"include": ["sparklines"]},
+}
+BENCH_SCORING = {"rec": 1, "rec_yd": 0.1, **{f"stat_{index:02d}": 0.05 for index in range(12)}, "bonus_rec_te": 0.5}
+
+
+def seed(connection, players, fantasy_players, stat_keys, weeks, rng):
+    now = live_data.utc_now_iso()
+    player_rows = []
+    for index in range(players):
+        player_rows.append(
+            (
+                f"p{index}",
+                f"Player {index:05d}",
+                "Player",
+                f"{index:05d}",
+                f"player{index:05d}",
+                rng.choice(POSITIONS),
+                rng.choice(TEAMS) if rng.random() > 0.2 else None,
+                "Active" if rng.random() > 0.3 else "Inactive",
+                round(rng.uniform(21, 38), 1) if rng.random() > 0.05 else None,
+                rng.randint(0, 15),
+                now,
+            )
+        )
+    connection.executemany(
+        """
+        INSERT INTO players (
+          player_id, full_name, first_name, last_name, search_full_name, position, team, status, age, years_exp, updated_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        player_rows,
+    )
+    stat_rows, metric_rows = [], []
+    for index in range(fantasy_players):
+        player_id = f"p{index}"
+        for week in range(1, weeks + 1):
+            points = round(max(0.0, rng.gauss(9, 7)), 2)
+            stat_rows.append((player_id, week, now, points, points * 6, points * 4, points * 5, points / 3))
+            for stat_key in stat_keys:
+                if rng.random() < 0.85:
+                    metric_rows.append((player_id, week, stat_key, round(rng.uniform(0, 100), 3), now))
+    connection.executemany(
+        """
+        INSERT INTO player_week_stats (
+          player_id, season, week, season_type, source, updated_at,
+          fantasy_points_ppr, passing_yards, rushing_yards, receiving_yards, receptions
+        ) VALUES (?, 2025, ?, 'regular', 'sleeper', ?, ?, ?, ?, ?, ?)
+        """,
+        stat_rows,
+    )
+    connection.executemany(
+        """
+        INSERT INTO player_week_metrics (player_id, season, week, season_type, source, stat_key, stat_value, updated_at)
+        VALUES (?, 2025, ?, 'regular', 'sleeper', ?, ?, ?)
+        """,
+        metric_rows,
+    )
+    connection.commit()
+    live_data.refresh_latest_metrics(connection)
+
+
+def time_call(function, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def bench_index(connection, repeat):
+    holder = live_data.SCREENER_INDEX
+    started = time.perf_counter()
+    holder.get(connection, live_data.current_data_generation(connection))
+    print(f"index build: {(time.perf_counter() - started) * 1000:.1f} ms  {holder.snapshot()}")
+    print(f"{'view':<18} {'sql ms':>9} {'index ms':>9} {'speedup':>8}")
+    for name, payload in LAB_VIEWS.items():
+        if payload.get("scoring_profile") == "BENCH":
+            payload = {**payload, "scoring_profile": BENCH_SCORING}
+        spec = live_data.normalize_screener_payload(payload)
+        holder.enabled = False
+        expected = live_data.execute_screener_query(connection, spec)["items"]
+        sql_ms = time_call(lambda: live_data.execute_screener_query(connection, spec), repeat)
+        holder.enabled = True
+        actual = live_data.execute_screener_query(connection, spec)["items"]
+        assert [item["player_id"] for item in actual] == [item["player_id"] for item in expected], name
+        index_ms = time_call(lambda: live_data.execute_screener_query(connection, spec), repeat)
+        print(f"{name:<18} {sql_ms:>9.2f} {index_ms:>9.2f} {sql_ms / index_ms:>7.1f}x")
+
+
+def _metrics_fan_out(connection, player_ids, stat_keys):
+    """The pre-compiler v1 shape: one joined row per (player, metric) carrying every player field."""
+    sql = f"""
+      SELECT p.player_id, p.full_name, p.position, p.team, p.status, p.age, p.years_exp,
+             mv.stat_key, mv.stat_value
+      FROM players p
+      LEFT JOIN player_latest_metrics mv
+        ON mv.player_id = p.player_id
+       AND mv.stat_key IN ({",".join("?" * len(stat_keys))})
+      WHERE p.player_id IN ({",".join("?" * len(player_ids))})
+    """
+    items = {}
+    for row in connection.execute(sql, [*stat_keys, *player_ids]).fetchall():
+        item = items.get(row["player_id"])
+        if item is None:
+            item = {key: row[key] for key in ("player_id", "full_name", "position", "team", "status", "age", "years_exp")}
+            item["metrics"] = {}
+            items[row["player_id"]] = item
+        if row["stat_key"]:
+            item["metrics"][row["stat_key"]] = row["stat_value"]
+    return {player_id: item["metrics"] for player_id, item in items.items()}
+
+
+def _metrics_row_objects(connection, player_ids, stat_keys):
+    values = {player_id: {} for player_id in player_ids}
+    rows = connection.execute(
+        live_data.screener_compiler.metrics_sql("player_latest_metrics"),
+        live_data.screener_compiler.metrics_params(player_ids, stat_keys),
+    ).fetchall()
+    for row in rows:
+        values[row["player_id"]][row["stat_key"]] = row["stat_value"]
+    return values
+
+
+def bench_metric_pivot(connection, repeat, players=200, columns=80):
+    stat_keys = [
+        row[0]
+        for row in connection.execute(
+            "SELECT stat_key FROM metric_catalog WHERE scope = 'all' ORDER BY player_count DESC, stat_key LIMIT ?",
+            (columns,),
+        )
+    ]
+    player_ids = [
+        row[0]
+        for row in connection.execute(
+            "SELECT player_id FROM player_latest_metrics GROUP BY player_id ORDER BY COUNT(*) DESC, player_id LIMIT ?",
+            (players,),
+        )
+    ]
+    index = live_data.get_screener_index(connection)
+    variants = {
+        "fan_out_join": lambda: _metrics_fan_out(connection, player_ids, stat_keys),
+        "row_objects": lambda: _metrics_row_objects(connection, player_ids, stat_keys),
+        "tuple_scatter": lambda: live_data.fetch_metric_values(connection, "player_latest_metrics", player_ids, stat_keys),
+        "index_arrays": lambda: index.metric_values(player_ids, stat_keys),
+    }
+    expected = json.dumps(variants["fan_out_join"](), sort_keys=True)
+    print(f"metric pivot: {len(player_ids)} players x {len(stat_keys)} columns")
+    print(f"{'variant':<18} {'ms':>9} {'peak KiB':>9}")
+    for name, function in variants.items():
+        assert json.dumps(function(), sort_keys=True) == expected, name
+        elapsed = time_call(function, repeat)
+        tracemalloc.start()
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{name:<18} {elapsed:>9.2f} {peak / 1024:>9.0f}")
+
+
+def bench_series(connection, repeat, players=500):
+    player_ids = [f"p{index}" for index in range(players)]
+    spec = live_data.normalize_series_payload({"player_ids": player_ids, "stat_keys": ["target_share", "stat_01", "stat_02"]})
+
+    def batch():
+        cursor = connection.cursor()
+        cursor.row_factory = None
+        rows = cursor.execute(live_data.PLAYER_SERIES_SQL, live_data.player_series_params(spec))
+        return live_data.player_series_document(spec, None, rows)
+
+    document = batch()
+    cells = sum(value is not None for series in document["values"].values() for row in series for value in row)
+    per_player_ms = time_call(lambda: [live_data.fetch_player_history(connection, player_id) for player_id in player_ids], repeat)
+    batch_ms = time_call(batch, repeat)
+    print(f"player series: {players} players x {len(spec['stat_keys'])} keys, {cells} cells")
+    print(f"{'per_player_history':<18} {per_player_ms:>9.2f}")
+    print(f"{'series_batch':<18} {batch_ms:>9.2f}")
+
+
+def bench_comps(connection, repeat, players=20):
+    generation = live_data.current_data_generation(connection)
+    metrics = {"metrics": ["target_share", *[f"stat_{index:02d}" for index in range(7)]]}
+    spec = live_data.normalize_comps_query(metrics)
+    live_data.COMPS_COLUMNS["generation"] = None
+    started = time.perf_counter()
+    live_data.compute_player_comps(connection, "p0", spec, generation)
+    print(f"comps: cold {len(spec['metrics'])} columns in {(time.perf_counter() - started) * 1000:.0f} ms")
+    player_ids = [f"p{index}" for index in range(players)]
+    warm_ms = time_call(
+        lambda: [live_data.compute_player_comps(connection, player_id, spec, generation) for player_id in player_ids], repeat
+    )
+    print(f"comps: warm {warm_ms / players:.2f} ms per player")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--players", type=int, default=11000)
+    parser.add_argument("--fantasy-players", type=int, default=2500)
+    parser.add_argument("--stat-keys", type=int, default=80)
+    parser.add_argument("--weeks", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    stat_keys = ["target_share", *[f"stat_{index:02d}" for index in range(args.stat_keys - 1)]]
+    with tempfile.TemporaryDirectory() as tmp:
+        live_data.DATA_DIR = Path(tmp)
+        live_data.DB_PATH = Path(tmp) / "bench.db"
+        live_data.SCREENER_INDEX = screener_index.ScreenerIndexHolder()
+        with live_data.get_connection() as connection:
+            live_data.initialize_database(connection)
+            started = time.perf_counter()
+            seed(connection, args.players, args.fantasy_players, stat_keys, args.weeks, rng)
+            print(f"seeded in {time.perf_counter() - started:.1f} s")
+            started = time.perf_counter()
+            ranked = live_data.refresh_metric_ranks(connection)
+            print(f"metric ranks: {ranked} rows in {(time.perf_counter() - started) * 1000:.0f} ms")
+            started = time.perf_counter()
+            sparklines = live_data.refresh_player_sparklines(connection)
+            print(f"sparklines: {sparklines} players in {(time.perf_counter() - started) * 1000:.0f} ms")
+            started = time.perf_counter()
+            profile = live_data.register_scoring_profile(connection, {"scoring_settings": BENCH_SCORING})
+            print(f"scoring profile: {profile['player_weeks']} player-weeks in {(time.perf_counter() - started) * 1000:.0f} ms")
+            bench_index(connection, args.repeat)
+            bench_metric_pivot(connection, args.repeat)
+            bench_series(connection, args.repeat)
+            bench_comps(connection, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
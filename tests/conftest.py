@@ -6,6 +6,11 @@ from pathlib import Path
 
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+
+import live_data
+import screener_index
+from src.backend.db.repositories.bootstrap_repository import ensure_v2_tables, refresh_latest_stats_current
 
 
 @pytest.fixture()
@@ -63,3 +68,81 @@ def app_client(tmp_path: Path):
             refresh_latest_stats_current(connection)
 
         yield client
+
+
+# Screener fixture players:
+# name, position, team, age, years_exp, status, weekly ppr, target_share, yards_per_route
+SCREENER_PLAYERS = [
+    ("Alpha Adams", "WR", "SF", 24, 3, "Active", [12.5, 18.0], 0.27, 2.1),
+    ("Bravo Brown", "RB", "KC", 26, 5, "Active", [9.0, 14.25], None, 1.2),
+    ("Charlie Cole", "WR", "KC", 22, 1, "Active", [0.0, 0.0], 0.11, None),
+    ("Delta Diaz", "TE", "SF", 29, 7, "Active", [7.5, 6.0], 0.18, 1.6),
+    ("Echo Evans", "QB", "DAL", 31, 9, "Inactive", [22.0, 25.5], None, None),
+    ("Foxtrot Fox", "WR", "DAL", None, 0, "Active", [], None, None),
+    ("Golf Green", "RB", "SF", 23, 2, "Active", [15.0, 3.5], 0.09, 0.8),
+    ("Hotel Hill", "TE", None, 27, 4, "Active", [4.0, 11.0], 0.22, 1.9),
+]
+
+
+def _seed_screener_db(connection):
+    now = live_data.utc_now_iso()
+    for index, (name, position, team, age, years_exp, status, weekly, share, ypr) in enumerate(SCREENER_PLAYERS):
+        player_id = f"p{index}"
+        first, last = name.split(" ")
+        connection.execute(
+            """
+            INSERT INTO players (
+              player_id, full_name, first_name, last_name, search_full_name, position, team, status, age, years_exp, updated_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (player_id, name, first, last, name.replace(" ", "").lower(), position, team, status, age, years_exp, now),
+        )
+        for week, points in enumerate(weekly, start=1):
+            connection.execute(
+                """
+                INSERT INTO player_week_stats (
+                  player_id, season, week, season_type, source, updated_at, fantasy_points_ppr, receiving_yards, receptions
+                ) VALUES (?, 2025, ?, 'regular', 'sleeper', ?, ?, ?, ?)
+                """,
+                (player_id, week, now, points, points * 7, int(points // 3)),
+            )
+            for stat_key, value in (("target_share", share), ("yards_per_route", ypr)):
+                if value is None:
+                    continue
+                connection.execute(
+                    """
+                    INSERT INTO player_week_metrics (
+                      player_id, season, week, season_type, source, stat_key, stat_value, updated_at
+                    ) VALUES (?, 2025, ?, 'regular', 'sleeper', ?, ?, ?)
+                    """,
+                    (player_id, week, stat_key, value + week / 100.0, now),
+                )
+    connection.commit()
+    live_data.refresh_latest_metrics(connection)
+
+
+@pytest.fixture()
+def screener_players():
+    return SCREENER_PLAYERS
+
+
+@pytest.fixture()
+def screener_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(live_data, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(live_data, "DB_PATH", tmp_path / "terminal.db")
+    monkeypatch.setitem(live_data.DATA_GENERATION, "value", None)
+    live_data.SCREENER_RESULT_CACHE.clear()
+    monkeypatch.setitem(live_data.METRIC_HISTOGRAMS, "generation", None)
+    monkeypatch.setitem(live_data.METRIC_CATALOG, "generation", None)
+    monkeypatch.setitem(live_data.SPARKLINES, "generation", None)
+    monkeypatch.setitem(live_data.COMPS_COLUMNS, "generation", None)
+    monkeypatch.setattr(live_data, "SCREENER_INDEX", screener_index.ScreenerIndexHolder())
+    with live_data.get_connection() as connection:
+        live_data.initialize_database(connection)
+        _seed_screener_db(connection)
+    engine = create_engine(f"sqlite:///{tmp_path / 'terminal.db'}")
+    with engine.begin() as sa_connection:
+        ensure_v2_tables(sa_connection)
+        refresh_latest_stats_current(sa_connection)
+    yield engine
+    engine.dispose()
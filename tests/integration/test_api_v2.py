@@ -75,3 +75,182 @@ def test_sync_job_dedupes_when_active(app_client):
     assert first.status_code == 200
     assert second.status_code == 200
     assert first.json()["data"]["job_id"] == second.json()["data"]["job_id"]
+
+
+def test_repeated_screener_query_is_served_from_cache(app_client):
+    body = {"positions": ["WR"], "sort": {"key": "fantasy_points_ppr", "direction": "desc"}}
+    first = app_client.post("/api/v2/screener/query", json=body)
+    second = app_client.post("/api/v2/screener/query", json=body)
+    assert first.status_code == 200
+    assert first.json()["data"] == second.json()["data"]
+
+    cache = app_client.get("/api/v2/health").json()["data"]["screener_cache"]
+    assert cache["misses"] >= 1
+    assert cache["hits"] >= 1
+
+
+def test_scoring_profile_is_registered_and_screens(app_client):
+    response = app_client.post("/api/v2/scoring/profiles", json={"preset": "half_ppr"})
+    assert response.status_code == 200
+    profile_id = response.json()["data"]["profile_id"]
+
+    screened = app_client.post("/api/v2/screener/query", json={"scoring_profile": profile_id})
+    assert screened.status_code == 200
+    assert screened.json()["data"]["sort"]["key"] == "fantasy_points_custom"
+
+    rejected = app_client.post("/api/v2/scoring/profiles", json={"scoring_settings": {"rec": 0}})
+    assert rejected.status_code == 400
+
+
+
+def test_screener_league_filters_map_errors(app_client, monkeypatch):
+    import league_rosters
+    import live_data
+
+    def unreachable(league_id):
+        raise RuntimeError(f"Sleeper rosters request failed for league {league_id}: timed out")
+
+    monkeypatch.setattr(live_data, "LEAGUE_OWNERSHIP", league_rosters.LeagueOwnershipCache())
+    monkeypatch.setattr(live_data, "fetch_league_rosters", unreachable)
+
+    rejected = app_client.post("/api/v2/screener/query", json={"available_only": True})
+    assert rejected.status_code == 400
+    failed = app_client.post("/api/v2/screener/query", json={"league_id": "L1", "available_only": True})
+    assert failed.status_code == 502
+
+
+def test_player_series_returns_column_arrays(app_client):
+    response = app_client.post("/api/v2/players/series", json={"player_ids": ["p1", "p9"], "stat_keys": ["target_share"]})
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["axis"] == {"season": [2025], "week": [1]}
+    assert data["values"] == {"target_share": [[0.31], [None]]}
+
+    rejected = app_client.post("/api/v2/players/series", json={"player_ids": []})
+    assert rejected.status_code == 400
+
+
+def test_player_comps_endpoint_validates(app_client):
+    response = app_client.get("/api/v2/players/p1/comps", params={"metrics": "target_share"})
+    assert response.status_code == 200
+    assert response.json()["data"]["target"] == {"target_share": 0.31}
+
+    assert app_client.get("/api/v2/players/nobody/comps").status_code == 404
+    assert app_client.get("/api/v2/players/p1/comps", params={"pool": "league"}).status_code == 422
+
+
+def test_intel_report_is_built_from_cached_league_payloads(app_client, monkeypatch):
+    from src.backend.services.sleeper_client import SleeperClient
+
+    payloads = {
+        "/league/L2": {"league_id": "L2", "season": "2025", "status": "in_season", "previous_league_id": "L1", "name": "Dynasty"},
+        "/league/L1": {"league_id": "L1", "season": "2024", "status": "complete", "previous_league_id": None},
+        "/league/L2/users": [{"user_id": "u1", "display_name": "Alice"}, {"user_id": "u2", "display_name": "Bob"}],
+        "/league/L2/rosters": [{"roster_id": 1, "owner_id": "u1", "players": ["p1"]}, {"roster_id": 2, "owner_id": "u2"}],
+        "/league/L2/transactions/1": [
+            {
+                "transaction_id": "t1",
+                "type": "trade",
+                "status": "complete",
+                "status_updated": 1000,
+                "roster_ids": [1, 2],
+                "adds": {"p1": 1},
+                "drops": {"p1": 2},
+            }
+        ],
+    }
+    calls = []
+
+    async def fake_get_json(self, path):
+        calls.append(path)
+        if path == "/league/down/users":
+            raise RuntimeError("Sleeper request failed")
+        if path == "/league/down":
+            return {"league_id": "down", "season": "2025"}
+        if "/transactions/" in path or path.endswith(("/users", "/rosters")):
+            return payloads.get(path, [])
+        return payloads.get(path)
+
+    monkeypatch.setattr(SleeperClient, "get_json", fake_get_json)
+
+    response = app_client.get("/api/v2/intel/report", params={"league_id": "L2", "lookback": 3, "user_id": "u1"})
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["summary"]["seasons"] == ["2025", "2024"]
+    assert data["summary"]["total_trades"] == 1
+    assert data["summary"]["sleeper_cache"] == {"cache_hits": 0, "fetched": 42, "failed": 0, "weeks_fetched": 36}
+    assert data["summary"]["transactions_folded"] == 1
+    assert [manager["user_id"] for manager in data["managers"]] == ["u1", "u2"]
+    assert data["managers"][0]["is_you"] is True
+    assert data["managers"][0]["window_tag"] == "Rebuilder"
+    assert len(calls) == 42
+
+    # A second user of the same league is served from the shared cache, and the
+    # completed 2024 season's weeks are sealed in the profile store.
+    again = app_client.get("/api/v2/intel/report", params={"league_id": "L2", "lookback": 3, "user_id": "u2"})
+    summary = again.json()["data"]["summary"]
+    assert summary["sleeper_cache"] == {"cache_hits": 24, "fetched": 0, "failed": 0, "weeks_fetched": 18}
+    assert (summary["transactions_folded"], summary["total_trades"]) == (0, 1)
+    assert len(calls) == 42
+
+    assert app_client.get("/api/v2/intel/report").status_code == 400
+    assert app_client.get("/api/v2/intel/report", params={"league_id": "missing"}).status_code == 404
+    assert app_client.get("/api/v2/intel/report", params={"league_id": "down"}).status_code == 502
+
+
+def test_intel_refresh_folds_only_new_transactions(app_client, monkeypatch):
+    import live_data
+    from src.backend.services.sleeper_client import SleeperClient
+
+    week_two = []
+    payloads = {
+        "/league/L9": {"league_id": "L9", "season": "2025", "status": "in_season", "settings": {"leg": 4}},
+        "/league/L9/users": [{"user_id": "u1", "display_name": "Alice"}],
+        "/league/L9/rosters": [{"roster_id": 1, "owner_id": "u1", "players": ["p1"]}],
+        "/league/L9/transactions/1": [
+            {"transaction_id": "a", "type": "free_agent", "status": "complete", "status_updated": 100, "roster_ids": [1], "adds": {"p1": 1}}
+        ],
+        "/league/L9/transactions/2": week_two,
+    }
+    calls = []
+
+    async def fake_get_json(self, path):
+        calls.append(path)
+        return payloads.get(path, [])
+
+    monkeypatch.setattr(SleeperClient, "get_json", fake_get_json)
+
+    def refresh():
+        with live_data.get_connection() as connection:
+            connection.execute("DELETE FROM sleeper_cache WHERE resource = 'transactions'")
+            connection.commit()
+        calls.clear()
+        response = app_client.get("/api/v2/intel/report", params={"league_id": "L9", "lookback": 1})
+        assert response.status_code == 200
+        return response.json()["data"]
+
+    first = refresh()
+    assert first["summary"]["transactions_folded"] == 1
+    # Weeks 1-2 are two legs behind leg 4, so they are sealed after this fetch.
+    assert sum("/transactions/" in path for path in calls) == 18
+
+    week_two.append({"transaction_id": "b", "type": "waiver", "status": "complete", "status_updated": 200, "roster_ids": [1], "settings": {"waiver_bid": 12}})
+    payloads["/league/L9/transactions/3"] = [
+        {"transaction_id": "c", "type": "waiver", "status": "complete", "status_updated": 300, "roster_ids": [1], "settings": {"waiver_bid": 20}},
+        {"transaction_id": "d", "type": "waiver", "status": "pending", "status_updated": 300, "roster_ids": [1]},
+    ]
+    second = refresh()
+    # Week 2 was sealed, so its late transaction is never fetched; week 3 is still open.
+    assert "/league/L9/transactions/2" not in calls
+    assert second["summary"]["transactions_folded"] == 1
+    assert second["summary"]["total_transactions"] == 2
+
+    payloads["/league/L9/transactions/3"].append(
+        {"transaction_id": "e", "type": "waiver", "status": "complete", "status_updated": 300, "roster_ids": [1], "settings": {"waiver_bid": 4}}
+    )
+    third = refresh()
+    assert third["summary"]["transactions_folded"] == 1
+    assert third["summary"]["total_faab_bid"] == 24
+    manager = third["managers"][0]
+    assert (manager["waiver_count"], manager["avg_faab_bid"], manager["max_faab_bid"]) == (3, 12.0, 20)
+    assert manager["faab_predictor"]["confidence"] == "Low"
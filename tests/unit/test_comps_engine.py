@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import pytest
+
+import comps_engine
+import live_data
+
+
+def test_zscore_cohorts_are_per_season_and_position():
+    rows = [
+        ("a", 2025, "WR", 10.0),
+        ("b", 2025, "WR", 20.0),
+        ("c", 2025, "RB", 5.0),
+        ("a", 2024, "WR", 7.0),
+        ("d", 2024, "WR", 7.0),
+    ]
+    columns = comps_engine.zscore_cohorts(rows)
+    assert columns["WR"][("a", 2025)] == (10.0, -1.0)
+    assert columns["WR"][("b", 2025)] == (20.0, 1.0)
+    assert columns["RB"] == {("c", 2025): (5.0, 0.0)}
+    assert columns["WR"][("d", 2024)] == (7.0, 0.0)
+
+
+def test_nearest_ranks_by_rms_over_shared_metrics():
+    target = {"x": 1.0, "y": 1.0, "z": 0.0}
+    candidates = {
+        ("far", 2025): {"x": -1.0, "y": -1.0, "z": 0.0},
+        ("near", 2025): {"x": 1.0, "y": 0.0, "z": 0.0},
+        ("partial", 2025): {"x": 1.0, "y": 1.0},
+        ("sparse", 2025): {"x": 1.0},
+    }
+    neighbours = comps_engine.nearest(target, candidates, k=3)
+    assert [key for _, key, _ in neighbours] == [("partial", 2025), ("near", 2025), ("far", 2025)]
+    assert neighbours[1][0] == pytest.approx((1 / 3) ** 0.5)
+    assert [shared for _, _, shared in neighbours] == [2, 3, 3]
+    assert comps_engine.similarity(0.0) == 1.0
+
+
+def test_default_metrics_fall_back_for_other_positions():
+    assert comps_engine.default_metrics("wr")[0] == "fantasy_points_ppr"
+    assert "target_share" in comps_engine.default_metrics("TE")
+    assert comps_engine.default_metrics("K") == ["fantasy_points_ppr"]
+
+
+def test_player_comps_rank_same_position_seasons(screener_db):
+    now = live_data.utc_now_iso()
+    # player_id, season, target_share, yards_per_route (WR unless noted)
+    comps = [
+        ("w1", 2025, 0.28, 2.0),
+        ("w2", 2025, 0.10, 0.9),
+        ("w3", 2025, 0.24, 1.7),
+        ("w4", 2024, 0.30, 2.2),
+        ("w5", 2024, 0.05, 0.5),
+    ]
+    with live_data.get_connection() as connection:
+        for player_id in ("w1", "w2", "w3", "w4", "w5"):
+            connection.execute(
+                "INSERT INTO players (player_id, full_name, position, team, updated_at) VALUES (?, ?, 'WR', 'NYJ', ?)",
+                (player_id, player_id.upper(), now),
+            )
+        for player_id, season, share, ypr in comps:
+            connection.executemany(
+                """
+                INSERT INTO player_week_metrics (player_id, season, week, season_type, source, stat_key, stat_value, updated_at)
+                VALUES (?, ?, 1, 'regular', 'sleeper', ?, ?, ?)
+                """,
+                [(player_id, season, "target_share", share, now), (player_id, season, "yards_per_route", ypr, now)],
+            )
+        connection.commit()
+        live_data.refresh_latest_metrics(connection)
+
+        query = {"metrics": "target_share,yards_per_route"}
+        season = live_data.fetch_player_comps(connection, "p0", query)
+        career = live_data.fetch_player_comps(connection, "p0", {**query, "pool": "all", "k": 2})
+        default_metrics = live_data.fetch_player_comps(connection, "p0", {})
+        assert live_data.fetch_player_comps(connection, "nobody", query) is None
+        with pytest.raises(ValueError, match="pool must be one of"):
+            live_data.fetch_player_comps(connection, "p0", {"pool": "league"})
+
+    assert (season["position"], season["season"]) == ("WR", 2025)
+    assert season["target"] == pytest.approx({"target_share": 0.285, "yards_per_route": 2.115})
+    assert [item["player_id"] for item in season["items"]] == ["w1", "w3", "p2", "w2"]
+    assert season["items"][0]["metrics"] == {"target_share": 0.28, "yards_per_route": 2.0}
+    assert season["items"][2]["shared_metrics"] == 1
+    assert [(item["player_id"], item["season"]) for item in career["items"]] == [("w4", 2024), ("w1", 2025)]
+    assert default_metrics["metrics"][0] == "fantasy_points_ppr"
+    assert default_metrics["items"][0]["player_id"] == "w1"
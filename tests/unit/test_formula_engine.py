@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import math
+import sqlite3
+
+import pytest
+
+import formula_engine
+
+
+def test_parser_respects_precedence_and_canonicalizes():
+    formula = formula_engine.parse_formula("f", "  a + b * -2 / (c - 1)  ")
+    assert formula.expression == "(a + ((b * -2.0) / (c - 1.0)))"
+    assert formula.stat_keys == ("a", "b", "c")
+    assert formula_engine.parse_formula("g", formula.expression).expression == formula.expression
+
+
+@pytest.mark.parametrize(
+    "text, message",
+    [
+        ("", "empty"),
+        ("2 + 3", "at least one stat"),
+        ("a +", "end of formula"),
+        ("(a + b", "expected"),
+        ("a b", "unexpected 'b'"),
+        ("__import__(os)", "unknown function"),
+        ("a; drop table players", "unexpected character"),
+        ("abs(a, b)", "takes 1 argument"),
+        ("max(a)", "at least 2"),
+        ("a" + " + a" * 40, "more than 64 terms"),
+        ("receptions * 1e400", "out of range"),
+    ],
+)
+def test_parser_rejects_invalid_formulas(text, message):
+    with pytest.raises(formula_engine.FormulaError, match=message):
+        formula_engine.parse_formula("f", text)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "a * 2 + b",
+        "ratio(a, b)",
+        "a / (b - 4)",
+        "max(a, b, 3) - min(a, -b)",
+        "abs(a - b) / per_game(b)",
+        "-a * -b",
+    ],
+)
+def test_column_evaluation_matches_sqlite(text):
+    rows = [(1.5, 4.0, 2.0), (-2.0, None, 1.0), (3.0, 4.0, 0.0), (None, 2.0, 3.0), (0.0, 0.5, None)]
+    formula = formula_engine.parse_formula("f", text)
+    connection = sqlite3.connect(":memory:")
+    connection.execute("CREATE TABLE t (a REAL, b REAL, games REAL)")
+    connection.executemany("INSERT INTO t VALUES (?, ?, ?)", rows)
+    sql = formula_engine.to_sql(formula.tree, {"a": "a", "b": "b"}, "COALESCE(games, 1)")
+    expected = [row[0] for row in connection.execute(f"SELECT {sql} FROM t ORDER BY rowid")]
+
+    nan = float("nan")
+    columns = {
+        "a": [nan if row[0] is None else row[0] for row in rows],
+        "b": [nan if row[1] is None else row[1] for row in rows],
+    }
+    games = [1.0 if row[2] is None else row[2] for row in rows]
+    actual = formula_engine.evaluate_columns(formula.tree, columns, len(rows), games)
+    assert [None if math.isnan(value) else value for value in actual] == pytest.approx(expected)
+    assert [
+        formula_engine.evaluate_row(formula.tree, {"a": row[0], "b": row[1]}, row[2]) for row in rows
+    ] == pytest.approx(expected)
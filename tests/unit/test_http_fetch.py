@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import gzip
+import threading
+import urllib.error
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import http_fetch
+
+
+class _StubOrigin:
+    """Local HTTP/1.1 origin: path -> body, with an ETag, optional gzip, redirects and scripted failures."""
+
+    def __init__(self):
+        self.bodies: dict[str, bytes] = {}
+        self.redirects: dict[str, str] = {}
+        self.failures: dict[str, list[int]] = {}
+        self.hits: dict[str, int] = {}
+        self.connections = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                with stub._lock:
+                    stub.connections += 1
+                super().setup()
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.hits[self.path] = stub.hits.get(self.path, 0) + 1
+                    status = stub.failures[self.path].pop(0) if stub.failures.get(self.path) else None
+                if self.path in stub.redirects:
+                    self._reply(302, b"", Location=stub.redirects[self.path])
+                    return
+                if status is None and self.path not in stub.bodies:
+                    status = 404
+                if status is not None:
+                    self._reply(status, b"error")
+                    return
+                body = stub.bodies[self.path]
+                etag = f'"{len(body)}"'
+                if self.headers.get("If-None-Match") == etag:
+                    self._reply(304, b"", ETag=etag)
+                    return
+                headers = {"ETag": etag}
+                if "gzip" in (self.headers.get("Accept-Encoding") or ""):
+                    body = gzip.compress(body)
+                    headers["Content-Encoding"] = "gzip"
+                self._reply(200, body, **headers)
+
+            def _reply(self, status, body, **headers):
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture()
+def origin():
+    stub = _StubOrigin()
+    yield stub
+    stub.close()
+
+
+@pytest.fixture()
+def fetcher():
+    client = http_fetch.HttpFetcher("fdl-test", sleep=lambda seconds: None)
+    yield client
+    client.close()
+
+
+def test_gzip_bodies_are_decoded_and_counted(origin, fetcher):
+    origin.bodies["/players"] = b'{"1": "x"}' * 500
+
+    result = fetcher.fetch(origin.base_url + "/players")
+
+    assert result.body == origin.bodies["/players"]
+    assert result.wire_bytes < len(result.body)
+    stats = fetcher.snapshot()
+    assert stats["bytes_transferred"] == result.wire_bytes
+    assert stats["bytes_decoded"] == len(result.body)
+    assert stats["bytes_saved"] == len(result.body) - result.wire_bytes
+
+
+def test_stored_validators_turn_an_unchanged_body_into_a_304(origin, fetcher):
+    origin.bodies["/releases"] = b"[]" * 100
+    first = fetcher.fetch(origin.base_url + "/releases")
+    before = fetcher.snapshot()
+
+    second = fetcher.fetch(origin.base_url + "/releases", validators=first.validators())
+
+    assert second.not_modified and second.body == b""
+    delta = fetcher.stats_since(before)
+    assert (delta["not_modified"], delta["bytes_saved"]) == (1, len(first.body))
+    assert delta["bytes_transferred"] == 0
+
+
+def test_retries_server_errors_then_raises_http_errors(origin, fetcher):
+    origin.bodies["/flaky"] = b"ok"
+    origin.failures["/flaky"] = [503, 502]
+
+    assert fetcher.fetch(origin.base_url + "/flaky").body == b"ok"
+    assert fetcher.snapshot()["retries"] == 2
+
+    with pytest.raises(urllib.error.HTTPError) as error:
+        fetcher.fetch(origin.base_url + "/missing")
+    assert error.value.code == 404
+    assert origin.hits["/missing"] == 1
+
+
+def test_connections_are_reused_and_redirects_followed(origin, fetcher):
+    origin.bodies["/asset.csv"] = b"season,week\n2025,1\n"
+    origin.redirects["/download/asset.csv"] = origin.base_url + "/asset.csv"
+
+    for _ in range(3):
+        result = fetcher.fetch(origin.base_url + "/download/asset.csv")
+
+    assert result.body == origin.bodies["/asset.csv"]
+    assert result.url == origin.base_url + "/asset.csv"
+    assert fetcher.snapshot()["connections_opened"] == 1
+    assert origin.connections == 1
+
+
+def test_stream_reads_the_body_incrementally_and_reuses_the_connection(origin, fetcher):
+    origin.bodies["/season.csv"] = b"season,week\n" + b"2025,1\n" * 2000
+
+    with fetcher.stream(origin.base_url + "/season.csv") as result:
+        lines = result.body.readlines()
+    assert b"".join(lines) == origin.bodies["/season.csv"]
+
+    with fetcher.stream(origin.base_url + "/season.csv", validators=result.validators()) as again:
+        assert again.not_modified and again.body.read() == b""
+
+    stats = fetcher.snapshot()
+    assert stats["bytes_decoded"] == len(origin.bodies["/season.csv"])
+    assert stats["bytes_saved"] == 2 * len(origin.bodies["/season.csv"]) - stats["bytes_transferred"]
+    assert (stats["connections_opened"], stats["not_modified"]) == (1, 1)
+
+
+def test_proxy_environment_variables_are_honoured(origin, fetcher, monkeypatch):
+    monkeypatch.setenv("http_proxy", origin.base_url)
+    monkeypatch.delenv("no_proxy", raising=False)
+    monkeypatch.delenv("NO_PROXY", raising=False)
+    origin.bodies["http://upstream.invalid/players"] = b"{}"
+
+    assert fetcher.fetch("http://upstream.invalid/players").body == b"{}"
+    assert origin.hits == {"http://upstream.invalid/players": 1}
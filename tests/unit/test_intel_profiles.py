@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from src.backend.services import intel_profiles
+
+PLAYERS = {"p1": {"position": "WR", "age": 24, "years_exp": 2}}
+
+
+def _season_data():
+    current = {
+        "league": {"league_id": "L2", "season": "2025", "settings": {"waiver_budget": 100}},
+        "users": [{"user_id": "u1", "display_name": "Alice"}, {"user_id": "u2", "display_name": "Bob"}],
+        "rosters": [
+            {"roster_id": 1, "owner_id": "u1", "players": ["p1"]},
+            {"roster_id": 2, "owner_id": "u2", "players": []},
+        ],
+        "transactions": [
+            {"type": "trade", "status": "complete", "roster_ids": [1, 2], "adds": {"p1": 1}, "drops": {"p1": 2}, "created": 1000, "_week": 1},
+            {"type": "waiver", "status": "complete", "roster_ids": [2], "adds": {"p9": 2}, "settings": {"waiver_bid": 30}, "_week": 2},
+            {"type": "waiver", "status": "failed", "roster_ids": [1], "adds": {"p9": 1}, "settings": {"waiver_bid": 90}, "_week": 2},
+        ],
+    }
+    previous = {
+        "league": {"league_id": "L1", "season": "2024"},
+        "users": current["users"],
+        "rosters": current["rosters"],
+        "transactions": [{"type": "free_agent", "roster_ids": [1], "adds": {"p1": 1}, "_week": 3}],
+    }
+    return [current, previous]
+
+
+def test_adversarial_report_matches_js_profiles():
+    report = intel_profiles.build_adversarial_intel_report(_season_data(), "u1", PLAYERS)
+
+    assert report["summary"] == {
+        "seasons_analyzed": 2,
+        "leagues_traversed": 2,
+        "total_transactions": 3,
+        "total_waivers": 1,
+        "total_trades": 1,
+        "total_faab_bid": 30,
+        "managers_analyzed": 2,
+    }
+    bob, alice = report["managers"]
+    assert (bob["user_id"], bob["aggression_score"], bob["profile_label"]) == ("u2", 100.0, "FAAB Sniper")
+    assert bob["faab_bid_pct"] == 30.0
+    assert bob["risk_tolerance_score"] == 10
+    assert bob["top_position_adds"] == "N/A"
+    assert (alice["aggression_score"], alice["profile_label"], alice["is_you"]) == (25.8, "The Hoarder", True)
+    assert alice["seasons_covered"] == 2
+    assert alice["top_position_adds"] == "WR"
+    assert alice["trade_friendliness_score"] == 1.4
+    assert alice["top_counterparty_user_id"] == "u2"
+    assert alice["trade_timeline"] == [
+        {"timestamp": 1000, "date_label": "2025 W1", "summary": "Sent 0 · Received 1 vs Bob", "delta": 4104}
+    ]
+    assert bob["trade_timeline"][0]["delta"] == -4104
+    assert "average 30% of budget" in bob["insight"]
+
+
+def test_terminal_tone_and_roster_context():
+    season_data = _season_data()
+    report = intel_profiles.build_adversarial_intel_report(season_data, "", PLAYERS, tone="terminal")
+    intel_profiles.merge_roster_context(report, season_data[0], PLAYERS)
+
+    managers = {manager["user_id"]: manager for manager in report["managers"]}
+    assert managers["u2"]["profile_label"] == "Waiver sniper"
+    assert managers["u1"]["profile_label"] == "Risk-averse"
+    alice = managers["u1"]
+    assert alice["position_strengths"]["WR"] == {"count": 1, "ratio": 0.14, "label": "WEAK"}
+    assert alice["weak_positions"] == ["QB", "RB"]
+    assert (alice["starter_value"], alice["avg_roster_age"], alice["window_tag"]) == (4104, 24.0, "Rebuilder")
+    assert alice["faab_remaining"] == 100
+    assert alice["trade_pattern"]["buys"] == "young WRs, draft picks"
+    assert managers["u2"]["window_tag"] == "Competitive"
+
+
+
+def test_incremental_folds_match_the_full_report():
+    season_data = _season_data()
+    full = intel_profiles.build_adversarial_intel_report(season_data, "u1", PLAYERS)
+
+    parts = []
+    for season in season_data:
+        aggregates = intel_profiles.new_aggregates()
+        for transaction in season["transactions"]:
+            intel_profiles.fold_season(aggregates, {**season, "transactions": [transaction]}, PLAYERS)
+            aggregates = intel_profiles.aggregates_from_json(intel_profiles.aggregates_to_json(aggregates))
+        parts.append(aggregates)
+    incremental = intel_profiles.finalize_report(intel_profiles.merge_aggregates(parts), len(season_data), "u1")
+
+    assert incremental == full
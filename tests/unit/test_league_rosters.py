@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import threading
+
+import league_rosters
+
+
+def test_ownership_counts_reserve_taxi_and_co_owners():
+    ownership = league_rosters.LeagueOwnership(
+        "L1",
+        [
+            {"roster_id": 1, "owner_id": "u1", "players": ["p1", "p2"], "reserve": ["p3"]},
+            {"roster_id": 2, "owner_id": "u2", "co_owners": ["u3"], "players": ["p4"], "taxi": ["p5"]},
+            {"roster_id": 3, "owner_id": None, "players": None},
+            "garbage",
+        ],
+    )
+
+    assert ownership.player_ids() == ["p1", "p2", "p3", "p4", "p5"]
+    assert ownership.player_ids(["u1"]) == ["p1", "p2", "p3"]
+    assert ownership.player_ids(["2"]) == ownership.player_ids(["u3"]) == ["p4", "p5"]
+    assert ownership.player_ids(["u9"]) == []
+    assert ownership.owner_by_player["p5"] == "u2"
+
+
+def test_cache_refetches_after_ttl_and_evicts_least_recent():
+    now = [0.0]
+    loads = []
+    cache = league_rosters.LeagueOwnershipCache(ttl_seconds=60, max_leagues=2, clock=lambda: now[0])
+
+    def load(league_id):
+        loads.append(league_id)
+        return [{"roster_id": 1, "owner_id": "u1", "players": [f"{league_id}-p{len(loads)}"]}]
+
+    assert cache.get("A", load).player_ids() == ["A-p1"]
+    assert cache.get("A", load).player_ids() == ["A-p1"]
+    now[0] = 61.0
+    assert cache.get("A", load).player_ids() == ["A-p2"]
+    cache.get("B", load)
+    cache.get("A", load)
+    cache.get("C", load)
+    cache.get("A", load)
+    cache.get("B", load)
+
+    assert loads == ["A", "A", "B", "C", "B"]
+    assert cache.snapshot() == {"leagues": 2, "hits": 3, "misses": 5}
+
+
+def test_concurrent_misses_share_one_fetch():
+    release = threading.Event()
+    loads = []
+    cache = league_rosters.LeagueOwnershipCache()
+
+    def load(league_id):
+        loads.append(league_id)
+        release.wait(5)
+        return [{"roster_id": 1, "owner_id": "u1", "players": ["p1"]}]
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("A", load).player_ids())) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert loads == ["A"]
+    assert results == [["p1"]] * 4
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import player_catalog
+
+RAW = {
+    "4046": {"full_name": "Patrick Mahomes", "position": "QB", "team": "KC", "age": 29, "years_exp": 7, "college": "Texas Tech"},
+    "6794": {"full_name": "Justin Jefferson", "position": "WR", "team": "MIN", "age": 25, "years_exp": 4},
+    "1234": {"full_name": "Retired Guy", "position": "RB", "team": None, "status": "Inactive"},
+}
+
+
+def _build(raw, generation, previous=None):
+    return player_catalog.PlayerCatalog.build(raw, generation, {"fetched_at": f"gen-{generation}"}, previous=previous)
+
+
+def test_catalog_keeps_only_catalog_fields_in_slots():
+    catalog = _build(RAW, 100)
+
+    player = catalog.players["4046"]
+    assert not hasattr(player, "__dict__")
+    assert player.as_dict() == {
+        "player_id": "4046",
+        "full_name": "Patrick Mahomes",
+        "first_name": None,
+        "last_name": None,
+        "position": "QB",
+        "age": 29,
+        "years_exp": 7,
+        "team": "KC",
+        "status": None,
+    }
+    assert catalog.subset(["6794", "missing"]) == {"6794": catalog.players["6794"].as_dict()}
+
+    document, etag = catalog.document()
+    assert document["full"] is True
+    assert document["columns"]["player_id"] == ["1234", "4046", "6794"]
+    assert document["columns"]["team"] == [None, "KC", "MIN"]
+    assert catalog.document() == (document, etag)
+    assert etag.startswith('"pc100-')
+
+
+def test_delta_lists_changed_and_removed_players_since_a_generation():
+    first = _build(RAW, 100)
+    second_raw = {key: dict(value) for key, value in RAW.items() if key != "1234"}
+    second_raw["6794"]["team"] = "NYG"
+    second_raw["9999"] = {"full_name": "Rookie Player", "position": "TE"}
+    second = _build(second_raw, 200, previous=first)
+    third = _build({**second_raw, "4046": {**second_raw["4046"], "college": "Elsewhere"}}, 300, previous=second)
+
+    delta, delta_etag = third.document(100)
+    assert (delta["full"], delta["since_generation"], delta["count"]) == (False, 100, 3)
+    assert delta["columns"]["player_id"] == ["6794", "9999"]
+    assert delta["columns"]["team"] == ["NYG", None]
+    assert delta["removed"] == ["1234"]
+    # A field outside the catalog changed, so Mahomes still dates from generation 100.
+    assert third.players["4046"].changed_generation == 100
+
+    current, _ = third.document(300)
+    assert (current["changed"], current["removed"]) == (0, [])
+    assert third.document(200)[0]["columns"]["player_id"] == []
+    assert delta_etag != third.document()[1]
+
+    # History starts at the first catalog built; anything older gets everything.
+    assert third.document(50)[0]["full"] is True
+    assert third.document(400)[0]["full"] is True
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import pytest
+
+import live_data
+from src.backend.db.repositories import players_repository
+
+
+def _rounded(series):
+    return [[None if value is None else round(value, 4) for value in row] for row in series]
+
+
+def test_player_series_pivots_weeks_in_both_apis(screener_db):
+    now = live_data.utc_now_iso()
+    with live_data.get_connection() as connection:
+        connection.executemany(
+            """
+            INSERT INTO player_week_stats (player_id, season, week, season_type, source, updated_at)
+            VALUES (?, ?, ?, 'regular', ?, ?)
+            """,
+            [("p0", 2024, 17, "sleeper", now), ("p0", 2025, 1, "nflverse", now), ("p5", 2025, 1, "nflverse", now)],
+        )
+        connection.executemany(
+            """
+            INSERT INTO player_week_metrics (player_id, season, week, season_type, source, stat_key, stat_value, updated_at)
+            VALUES (?, ?, ?, 'regular', ?, 'target_share', ?, ?)
+            """,
+            [("p0", 2024, 17, "sleeper", 0.3, now), ("p0", 2025, 1, "nflverse", 0.99, now), ("p5", 2025, 1, "nflverse", 0.5, now)],
+        )
+        connection.commit()
+        payload = {"player_ids": "p0,p5,p2,missing,p0", "stat_keys": "target_share,Yards Per Route"}
+        live_data.SCREENER_RESULT_CACHE.clear()
+        document = live_data.fetch_player_series(connection, payload)
+        recent = live_data.fetch_player_series(connection, {**payload, "seasons": [2025], "last_n_games": 1})
+        plan = " ".join(
+            row["detail"]
+            for row in connection.execute(
+                f"EXPLAIN QUERY PLAN {live_data.PLAYER_SERIES_SQL}",
+                live_data.player_series_params(live_data.normalize_series_payload(payload)),
+            )
+        )
+
+    assert "idx_week_metrics_series" in plan
+    assert document["player_ids"] == ["p0", "p5", "p2", "missing"]
+    assert document["stat_keys"] == ["target_share", "yards_per_route"]
+    assert document["axis"] == {"season": [2024, 2025, 2025], "week": [17, 1, 2]}
+    assert _rounded(document["values"]["target_share"]) == [
+        [0.3, 0.28, 0.29],
+        [None, 0.5, None],
+        [None, 0.12, 0.13],
+        [None, None, None],
+    ]
+    assert document["values"]["yards_per_route"][2] == [None, None, None]
+    assert recent["axis"] == {"season": [2025, 2025], "week": [1, 2]}
+    assert _rounded(recent["values"]["target_share"][:2]) == [[None, 0.29], [0.5, None]]
+
+    live_data.SCREENER_RESULT_CACHE.clear()
+    with screener_db.connect() as connection:
+        assert players_repository.fetch_player_series(connection, payload) == document
+
+    for invalid, message in (
+        ({"player_ids": []}, "player_ids is required"),
+        ({"player_ids": [f"p{index}" for index in range(501)]}, "at most 500"),
+        ({"player_ids": "p0", "stat_keys": [f"k{index}" for index in range(33)]}, "at most 32"),
+    ):
+        with pytest.raises(ValueError, match=message):
+            live_data.normalize_series_payload(invalid)
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from query_cache import ResultCache, canonical_key
+
+
+def test_canonical_key_ignores_dict_order():
+    assert canonical_key("v1", {"a": 1, "b": [1, 2]}) == canonical_key("v1", {"b": [1, 2], "a": 1})
+    assert canonical_key("v1", {"a": 1}) != canonical_key("v2", {"a": 1})
+
+
+def test_concurrent_misses_share_one_execution():
+    cache = ResultCache("test", max_bytes=1024)
+    calls = {"count": 0}
+    started = threading.Event()
+
+    def compute():
+        calls["count"] += 1
+        started.set()
+        time.sleep(0.1)
+        return {"rows": [1, 2, 3]}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls["count"] == 1
+    assert all(result == {"rows": [1, 2, 3]} for result in results)
+    stats = cache.snapshot()
+    assert stats["misses"] == 1
+    assert stats["hits"] + stats["coalesced"] == 7
+
+
+def test_lru_eviction_respects_byte_budget():
+    cache = ResultCache("test", max_bytes=40, size_of=lambda value: len(value))
+    cache.get_or_compute("a", lambda: "x" * 20)
+    cache.get_or_compute("b", lambda: "y" * 20)
+    cache.get_or_compute("a", lambda: pytest.fail("a should be cached"))
+    cache.get_or_compute("c", lambda: "z" * 20)
+
+    stats = cache.snapshot()
+    assert stats["entries"] == 2
+    assert stats["evictions"] == 1
+    assert cache.get_or_compute("b", lambda: "recomputed") == "recomputed"
+
+
+def test_new_generation_drops_entries_and_errors_are_not_cached():
+    cache = ResultCache("test", max_bytes=1024)
+    cache.get_or_compute("k", lambda: 1, generation=1)
+    assert cache.get_or_compute("k", lambda: 2, generation=2) == 2
+
+    def boom():
+        raise ValueError("nope")
+
+    with pytest.raises(ValueError):
+        cache.get_or_compute("err", boom, generation=2)
+    assert cache.get_or_compute("err", lambda: "ok", generation=2) == "ok"
+
+
+def test_generation_bump_during_a_flight_never_serves_the_old_result():
+    cache = ResultCache("test", max_bytes=1024)
+    started = threading.Event()
+    release = threading.Event()
+
+    def old_compute():
+        started.set()
+        release.wait(5)
+        return "old"
+
+    results = {}
+    leader = threading.Thread(target=lambda: results.update(old=cache.get_or_compute("k", old_compute, generation=1)))
+    leader.start()
+    assert started.wait(5)
+
+    assert cache.get_or_compute("k", lambda: "new", generation=2) == "new"
+    release.set()
+    leader.join()
+
+    assert results["old"] == "old"
+    assert cache.get_or_compute("k", lambda: pytest.fail("generation 2 should be cached"), generation=2) == "new"
+    assert cache.get_or_compute("k", lambda: "late", generation=1) == "late"
+    stats = cache.snapshot()
+    assert (stats["generation"], stats["entries"], stats["coalesced"]) == (2, 1, 0)
+    assert cache.get_or_compute("k", lambda: pytest.fail("generation 2 should survive"), generation=2) == "new"
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import pytest
+
+import scoring_engine
+
+
+def test_settings_normalize_to_a_stable_profile_id():
+    settings = scoring_engine.normalize_scoring_settings({"REC": "1", "pass_td": 6, "rush_2pt": 0, "rec_yd": 0.1})
+    assert settings == {"pass_td": 6.0, "rec": 1.0, "rec_yd": 0.1}
+    reordered = scoring_engine.normalize_scoring_settings({"rec_yd": 0.1, "rec": 1, "pass_td": 6.0})
+    assert scoring_engine.profile_id(settings) == scoring_engine.profile_id(reordered)
+    assert scoring_engine.profile_id(settings) != scoring_engine.profile_id({**settings, "rec": 0.5})
+
+
+@pytest.mark.parametrize(
+    "raw, message",
+    [
+        ({}, "non-empty object"),
+        ({"rec": 0}, "no non-zero values"),
+        ({"rec": "one"}, "rec must be a number"),
+        ({"rec": True}, "rec must be a number"),
+        ({"rec; drop": 1}, "invalid scoring key"),
+        ({"rec": float("inf")}, "rec must be finite"),
+    ],
+)
+def test_invalid_settings_are_rejected(raw, message):
+    with pytest.raises(scoring_engine.ScoringError, match=message):
+        scoring_engine.normalize_scoring_settings(raw)
+
+
+def test_resolve_profile_accepts_presets_ids_and_league_objects():
+    assert scoring_engine.resolve_profile(None) == (None, None)
+    preset_id, preset = scoring_engine.resolve_profile("Half_PPR")
+    assert preset["rec"] == 0.5
+    assert scoring_engine.resolve_profile({"scoring_settings": scoring_engine.SCORING_PRESETS["half_ppr"]}) == (
+        preset_id,
+        preset,
+    )
+    assert scoring_engine.resolve_profile(preset_id) == (preset_id, None)
+    with pytest.raises(scoring_engine.ScoringError, match="unknown scoring profile"):
+        scoring_engine.resolve_profile("superflex")
+
+
+def test_weight_vector_maps_sources_and_position_bonuses():
+    weights = scoring_engine.weight_vector({"rec": 1.0, "bonus_rec_te": 0.5, "fum_lost": -2.0, "bonus_rec_yd_100": 3.0})
+    assert ["sleeper", "rec", "", 1.0] in weights
+    assert ["sleeper", "rec", "TE", 0.5] in weights
+    assert ["nflverse", "receptions", "TE", 0.5] in weights
+    assert ["sleeper", "bonus_rec_yd_100", "", 3.0] in weights
+    assert {tuple(entry[:2]) for entry in weights if entry[3] == -2.0} == {
+        ("sleeper", "fum_lost"),
+        ("nflverse", "rushing_fumbles_lost"),
+        ("nflverse", "receiving_fumbles_lost"),
+        ("nflverse", "sack_fumbles_lost"),
+    }
+
@@ -0,0 +1,732 @@
+from __future__ import annotations
+
+import sqlite3
+
+import pytest
+from sqlalchemy import text
+
+import league_rosters
+import live_data
+import screener_compiler
+from src.backend.db.repositories import players_repository, screener_repository
+
+
+def _legacy_filter_sql(alias, metric_filter):
+    op = metric_filter["op"]
+    if op == "between":
+        return f"{alias}.stat_value BETWEEN ? AND ?", [metric_filter["value"], metric_filter["value_max"]]
+    symbol = {"lt": "<", "lte": "<=", "gt": ">", "eq": "=", "neq": "!="}.get(op, ">=")
+    return f"{alias}.stat_value {symbol} ?", [metric_filter["value"]]
+
+
+def _legacy_v1(connection, spec):
+    """The v1 screener SQL as it was before the compiler, used as a parity oracle."""
+    use_window = spec["window"]["mode"] != "latest" or spec["window"].get("seasons") is not None
+    metrics_table = "temp_window_metrics" if use_window else "player_latest_metrics"
+    stats_table = "temp_window_stats" if use_window else "player_latest_stats"
+    if use_window:
+        live_data.rebuild_window_temp_tables(connection, spec["window"])
+    games_played_col = "l.games_played AS games_played" if use_window else "NULL AS games_played"
+    null_fill = "9999999" if spec["sort_direction"] == "asc" else "-9999999"
+    order = spec["sort_direction"].upper()
+
+    joins, join_params, where_parts, where_params = [], [], ["1=1"], []
+    if spec["relevance"] == "fantasy" and not spec["search"]:
+        where_parts.append(
+            """(
+              p.status = 'Active'
+              AND (
+                p.years_exp IS NOT NULL AND p.years_exp <= 1
+                OR EXISTS (
+                  SELECT 1 FROM player_week_stats pws
+                  WHERE pws.player_id = p.player_id AND pws.fantasy_points_ppr > 0
+                )
+              )
+            )"""
+        )
+    for index, metric_filter in enumerate(spec["filters"]):
+        clause, clause_params = _legacy_filter_sql(f"mf{index}", metric_filter)
+        joins.append(
+            f"JOIN {metrics_table} mf{index} ON mf{index}.player_id = p.player_id AND mf{index}.stat_key = ? AND {clause}"
+        )
+        join_params.extend([metric_filter["key"], *clause_params])
+    if spec["search"]:
+        where_parts.append("(LOWER(p.full_name) LIKE ? OR LOWER(p.first_name) LIKE ? OR LOWER(p.last_name) LIKE ?)")
+        where_params.extend([f"%{spec['search']}%"] * 3)
+    if spec["positions"]:
+        where_parts.append(f"p.position IN ({', '.join('?' * len(spec['positions']))})")
+        where_params.extend(spec["positions"])
+    if spec["team"]:
+        where_parts.append("p.team = ?")
+        where_params.append(spec["team"])
+    if spec["age_min"] is not None:
+        where_parts.append("p.age >= ?")
+        where_params.append(spec["age_min"])
+    if spec["age_max"] is not None:
+        where_parts.append("p.age <= ?")
+        where_params.append(spec["age_max"])
+
+    rows = connection.execute(
+        f"""
+        SELECT p.player_id, p.full_name, p.position, p.team, p.status, p.age, p.years_exp,
+          l.season AS latest_season, l.week AS latest_week, l.source AS latest_source,
+          l.fantasy_points_ppr AS latest_fantasy_points_ppr,
+          l.passing_yards AS latest_passing_yards,
+          l.rushing_yards AS latest_rushing_yards,
+          l.receiving_yards AS latest_receiving_yards,
+          l.receptions AS latest_receptions,
+          l.touchdowns AS latest_touchdowns,
+          {games_played_col}
+        FROM players p {' '.join(joins)}
+        LEFT JOIN {stats_table} l ON l.player_id = p.player_id
+        LEFT JOIN {metrics_table} msort ON msort.player_id = p.player_id AND msort.stat_key = ?
+        WHERE {' AND '.join(where_parts)}
+        ORDER BY COALESCE(msort.stat_value, COALESCE(l.fantasy_points_ppr, {null_fill})) {order}, p.full_name ASC
+        LIMIT ? OFFSET ?
+        """,
+        [*join_params, spec["sort_key"], *where_params, spec["limit"], spec["offset"]],
+    ).fetchall()
+    items = [dict(row) for row in rows]
+    for item in items:
+        item["metrics"] = {
+            row["stat_key"]: row["stat_value"]
+            for row in connection.execute(
+                f"SELECT stat_key, stat_value FROM {metrics_table} WHERE player_id = ?", (item["player_id"],)
+            )
+            if row["stat_key"] in spec["columns"]
+        }
+    return items
+
+
+def _legacy_v2(connection, spec):
+    """The v2 page/count SQL as it was before the compiler, used as a parity oracle."""
+    base_sorts = {
+        "player_name": "p.full_name",
+        "position": "p.position",
+        "team": "p.team",
+        "age": "COALESCE(p.age, {null_fill})",
+        "fantasy_points_ppr": "COALESCE(ls.fantasy_points_ppr, {null_fill})",
+    }
+    null_fill = "9999999" if spec["sort_direction"] == "asc" else "-9999999"
+    joins = ["LEFT JOIN player_latest_stats_current ls ON ls.player_id = p.player_id"]
+    where_parts = ["1=1"]
+    params = {"limit": spec["limit"], "offset": spec["offset"]}
+    for index, metric_filter in enumerate(spec["filters"]):
+        op = metric_filter["op"]
+        if op == "between":
+            clause = f"mf{index}.stat_value BETWEEN :mf{index}_lo AND :mf{index}_hi"
+            params[f"mf{index}_lo"] = metric_filter["value"]
+            params[f"mf{index}_hi"] = metric_filter["value_max"]
+        else:
+            symbol = {"lt": "<", "lte": "<=", "gt": ">", "eq": "=", "neq": "!="}.get(op, ">=")
+            clause = f"mf{index}.stat_value {symbol} :mf{index}_value"
+            params[f"mf{index}_value"] = metric_filter["value"]
+        where_parts.append(
+            f"EXISTS (SELECT 1 FROM player_latest_metrics mf{index} WHERE mf{index}.player_id = p.player_id "
+            f"AND mf{index}.stat_key = :mf{index}_key AND {clause})"
+        )
+        params[f"mf{index}_key"] = metric_filter["key"]
+    if spec["sort_key"] in base_sorts:
+        sort_expr = base_sorts[spec["sort_key"]].format(null_fill=null_fill)
+    else:
+        sort_expr = f"COALESCE(msort.stat_value, COALESCE(ls.fantasy_points_ppr, {null_fill}))"
+        joins.append("LEFT JOIN player_latest_metrics msort ON msort.player_id = p.player_id AND msort.stat_key = :sort_key")
+        params["sort_key"] = spec["sort_key"]
+    if spec["search"]:
+        where_parts.append("(LOWER(p.full_name) LIKE :wild OR LOWER(p.first_name) LIKE :wild OR LOWER(p.last_name) LIKE :wild)")
+        params["wild"] = f"%{spec['search']}%"
+    if spec["positions"]:
+        names = []
+        for index, position in enumerate(spec["positions"]):
+            names.append(f":position_{index}")
+            params[f"position_{index}"] = position
+        where_parts.append(f"p.position IN ({','.join(names)})")
+    for key, clause in (("team", "p.team = :team"), ("age_min", "p.age >= :age_min"), ("age_max", "p.age <= :age_max")):
+        if spec[key] not in (None, ""):
+            where_parts.append(clause)
+            params[key] = spec[key]
+
+    from_where = f"FROM players p {' '.join(joins)} WHERE {' AND '.join(where_parts)}"
+    total = connection.execute(text(f"SELECT COUNT(*) {from_where}"), params).scalar()
+    rows = connection.execute(
+        text(
+            f"""
+            SELECT p.player_id, p.full_name, p.position, p.team, p.status, p.age, p.years_exp,
+              ls.season AS latest_season, ls.week AS latest_week, ls.source AS latest_source,
+              ls.fantasy_points_ppr AS latest_fantasy_points_ppr
+            {from_where}
+            ORDER BY {sort_expr} {spec['sort_direction'].upper()}, p.full_name ASC
+            LIMIT :limit OFFSET :offset
+            """
+        ),
+        params,
+    ).mappings().all()
+    return total, [dict(row) for row in rows]
+
+
+PAYLOADS = [
+    {},
+    {"relevance": "all"},
+    {"relevance": "all", "sort_direction": "asc"},
+    {"relevance": "all", "sort_key": "target_share"},
+    {"relevance": "all", "sort_key": "target_share", "sort_direction": "asc", "limit": 3, "offset": 2},
+    {"relevance": "all", "sort_key": "player_name", "sort_direction": "asc"},
+    {"relevance": "all", "sort_key": "age"},
+    {"relevance": "all", "sort_key": "team", "sort_direction": "asc"},
+    {"search": "ol"},
+    {"positions": ["WR", "TE"], "relevance": "all"},
+    {"position": "RB"},
+    {"team": "sf", "relevance": "all", "age_min": 23, "age_max": 28},
+    {"relevance": "all", "filters": [{"key": "target_share", "op": "gte", "value": 0.18}]},
+    {"relevance": "all", "filters": [{"key": "target_share", "op": "gt", "value": 0.2}]},
+    {"relevance": "all", "filters": [{"key": "target_share", "op": "lt", "value": 0.2}]},
+    {"relevance": "all", "filters": [{"key": "target_share", "op": "lte", "value": 0.29}]},
+    {"relevance": "all", "filters": [{"key": "target_share", "op": "eq", "value": 0.27 + 2 / 100.0}]},
+    {"relevance": "all", "filters": [{"key": "target_share", "op": "neq", "value": 0.29}]},
+    {
+        "relevance": "all",
+        "columns": ["yards_per_route"],
+        "filters": [
+            {"key": "target_share", "op": "between", "value": 0.3, "value_max": 0.1},
+            {"key": "yards_per_route", "op": "gte", "value": 1},
+        ],
+    },
+    {"relevance": "all", "window": {"mode": "last_n_games", "last_n_games": 1}, "sort_key": "target_share"},
+    {"window": {"mode": "last_season"}, "filters": [{"key": "target_share", "op": "gt", "value": 0.1}]},
+]
+
+
+@pytest.mark.parametrize("use_index", [True, False], ids=["index", "sql"])
+@pytest.mark.parametrize("payload", PAYLOADS)
+def test_v1_compiled_screener_matches_legacy_sql(screener_db, payload, use_index):
+    live_data.SCREENER_INDEX.enabled = use_index
+    spec = live_data.normalize_screener_payload(payload)
+    with live_data.get_connection() as connection:
+        expected = _legacy_v1(connection, spec)
+        actual = live_data.execute_screener_query(connection, spec)["items"]
+    assert [item["player_id"] for item in actual] == [item["player_id"] for item in expected]
+    assert actual == expected
+
+
+@pytest.mark.parametrize("use_index", [True, False], ids=["index", "sql"])
+@pytest.mark.parametrize("payload", PAYLOADS)
+def test_v2_compiled_screener_matches_legacy_sql(screener_db, payload, use_index):
+    live_data.SCREENER_INDEX.enabled = use_index
+    spec = screener_repository.normalize_query(payload)
+    with screener_db.connect() as connection:
+        expected_total, expected_items = _legacy_v2(connection, spec)
+        result = screener_repository.execute_query(connection, spec)
+    assert result["page"]["total"] == expected_total
+    assert [{k: v for k, v in item.items() if k != "metrics"} for item in result["items"]] == expected_items
+
+
+def test_v2_paths_agree_after_a_v1_sync(screener_db):
+    with live_data.get_connection() as connection:
+        connection.execute(
+            """
+            INSERT INTO player_week_stats (
+              player_id, season, week, season_type, source, updated_at, fantasy_points_ppr
+            ) VALUES ('p6', 2025, 3, 'regular', 'sleeper', ?, 40.0)
+            """,
+            (live_data.utc_now_iso(),),
+        )
+        connection.commit()
+        live_data.refresh_latest_metrics(connection)
+
+    spec = screener_repository.normalize_query({"relevance": "all"})
+    orders = []
+    for use_index in (True, False):
+        live_data.SCREENER_INDEX.enabled = use_index
+        with screener_db.connect() as connection:
+            orders.append([item["player_id"] for item in screener_repository.execute_query(connection, spec)["items"]])
+    assert orders[0] == orders[1]
+    assert orders[0][0] == "p6"
+
+
+def test_filter_operators_compile_to_shared_shapes():
+    def shape_of(op):
+        spec = live_data.normalize_screener_payload({"filters": [{"key": "target_share", "op": op, "value": 1}]})
+        return screener_compiler.compile_screener(
+            spec, profile="v1", metrics_table="player_latest_metrics", stats_table="player_latest_stats"
+        )
+
+    shapes = {op: shape_of(op)[0] for op in ("gte", "gt", "lt", "lte", "eq")}
+    assert len(set(shapes.values())) == 1
+    _, params, _ = shape_of("gt")
+    assert params["f0_low"] > 1 and params["f0_high"] == float("inf")
+    assert shape_of("neq")[0].filters == ("neq",)
+
+
+def test_positions_bind_as_one_parameter():
+    small = live_data.normalize_screener_payload({"positions": ["WR"]})
+    large = live_data.normalize_screener_payload({"positions": ["WR", "RB", "TE", "QB"]})
+    kwargs = {"profile": "v1", "metrics_table": "player_latest_metrics", "stats_table": "player_latest_stats"}
+    small_shape, _, _ = screener_compiler.compile_screener(small, **kwargs)
+    large_shape, _, _ = screener_compiler.compile_screener(large, **kwargs)
+    assert small_shape == large_shape
+    assert screener_compiler.page_sql(small_shape) is screener_compiler.page_sql(large_shape)
+    sqlite3.connect(":memory:").execute("SELECT value FROM json_each(?)", ('["WR"]',)).fetchall()
+
+
+def test_histogram_estimates_track_value_distribution():
+    values = sorted([0.0] * 50 + [float(value) for value in range(1, 51)])
+    histogram = {"player_count": len(values), "bounds": screener_compiler.equi_depth_bounds(values)}
+    assert screener_compiler.estimate_filter_rows(histogram, "range", 0.0, 0.0) == pytest.approx(50, abs=4)
+    assert screener_compiler.estimate_filter_rows(histogram, "range", 40.0, float("inf")) == pytest.approx(11, abs=4)
+    assert screener_compiler.estimate_filter_rows(histogram, "range", 60.0, 70.0) == 0
+    assert screener_compiler.estimate_filter_rows(histogram, "neq", 1.0, None) == 100
+    assert screener_compiler.estimate_filter_rows(None, "range", 0.0, 1.0) is None
+
+
+def test_planner_drives_from_most_selective_filter(screener_db):
+    payload = {
+        "relevance": "all",
+        "debug": True,
+        "filters": [
+            {"key": "target_share", "op": "neq", "value": 0.5},
+            {"key": "age", "op": "gte", "value": 0},
+            {"key": "yards_per_route", "op": "gt", "value": 2},
+        ],
+    }
+    with live_data.get_connection() as connection:
+        rows = connection.execute(
+            "SELECT stat_key, player_count FROM metric_catalog WHERE scope = 'all'"
+        ).fetchall()
+        assert {row["stat_key"]: row["player_count"] for row in rows}["target_share"] == 5
+        result = live_data.execute_screener_query(connection, live_data.normalize_screener_payload(payload))
+    plan = result["debug"]["plan"]
+    assert plan["histograms"] is True
+    assert plan["driver"] == "yards_per_route"
+    assert [entry["key"] for entry in plan["filters"]] == ["yards_per_route", "age", "target_share"]
+    assert [item["player_id"] for item in result["items"]] == ["p0"]
+
+    spec = screener_repository.normalize_query(payload)
+    with screener_db.connect() as connection:
+        v2_result = screener_repository.execute_query(connection, spec)
+    assert v2_result["debug"]["plan"]["driver"] == "yards_per_route"
+    assert [item["player_id"] for item in v2_result["items"]] == ["p0"]
+
+
+def test_planner_never_drives_from_unestimated_rank_filter(screener_db):
+    payload = {
+        "relevance": "all",
+        "debug": True,
+        "filters": [
+            {"key": "target_share__pct", "op": "gte", "value": 0},
+            {"key": "yards_per_route", "op": "gt", "value": 2},
+        ],
+    }
+    with live_data.get_connection() as connection:
+        result = live_data.execute_screener_query(connection, live_data.normalize_screener_payload(payload))
+    plan = result["debug"]["plan"]
+    assert plan["driver"] == "yards_per_route"
+    assert [(entry["key"], entry["estimated_rows"]) for entry in plan["filters"]][1] == ("target_share__pct", None)
+    assert [item["player_id"] for item in result["items"]] == ["p0"]
+
+    _, driver, plan = screener_compiler.plan_filters(
+        [({"key": "target_share__pct", "op": "gte"}, "range", 5.0, float("inf"))],
+        {"player_count": 100, "by_key": {"targets": {"player_count": 100, "bounds": [0.0, 100.0]}}},
+    )
+    assert (driver, plan["driver"], plan["filters"][0]["estimated_rows"]) == (False, None, None)
+
+def test_filter_options_read_sync_histograms(screener_db, monkeypatch):
+    monkeypatch.setattr(live_data, "FILTER_OPTIONS_CACHE", {"stamp": None, "entries": {}})
+    with live_data.get_connection() as connection:
+        connection.execute(
+            "INSERT OR REPLACE INTO sync_state (key, value, updated_at) VALUES ('last_sync_report', '{}', ?)",
+            (live_data.utc_now_iso(),),
+        )
+        connection.commit()
+        overall = {item["key"]: item for item in live_data.fetch_filter_options(connection, {"limit": 50})}
+        sliced = {item["key"]: item for item in live_data.fetch_filter_options(connection, {"position": "WR"})}
+    assert overall["target_share"]["player_count"] == 5
+    assert overall["target_share"]["max_value"] == pytest.approx(0.29)
+    assert sliced["target_share"]["player_count"] == 2
+
+
+def test_screener_index_walks_metric_then_fallback_order(screener_db, screener_players):
+    with live_data.get_connection() as connection:
+        index = live_data.get_screener_index(connection)
+    assert index.snapshot()["players"] == len(screener_players)
+    spec = live_data.normalize_screener_payload({"relevance": "all", "sort_key": "yards_per_route"})
+    # Players without the metric sort by latest PPR (p4, p2); players with neither go last (p5).
+    assert index.top_k(spec, "yards_per_route") == ["p4", "p0", "p7", "p3", "p1", "p6", "p2", "p5"]
+    relevant = live_data.normalize_screener_payload({"positions": ["WR"], "limit": 1, "offset": 1})
+    assert index.top_k(relevant, "fantasy_points_ppr") == ["p2"]
+
+
+@pytest.mark.parametrize("use_index", [True, False], ids=["index", "sql"])
+def test_relevance_tiers_are_materialized_at_sync(screener_db, use_index):
+    live_data.SCREENER_INDEX.enabled = use_index
+    with live_data.get_connection() as connection:
+        tiers = {
+            row["player_id"]: (row["relevance_tier"], row["is_fantasy_relevant"], row["max_ppr"], row["last_ppr"])
+            for row in connection.execute(
+                "SELECT player_id, relevance_tier, is_fantasy_relevant, max_ppr, last_ppr FROM players"
+            )
+        }
+        rosterable = live_data.execute_screener_query(
+            connection, live_data.normalize_screener_payload({"relevance": "rosterable"})
+        )
+    assert tiers["p0"] == (2, 1, 18.0, 18.0)
+    assert tiers["p2"] == (1, 1, 0.0, 0.0)
+    assert tiers["p4"] == (0, 0, 25.5, 25.5)
+    assert tiers["p5"] == (1, 1, None, None)
+    assert [item["player_id"] for item in rosterable["items"]] == ["p0", "p1", "p7", "p6"]
+
+    spec = screener_repository.normalize_query({"relevance": "fantasy", "positions": ["WR"]})
+    with screener_db.connect() as connection:
+        v2_result = screener_repository.execute_query(connection, spec)
+    assert v2_result["page"]["total"] == 3
+    assert [item["player_id"] for item in v2_result["items"]] == ["p0", "p2", "p5"]
+
+
+def test_initialize_database_adds_relevance_columns_to_existing_players(tmp_path):
+    connection = sqlite3.connect(tmp_path / "old.db")
+    connection.execute(
+        """
+        CREATE TABLE players (
+          player_id TEXT PRIMARY KEY, full_name TEXT, first_name TEXT, last_name TEXT, search_full_name TEXT,
+          position TEXT, team TEXT, status TEXT, age REAL, years_exp INTEGER, gsis_id TEXT, espn_id TEXT,
+          yahoo_id TEXT, fantasy_positions TEXT, metadata_json TEXT, updated_at TEXT NOT NULL
+        )
+        """
+    )
+    live_data.initialize_database(connection)
+    columns = {row[1] for row in connection.execute("PRAGMA table_info(players)")}
+    assert set(live_data.PLAYER_RELEVANCE_COLUMNS) <= columns
+    plan = connection.execute(
+        "EXPLAIN QUERY PLAN SELECT player_id FROM players WHERE is_fantasy_relevant = 1 AND position = 'WR'"
+    ).fetchall()
+    assert "idx_players_relevance_position" in " ".join(str(row[-1]) for row in plan)
+    connection.close()
+
+
+@pytest.mark.parametrize("use_index", [True, False], ids=["index", "sql"])
+def test_metric_ranks_screen_as_pseudo_metrics(screener_db, use_index):
+    live_data.SCREENER_INDEX.enabled = use_index
+    with live_data.get_connection() as connection:
+        ranks = {
+            (row["player_id"], row["stat_key"]): (row["position"], row["percentile"], row["z_score"], row["cohort_size"])
+            for row in connection.execute("SELECT * FROM player_metric_ranks")
+        }
+        top_half = live_data.execute_screener_query(
+            connection,
+            live_data.normalize_screener_payload(
+                {
+                    "relevance": "all",
+                    "sort_key": "target_share__pct",
+                    "columns": ["target_share__z"],
+                    "filters": [{"key": "target_share__pct", "op": "gte", "value": 50}],
+                }
+            ),
+        )
+    assert ranks[("p0", "target_share")][:2] == ("WR", 100.0)
+    assert ranks[("p0", "target_share")][2] == pytest.approx(1.0)
+    assert ranks[("p2", "target_share")][1:] == (0.0, pytest.approx(-1.0), 2)
+    assert ranks[("p6", "target_share")] == ("RB", 0.0, None, 1)
+    assert [item["player_id"] for item in top_half["items"]] == ["p0", "p7"]
+    assert top_half["items"][0]["metrics"] == {
+        "target_share__pct": 100.0,
+        "target_share__z": pytest.approx(1.0),
+        "age": 24.0,
+        "years_exp": 3.0,
+    }
+
+    spec = screener_repository.normalize_query(
+        {"filters": [{"key": "Yards Per Route__PCT", "op": "lt", "value": 50}], "sort": {"key": "yards_per_route"}}
+    )
+    assert spec["filters"][0]["key"] == "yards_per_route__pct"
+    with screener_db.connect() as connection:
+        v2_result = screener_repository.execute_query(connection, spec)
+    assert [item["player_id"] for item in v2_result["items"]] == ["p0", "p3", "p6"]
+
+
+def test_filter_options_label_rank_pseudo_metrics(screener_db, monkeypatch):
+    monkeypatch.setattr(live_data, "FILTER_OPTIONS_CACHE", {"stamp": None, "entries": {}})
+    with live_data.get_connection() as connection:
+        connection.execute(
+            "INSERT OR REPLACE INTO sync_state (key, value, updated_at) VALUES ('last_sync_report', '{}', ?)",
+            (live_data.utc_now_iso(),),
+        )
+        connection.commit()
+        options = {item["key"]: item for item in live_data.fetch_filter_options(connection, {"search": "target"})}
+        defaults = {item["key"] for item in live_data.fetch_filter_options(connection, {})}
+        catalog_keys = {row[0] for row in connection.execute("SELECT stat_key FROM metric_catalog")}
+    assert options["target_share__pct"]["label"] == "Target Share (Pos. Percentile)"
+    assert options["target_share__pct"]["max_value"] == 100.0
+    assert options["target_share__z"]["label"] == "Target Share (Pos. Z-Score)"
+    assert "target_share" in defaults and not any("__" in key for key in defaults | catalog_keys)
+
+    with screener_db.connect() as connection:
+        v2_options = players_repository.fetch_filter_options(
+            connection, search="target", position="WR", team="", limit=50
+        )
+        v2_defaults = players_repository.fetch_filter_options(connection, search="", position="WR", team="", limit=50)
+    assert {"target_share", "target_share__pct", "target_share__z"} <= {item["key"] for item in v2_options}
+    assert not any("__" in item["key"] for item in v2_defaults)
+    assert live_data.normalize_stat_key("Catch %") == "catch_pct"
+
+
+def test_metric_distribution_quantiles_and_buckets():
+    quantiles, counts = live_data.metric_distribution([float(value) for value in range(10)], buckets=5)
+    assert quantiles == [1.0, 2.0, 5.0, 7.0, 9.0]
+    assert counts == [2, 2, 2, 2, 2]
+    assert live_data.metric_distribution([3.0, 3.0], buckets=4) == ([3.0] * 5, [2, 0, 0, 0])
+
+
+def test_metric_catalog_serves_scoped_distributions(screener_db):
+    with live_data.get_connection() as connection:
+        document = live_data.fetch_metric_catalog(connection, {"scope": "position", "scope_value": "wr"})
+    by_key = {item["key"]: item for item in document["items"]}
+    assert {item["scope_value"] for item in document["items"]} == {"WR"}
+    assert by_key["target_share"]["player_count"] == 2
+    assert by_key["target_share"]["min_value"] == pytest.approx(0.13)
+    assert by_key["target_share"]["quantiles"][-1] == pytest.approx(0.29)
+    assert sum(by_key["target_share"]["histogram"]) == 2
+    assert len(by_key["target_share"]["histogram"]) == document["buckets"]
+
+    with screener_db.connect() as connection:
+        v2_document = players_repository.fetch_metric_catalog(connection, scope="team", scope_value="kc")
+        v2_options = players_repository.fetch_filter_options(connection, search="", position="TE", team="", limit=50)
+    assert {item["scope"] for item in v2_document["items"]} == {"team"}
+    assert {item["key"]: item["player_count"] for item in v2_options}["target_share"] == 2
+
+
+@pytest.mark.parametrize("use_index", [True, False], ids=["index", "sql"])
+def test_formulas_filter_and_sort_in_both_apis(screener_db, use_index):
+    live_data.SCREENER_INDEX.enabled = use_index
+    payload = {
+        "relevance": "all",
+        "formulas": [{"name": "Share x Route", "expression": "target_share * yards_per_route * 100"}],
+        "sort_key": "share_x_route",
+        "filters": [{"key": "share_x_route", "op": "gt", "value": 10}],
+    }
+    with live_data.get_connection() as connection:
+        v1_items = live_data.execute_screener_query(connection, live_data.normalize_screener_payload(payload))["items"]
+    assert [item["player_id"] for item in v1_items] == ["p0", "p7", "p3"]
+    assert v1_items[0]["metrics"]["share_x_route"] == pytest.approx(0.29 * 2.12 * 100)
+
+    spec = screener_repository.normalize_query({**payload, "sort": {"key": "share_x_route", "direction": "asc"}})
+    with screener_db.connect() as connection:
+        v2_result = screener_repository.execute_query(connection, spec)
+    assert v2_result["page"]["total"] == 3
+    assert [item["player_id"] for item in v2_result["items"]] == ["p3", "p7", "p0"]
+    assert v2_result["items"][0]["metrics"]["share_x_route"] == pytest.approx(0.20 * 1.62 * 100)
+
+
+def test_formula_columns_are_cached_per_index(screener_db):
+    spec = live_data.normalize_screener_payload(
+        {"relevance": "all", "formulas": {"ratio_ts": "ratio(target_share, yards_per_route)"}, "sort_key": "ratio_ts"}
+    )
+    with live_data.get_connection() as connection:
+        index = live_data.get_screener_index(connection)
+        first = live_data.execute_screener_query(connection, spec)["items"]
+        live_data.execute_screener_query(connection, {**spec, "sort_direction": "asc"})
+    assert [item["player_id"] for item in first][:4] == ["p0", "p6", "p7", "p3"]
+    assert index.snapshot()["formula_builds"] == 1
+    assert index.snapshot()["formula_hits"] >= 2
+
+
+def test_formula_per_game_uses_window_games(screener_db):
+    spec = live_data.normalize_screener_payload(
+        {
+            "relevance": "all",
+            "window": {"mode": "last_n_games", "last_n_games": 2},
+            "columns": ["receptions"],
+            "formulas": [{"name": "rec_pg", "expression": "per_game(target_share)"}],
+            "filters": [{"key": "rec_pg", "op": "gte", "value": 0}],
+        }
+    )
+    with live_data.get_connection() as connection:
+        items = live_data.execute_screener_query(connection, spec)["items"]
+        shares = live_data.fetch_metric_values(
+            connection, "temp_window_metrics", [item["player_id"] for item in items], ["target_share"]
+        )
+    assert {item["player_id"] for item in items} == {"p0", "p2", "p3", "p6", "p7"}
+    for item in items:
+        assert item["metrics"]["rec_pg"] == pytest.approx(shares[item["player_id"]]["target_share"] / item["games_played"])
+
+
+def test_invalid_formula_is_rejected():
+    with pytest.raises(ValueError, match="share: unknown function"):
+        live_data.normalize_screener_payload({"formulas": [{"name": "share", "expression": "exec(target_share)"}]})
+
+
+SCORING = {"rec": 1, "rec_yd": 0.1, "bonus_rec_te": 0.5}
+
+
+def _seed_scoring_stats(connection, players):
+    """Sleeper rec/rec_yd for every synced week, plus one nflverse-only week for p5."""
+    now = live_data.utc_now_iso()
+    expected = {}
+    for index, (_, position, _, _, _, _, weekly, _, _) in enumerate(players):
+        for week, points in enumerate(weekly, start=1):
+            receptions = int(points // 3)
+            for stat_key, value in (("rec", receptions), ("rec_yd", points * 7)):
+                connection.execute(
+                    """
+                    INSERT INTO player_week_metrics (
+                      player_id, season, week, season_type, source, stat_key, stat_value, updated_at
+                    ) VALUES (?, 2025, ?, 'regular', 'sleeper', ?, ?, ?)
+                    """,
+                    (f"p{index}", week, stat_key, value, now),
+                )
+            bonus = 0.5 * receptions if position == "TE" else 0.0
+            expected[(f"p{index}", week)] = receptions + points * 0.7 + bonus
+    connection.execute(
+        """
+        INSERT INTO player_week_stats (player_id, season, week, season_type, source, updated_at)
+        VALUES ('p5', 2025, 1, 'regular', 'nflverse', ?)
+        """,
+        (now,),
+    )
+    for stat_key, value in (("receptions", 4), ("receiving_yards", 50), ("rec", 99)):
+        connection.execute(
+            """
+            INSERT INTO player_week_metrics (
+              player_id, season, week, season_type, source, stat_key, stat_value, updated_at
+            ) VALUES ('p5', 2025, 1, 'regular', 'nflverse', ?, ?, ?)
+            """,
+            (stat_key, value, now),
+        )
+    expected[("p5", 1)] = 4 + 5.0
+    connection.commit()
+    return expected
+
+
+@pytest.mark.parametrize("use_index", [True, False], ids=["index", "sql"])
+def test_scoring_profile_recomputes_points_in_both_apis(screener_db, screener_players, use_index):
+    live_data.SCREENER_INDEX.enabled = use_index
+    with live_data.get_connection() as connection:
+        weekly = _seed_scoring_stats(connection, screener_players)
+        latest = {player_id: points for (player_id, week), points in sorted(weekly.items(), key=lambda entry: entry[0][1])}
+        expected_order = sorted(latest, key=lambda player_id: (-latest[player_id], screener_players[int(player_id[1:])][0]))
+        response = live_data.execute_screener_query(
+            connection, live_data.normalize_screener_payload({"relevance": "all", "scoring_profile": SCORING})
+        )
+        points = {item["player_id"]: item["metrics"].get("fantasy_points_custom") for item in response["items"]}
+        window = live_data.execute_screener_query(
+            connection,
+            live_data.normalize_screener_payload(
+                {
+                    "relevance": "all",
+                    "scoring_profile": response["scoring_profile"],
+                    "window": {"mode": "last_n_games", "last_n_games": 2, "agg_mode": "totals"},
+                    "filters": [{"key": "fantasy_points_custom", "op": "gt", "value": 20}],
+                }
+            ),
+        )
+    assert [item["player_id"] for item in response["items"]][: len(expected_order)] == expected_order
+    assert points["p3"] == pytest.approx(6.0 * 0.7 + 2 + 1.0)
+    assert points["p5"] == pytest.approx(9.0)
+    totals = {}
+    for (player_id, _), value in weekly.items():
+        totals[player_id] = totals.get(player_id, 0.0) + value
+    assert {item["player_id"]: item["metrics"]["fantasy_points_custom"] for item in window["items"]} == pytest.approx(
+        {player_id: value for player_id, value in totals.items() if value > 20}
+    )
+
+    spec = screener_repository.normalize_query({"scoring_profile": "0" * 16, "relevance": "all"})
+    with screener_db.connect() as connection, pytest.raises(ValueError, match="unknown scoring profile"):
+        screener_repository.execute_query(connection, spec)
+    spec = screener_repository.normalize_query(
+        {"scoring_profile": response["scoring_profile"], "relevance": "all", "sort": {"direction": "asc"}}
+    )
+    with screener_db.connect() as connection:
+        v2_result = screener_repository.execute_query(connection, spec)
+    assert v2_result["sort"]["key"] == "fantasy_points_custom"
+    assert [item["player_id"] for item in v2_result["items"]][-len(expected_order):] == expected_order[::-1]
+
+
+def test_scoring_profiles_are_cached_per_generation(screener_db, screener_players, monkeypatch):
+    with live_data.get_connection() as connection:
+        weekly = _seed_scoring_stats(connection, screener_players)
+        first = live_data.register_scoring_profile(connection, {"scoring_settings": SCORING})
+        again = live_data.register_scoring_profile(connection, {"scoring_settings": dict(reversed(SCORING.items()))})
+        assert (first["cached"], again["cached"]) == (False, True)
+        assert first["player_weeks"] == len(weekly)
+
+        players = live_data.fetch_players(connection, {"scoring_profile": first["profile_id"], "limit": 3})
+        assert [item["player_id"] for item in players] == ["p4", "p0", "p1"]
+        assert players[0]["latest_fantasy_points_custom"] == pytest.approx(weekly[("p4", 2)])
+
+        live_data.refresh_latest_metrics(connection)
+        assert live_data.ensure_scoring_profile(connection, first["profile_id"])["cached"] is False
+
+        monkeypatch.setattr(live_data, "SCORING_PROFILE_CACHE_SIZE", 1)
+        live_data.register_scoring_profile(connection, {"preset": "std"})
+        assert connection.execute(
+            "SELECT COUNT(*) FROM scoring_profile_points WHERE profile_id = ?", (first["profile_id"],)
+        ).fetchone()[0] == 0
+        # An evicted profile_id still resolves and is rescored from its stored settings.
+        rescored = live_data.ensure_scoring_profile(connection, first["profile_id"])
+        assert (rescored["cached"], rescored["player_weeks"], rescored["settings"]) == (False, len(weekly), SCORING)
+
+    with screener_db.connect() as connection:
+        v2_players = players_repository.fetch_players(
+            connection, search="", position="TE", team="", limit=5, offset=0, sort="points_desc", scoring_profile="ppr"
+        )
+    assert [item["player_id"] for item in v2_players["items"]] == ["p7", "p3"]
+    assert v2_players["items"][0]["latest_fantasy_points_custom"] == pytest.approx(3 + 11.0 * 0.7)
+
+
+LEAGUE_ROSTERS = [
+    {"roster_id": 1, "owner_id": "u1", "players": ["p0", "p1"], "reserve": ["p6"]},
+    {"roster_id": 2, "owner_id": "u2", "co_owners": ["u3"], "players": ["p4"], "taxi": ["p2"]},
+    {"roster_id": 3, "owner_id": None, "players": None},
+]
+
+
+@pytest.mark.parametrize("use_index", [True, False], ids=["index", "sql"])
+def test_league_filters_semi_join_rosters_in_both_apis(screener_db, monkeypatch, use_index):
+    live_data.SCREENER_INDEX.enabled = use_index
+    fetched = []
+    monkeypatch.setattr(live_data, "LEAGUE_OWNERSHIP", league_rosters.LeagueOwnershipCache())
+    monkeypatch.setattr(live_data, "fetch_league_rosters", lambda league_id: fetched.append(league_id) or LEAGUE_ROSTERS)
+
+    def v1_ids(payload):
+        with live_data.get_connection() as connection:
+            result = live_data.fetch_screener_query(connection, {"relevance": "all", **payload})
+        return {item["player_id"] for item in result["items"]}
+
+    def v2_page(payload):
+        with screener_db.connect() as connection:
+            result = screener_repository.query_screener(connection, {"relevance": "all", **payload})
+        return {item["player_id"] for item in result["items"]}, result["page"]["total"]
+
+    assert v1_ids({"league_id": "L1", "owned_by": ["u1"]}) == {"p0", "p1", "p6"}
+    assert v1_ids({"league_id": "L1", "owned_by": "2", "positions": ["QB"]}) == {"p4"}
+    assert v1_ids({"league_id": "L1", "owned_by": ["u3"]}) == {"p2", "p4"}
+    assert v1_ids({"league_id": "L1", "available_only": True}) == {"p3", "p5", "p7"}
+    assert v1_ids({"league_id": "L1", "owned_by": ["nobody"]}) == set()
+    assert v2_page({"league_id": "L1", "available_only": True, "page": {"limit": 2}})[1] == 3
+    assert v2_page({"league_id": "L1", "owned_by": ["u2"]}) == ({"p2", "p4"}, 2)
+    # One roster fetch per league, shared by both APIs until the TTL lapses.
+    assert fetched == ["L1"]
+
+    spec = live_data.resolve_league_filters(
+        live_data.normalize_screener_payload({"league_id": "L1", "available_only": "1"})
+    )
+    shape, params, _ = screener_compiler.compile_screener(
+        spec, profile="v1", metrics_table="player_latest_metrics", stats_table="player_latest_stats"
+    )
+    assert shape.league == "available"
+    assert "NOT IN (SELECT value FROM json_each(:league_player_ids))" in screener_compiler.page_sql(shape)
+    assert params["league_player_ids"] == '["p0", "p1", "p2", "p4", "p6"]'
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {"owned_by": ["u1"]},
+        {"available_only": True},
+        {"league_id": "L1", "owned_by": ["u1"], "available_only": True},
+        {"league_id": "../users", "available_only": True},
+    ],
+)
+def test_invalid_league_filters_are_rejected(payload):
+    with pytest.raises(league_rosters.LeagueFilterError):
+        live_data.normalize_screener_payload(payload)
+    with pytest.raises(league_rosters.LeagueFilterError):
+        screener_repository.normalize_query(payload)
@@ -2,52 +2,184 @@ from __future__ import annotations
 
 import asyncio
 import json
-import urllib.error
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 import pytest
 
-from src.backend.services.sleeper_client import SleeperClient
-
-
-class _Response:
-    def __init__(self, payload: dict):
-        self._payload = payload
-
-    def __enter__(self):
-        return self
-
-    def __exit__(self, exc_type, exc, tb):
-        return False
-
-    def read(self):
-        return json.dumps(self._payload).encode("utf-8")
+import src.backend.config as config
+from src.backend.services.sleeper_client import SleeperClient, SleeperHTTPError
+
+
+class _StubSleeper:
+    """Local stand-in for api.sleeper.app: path -> payload, with scripted failures and delays."""
+
+    def __init__(self):
+        self.payloads: dict[str, object] = {}
+        self.failures: dict[str, list[int]] = {}
+        self.delays: dict[str, list[float]] = {}
+        self.hits: dict[str, int] = {}
+        self.connections = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                with stub._lock:
+                    stub.connections += 1
+                super().setup()
+
+            def do_GET(self):
+                path = self.path.removeprefix("/v1")
+                with stub._lock:
+                    stub.hits[path] = stub.hits.get(path, 0) + 1
+                    status = stub.failures[path].pop(0) if stub.failures.get(path) else 200
+                    delay = stub.delays[path].pop(0) if stub.delays.get(path) else 0
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                if delay:
+                    threading.Event().wait(delay)
+                with stub._lock:
+                    stub.in_flight -= 1
+                body = json.dumps(stub.payloads.get(path) if status == 200 else {"error": status}).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture()
+def stub_sleeper(monkeypatch):
+    monkeypatch.setenv("FDL_SLEEPER_MAX_CONCURRENCY", "4")
+    monkeypatch.setenv("FDL_SLEEPER_RETRY_ATTEMPTS", "3")
+    monkeypatch.setenv("FDL_SLEEPER_HEDGE_AFTER_MS", "0")
+    monkeypatch.setattr("src.backend.services.sleeper_client.time.sleep", lambda seconds: None)
+    config.reset_settings_cache()
+    stub = _StubSleeper()
+    yield stub
+    stub.close()
+    config.reset_settings_cache()
+
+
+def _client(stub: _StubSleeper) -> SleeperClient:
+    return SleeperClient(base_url=stub.base_url, timeout_seconds=5)
 
 
 @pytest.mark.parametrize("failures", [1, 2])
-def test_sleeper_client_retries_then_succeeds(monkeypatch, failures: int):
-    calls = {"count": 0}
-
-    def fake_urlopen(request, timeout=0):
-        calls["count"] += 1
-        if calls["count"] <= failures:
-            raise urllib.error.URLError("temporary")
-        return _Response({"ok": True})
+def test_sleeper_client_retries_then_succeeds(stub_sleeper, failures: int):
+    stub_sleeper.payloads["/league/test"] = {"ok": True}
+    stub_sleeper.failures["/league/test"] = [503] * failures
 
-    monkeypatch.setattr("urllib.request.urlopen", fake_urlopen)
-
-    client = SleeperClient(base_url="https://example.com", timeout_seconds=1)
+    client = _client(stub_sleeper)
     payload = asyncio.run(client.get_json("/league/test"))
 
     assert payload["ok"] is True
-    assert calls["count"] == failures + 1
-
+    assert stub_sleeper.hits["/league/test"] == failures + 1
+    assert client.stats["retries"] == failures
 
-def test_sleeper_client_raises_after_retries(monkeypatch):
-    def fake_urlopen(request, timeout=0):
-        raise urllib.error.URLError("down")
 
-    monkeypatch.setattr("urllib.request.urlopen", fake_urlopen)
+def test_sleeper_client_raises_after_retries(stub_sleeper):
+    stub_sleeper.failures["/league/test"] = [503] * 3
 
-    client = SleeperClient(base_url="https://example.com", timeout_seconds=1)
+    client = _client(stub_sleeper)
     with pytest.raises(RuntimeError):
         asyncio.run(client.get_json("/league/test"))
+    assert stub_sleeper.hits["/league/test"] == 3
+
+
+def test_sleeper_client_does_not_retry_client_errors(stub_sleeper):
+    stub_sleeper.failures["/league/test"] = [404]
+
+    client = _client(stub_sleeper)
+    with pytest.raises(SleeperHTTPError) as error:
+        asyncio.run(client.get_json("/league/test"))
+    assert error.value.status == 404
+    assert stub_sleeper.hits["/league/test"] == 1
+
+
+def test_get_many_reuses_keep_alive_connections(stub_sleeper):
+    paths = [f"/players/{index}" for index in range(40)]
+    for index, path in enumerate(paths):
+        stub_sleeper.payloads[path] = {"index": index}
+
+    client = _client(stub_sleeper)
+    first = asyncio.run(client.get_many(paths))
+    second = asyncio.run(client.get_many(paths))
+
+    assert [payload["index"] for payload in first] == list(range(40))
+    assert second == first
+    # 80 requests over at most max_concurrency sockets, kept across event loops.
+    assert client.connections_opened == stub_sleeper.connections
+    assert stub_sleeper.connections <= 4
+
+
+def test_concurrency_is_bounded_across_event_loops(stub_sleeper):
+    paths = [f"/players/{index}" for index in range(12)]
+    for path in paths:
+        stub_sleeper.payloads[path] = {}
+        stub_sleeper.delays[path] = [0.05]
+
+    client = _client(stub_sleeper)
+    # Each intel report runs its own asyncio.run in a threadpool worker.
+    reports = [
+        threading.Thread(target=lambda chunk=chunk: asyncio.run(client.get_many(chunk)))
+        for chunk in (paths[:6], paths[6:])
+    ]
+    for report in reports:
+        report.start()
+    for report in reports:
+        report.join()
+
+    assert sum(stub_sleeper.hits.values()) == 12
+    assert stub_sleeper.max_in_flight <= 4
+
+
+def test_all_weeks_transactions_skip_failed_weeks(stub_sleeper):
+    stub_sleeper.payloads.update(
+        {
+            "/league/L3/transactions/1": [{"transaction_id": "t1"}],
+            "/league/L3/transactions/3": [{"transaction_id": "t3"}, {"transaction_id": "t3b"}],
+        }
+    )
+    stub_sleeper.failures["/league/L3/transactions/2"] = [500, 500, 500]
+
+    client = _client(stub_sleeper)
+    transactions = asyncio.run(client.get_league_transactions("L3"))
+
+    assert [(item["transaction_id"], item["_week"]) for item in transactions] == [("t1", 1), ("t3", 3), ("t3b", 3)]
+    assert sum(hits for path, hits in stub_sleeper.hits.items() if "/transactions/" in path) == 18 + 2
+
+
+def test_slow_request_is_hedged(stub_sleeper, monkeypatch):
+    monkeypatch.setenv("FDL_SLEEPER_HEDGE_AFTER_MS", "50")
+    config.reset_settings_cache()
+    stub_sleeper.payloads["/league/slow"] = {"league_id": "slow"}
+    stub_sleeper.delays["/league/slow"] = [2.0]
+
+    client = _client(stub_sleeper)
+    started = time.perf_counter()
+    payload = asyncio.run(client.get_json("/league/slow"))
+
+    assert payload == {"league_id": "slow"}
+    assert time.perf_counter() - started < 1.5
+    assert client.stats == {"requests": 2, "retries": 0, "hedges": 1, "hedge_wins": 1}
+    assert stub_sleeper.hits["/league/slow"] == 2
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import datetime as dt
+import json
+import threading
+import time
+
+import pytest
+
+import http_fetch
+import live_data
+
+
+@pytest.fixture()
+def players_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(live_data, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(live_data, "DB_PATH", tmp_path / "terminal.db")
+    monkeypatch.setattr(live_data, "SLEEPER_PLAYERS_CACHE_PATH", tmp_path / "sleeper_players_nfl.json")
+    monkeypatch.setattr(live_data, "SLEEPER_PLAYERS_MEMORY", {"snapshot": None, "refreshing": False, "retry_after": 0.0})
+    monkeypatch.setattr(live_data, "SLEEPER_PLAYERS_STATS", dict.fromkeys(live_data.SLEEPER_PLAYERS_STATS, 0))
+    return tmp_path / "sleeper_players_nfl.json"
+
+
+class _FakeFetcher:
+    def __init__(self, respond):
+        self.respond = respond
+        self.calls = []
+
+    def fetch(self, url, *, timeout=45, accept=None, validators=None):
+        self.calls.append((url, validators))
+        status, body, headers = self.respond()
+        return http_fetch.FetchResult(url, status, body, headers, len(body))
+
+
+def _players_body(players):
+    return 200, json.dumps(players).encode("utf-8"), {"etag": '"v2"'}
+
+
+def _write(path, players, age_seconds):
+    fetched_at = dt.datetime.utcnow() - dt.timedelta(seconds=age_seconds)
+    path.write_text(json.dumps({"fetched_at": fetched_at.isoformat() + "Z", "players": players}), encoding="utf-8")
+
+
+def test_lookups_reuse_the_parsed_file_until_it_changes(players_cache):
+    _write(players_cache, {"1": {"full_name": "One"}}, age_seconds=60)
+
+    for _ in range(5):
+        players, info = live_data.fetch_sleeper_players_cached()
+    assert players == {"1": {"full_name": "One"}}
+    assert info["source"] == "cache"
+    assert live_data.SLEEPER_PLAYERS_STATS["disk_loads"] == 1
+    assert live_data.SLEEPER_PLAYERS_STATS["hits"] == 4
+
+    # Another process rewrote the cache file.
+    _write(players_cache, {"1": {"full_name": "One"}, "2": {"full_name": "Two"}}, age_seconds=30)
+    players, _ = live_data.fetch_sleeper_players_cached()
+    assert sorted(players) == ["1", "2"]
+    assert live_data.SLEEPER_PLAYERS_STATS["disk_loads"] == 2
+
+    summary = live_data.sleeper_players_cache_snapshot()
+    assert (summary["loaded"], summary["count"]) == (True, 2)
+    assert summary["file_bytes"] == players_cache.stat().st_size
+    assert summary["memory_bytes"] > 0
+
+
+def test_stale_cache_is_refreshed_once_for_concurrent_callers(players_cache, monkeypatch):
+    _write(players_cache, {"1": {"full_name": "Old"}}, age_seconds=live_data.SLEEPER_PLAYERS_CACHE_TTL_SECONDS + 60)
+
+    def respond():
+        time.sleep(0.1)
+        return _players_body({"1": {"full_name": "New"}})
+
+    fetcher = _FakeFetcher(respond)
+    monkeypatch.setattr(live_data, "HTTP_FETCHER", fetcher)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(live_data.fetch_sleeper_players_cached()[0]["1"]["full_name"]))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [url for url, _ in fetcher.calls] == [live_data.SLEEPER_PLAYERS_URL]
+    assert results == ["New"] * 4
+    assert live_data.SLEEPER_PLAYERS_STATS["disk_loads"] <= 1
+
+
+def test_expiring_cache_refreshes_in_the_background(players_cache, monkeypatch):
+    ttl = live_data.SLEEPER_PLAYERS_CACHE_TTL_SECONDS
+    _write(players_cache, {"1": {"full_name": "Old"}}, age_seconds=int(ttl * 0.95))
+    release = threading.Event()
+
+    def respond():
+        release.wait(5)
+        return _players_body({"1": {"full_name": "New"}})
+
+    monkeypatch.setattr(live_data, "HTTP_FETCHER", _FakeFetcher(respond))
+    players, info = live_data.fetch_sleeper_players_cached()
+    # Served from the cache immediately while the refresh runs.
+    assert (players["1"]["full_name"], info["source"]) == ("Old", "cache")
+    assert live_data.sleeper_players_cache_snapshot()["refreshing"] is True
+    assert live_data.fetch_sleeper_players_cached()[0]["1"]["full_name"] == "Old"
+
+    release.set()
+    deadline = time.monotonic() + 5
+    while live_data.SLEEPER_PLAYERS_MEMORY["refreshing"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    players, info = live_data.fetch_sleeper_players_cached()
+    assert players["1"]["full_name"] == "New"
+    assert live_data.SLEEPER_PLAYERS_STATS["background_refreshes"] == 1
+    assert json.loads(players_cache.read_text(encoding="utf-8"))["players"] == players
+
+
+def test_unchanged_players_download_keeps_the_cached_copy(players_cache, monkeypatch):
+    ttl = live_data.SLEEPER_PLAYERS_CACHE_TTL_SECONDS
+    _write(players_cache, {"1": {"full_name": "Old"}}, age_seconds=ttl + 60)
+    responses = [_players_body({"1": {"full_name": "New"}}), (304, b"", {})]
+    fetcher = _FakeFetcher(lambda: responses.pop(0))
+    monkeypatch.setattr(live_data, "HTTP_FETCHER", fetcher)
+
+    assert live_data.fetch_sleeper_players_cached()[0]["1"]["full_name"] == "New"
+    _write(players_cache, {"1": {"full_name": "New"}}, age_seconds=ttl + 60)
+    players, info = live_data.fetch_sleeper_players_cached()
+
+    assert players == {"1": {"full_name": "New"}}
+    assert info["source"] == "network"
+    assert fetcher.calls[1][1] == {"etag": '"v2"', "bytes": len(json.dumps(players))}
+    assert json.loads(players_cache.read_text(encoding="utf-8"))["players"] == players
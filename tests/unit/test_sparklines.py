@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import pytest
+
+import live_data
+from src.backend.db.repositories import screener_repository
+
+
+def test_sparkline_trend_slope_and_momentum():
+    assert live_data.sparkline_trend([4.0, None]) == (None, None)
+    assert live_data.sparkline_trend([1.0, 2.0, None, 4.0]) == (1.0, None)
+    assert live_data.sparkline_trend([0.0, 0.0, 0.0, 0.0, 10.0]) == (2.0, 0.5)
+
+
+@pytest.mark.parametrize("use_index", [True, False], ids=["index", "sql"])
+def test_screener_includes_precomputed_sparklines(screener_db, use_index):
+    live_data.SCREENER_INDEX.enabled = use_index
+    now = live_data.utc_now_iso()
+    with live_data.get_connection() as connection:
+        connection.executemany(
+            """
+            INSERT INTO player_week_metrics (player_id, season, week, season_type, source, stat_key, stat_value, updated_at)
+            VALUES ('p0', 2025, ?, 'regular', ?, 'targets', ?, ?)
+            """,
+            [(1, "sleeper", 7, now), (1, "nflverse", 9, now), (2, "nflverse", 11, now)],
+        )
+        connection.commit()
+        live_data.refresh_latest_metrics(connection)
+        assert connection.execute("SELECT COUNT(*) FROM player_sparklines").fetchone()[0] == 7
+        response = live_data.execute_screener_query(
+            connection, live_data.normalize_screener_payload({"relevance": "all", "include": "sparklines,bogus"})
+        )
+        plain = live_data.execute_screener_query(connection, live_data.normalize_screener_payload({"relevance": "all"}))
+
+    sparklines = {item["player_id"]: item["sparkline"] for item in response["items"]}
+    assert sparklines["p0"]["axis"] == {"season": [2025, 2025], "week": [1, 2]}
+    assert sparklines["p0"]["values"]["fantasy_points_ppr"] == [12.5, 18.0]
+    assert sparklines["p0"]["values"]["targets"] == [7, 11]
+    assert sparklines["p0"]["values"]["carries"] == [None, None]
+    assert (sparklines["p0"]["games"], sparklines["p0"]["ppr_slope"]) == (2, 5.5)
+    assert sparklines["p5"] is None
+    assert "sparkline" not in plain["items"][0]
+
+    spec = screener_repository.normalize_query({"relevance": "all", "include": ["sparklines"]})
+    with screener_db.connect() as connection:
+        v2_items = screener_repository.execute_query(connection, spec)["items"]
+    assert {item["player_id"]: item["sparkline"] for item in v2_items} == sparklines
@@ -0,0 +1,399 @@
+from __future__ import annotations
+
+import gzip
+import http.client
+import json
+import os
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import screener_index
+import terminal_server
+
+
+@pytest.fixture()
+def static_server(monkeypatch):
+    monkeypatch.setattr(terminal_server.TerminalRequestHandler, "max_requests_per_connection", 3)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), terminal_server.TerminalRequestHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server.server_address[1]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_keepalive_reuses_connection_until_request_limit(static_server):
+    connection = http.client.HTTPConnection("127.0.0.1", static_server, timeout=5)
+    try:
+        connection.request("GET", "/lab")
+        redirect = connection.getresponse()
+        assert redirect.status == 302
+        assert redirect.getheader("Content-Length") == "0"
+        assert redirect.getheader("Keep-Alive", "").endswith("max=2")
+        redirect.read()
+        sock = connection.sock
+
+        connection.request("GET", "/lab.html")
+        page = connection.getresponse()
+        body = page.read()
+        assert page.status == 200
+        assert int(page.getheader("Content-Length")) == len(body)
+        assert connection.sock is sock
+        etag = page.getheader("ETag")
+
+        connection.request("GET", "/lab.html", headers={"If-None-Match": etag})
+        not_modified = connection.getresponse()
+        assert not_modified.status == 304
+        assert not_modified.getheader("Connection") == "close"
+        assert not_modified.read() == b""
+    finally:
+        connection.close()
+
+
+def test_client_requested_close_is_honoured(static_server):
+    connection = http.client.HTTPConnection("127.0.0.1", static_server, timeout=5)
+    try:
+        connection.request("GET", "/home", headers={"Connection": "close"})
+        response = connection.getresponse()
+        assert response.status == 302
+        assert response.getheader("Connection") == "close"
+    finally:
+        connection.close()
+
+
+def test_negotiate_encoding_respects_quality_values():
+    assert terminal_server.negotiate_encoding("gzip, deflate") == "gzip"
+    assert terminal_server.negotiate_encoding("gzip;q=0, identity") is None
+    assert terminal_server.negotiate_encoding("") is None
+    assert terminal_server.negotiate_encoding("*") in terminal_server.available_encodings()
+
+
+def test_static_assets_are_served_compressed_with_vary(static_server):
+    connection = http.client.HTTPConnection("127.0.0.1", static_server, timeout=5)
+    try:
+        connection.request("GET", "/lab.js", headers={"Accept-Encoding": "gzip"})
+        response = connection.getresponse()
+        body = response.read()
+        assert response.status == 200
+        assert response.getheader("Content-Encoding") == "gzip"
+        assert response.getheader("Vary") == "Accept-Encoding"
+        assert int(response.getheader("Content-Length")) == len(body)
+        assert gzip.decompress(body) == (terminal_server.BASE_DIR / "lab.js").read_bytes()
+        etag = response.getheader("ETag")
+        assert etag.endswith('-gz"')
+
+        connection.request("GET", "/lab.js")
+        identity = connection.getresponse()
+        identity.read()
+        assert identity.getheader("Content-Encoding") is None
+        assert identity.getheader("Vary") == "Accept-Encoding"
+        assert identity.getheader("ETag") != etag
+    finally:
+        connection.close()
+
+
+def test_static_asset_cache_refreshes_changed_files(tmp_path):
+    asset = tmp_path / "app.js"
+    asset.write_text("console.log('v1');" * 40, encoding="utf-8")
+    (tmp_path / "notes.bin").write_bytes(b"\x00" * 10)
+
+    cache = terminal_server.StaticAssetCache(tmp_path)
+    assert cache.warm() == 1
+    entry = cache.lookup("/app.js")
+    assert entry["bodies"][None] == asset.read_bytes()
+    assert "gzip" in entry["bodies"]
+    assert cache.lookup("/notes.bin") is None
+
+    asset.write_text("console.log('v2');" * 40, encoding="utf-8")
+    os.utime(asset, ns=(entry["stamp"][0] + 10**9, entry["stamp"][0] + 10**9))
+    assert cache.refresh_changed() == 1
+    refreshed = cache.lookup("/app.js")
+    assert refreshed["etag"] != entry["etag"]
+    assert refreshed["bodies"][None] == asset.read_bytes()
+
+    asset.unlink()
+    assert cache.refresh_changed() == 1
+    assert cache.lookup("/app.js") is None
+
+
+@pytest.fixture()
+def api_server(tmp_path, monkeypatch):
+    import live_data
+
+    monkeypatch.setattr(live_data, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(live_data, "DB_PATH", tmp_path / "terminal.db")
+    monkeypatch.setitem(live_data.DATA_GENERATION, "value", None)
+    monkeypatch.setitem(live_data.METRIC_CATALOG, "generation", None)
+    monkeypatch.setitem(live_data.SPARKLINES, "generation", None)
+    monkeypatch.setitem(live_data.COMPS_COLUMNS, "generation", None)
+    monkeypatch.setattr(live_data, "SCREENER_INDEX", screener_index.ScreenerIndexHolder())
+    with live_data.get_connection() as connection:
+        live_data.initialize_database(connection)
+        connection.execute(
+            """
+            INSERT INTO players (player_id, full_name, position, team, status, updated_at)
+            VALUES ('p1', 'Test Player', 'WR', 'SF', 'Active', ?)
+            """,
+            (live_data.utc_now_iso(),),
+        )
+        connection.commit()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), terminal_server.TerminalRequestHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server.server_address[1]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_api_conditional_get_uses_data_generation(api_server):
+    import live_data
+
+    connection = http.client.HTTPConnection("127.0.0.1", api_server, timeout=5)
+    try:
+        connection.request("GET", "/api/teams")
+        first_response = connection.getresponse()
+        assert json.loads(first_response.read())["items"] == ["SF"]
+        etag = first_response.getheader("ETag")
+        assert etag.startswith('W/"g0-')
+        assert first_response.getheader("Cache-Control") == terminal_server.API_CACHE_CONTROL
+
+        connection.request("GET", "/api/teams", headers={"If-None-Match": etag})
+        revalidated = connection.getresponse()
+        assert revalidated.status == 304
+        assert revalidated.read() == b""
+
+        with live_data.get_connection() as db:
+            live_data.refresh_latest_metrics(db)
+
+        connection.request("GET", "/api/teams", headers={"If-None-Match": etag})
+        changed = connection.getresponse()
+        changed.read()
+        assert changed.status == 200
+        assert changed.getheader("ETag").startswith('W/"g1-')
+
+        connection.request("GET", "/api/admin/sync/status")
+        status = connection.getresponse()
+        status.read()
+        assert status.getheader("Cache-Control") == "no-store"
+        assert status.getheader("ETag") is None
+    finally:
+        connection.close()
+
+
+def test_metric_catalog_endpoint_is_one_cacheable_document(api_server):
+    import live_data
+
+    with live_data.get_connection() as db:
+        db.execute(
+            """
+            INSERT INTO player_week_metrics (player_id, season, week, season_type, source, stat_key, stat_value, updated_at)
+            VALUES ('p1', 2025, 1, 'regular', 'sleeper', 'target_share', 0.25, ?)
+            """,
+            (live_data.utc_now_iso(),),
+        )
+        db.commit()
+        live_data.refresh_latest_metrics(db)
+
+    connection = http.client.HTTPConnection("127.0.0.1", api_server, timeout=5)
+    try:
+        connection.request("GET", "/api/metrics/catalog")
+        response = connection.getresponse()
+        document = json.loads(response.read())
+        assert response.status == 200
+        assert response.getheader("ETag").startswith('W/"g1-')
+        scopes = {(item["scope"], item["scope_value"]) for item in document["items"] if item["key"] == "target_share"}
+        assert scopes == {("all", ""), ("position", "WR"), ("team", "SF")}
+
+        connection.request("GET", "/api/metrics/catalog", headers={"If-None-Match": response.getheader("ETag")})
+        revalidated = connection.getresponse()
+        assert revalidated.status == 304
+        revalidated.read()
+
+        connection.request("GET", "/api/metrics/catalog?scope=league")
+        rejected = connection.getresponse()
+        rejected.read()
+        assert rejected.status == 400
+    finally:
+        connection.close()
+
+
+def test_scoring_profile_endpoints_register_and_validate(api_server):
+    connection = http.client.HTTPConnection("127.0.0.1", api_server, timeout=5)
+    try:
+        body = json.dumps({"scoring_settings": {"rec": 1, "pass_td": 6}})
+        connection.request("POST", "/api/scoring/profiles", body=body, headers={"Content-Type": "application/json"})
+        response = connection.getresponse()
+        profile = json.loads(response.read())
+        assert response.status == 200
+        assert profile["settings"] == {"pass_td": 6.0, "rec": 1.0}
+
+        connection.request("GET", f"/api/players?scoring_profile={profile['profile_id']}")
+        players = connection.getresponse()
+        items = json.loads(players.read())["items"]
+        assert players.status == 200
+        assert items[0]["latest_fantasy_points_custom"] is None
+
+        connection.request("POST", "/api/scoring/profiles", body=json.dumps({"scoring_settings": {"rec": "x"}}))
+        rejected = connection.getresponse()
+        assert rejected.status == 400
+        assert "rec must be a number" in json.loads(rejected.read())["error"]
+
+        connection.request("GET", "/api/players?scoring_profile=superflex")
+        unknown = connection.getresponse()
+        unknown.read()
+        assert unknown.status == 400
+    finally:
+        connection.close()
+
+
+def test_player_series_endpoint_is_cacheable_and_validates(api_server):
+    import live_data
+
+    with live_data.get_connection() as db:
+        now = live_data.utc_now_iso()
+        db.execute(
+            """
+            INSERT INTO player_week_stats (player_id, season, week, season_type, source, updated_at)
+            VALUES ('p1', 2025, 3, 'regular', 'sleeper', ?)
+            """,
+            (now,),
+        )
+        db.execute(
+            """
+            INSERT INTO player_week_metrics (player_id, season, week, season_type, source, stat_key, stat_value, updated_at)
+            VALUES ('p1', 2025, 3, 'regular', 'sleeper', 'target_share', 0.25, ?)
+            """,
+            (now,),
+        )
+        db.commit()
+
+    connection = http.client.HTTPConnection("127.0.0.1", api_server, timeout=5)
+    try:
+        connection.request("GET", "/api/players/series?player_ids=p1,p2&stat_keys=target_share")
+        response = connection.getresponse()
+        document = json.loads(response.read())
+        assert response.status == 200
+        assert document["axis"] == {"season": [2025], "week": [3]}
+        assert document["values"] == {"target_share": [[0.25], [None]]}
+
+        connection.request(
+            "GET",
+            "/api/players/series?player_ids=p1,p2&stat_keys=target_share",
+            headers={"If-None-Match": response.getheader("ETag")},
+        )
+        revalidated = connection.getresponse()
+        revalidated.read()
+        assert revalidated.status == 304
+
+        body = json.dumps({"player_ids": ["p1"], "seasons": [2024]})
+        connection.request("POST", "/api/players/series", body=body, headers={"Content-Type": "application/json"})
+        posted = connection.getresponse()
+        empty = json.loads(posted.read())
+        assert posted.status == 200
+        assert empty["axis"] == {"season": [], "week": []}
+        assert empty["stat_keys"] == list(live_data.SERIES_DEFAULT_STAT_KEYS)
+
+        connection.request("GET", "/api/players/series")
+        rejected = connection.getresponse()
+        assert rejected.status == 400
+        assert json.loads(rejected.read())["error"] == "player_ids is required"
+    finally:
+        connection.close()
+
+
+def test_player_comps_endpoint(api_server):
+    import live_data
+
+    with live_data.get_connection() as db:
+        now = live_data.utc_now_iso()
+        db.execute(
+            "INSERT INTO players (player_id, full_name, position, team, updated_at) VALUES ('p2', 'Other', 'WR', 'KC', ?)",
+            (now,),
+        )
+        db.executemany(
+            """
+            INSERT INTO player_week_metrics (player_id, season, week, season_type, source, stat_key, stat_value, updated_at)
+            VALUES (?, 2025, 1, 'regular', 'sleeper', 'target_share', ?, ?)
+            """,
+            [("p1", 0.25, now), ("p2", 0.2, now)],
+        )
+        db.commit()
+
+    connection = http.client.HTTPConnection("127.0.0.1", api_server, timeout=5)
+    try:
+        connection.request("GET", "/api/players/p1/comps?metrics=target_share&k=5")
+        response = connection.getresponse()
+        document = json.loads(response.read())
+        assert response.status == 200
+        assert response.getheader("ETag")
+        assert [(item["player_id"], item["season"]) for item in document["items"]] == [("p2", 2025)]
+
+        connection.request("GET", "/api/players/p1/comps?pool=league")
+        rejected = connection.getresponse()
+        rejected.read()
+        assert rejected.status == 400
+
+        connection.request("GET", "/api/players/nobody/comps")
+        missing = connection.getresponse()
+        missing.read()
+        assert missing.status == 404
+    finally:
+        connection.close()
+
+
+def test_sleeper_player_catalog_is_loaded_once_and_revalidates(api_server, monkeypatch):
+    import live_data
+
+    loads = []
+    players = {f"{index}": {"full_name": f"Player {index}", "position": "WR", "team": "SF"} for index in range(60)}
+
+    def fake_cached(force_refresh=False):
+        loads.append(force_refresh)
+        return players, {"source": "cache", "cached": True, "fetched_at": "2026-09-01T12:00:00Z", "count": len(players)}
+
+    monkeypatch.setattr(live_data, "fetch_sleeper_players_cached", fake_cached)
+    monkeypatch.setattr(live_data, "SLEEPER_PLAYER_CATALOG", {"catalog": None, "checked_at": 0.0})
+    generation = live_data.sleeper_catalog_generation("2026-09-01T12:00:00Z")
+
+    connection = http.client.HTTPConnection("127.0.0.1", api_server, timeout=5)
+    try:
+        connection.request("GET", "/api/sleeper/players/catalog", headers={"Accept-Encoding": "gzip"})
+        response = connection.getresponse()
+        document = json.loads(gzip.decompress(response.read()))
+        etag = response.getheader("ETag")
+        assert response.status == 200
+        assert response.getheader("Cache-Control") == terminal_server.SLEEPER_CATALOG_CACHE_CONTROL
+        assert etag.startswith(f'"pc{generation}-') and etag.endswith('-gz"')
+        assert (document["generation"], document["full"], document["count"]) == (generation, True, 60)
+        assert document["columns"]["full_name"][0] == "Player 0"
+
+        connection.request("GET", "/api/sleeper/players/catalog", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+        revalidated = connection.getresponse()
+        assert revalidated.status == 304
+        assert revalidated.read() == b""
+
+        connection.request("GET", f"/api/sleeper/players/catalog?since_generation={generation}")
+        delta = connection.getresponse()
+        delta_document = json.loads(delta.read())
+        assert (delta_document["full"], delta_document["changed"], delta_document["removed"]) == (False, 0, [])
+        assert delta.getheader("ETag") != etag
+
+        connection.request("POST", "/api/sleeper/players/by-ids", body=json.dumps({"ids": ["3", "nope"]}))
+        subset = json.loads(connection.getresponse().read())
+        assert subset["players"]["3"]["full_name"] == "Player 3"
+        assert subset["cache"]["generation"] == generation
+
+        connection.request("GET", "/api/sleeper/players/catalog?since_generation=soon")
+        rejected = connection.getresponse()
+        rejected.read()
+        assert rejected.status == 400
+    finally:
+        connection.close()
+    # The stale fetched_at is rechecked at most once per recheck window.
+    assert loads == [False]
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import http.client
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+
+import terminal_server
+
+
+def _make_handler(release: threading.Event):
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self):  # noqa: N802
+            if self.path == "/api/screener":
+                release.wait(timeout=5)
+            body = b"ok"
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):  # noqa: A002
+            return
+
+    return _Handler
+
+
+def _open_request(port: int, path: str) -> http.client.HTTPConnection:
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    connection.request("GET", path)
+    return connection
+
+
+def test_classify_request_path_routes_expensive_endpoints():
+    assert terminal_server.classify_request_path("/api/screener/query") == "heavy"
+    assert terminal_server.classify_request_path("/api/admin/sync") == "heavy"
+    assert terminal_server.classify_request_path("/api/teams") == "fast"
+    assert terminal_server.classify_request_path("/lab.js") == "fast"
+
+
+def test_pooled_server_rejects_heavy_overflow_but_keeps_fast_pool_open():
+    release = threading.Event()
+    server = terminal_server.PooledHTTPServer(
+        ("127.0.0.1", 0),
+        _make_handler(release),
+        fast_workers=2,
+        fast_queue=4,
+        heavy_workers=1,
+        heavy_queue=1,
+    )
+    port = server.server_address[1]
+    serve_thread = threading.Thread(target=server.serve_forever, daemon=True)
+    serve_thread.start()
+    pending = []
+    try:
+        pending.append(_open_request(port, "/api/screener"))
+        deadline = time.monotonic() + 5
+        while server.pool_snapshot()["heavy"]["busy"] < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        pending.append(_open_request(port, "/api/screener"))
+        deadline = time.monotonic() + 5
+        while server.pool_snapshot()["heavy"]["queued"] < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        overflow = _open_request(port, "/api/screener")
+        response = overflow.getresponse()
+        assert response.status == 503
+        assert response.getheader("Retry-After") == "1"
+        overflow.close()
+
+        fast = _open_request(port, "/api/teams")
+        assert fast.getresponse().status == 200
+        fast.close()
+
+        release.set()
+        for connection in pending:
+            assert connection.getresponse().status == 200
+            connection.close()
+
+        stats = server.pool_snapshot()
+        assert stats["heavy"]["rejected"] == 1
+        assert stats["fast"]["rejected"] == 0
+    finally:
+        release.set()
+        server.shutdown()
+        server.server_close()
+
+
+class _PoolEchoHandler(terminal_server.TerminalRequestHandler):
+    def do_GET(self):  # noqa: N802
+        self.send_json(200, {"path": self.path, "pool": self.server.worker_pool()})
+
+    def log_message(self, format, *args):  # noqa: A002
+        return
+
+
+def test_keepalive_requests_are_rerouted_to_the_heavy_pool():
+    server = terminal_server.PooledHTTPServer(
+        ("127.0.0.1", 0), _PoolEchoHandler, fast_workers=2, fast_queue=4, heavy_workers=1, heavy_queue=1
+    )
+    serve_thread = threading.Thread(target=server.serve_forever, daemon=True)
+    serve_thread.start()
+    connection = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+    try:
+        seen = []
+        for path in ("/api/teams", "/api/health", "/api/screener"):
+            connection.request("GET", path)
+            response = connection.getresponse()
+            seen.append((json.loads(response.read())["pool"], response.getheader("Connection")))
+
+        # The cheap requests share one fast-pool connection; the heavy one moves
+        # to the heavy pool on that same connection (one accept) and closes it afterwards.
+        assert seen == [("fast", None), ("fast", None), ("heavy", "close")]
+        stats = server.pool_snapshot()
+        assert (stats["fast"]["accepted"], stats["heavy"]["accepted"]) == (1, 1)
+    finally:
+        connection.close()
+        server.shutdown()
+        server.server_close()